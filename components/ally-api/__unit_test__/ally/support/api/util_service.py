@@ -0,0 +1,217 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally api
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides unit testing for the in memory query processing.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.api.config import model, query
+from ally.api.criteria import AsLikeOrdered, AsEqualOrdered, AsBooleanOrdered, \
+    AsRangeOrdered, AsBoolean, AsLike, AsEqual, AsOrdered
+from ally.support.api.util_service import processQuery, processCollection, \
+    iterateFor, namesFor, likeAsRegex, trimIter
+from itertools import chain
+import logging
+import random
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+@model(id='Id')
+class Item:
+    '''
+    Provides the item model.
+    '''
+    Id = int
+    Name = str
+    Rank = int
+    Active = bool
+    Score = int
+
+@query(Item)
+class QItem:
+    '''
+    Provides the item query.
+    '''
+    name = AsLikeOrdered
+    rank = AsEqualOrdered
+    active = AsBooleanOrdered
+    score = AsRangeOrdered
+
+def createItems(count, seed=1):
+    rnd, items = random.Random(seed), []
+    for k in range(count):
+        item = Item()
+        item.Id, item.Name, item.Rank = k, 'item%s%s' % (rnd.choice('abcd'), rnd.randint(0, 999)), rnd.randint(0, 9)
+        item.Active, item.Score = rnd.random() < 0.5, rnd.randint(0, 99)
+        items.append(item)
+    return items
+
+def createQueries():
+    queries = []
+    
+    q = QItem()
+    q.name.like = 'itema%'
+    queries.append(q)
+    
+    q = QItem()
+    q.name.ilike = 'ITEMB%1'
+    q.rank.orderDesc()
+    queries.append(q)
+    
+    q = QItem()
+    q.active.value = True
+    q.score.orderAsc()
+    q.rank.orderDesc()
+    queries.append(q)
+    
+    q = QItem()
+    q.rank.equal = 3
+    q.score.orderDesc()
+    q.score.priority = 2
+    q.name.orderAsc()
+    q.name.priority = 1
+    q.active.orderDesc()
+    queries.append(q)
+    
+    q = QItem()
+    q.score.orderDesc()
+    q.rank.orderDesc()
+    queries.append(q)
+    
+    q = QItem()
+    q.active.orderAsc()
+    queries.append(q)
+    
+    queries.append(QItem())
+    return queries
+
+def processQueryReference(collection, clazz, query, fetcher=None):
+    '''
+    The previous implementation used as a reference.
+    '''
+    if query is None: return list(collection)
+    
+    filtered = list(collection)
+    if fetcher:
+        items = {}
+        def get(reference):
+            if reference not in items: items[reference] = fetcher(reference)
+            return items[reference]
+    else: get = lambda item: item
+    
+    ordered, unordered = [], []
+    properties = {name.lower(): name for name in namesFor(clazz)}
+    for cname, criteria in iterateFor(query):
+        pname = properties.get(cname.lower())
+        if pname is not None and criteria in query:
+            cvalue = getattr(query, cname)
+            if isinstance(cvalue, AsBoolean):
+                if AsBoolean.value in cvalue:
+                    filtered = [item for item in filtered if cvalue.value == getattr(get(item), pname)]
+            elif isinstance(cvalue, AsLike):
+                regex = None
+                if AsLike.like in cvalue:
+                    if cvalue.like is not None: regex = likeAsRegex(cvalue.like, False)
+                elif AsLike.ilike in cvalue:
+                    if cvalue.ilike is not None: regex = likeAsRegex(cvalue.ilike, True)
+                if regex is not None:
+                    filtered = ((item, getattr(get(item), pname)) for item in filtered)
+                    filtered = [item for item, value in filtered if value is not None and regex.match(value)]
+            elif isinstance(cvalue, AsEqual):
+                if AsEqual.equal in cvalue:
+                    filtered = [item for item in filtered if cvalue.equal == getattr(get(item), pname)]
+            if isinstance(cvalue, AsOrdered):
+                if AsOrdered.ascending in cvalue:
+                    if AsOrdered.priority in cvalue and cvalue.priority:
+                        ordered.append((pname, cvalue.ascending, cvalue.priority))
+                    else:
+                        unordered.append((pname, cvalue.ascending, None))
+
+            ordered.sort(key=lambda pack: pack[2])
+            for prop, asc, __ in reversed(list(chain(ordered, unordered))):
+                filtered.sort(key=lambda item: getattr(get(item), prop), reverse=not asc)
+
+    return filtered
+
+def processCollectionReference(collection, clazz=None, query=None, fetcher=None, offset=0, limit=None):
+    collection = processQueryReference(collection, clazz, query, fetcher)
+    return len(collection), list(trimIter(collection, len(collection), offset, limit))
+
+# --------------------------------------------------------------------
+
+class TestProcessQuery(unittest.TestCase):
+
+    def testIdentical(self):
+        items = createItems(3000)
+        byId = {item.Id: item for item in items}
+        ids = [item.Id for item in items]
+        
+        for q in createQueries():
+            self.assertEqual(processQueryReference(items, Item, q), processQuery(items, Item, q))
+            
+            fetched = []
+            def fetcher(identifier):
+                fetched.append(identifier)
+                return byId[identifier]
+            self.assertEqual(processQueryReference(ids, Item, q, byId.get), processQuery(iter(ids), Item, q, fetcher))
+            self.assertTrue(len(fetched) == len(set(fetched)))
+            
+            for offset, limit in ((0, None), (0, 10), (20, 5), (2990, 30), (5000, 10), (0, 0)):
+                total, expected = processCollectionReference(items, Item, q, offset=offset, limit=limit)
+                collection = processCollection(items, Item, q, offset=offset, limit=limit, withTotal=True)
+                self.assertEqual((total, expected), (collection.total, list(collection)))
+                
+                total, expected = processCollectionReference(ids, Item, q, byId.get, offset=offset, limit=limit)
+                collection = processCollection(ids, Item, q, byId.get, offset=offset, limit=limit)
+                self.assertEqual(expected, list(collection))
+
+    def testNoQuery(self):
+        items = createItems(10)
+        self.assertEqual(items, processQuery(iter(items), Item, None))
+        self.assertEqual(items[2:5], list(processCollection(items, offset=2, limit=3)))
+
+# --------------------------------------------------------------------
+
+class BenchmarkProcessQuery(unittest.TestCase):
+
+    count = 100000
+    # The number of items to process.
+
+    def testBenchmark(self):
+        items = createItems(self.count)
+        byId = {item.Id: item for item in items}
+        ids = [item.Id for item in items]
+        
+        timings = {}
+        for name, process in (('reference', processCollectionReference), ('planned', processCollection)):
+            started = time.time()
+            for q in createQueries():
+                list(process(items, Item, q, offset=100, limit=20))
+                list(process(ids, Item, q, byId.get, offset=0, limit=None))
+            timings[name] = time.time() - started
+        
+        log.info('Processing %s items with %s queries, reference %.4fs, planned %.4fs (%.2fx)', self.count,
+                 len(createQueries()), timings['reference'], timings['planned'], timings['reference'] / timings['planned'])
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -53,4 +53,42 @@ class IterPart(Iterable):
         return '%s[%s(%s:%s), %s]' % (self.__class__.__name__, self.total, self.offset, self.limit, self.wrapped)
 
 #TODO: temporary for rename to IterSlice
-IterSlice = IterPart
\ No newline at end of file
+IterSlice = IterPart
+
+@extension
+class IterCursor(Iterable):
+    '''
+    Provides a wrapping for iterable objects that represent a keyset (cursor) slice of a bigger collection. Beside the actual
+    items this class objects contain the continuation token for the next slice and optionally the total count.
+    '''
+    cursor = str
+    total = int
+    limit = int
+
+    def __init__(self, wrapped, cursor=None, total=None, limit=None):
+        '''
+        Construct the cursor iterable.
+        
+        @param wrapped: Iterable
+            The iterable that provides the actual data.
+        @param cursor: string|None
+            The continuation token for the next slice, None if there are no more items.
+        @param total: integer|None
+            The total count of the big item collection, None if not requested.
+        @param limit: integer|None
+            The limit used for the slice.
+        '''
+        assert isinstance(wrapped, Iterable), 'Invalid iterable %s' % wrapped
+        assert cursor is None or isinstance(cursor, str), 'Invalid cursor %s' % cursor
+        assert total is None or isinstance(total, int), 'Invalid total %s' % total
+        assert limit is None or isinstance(limit, int), 'Invalid limit %s' % limit
+
+        self.wrapped = wrapped
+        self.cursor = cursor
+        self.total = total
+        self.limit = limit
+
+    def __iter__(self): return self.wrapped.__iter__()
+
+    def __str__(self):
+        return '%s[%s(%s:%s), %s]' % (self.__class__.__name__, self.total, self.cursor, self.limit, self.wrapped)
\ No newline at end of file
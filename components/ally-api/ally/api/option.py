@@ -60,3 +60,25 @@ class SliceAndTotal(Slice):
         Slice.__init__(self, **slice)
 
         self.withTotal = withTotal
+
+@option
+class SliceAndCursor(SliceAndTotal):
+    '''
+    Provides collection slicing options that also allow the keyset (cursor) slicing of the collection.
+    '''
+    
+    cursor = str
+    
+    def __init__(self, cursor=None, **slice):
+        '''
+        Construct the slice.
+        @see: SliceAndTotal.__init__
+        
+        @param cursor: string|None
+            The continuation token as provided by a previous slice, if provided (an empty string for the first slice)
+            then the offset is ignored and the items are fetched starting after the cursor position.
+        '''
+        assert cursor is None or isinstance(cursor, str), 'Invalid cursor %s' % cursor
+        SliceAndTotal.__init__(self, **slice)
+
+        self.cursor = cursor
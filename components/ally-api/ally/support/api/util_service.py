@@ -16,7 +16,9 @@ from ally.api.operator.type import TypeContainer, TypeModel, TypeService, \
 from ally.api.type import typeFor
 from ally.type_legacy import Iterable, Iterator
 from collections import Sized
+from heapq import nsmallest, nlargest
 from itertools import chain
+from operator import attrgetter
 from types import TracebackType
 import re
 
@@ -308,51 +310,7 @@ def processQuery(collection, clazz, query, fetcher=None):
         if not isinstance(collection, list): collection = list(collection)
         return collection
     
-    filtered = list(collection)
-    if fetcher:
-        items = {}
-        def get(reference):
-            if reference not in items: items[reference] = fetcher(reference)
-            return items[reference]
-    else: get = lambda item: item
-    
-    ordered, unordered = [], []
-    properties = {name.lower(): name for name in namesFor(clazz)}
-    for cname, criteria in iterateFor(query):
-        pname = properties.get(cname.lower())
-        if pname is not None and criteria in query:
-            cvalue = getattr(query, cname)
-            if isinstance(cvalue, AsBoolean):
-                assert isinstance(cvalue, AsBoolean)
-                if AsBoolean.value in cvalue:
-                    filtered = [item for item in filtered if cvalue.value == getattr(get(item), pname)]
-            elif isinstance(cvalue, AsLike):
-                assert isinstance(cvalue, AsLike)
-                regex = None
-                if AsLike.like in cvalue:
-                    if cvalue.like is not None: regex = likeAsRegex(cvalue.like, False)
-                elif AsLike.ilike in cvalue:
-                    if cvalue.ilike is not None: regex = likeAsRegex(cvalue.ilike, True)
-
-                if regex is not None:
-                    filtered = ((item, getattr(get(item), pname)) for item in filtered)
-                    filtered = [item for item, value in filtered if value is not None and regex.match(value)]
-            elif isinstance(cvalue, AsEqual):
-                assert isinstance(cvalue, AsEqual)
-                if AsEqual.equal in cvalue:
-                    filtered = [item for item in filtered if cvalue.equal == getattr(get(item), pname)]
-            if isinstance(cvalue, AsOrdered):
-                assert isinstance(cvalue, AsOrdered)
-                if AsOrdered.ascending in cvalue:
-                    if AsOrdered.priority in cvalue and cvalue.priority:
-                        ordered.append((pname, cvalue.ascending, cvalue.priority))
-                    else:
-                        unordered.append((pname, cvalue.ascending, None))
-
-            ordered.sort(key=lambda pack: pack[2])
-            for prop, asc, __ in reversed(list(chain(ordered, unordered))):
-                filtered.sort(key=lambda item: getattr(get(item), prop), reverse=not asc)
-
+    filtered, _total = executeQuery(collection, planQuery(clazz, query), fetcher)
     return filtered
 
 def processCollection(collection, clazz=None, query=None, fetcher=None, offset=0, limit=None, withTotal=False):
@@ -375,12 +333,159 @@ def processCollection(collection, clazz=None, query=None, fetcher=None, offset=0
         The processed collection.
     '''
     assert isinstance(withTotal, bool), 'Invalid with total flag %s' % withTotal
-    collection = processQuery(collection, clazz, query, fetcher)
-    total = len(collection)
+    assert isinstance(collection, Iterable), 'Invalid entities objects iterable %s' % collection
+    if query is None:
+        if not isinstance(collection, list): collection = list(collection)
+        total = len(collection)
+    else:
+        # Only the items up until the end of the slice need to be ordered.
+        count = None if limit is None else (offset or 0) + limit
+        collection, total = executeQuery(collection, planQuery(clazz, query), fetcher, count)
     collection = trimIter(collection, total, offset, limit)
     if withTotal: return IterSlice(collection, total, offset, limit)
     return collection
 
+def planQuery(clazz, query):
+    '''
+    Compiles the query criteria into a plan for processing in memory collections, all the filtering criteria are
+    compiled into a single predicate and all the ordering criteria into a single composite sort key.
+    
+    @param clazz: class
+        The model class to use the query on.
+    @param query: query
+        The query object to compile.
+    @return: tuple(callable(object) -> boolean|None, callable(object) -> object|None, boolean)
+        The predicate for the models to keep, the sort key for the models and the flag indicating that the sort key
+        needs to be applied reversed, None if there is no filtering or ordering.
+    '''
+    assert query is not None, 'A query is required'
+    
+    checks, ordered, unordered = [], [], []
+    properties = {name.lower(): name for name in namesFor(clazz)}
+    for cname, criteria in iterateFor(query):
+        pname = properties.get(cname.lower())
+        if pname is None or criteria not in query: continue
+        
+        cvalue, getter = getattr(query, cname), attrgetter(pname)
+        if isinstance(cvalue, AsBoolean):
+            assert isinstance(cvalue, AsBoolean)
+            if AsBoolean.value in cvalue: checks.append(checkEqual(getter, cvalue.value))
+        elif isinstance(cvalue, AsLike):
+            assert isinstance(cvalue, AsLike)
+            regex = None
+            if AsLike.like in cvalue:
+                if cvalue.like is not None: regex = likeAsRegex(cvalue.like, False)
+            elif AsLike.ilike in cvalue:
+                if cvalue.ilike is not None: regex = likeAsRegex(cvalue.ilike, True)
+            if regex is not None: checks.append(checkMatch(getter, regex))
+        elif isinstance(cvalue, AsEqual):
+            assert isinstance(cvalue, AsEqual)
+            if AsEqual.equal in cvalue: checks.append(checkEqual(getter, cvalue.equal))
+        if isinstance(cvalue, AsOrdered):
+            assert isinstance(cvalue, AsOrdered)
+            if AsOrdered.ascending in cvalue:
+                if AsOrdered.priority in cvalue and cvalue.priority:
+                    ordered.append((pname, cvalue.ascending, cvalue.priority))
+                else:
+                    unordered.append((pname, cvalue.ascending, None))
+    
+    if not checks: predicate = None
+    elif len(checks) == 1: predicate = checks[0]
+    else:
+        def predicate(model):
+            for check in checks:
+                if not check(model): return False
+            return True
+    
+    ordered.sort(key=lambda pack: pack[2])
+    ordering = [(pname, asc) for pname, asc, _priority in chain(ordered, unordered)]
+    if not ordering: return predicate, None, False
+    
+    ascending = set(asc for _pname, asc in ordering)
+    if len(ascending) == 1:
+        # All in the same direction so the reversed sort (which is stable) can be used.
+        return predicate, attrgetter(*(pname for pname, _asc in ordering)), not ascending.pop()
+    
+    getters = [(attrgetter(pname), asc) for pname, asc in ordering]
+    def key(model): return tuple(getter(model) if asc else Descending(getter(model)) for getter, asc in getters)
+    return predicate, key, False
+
+def executeQuery(collection, plan, fetcher=None, count=None):
+    '''
+    Executes the query plan on the collection, the references are fetched only once and the collection is sorted only
+    once or only the required items are selected if a count is provided.
+    
+    @param collection: Iterable(model object or reference)
+        The entities objects iterator to be processed.
+    @param plan: tuple(callable|None, callable|None, boolean)
+        The query plan as provided by @see: planQuery.
+    @param fetcher: callable(object) -> object|None
+        The callable used in fetching the actual models in case the collection only contains references of the models.
+    @param count: integer|None
+        The number of items from the start of the processed collection that are required, None for all items.
+    @return: tuple(list[model object or reference], integer)
+        The processed list of entities or references and the total count of filtered items.
+    '''
+    assert isinstance(collection, Iterable), 'Invalid entities objects iterable %s' % collection
+    assert isinstance(plan, tuple), 'Invalid plan %s' % plan
+    assert count is None or isinstance(count, int), 'Invalid count %s' % count
+    predicate, key, reverse = plan
+    
+    if fetcher and (predicate or key):
+        items = list(collection)
+        models = {}
+        for reference in items:
+            if reference not in models: models[reference] = fetcher(reference)
+        get = models.__getitem__
+        if predicate: items = [item for item in items if predicate(get(item))]
+        fkey = (lambda item: key(get(item))) if key else None
+    else:
+        if predicate: items = [item for item in collection if predicate(item)]
+        elif isinstance(collection, list): items = collection
+        else: items = list(collection)
+        fkey = key
+    
+    total = len(items)
+    if key:
+        if count is not None and count * SELECT_RATIO < total:
+            if reverse: items = nlargest(count, items, key=fkey)
+            else: items = nsmallest(count, items, key=fkey)
+        else: items = sorted(items, key=fkey, reverse=reverse)
+    return items, total
+
+SELECT_RATIO = 8
+# The ratio between the total and the required count from which only the required items are selected instead of sorting.
+
+class Descending:
+    '''
+    Wraps a value in order to be compared in descending order in composite sort keys.
+    '''
+    __slots__ = ('value',)
+    
+    def __init__(self, value):
+        self.value = value
+        
+    def __lt__(self, other): return other.value < self.value
+    
+    def __eq__(self, other): return self.value == other.value
+
+def checkEqual(getter, value):
+    '''
+    Provides the check that the model property is equal with the value.
+    '''
+    return lambda model: value == getter(model)
+
+def checkMatch(getter, regex):
+    '''
+    Provides the check that the model property is matched by the regex.
+    '''
+    def check(model):
+        value = getter(model)
+        return value is not None and regex.match(value)
+    return check
+
+# --------------------------------------------------------------------
+
 def emptyCollection(withTotal=False, **options):
     '''
     Provides an empty collection based on the provided options.
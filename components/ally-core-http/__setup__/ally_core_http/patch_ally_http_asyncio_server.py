@@ -0,0 +1,32 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally core http
+@copyright: 2011 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the setup patch when the server is asyncio.
+'''
+
+from ..ally_http.processor import asyncoreContent
+from ..ally_http.server import server_type
+from .processor import updateAssemblyResources, assemblyResources, multipart
+from ally.container import ioc
+import logging
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+try: from .. import ally_http_asyncio_server  # @UnusedImport
+except ImportError: log.info('No asyncio available thus skip the resources patching')
+else:
+    from ..ally_http_asyncio_server.server import SERVER_ASYNCIO
+    
+    @ioc.after(updateAssemblyResources)
+    def updateAssemblyResourcesForHTTPAsyncio():
+        if server_type() == SERVER_ASYNCIO:
+            assemblyResources().add(asyncoreContent(), before=multipart())
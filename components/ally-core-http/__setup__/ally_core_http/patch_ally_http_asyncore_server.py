@@ -9,8 +9,12 @@ Created on Jan 25, 2013
 Provides the setup patch when the server is asyncore.
 '''
 
+from ..ally_http.processor import asyncoreContent
 from ..ally_http.server import server_type
-from .processor import updateAssemblyResources, assemblyResources, multipart
+from .processor import updateAssemblyResources, assemblyResources, multipart, \
+    methodInvoker
+from .support_cache import updateAssemblyResourcesForResponseCache, response_cache, \
+    responseCache
 from ally.container import ioc
 import logging
 
@@ -23,10 +27,18 @@ log = logging.getLogger(__name__)
 try: from .. import ally_http_asyncore_server  # @UnusedImport
 except ImportError: log.info('No asyncore available thus skip the resources patching')
 else:
-    from ..ally_http_asyncore_server.processor import asyncoreContent
-    from ..ally_http_asyncore_server.server import SERVER_ASYNCORE
+    from ..ally_http_asyncore_server.server import SERVER_ASYNCORE, server_processes
     
     @ioc.after(updateAssemblyResources)
     def updateAssemblyResourcesForHTTPAsyncore():
         if server_type() == SERVER_ASYNCORE:
             assemblyResources().add(asyncoreContent(), before=multipart())
+    
+    @ioc.replace(updateAssemblyResourcesForResponseCache)
+    def updateAssemblyResourcesForResponseCacheAsyncore():
+        if not response_cache(): return
+        if server_type() == SERVER_ASYNCORE and server_processes() > 1:
+            # The cache invalidation is made only in the process that changed the service so the other serving processes
+            # would deliver stale responses.
+            log.warning('The response cache is disabled since the requests are served by %s processes', server_processes())
+        else: assemblyResources().add(responseCache(), after=methodInvoker())
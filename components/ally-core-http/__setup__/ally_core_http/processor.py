@@ -21,7 +21,7 @@ from ..ally_http.processor import acceptRequestDecode, encoderPath, \
 from .decode import assemblyDecodeParameterExport, assemblyDecodePathExport
 from ally.container import ioc
 from ally.core.http.impl.processor.content_index import \
-    ContentIndexEncodeHandler
+    ContentIndexEncodeHandler, ContentIndexAcceptHandler
 from ally.core.http.impl.processor.conversion_path import ConverterPathHandler
 from ally.core.http.impl.processor.error_explain import ErrorExplainHandler
 from ally.core.http.impl.processor.headers.content_disposition import \
@@ -62,6 +62,14 @@ def header_parameters():
     '''
     return []
 
+@ioc.config
+def content_index_header_size():
+    '''
+    The maximum size of the content index header, the larger content indexes are provided at the end of the response
+    content, if 0 the content index is always provided at the end of the response content.
+    '''
+    return 4096
+
 # --------------------------------------------------------------------
 
 @ioc.entity
@@ -103,8 +111,12 @@ def methodInvoker() -> Handler:
 def contentIndexEncode() -> Handler:
     b = ContentIndexEncodeHandler()
     b.assembly = assemblyBlocks()
+    b.maximumHeaderSize = content_index_header_size()
     return b
 
+@ioc.entity
+def contentIndexAccept() -> Handler: return ContentIndexAcceptHandler()
+
 # --------------------------------------------------------------------
 
 @ioc.entity
@@ -185,7 +197,7 @@ def updateAssemblyResources():
                             methodInvoker(), contentTypeRequestDecode(), contentLengthDecode(), acceptRequestDecode(),
                             converterContent(), rendering(), multipart(),
                             parsing(), content(), parameter(), scheme(), invoking(),
-                            errorInput(), encoderPath(), renderEncoder(), status(),
+                            errorInput(), encoderPath(), contentIndexAccept(), renderEncoder(), status(),
                             errorDefinition(), errorExplain(), contentIndexEncode(), contentTypeResponseEncode(),
                             contentLengthEncode(), allowEncode()
                             )
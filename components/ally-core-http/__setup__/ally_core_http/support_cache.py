@@ -0,0 +1,82 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally core http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the server side cache for the rendered GET responses.
+'''
+
+from .processor import assemblyResources, updateAssemblyResources, methodInvoker, \
+    parametersAsHeaders
+from ally.container import ioc
+from ally.core.http.impl.processor.cache import ResponseCacheHandler
+from ally.design.processor.handler import Handler
+
+# --------------------------------------------------------------------
+
+@ioc.config
+def response_cache() -> bool:
+    '''
+    Indicates that the rendered GET responses should be cached on the server, the cached responses are removed whenever
+    the service or the models they provide are changed through the REST resources. The cache is kept in the memory of
+    the serving process so the changes made through other processes are not seen, thus the cache is not used if the
+    requests are served by multiple processes.
+    '''
+    return False
+
+@ioc.config
+def response_cache_time_to_live() -> int:
+    '''
+    The default number of seconds a rendered response is cached, if 0 then only the responses of the services configured
+    in "response_cache_services" are cached.
+    '''
+    return 60
+
+@ioc.config
+def response_cache_services() -> dict:
+    '''
+    The number of seconds the rendered responses are cached for services, indexed by the service full name, if 0 then the
+    service responses are not cached, as an example:
+        {'gateway.api.gateway.IGatewayService': 300, 'security.api.user.IUserService': 0}
+    '''
+    return {}
+
+@ioc.config
+def response_cache_headers() -> list:
+    '''
+    The request headers that the rendered responses vary on, the responses are cached separately for each of the headers
+    values, to this list the parameters as headers will be appended automatically.
+    '''
+    return ['Accept', 'Accept-Charset', 'Accept-Language', 'Accept-Index', 'Authorization', 'Cookie', 'Filter-Input']
+
+@ioc.config
+def response_cache_size() -> int:
+    '''The maximum number of bytes of rendered responses kept in the cache'''
+    return 32 * 1024 * 1024
+
+@ioc.config
+def response_cache_entry_size() -> int:
+    '''The maximum size in bytes of a rendered response that is kept in the cache'''
+    return 1024 * 1024
+
+# --------------------------------------------------------------------
+
+@ioc.entity
+def responseCache() -> Handler:
+    b = ResponseCacheHandler()
+    b.timeToLive = response_cache_time_to_live()
+    b.servicesTimeToLive = response_cache_services()
+    b.headers = response_cache_headers() + [name for name in parametersAsHeaders()
+                                            if name not in response_cache_headers()]
+    b.cacheSize = response_cache_size()
+    b.cacheEntrySize = response_cache_entry_size()
+    return b
+
+# --------------------------------------------------------------------
+
+@ioc.after(updateAssemblyResources)
+def updateAssemblyResourcesForResponseCache():
+    if response_cache(): assemblyResources().add(responseCache(), after=methodInvoker())
@@ -0,0 +1,228 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally core http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing and benchmarking for the rendered responses cache.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.api.config import GET, INSERT, DELETE
+from ally.api.operator.type import TypeService, TypeModel
+from ally.container.ioc import initialize
+from ally.core.http.impl.processor.cache import ResponseCacheHandler
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import defines, requires
+from ally.design.processor.context import Context
+from ally.design.processor.execution import FILL_ALL
+from ally.design.processor.handler import HandlerProcessor
+from ally.http.spec.codes import PATH_FOUND, CodedHTTP
+from ally.http.spec.headers import HeadersDefines, Headers
+from ally.support.util_io import IInputStream
+from collections import Iterable
+import json
+import logging
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+class IItemService: pass
+class IOtherService: pass
+class Item: pass
+class Other: pass
+
+SERVICE_ITEM, SERVICE_OTHER = TypeService(IItemService), TypeService(IOtherService)
+MODEL_ITEM, MODEL_OTHER = TypeModel(Item, 'Item'), TypeModel(Other, 'Other')
+
+class Invoker(Context):
+    id = defines(str)
+    method = defines(int)
+    service = defines(TypeService)
+    target = defines(TypeModel)
+
+class Request(Context):
+    uri = defines(str)
+    parameters = defines(list)
+    headers = defines(dict)
+    invoker = defines(Context)
+
+class RequestRender(Context):
+    uri = requires(str)
+    invoker = requires(Context)
+
+class Response(CodedHTTP, HeadersDefines): pass
+
+class ResponseContent(Context):
+    source = defines(IInputStream, Iterable)
+    length = defines(int)
+
+class RenderHandler(HandlerProcessor):
+    '''
+    Renders the request URI and the number of renderings.
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.renders = 0
+        self.during = None
+        self.chunks = 0
+
+    def process(self, chain, request:RequestRender, response:Response, responseCnt:ResponseContent, **keyargs):
+        self.renders += 1
+        if self.during is not None:
+            during, self.during = self.during, None
+            during()
+        PATH_FOUND.set(response)
+        response.headers = Headers({'Content-Type': 'application/json'})
+        items = [{'Id': k, 'Name': 'Item %s' % k, 'href': '%s/%s' % (request.uri, k)} for k in range(100)]
+        content = json.dumps({'uri': request.uri, 'render': self.renders, 'items': items}).encode()
+        responseCnt.source = self.chunked(content)
+
+    def chunked(self, content):
+        for k in range(0, len(content), 64):
+            self.chunks += 1
+            yield content[k:k + 64]
+
+def createProcessing(**attributes):
+    cache, render = ResponseCacheHandler(), RenderHandler()
+    cache.headers = ['Accept']
+    for name, value in attributes.items(): setattr(cache, name, value)
+    assembly = Assembly('Cache', reportUnused=False)
+    assembly.add(initialize(cache), render)
+    return assembly.create(request=Request, response=Response, responseCnt=ResponseContent, Invoker=Invoker), cache, render
+
+def process(processing, method, uri, service=SERVICE_ITEM, target=MODEL_ITEM, **headers):
+    ctx = processing.ctx
+    invoker = ctx.Invoker(id='%s:%s' % (method, service), method=method, service=service, target=target)
+    request = ctx.request(uri=uri, parameters=[], headers=Headers(headers), invoker=invoker)
+    return processing.execute(FILL_ALL, request=request)
+
+def execute(processing, method, uri, service=SERVICE_ITEM, target=MODEL_ITEM, **headers):
+    arg = process(processing, method, uri, service, target, **headers)
+    source = arg.responseCnt.source
+    if source is None: content = None
+    elif isinstance(source, IInputStream): content = source.read()
+    else: content = b''.join(source)
+    return arg.response, content
+
+# --------------------------------------------------------------------
+
+class TestResponseCache(unittest.TestCase):
+
+    def testCache(self):
+        processing, cache, render = createProcessing()
+
+        response, first = execute(processing, GET, 'Item')
+        self.assertEqual(200, response.status)
+        etag = response.headers['ETag']
+        self.assertEqual(str(len(first)), response.headers['Content-Length'])
+
+        response, content = execute(processing, GET, 'Item')
+        self.assertEqual((first, etag), (content, response.headers['ETag']))
+        self.assertEqual('application/json', response.headers['Content-Type'])
+        self.assertEqual(1, render.renders)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+        # The responses vary on the configured headers and the URI.
+        self.assertNotEqual(first, execute(processing, GET, 'Item', Accept='text/xml')[1])
+        self.assertNotEqual(first, execute(processing, GET, 'Item/1')[1])
+        self.assertEqual(3, render.renders)
+
+        response, content = execute(processing, GET, 'Item', **{'If-None-Match': etag})
+        self.assertEqual((304, None), (response.status, content))
+        self.assertEqual(etag, response.headers['ETag'])
+
+    def testInvalidate(self):
+        processing, _cache, render = createProcessing()
+
+        execute(processing, GET, 'Item')
+        execute(processing, GET, 'Other', SERVICE_OTHER, MODEL_OTHER)
+        execute(processing, GET, 'Other/Item', SERVICE_OTHER, MODEL_ITEM)
+        self.assertEqual(3, render.renders)
+
+        # The delete has no target model so the models provided by the service are invalidated.
+        execute(processing, DELETE, 'Item/1', target=None)
+        execute(processing, GET, 'Item')
+        execute(processing, GET, 'Other/Item', SERVICE_OTHER, MODEL_ITEM)
+        self.assertEqual(6, render.renders)
+        execute(processing, GET, 'Other', SERVICE_OTHER, MODEL_OTHER)
+        self.assertEqual(6, render.renders)
+
+        # The other service provides also items so the items are invalidated as well.
+        execute(processing, INSERT, 'Other', SERVICE_OTHER, MODEL_OTHER)
+        execute(processing, GET, 'Item')
+        execute(processing, GET, 'Other', SERVICE_OTHER, MODEL_OTHER)
+        self.assertEqual(9, render.renders)
+
+        # The response rendered while the service is changed is not cached since it might be stale.
+        render.during = lambda: execute(processing, DELETE, 'Item/1', target=None)
+        execute(processing, GET, 'Item/2')
+        execute(processing, GET, 'Item/2')
+        self.assertEqual(12, render.renders)
+
+    def testLimits(self):
+        processing, _cache, render = createProcessing(servicesTimeToLive={'%s.IOtherService' % __name__: 0})
+        execute(processing, GET, 'Other', SERVICE_OTHER, MODEL_OTHER)
+        execute(processing, GET, 'Other', SERVICE_OTHER, MODEL_OTHER)
+        self.assertEqual(2, render.renders)
+
+        processing, cache, render = createProcessing(timeToLive=0.05)
+        execute(processing, GET, 'Item')
+        time.sleep(0.1)
+        execute(processing, GET, 'Item')
+        self.assertEqual(2, render.renders)
+
+        size = len(execute(processing, GET, 'Item/0')[1])
+        processing, cache, render = createProcessing(cacheSize=size * 2)
+        for uri in ('Item/0', 'Item/1', 'Item/2', 'Item/0'): execute(processing, GET, uri)
+        self.assertEqual(4, render.renders)
+        self.assertEqual(size * 2, cache._size)
+
+        processing, cache, render = createProcessing(cacheEntrySize=size - 1)
+        for _k in range(2): self.assertEqual(size, len(execute(processing, GET, 'Item/0')[1]))
+        self.assertEqual(2, render.renders)
+
+        # The bigger responses are delivered as they are without reading more then the cache entry size.
+        processing, cache, render = createProcessing(cacheEntrySize=100)
+        arg = process(processing, GET, 'Item/0')
+        self.assertEqual(2, render.chunks)
+        self.assertNotIn('ETag', arg.response.headers)
+        self.assertEqual(size, len(b''.join(arg.responseCnt.source)))
+        self.assertEqual(0, cache._size)
+
+# --------------------------------------------------------------------
+
+class BenchmarkResponseCache(unittest.TestCase):
+
+    count = 5000
+    # The number of requests to measure.
+
+    def testBenchmark(self):
+        timings = {}
+        for name, timeToLive in (('rendering', 0), ('caching', 60)):
+            processing, _cache, _render = createProcessing(timeToLive=timeToLive)
+            started = time.time()
+            for k in range(self.count): execute(processing, GET, 'Item/%s' % (k % 10))
+            timings[name] = time.time() - started
+        log.info('Delivered %s responses by rendering in %.4fs and from the cache in %.4fs (%.2fx)', self.count,
+                 timings['rendering'], timings['caching'], timings['rendering'] / timings['caching'])
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,202 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally core http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the multipart content streaming.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container.ioc import initialize
+from ally.core.http.impl.processor.base import ErrorResponseHTTP
+from ally.core.http.impl.processor.multipart import MultipartHandler
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import defines, requires
+from ally.design.processor.context import Context
+from ally.design.processor.execution import FILL_ALL
+from ally.design.processor.handler import HandlerProcessor
+from ally.support.util_io import IInputStream
+import logging
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+class RequestContent(Context):
+    type = defines(str)
+    typeAttr = defines(dict)
+    source = defines(IInputStream)
+    disposition = defines(str)
+
+class RequestPopulate(Context):
+    headers = requires(dict)
+
+class RequestContentPopulate(Context):
+    disposition = defines(str)
+
+class PopulateHandler(HandlerProcessor):
+    '''
+    Populates the multipart content disposition.
+    '''
+
+    def process(self, chain, request:RequestPopulate, requestCnt:RequestContentPopulate, **keyargs):
+        requestCnt.disposition = request.headers.get('Content-Disposition')
+
+class Source(IInputStream):
+    '''
+    Source that provides the content in packages of maximum the provided size.
+    '''
+
+    def __init__(self, content, size):
+        self.content = memoryview(content)
+        self.size = size
+        self.reads = 0
+
+    def read(self, nbytes=None):
+        self.reads += 1
+        nbytes = min(self.size, len(self.content) if nbytes is None else nbytes)
+        data, self.content = self.content[:nbytes].tobytes(), self.content[nbytes:]
+        return data
+
+class Generated(IInputStream):
+    '''
+    Source that generates a multipart content with a body of the provided size.
+    '''
+
+    def __init__(self, size):
+        self.parts = [b'--boundary\r\nContent-Disposition: file\r\n\r\n', None, b'\r\n--boundary--\r\n']
+        self.size = size
+        self.block = (b'0123456789abcdef\r\n--boundar' * 4096)[:64 * 1024]
+
+    def read(self, nbytes=None):
+        while self.parts:
+            if self.parts[0] is not None: return self.parts.pop(0)
+            if not self.size:
+                self.parts.pop(0)
+                continue
+            data = self.block[:min(nbytes or len(self.block), self.size, len(self.block))]
+            self.size -= len(data)
+            return data
+        return b''
+
+def createProcessing(**attributes):
+    handler = MultipartHandler()
+    for name, value in attributes.items(): setattr(handler, name, value)
+    handler.populateAssembly = Assembly('Populate')
+    handler.populateAssembly.add(PopulateHandler())
+    assembly = Assembly('Multipart', reportUnused=False)
+    assembly.add(initialize(handler))
+    return assembly.create(requestCnt=RequestContent, response=ErrorResponseHTTP)
+
+def contentFor(processing, source, boundary='boundary'):
+    requestCnt = processing.ctx.requestCnt()
+    requestCnt.type, requestCnt.typeAttr, requestCnt.source = 'multipart/form-data', {'boundary': boundary}, source
+    return processing.execute(FILL_ALL, requestCnt=requestCnt, response=processing.ctx.response()).requestCnt
+
+def readAll(source, nbytes):
+    chunks = []
+    while True:
+        chunk = source.read(nbytes)
+        if not chunk: return b''.join(chunks)
+        if nbytes is not None: assert len(chunk) <= nbytes, 'Invalid chunk size %s' % len(chunk)
+        chunks.append(chunk)
+
+# --------------------------------------------------------------------
+
+BODIES = [b'first', b'', b'tricky\r\n--boundar\r\n-- boundary\r\n--boundaryx', b'x' * 5000, b'\r\nlast\r\n']
+CONTENT = b'preamble\r\n' + b''.join(b'--boundary\r\nContent-Disposition: part %s\r\n\r\n%s\r\n' % (str(k).encode(), body)
+                                     for k, body in enumerate(BODIES)) + b'--boundary--\r\nepilogue'
+
+class TestMultipart(unittest.TestCase):
+
+    def setUp(self):
+        self.processing = createProcessing(packageSize=64)
+
+    def parts(self, source, nbytes):
+        parts, content = [], contentFor(self.processing, source)
+        while content is not None:
+            parts.append((content.disposition, readAll(content.source, nbytes)))
+            content = content.doFetchNextContent()
+        return parts
+
+    def testParts(self):
+        expected = [('part %s' % k, body) for k, body in enumerate(BODIES)]
+        for size in (1, 3, 17, 64, 1000, len(CONTENT)):
+            for nbytes in (None, 1, 5, 64, 100, 10000):
+                self.assertEqual(expected, self.parts(Source(CONTENT, size), nbytes), 'For %s and %s' % (size, nbytes))
+
+    def testNoBoundary(self):
+        requestCnt, response = self.processing.ctx.requestCnt(), self.processing.ctx.response()
+        requestCnt.type, requestCnt.typeAttr, requestCnt.source = 'multipart/mixed', {'boundary': 'b'}, Source(b'no', 1)
+        self.processing.execute(FILL_ALL, requestCnt=requestCnt, response=response)
+        self.assertFalse(response.isSuccess)
+
+    def testSpool(self):
+        processing = createProcessing(packageSize=64, spoolThreshold=100)
+        first = contentFor(processing, Source(CONTENT, 1000))
+        self.assertEqual(b'fi', first.source.read(2))
+        second = first.doFetchNextContent()
+        third = second.doFetchNextContent()
+        self.assertEqual(b'rst', first.source.read())
+        self.assertEqual(b'', second.source.read())
+
+        third.source.close()
+        fourth = third.doFetchNextContent()
+        self.assertRaises(ValueError, third.source.read)
+        fifth = fourth.doFetchNextContent()
+        self.assertTrue(fourth.source._spool._rolled)
+        self.assertEqual(b'x' * 5000, fourth.source.read())
+        self.assertEqual(b'\r\nlast\r\n', fifth.source.read())
+        self.assertIsNone(fifth.doFetchNextContent())
+
+    def testBoundedBuffer(self):
+        processing = createProcessing(packageSize=1024)
+        content = contentFor(processing, Generated(8 * 1024 * 1024))
+        stream, size = content.source._stream, 0
+        while True:
+            chunk = content.source.read(4096)
+            if not chunk: break
+            size += len(chunk)
+            self.assertTrue(len(stream._buffer) < 3 * 4096, 'Invalid buffer size %s' % len(stream._buffer))
+        self.assertEqual(8 * 1024 * 1024, size)
+        self.assertIsNone(content.doFetchNextContent())
+
+# --------------------------------------------------------------------
+
+class BenchmarkMultipart(unittest.TestCase):
+
+    sizes = (1024, 64 * 1024, 1024 * 1024, 32 * 1024 * 1024)
+    # The body sizes to benchmark.
+    total = 16 * 1024 * 1024
+    # The total number of bytes read for each size.
+
+    def testBenchmark(self):
+        processing = createProcessing()
+        for size in self.sizes:
+            for nbytes in (None, 1024, 64 * 1024):
+                started, count = time.time(), max(1, self.total // size)
+                for _k in range(count):
+                    content = contentFor(processing, Generated(size))
+                    self.assertEqual(size, len(readAll(content.source, nbytes)))
+                elapsed = time.time() - started
+                log.info('Multipart body of %s bytes read by %s: %.2f MB/s', size, nbytes or 'all',
+                         count * size / elapsed / 1024 / 1024)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,343 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally core http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the server side cache for the rendered GET responses.
+'''
+
+from ally.api.config import GET
+from ally.api.operator.type import TypeService, TypeModel
+from ally.container.ioc import injected
+from ally.core.spec.codes import Coded
+from ally.design.processor.attribute import requires, defines, optional
+from ally.design.processor.context import Context
+from ally.design.processor.execution import Chain
+from ally.design.processor.handler import HandlerProcessor
+from ally.http.spec.codes import CodedHTTP, PATH_FOUND, NOT_MODIFIED
+from ally.http.spec.headers import HeadersRequire, HeadersDefines, HeaderRaw, \
+    Headers, ETAG, IF_NONE_MATCH, CONTENT_LENGTH, TRANSFER_ENCODING
+from ally.support.util_io import IInputStream, IClosable, readGenerator
+from collections import OrderedDict, Iterable
+from functools import partial
+from io import BytesIO
+from threading import Lock
+import hashlib
+import itertools
+import logging
+import time
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+class Invoker(Context):
+    '''
+    The invoker context.
+    '''
+    # ---------------------------------------------------------------- Required
+    id = requires(str)
+    method = requires(int)
+    service = requires(TypeService)
+    # ---------------------------------------------------------------- Optional
+    target = optional(TypeModel)
+
+class Request(HeadersRequire):
+    '''
+    The request context.
+    '''
+    # ---------------------------------------------------------------- Required
+    uri = requires(str)
+    parameters = requires(list)
+    invoker = requires(Context)
+
+class Response(Coded, CodedHTTP, HeadersDefines):
+    '''
+    The response context.
+    '''
+
+class ResponseContent(Context):
+    '''
+    The response content context.
+    '''
+    # ---------------------------------------------------------------- Defined
+    source = defines(IInputStream, Iterable)
+    length = defines(int)
+
+# --------------------------------------------------------------------
+
+@injected
+class ResponseCacheHandler(HandlerProcessor):
+    '''
+    Implementation for a processor that caches the rendered GET responses, the cached responses are delivered without
+    invoking and rendering and have an entity tag so the clients that already have the response receive a not modified
+    status. The cached responses are indexed by the services and models they provide, whenever a service is invoked with
+    an INSERT, UPDATE or DELETE the responses of the service and of the changed models are removed from the cache.
+    '''
+
+    timeToLive = 60
+    # The default number of seconds a response is cached, if 0 then only the responses of the services that have a time to
+    # live in the services times to live are cached.
+    servicesTimeToLive = {}
+    # The number of seconds the responses are cached for the services, as a dictionary{string: integer} indexed by the
+    # service full name (module and class name), if 0 then the service responses are not cached.
+    headers = list
+    # The names of the request headers that the rendered responses vary on, like the accepted content types or the
+    # authorization, the responses are cached separately for each of the headers values.
+    cacheSize = 32 * 1024 * 1024
+    # The maximum number of bytes of responses content kept in the cache.
+    cacheEntrySize = 1024 * 1024
+    # The maximum size in bytes of a response that is kept in the cache.
+
+    def __init__(self):
+        assert isinstance(self.timeToLive, (int, float)), 'Invalid time to live %s' % self.timeToLive
+        assert isinstance(self.servicesTimeToLive, dict), 'Invalid services time to live %s' % self.servicesTimeToLive
+        assert isinstance(self.headers, list), 'Invalid headers %s' % self.headers
+        assert isinstance(self.cacheSize, int), 'Invalid cache size %s' % self.cacheSize
+        assert isinstance(self.cacheEntrySize, int), 'Invalid cache entry size %s' % self.cacheEntrySize
+        if __debug__:
+            for name, seconds in self.servicesTimeToLive.items():
+                assert isinstance(name, str), 'Invalid service name %s' % name
+                assert isinstance(seconds, (int, float)), 'Invalid time to live %s' % seconds
+            for name in self.headers: assert isinstance(name, str), 'Invalid header name %s' % name
+        super().__init__(Invoker=Invoker)
+
+        self._headers = [HeaderRaw(name) for name in self.headers]
+        self._timesToLive = {}
+        self._entries = OrderedDict()
+        self._size = 0
+        self._keysByType = {}
+        self._stamps = {}
+        self._targets = {}
+        self._lock = Lock()
+        # The cache statistics.
+        self.hits = self.misses = 0
+
+    def process(self, chain, request:Request, response:Response, responseCnt:ResponseContent, **keyargs):
+        '''
+        @see: HandlerProcessor.process
+
+        Delivers the cached response or registers the caching of the rendered response.
+        '''
+        assert isinstance(chain, Chain), 'Invalid chain %s' % chain
+        assert isinstance(request, Request), 'Invalid request %s' % request
+        assert isinstance(response, Response), 'Invalid response %s' % response
+        assert isinstance(responseCnt, ResponseContent), 'Invalid response content %s' % responseCnt
+        if response.isSuccess is False: return  # Skip in case the response is in error
+
+        invoker = request.invoker
+        if invoker is None: return
+        assert isinstance(invoker, Invoker), 'Invalid invoker %s' % invoker
+
+        if invoker.method != GET:
+            chain.onFinalize(self.processInvalidate)
+            return
+
+        timeToLive = self.timeToLiveFor(invoker.service)
+        if timeToLive <= 0: return
+
+        key = (invoker.id, request.uri, tuple(request.parameters) if request.parameters else None,
+               tuple(header.fetch(request) for header in self._headers))
+        now = time.time()
+        with self._lock:
+            types = self.typesFor(invoker)
+            entry = self._entries.get(key)
+            if entry is not None:
+                assert isinstance(entry, Entry), 'Invalid entry %s' % entry
+                if entry.expires > now: self._entries.move_to_end(key)
+                else:
+                    self._remove(key)
+                    entry = None
+            if entry is None:
+                stamp = tuple(self._stamps.get(typ, 0) for typ in types)
+                self.misses += 1
+            else: self.hits += 1
+
+        if entry is None:
+            chain.onFinalize(partial(self.processStore, key=key, types=types, stamp=stamp, timeToLive=timeToLive))
+            return
+
+        if self.isNotModified(request, entry.etag):
+            NOT_MODIFIED.set(response)
+            ETAG.put(response, entry.etag)
+            responseCnt.source = None
+            responseCnt.length = 0
+        else:
+            PATH_FOUND.set(response)
+            if response.headers is None: response.headers = Headers()
+            response.headers.update(entry.headers)
+            responseCnt.source = BytesIO(entry.content)
+            responseCnt.length = len(entry.content)
+        chain.cancel()
+
+    def processStore(self, final, key, types, stamp, timeToLive, request, response, responseCnt, **keyargs):
+        '''
+        Process the rendered response storing in the cache, the response is not stored if the services or models that
+        it provides have been changed in the mean time.
+        '''
+        assert isinstance(request, Request), 'Invalid request %s' % request
+        assert isinstance(response, Response), 'Invalid response %s' % response
+        assert isinstance(responseCnt, ResponseContent), 'Invalid response content %s' % responseCnt
+
+        if response.status != PATH_FOUND.status or responseCnt.source is None: return
+        if TRANSFER_ENCODING.has(response): return  # The transfer encoded content is not cached.
+        if responseCnt.length is not None and responseCnt.length > self.cacheEntrySize: return
+
+        # Only the content up to the cache entry size is read, the bigger responses are delivered as they are.
+        limit, size, chunks = self.cacheEntrySize + 1, 0, []
+        if isinstance(responseCnt.source, IInputStream):
+            source = responseCnt.source
+            while size < limit:
+                chunk = source.read(limit - size)
+                if not chunk: break
+                chunks.append(chunk)
+                size += len(chunk)
+            if size >= limit: rest = readGenerator(source, limit)
+            elif isinstance(source, IClosable): source.close()
+        else:
+            rest = iter(responseCnt.source)
+            for chunk in rest:
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= limit: break
+        if size >= limit:
+            responseCnt.source = itertools.chain(chunks, rest)
+            return
+        
+        content = b''.join(chunks)
+        assert isinstance(content, bytes), 'Invalid content %s' % content
+        responseCnt.source = BytesIO(content)
+        responseCnt.length = len(content)
+        CONTENT_LENGTH.put(response, str(len(content)))
+
+        entry = Entry(content, time.time() + timeToLive)
+        ETAG.put(response, entry.etag)
+        if response.headers: entry.headers.update(response.headers)
+
+        with self._lock:
+            if stamp == tuple(self._stamps.get(typ, 0) for typ in types):
+                if key in self._entries: self._remove(key)
+                self._entries[key] = entry
+                entry.types = types
+                self._size += entry.size
+                for typ in types:
+                    keys = self._keysByType.get(typ)
+                    if keys is None: keys = self._keysByType[typ] = set()
+                    keys.add(key)
+                while self._size > self.cacheSize: self._remove(next(iter(self._entries)))
+
+        if self.isNotModified(request, entry.etag):
+            NOT_MODIFIED.set(response)
+            CONTENT_LENGTH.remove(response)
+            responseCnt.source = None
+            responseCnt.length = 0
+
+    def processInvalidate(self, final, request, **keyargs):
+        '''
+        Process the removal of the cached responses for the service and models that have been changed, the removal is
+        performed after the changing request has been processed even if the processing failed.
+        '''
+        assert isinstance(request, Request), 'Invalid request %s' % request
+        invoker = request.invoker
+        assert isinstance(invoker, Invoker), 'Invalid invoker %s' % invoker
+
+        with self._lock:
+            types = set(self.typesFor(invoker))
+            types.update(self._targets.get(invoker.service, ()))
+            for typ in types:
+                self._stamps[typ] = self._stamps.get(typ, 0) + 1
+                for key in self._keysByType.pop(typ, ()):
+                    if key in self._entries: self._remove(key)
+        assert log.debug('Invalidated the cached responses for %s', ', '.join(str(typ) for typ in types)) or True
+
+    # ----------------------------------------------------------------
+
+    def timeToLiveFor(self, service):
+        '''
+        Provides the number of seconds the service responses are cached.
+
+        @param service: TypeService
+            The service to provide the time to live for.
+        @return: integer|float
+            The time to live, if 0 then the service responses are not cached.
+        '''
+        assert isinstance(service, TypeService), 'Invalid service %s' % service
+        timeToLive = self._timesToLive.get(service)
+        if timeToLive is None:
+            name = '%s.%s' % (service.clazz.__module__, service.clazz.__name__)
+            timeToLive = self._timesToLive[service] = self.servicesTimeToLive.get(name, self.timeToLive)
+        return timeToLive
+
+    def typesFor(self, invoker):
+        '''
+        Provides the types that the cached responses of the invoker are indexed by, the invoker service targets are also
+        registered, needs to be called while holding the cache lock.
+
+        @param invoker: Invoker
+            The invoker to provide the types for.
+        @return: tuple(TypeService, TypeModel)|tuple(TypeService)
+            The types of the invoker.
+        '''
+        assert isinstance(invoker, Invoker), 'Invalid invoker %s' % invoker
+        target = invoker.target if Invoker.target in invoker else None
+        if target is None: return (invoker.service,)
+
+        if invoker.method == GET:
+            targets = self._targets.get(invoker.service)
+            if targets is None: targets = self._targets[invoker.service] = set()
+            targets.add(target)
+        return (invoker.service, target)
+
+    def isNotModified(self, request, etag):
+        '''
+        Checks if the request client already has the response with the provided entity tag.
+        '''
+        assert isinstance(request, Request), 'Invalid request %s' % request
+
+        tags = IF_NONE_MATCH.decode(request)
+        if tags:
+            for tag in tags:
+                if tag == '*' or tag == etag or (tag.startswith('W/') and tag[2:] == etag): return True
+        return False
+
+    def _remove(self, key):
+        '''
+        Removes the entry for the key from the cache, needs to be called while holding the cache lock.
+        '''
+        entry = self._entries.pop(key)
+        assert isinstance(entry, Entry), 'Invalid entry %s' % entry
+        self._size -= entry.size
+        for typ in entry.types:
+            keys = self._keysByType.get(typ)
+            if keys is not None: keys.discard(key)
+
+# --------------------------------------------------------------------
+
+class Entry:
+    '''
+    The cached response entry.
+    '''
+    __slots__ = ('content', 'expires', 'etag', 'headers', 'types', 'size')
+
+    def __init__(self, content, expires):
+        '''
+        Construct the entry.
+
+        @param content: bytes
+            The rendered response content.
+        @param expires: float
+            The time stamp when the entry expires.
+        '''
+        assert isinstance(content, bytes), 'Invalid content %s' % content
+        assert isinstance(expires, float), 'Invalid expires %s' % expires
+        self.content = content
+        self.expires = expires
+        self.etag = '"%s"' % hashlib.sha1(content).hexdigest()
+        self.headers = {}
+        self.types = ()
+        self.size = len(content)
@@ -6,22 +6,24 @@ Created on Apr 4, 2013
 @license: http://www.gnu.org/licenses/gpl-3.0.txt
 @author: Gabriel Nistor
 
-Provides the content index header encoding.
+Provides the content index header encoding and the content index request.
 '''
 
 from ally.container.ioc import injected
 from ally.core.impl.index import Index
 from ally.design.processor.assembly import Assembly
-from ally.design.processor.attribute import requires
+from ally.design.processor.attribute import requires, defines
 from ally.design.processor.branch import Branch
 from ally.design.processor.context import Context
 from ally.design.processor.execution import Processing, FILL_ALL
-from ally.design.processor.handler import HandlerBranching
-from ally.http.spec.headers import HeadersDefines, CONTENT_INDEX
+from ally.design.processor.handler import HandlerBranching, HandlerProcessor
+from ally.http.spec.headers import HeadersDefines, HeadersRequire, CONTENT_INDEX, \
+    CONTENT_INDEX_LENGTH, ACCEPT_INDEX
+from ally.indexing.impl.codec import IndexEncoder
 from ally.indexing.spec.model import Block
-from io import BytesIO
+from ally.support.util_io import IInputStream, StreamOnIterable, readGenerator
 import binascii
-import zlib
+import itertools
 
 # --------------------------------------------------------------------
 
@@ -36,9 +38,22 @@ class ResponseContent(Context):
     '''
     The response content context.
     '''
+    # ---------------------------------------------------------------- Defined
+    source = defines(IInputStream)
+    length = defines(int)
     # ---------------------------------------------------------------- Required
     indexes = requires(list)
 
+class ResponseContentAccept(Context):
+    '''
+    The response content context for index accept.
+    '''
+    # ---------------------------------------------------------------- Defined
+    isIndexed = defines(bool, doc='''
+    @rtype: boolean
+    True if the content index has been requested.
+    ''')
+
 class Mapping(Context):
     '''
     The index mapping context.
@@ -59,35 +74,21 @@ class Blocks(Context):
 @injected
 class ContentIndexEncodeHandler(HandlerBranching):
     '''
-    Implementation for a processor that provides the encoding of the index as a header.
+    Implementation for a processor that provides the encoding of the index as a header, or as a trailer of the response
+    content if the encoded index is too large for a header, @see: ally.indexing.impl.codec for the index format.
     '''
     
     assembly = Assembly
     # The assembly used for processing markers.
-    
-    byteOrder = 'little'
-    # The byte order to use in encoding values.
-    bytesIndexCount = 3
-    # The number of bytes to represent the indexes count.
-    bytesBlock = 1
-    # The number of bytes to represent the index block id.
-    bytesOffset = 3
-    # The number of bytes to represent the index offset.
-    bytesValueId = 1
-    # The number of bytes to represent the index value id's.
-    bytesValueSize = 1
-    # The number of bytes to represent the value size.
+    maximumHeaderSize = 4096
+    # The maximum size of the content index header, the larger content indexes are provided as a trailer of the response
+    # content with the trailer size in the content index length header, if 0 the content index is always a trailer.
     encoding = 'ascii'
     # The string encoding. 
 
     def __init__(self):
         assert isinstance(self.assembly, Assembly), 'Invalid assembly %s' % self.assembly
-        assert isinstance(self.byteOrder, str), 'Invalid byte order %s' % self.byteOrder
-        assert isinstance(self.bytesIndexCount, int), 'Invalid bytes index count %s' % self.bytesIndexCount
-        assert isinstance(self.bytesBlock, int), 'Invalid bytes mark %s' % self.bytesMark
-        assert isinstance(self.bytesOffset, int), 'Invalid bytes offset %s' % self.bytesOffset
-        assert isinstance(self.bytesValueId, int), 'Invalid bytes value id %s' % self.bytesValueId
-        assert isinstance(self.bytesValueSize, int), 'Invalid bytes value size %s' % self.bytesValueSize
+        assert isinstance(self.maximumHeaderSize, int), 'Invalid maximum header size %s' % self.maximumHeaderSize
         assert isinstance(self.encoding, str), 'Invalid encoding %s' % self.encoding
         super().__init__(Branch(self.assembly).using(blocks=Blocks, Mapping=Mapping))
         
@@ -114,32 +115,39 @@ class ContentIndexEncodeHandler(HandlerBranching):
             self.blocks = blocks.blocks
         assert isinstance(self.blocks, dict), 'Invalid blocks %s' % blocks
         
-        out = BytesIO()
-        out.write(len(responseCnt.indexes).to_bytes(self.bytesIndexCount, self.byteOrder))
-        values = {}
+        encoder = IndexEncoder(self.encoding)
         for index in responseCnt.indexes:
             assert isinstance(index, Index), 'Invalid index %s' % index
             assert index.block in self.blocks, 'Unknown block \'%s\' in definitions %s' % (index.block, list(self.blocks))
             mapping = self.blocks[index.block]
             assert isinstance(mapping, Mapping), 'Invalid mapping %s' % mapping
-            assert isinstance(mapping.block, Block), 'Invalid mapping block %s' % mapping.block
-           
-            out.write(mapping.blockId.to_bytes(self.bytesBlock, self.byteOrder))
-            for key in mapping.block.keys:
-                assert key in index.values, 'Missing key value for %s' % key
-                value = index.values.get(key)
-                valueId = values.get(value)
-                if valueId is None: valueId = values[value] = len(values) + 1
-                out.write(valueId.to_bytes(self.bytesValueId, self.byteOrder))
-                
-            for name in mapping.block.indexes:
-                assert name in index.values, 'Missing index value \'%s\' for \'%s\'' % (name, index.block)
-                out.write(index.values[name].to_bytes(self.bytesOffset, self.byteOrder))
+            encoder.add(mapping.blockId, mapping.block, index.values)
+        encoded = encoder.finalize()
         
-        out.write(len(values).to_bytes(self.bytesValueId, self.byteOrder))
-        for name, valueId in values.items():
-            out.write(valueId.to_bytes(self.bytesValueId, self.byteOrder))
-            out.write(len(name).to_bytes(self.bytesValueSize, self.byteOrder))
-            out.write(name.encode(self.encoding))
+        value = str(binascii.b2a_base64(encoded)[:-1], self.encoding)
+        if len(value) <= self.maximumHeaderSize or not isinstance(responseCnt.source, IInputStream):
+            CONTENT_INDEX.put(response, value)
+            return
+        
+        CONTENT_INDEX_LENGTH.put(response, str(len(encoded)))
+        responseCnt.source = StreamOnIterable(itertools.chain(readGenerator(responseCnt.source), (encoded,)))
+        if responseCnt.length is not None: responseCnt.length += len(encoded)
+
+# --------------------------------------------------------------------
+
+@injected
+class ContentIndexAcceptHandler(HandlerProcessor):
+    '''
+    Implementation for a processor that marks the response content as indexed only if the content index has been
+    requested, the content for requests without the @see: ACCEPT_INDEX header is rendered without indexing.
+    '''
+    
+    def process(self, chain, request:HeadersRequire, responseCnt:ResponseContentAccept, **keyargs):
+        '''
+        @see: HandlerProcessor.process
+        
+        Mark the content index request.
+        '''
+        assert isinstance(responseCnt, ResponseContentAccept), 'Invalid response content %s' % responseCnt
         
-        CONTENT_INDEX.put(response, str(binascii.b2a_base64(zlib.compress(out.getvalue()))[:-1], self.encoding))
+        responseCnt.isIndexed = ACCEPT_INDEX.fetch(request) is not None
@@ -20,10 +20,11 @@ from ally.design.processor.branch import Branch
 from ally.design.processor.context import Context
 from ally.design.processor.execution import Chain, Processing
 from ally.design.processor.handler import HandlerBranching
-from ally.http.spec.headers import HeadersDefines
+from ally.http.spec.headers import HeadersDefines, Headers
 from ally.support.util_io import IInputStream, IClosable
 from ally.support.util_spec import IDo
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
 import codecs
 import logging
 import re
@@ -39,11 +40,13 @@ log = logging.getLogger(__name__)
 FLAG_CONTENT_END = 1 << 1
 FLAG_MARK_START = 1 << 2
 FLAG_MARK_END = 1 << 3
-FLAG_HEADER_END = 1 << 4
-FLAG_CLOSED = 1 << 5
+FLAG_SOURCE_END = 1 << 4
 FLAG_MARK = FLAG_MARK_START | FLAG_MARK_END
 FLAG_END = FLAG_CONTENT_END | FLAG_MARK
 
+SPOOL_PACKAGE = 64 * 1024
+# The package size used when the body content is spooled or skipped.
+
 # --------------------------------------------------------------------
 
 class RequestContent(Context):
@@ -86,6 +89,8 @@ class DataMultiPart:
     # Mark used to separate the header from the value, only the first occurrence is considered.
     packageSize = 1024
     # The maximum package size to be read in one go.
+    spoolThreshold = 1024 * 1024
+    # The body content size above which the unread content of a body that is left behind is spooled to disk.
 
     def __init__(self):
         assert isinstance(self.charSet, str), 'Invalid character set %s' % self.charSet
@@ -95,6 +100,7 @@ class DataMultiPart:
         assert isinstance(self.trimBodyAtEnd, str), 'Invalid trim body at end %s' % self.trimBodyAtEnd
         assert isinstance(self.separatorHeader, str), 'Invalid separator header %s' % self.separatorHeader
         assert isinstance(self.packageSize, int), 'Invalid package size %s' % self.packageSize
+        assert isinstance(self.spoolThreshold, int), 'Invalid spool threshold %s' % self.spoolThreshold
 
         self.markHeaderEnd = bytes(self.markHeaderEnd, self.charSet)
         self.trimBodyAtEnd = bytes(self.trimBodyAtEnd, self.charSet)
@@ -148,11 +154,15 @@ class MultipartHandler(HandlerBranching, DataMultiPart):
 
 # --------------------------------------------------------------------
 
-class StreamMultipart(IInputStream, IClosable):
+class StreamMultipart:
     '''
-    Provides the mutipart stream content.
+    Provides the mutipart stream scanner. The content is read in a buffer that is consumed by moving a start offset, the
+    consumed bytes are discarded only when they are more then the bytes not consumed, and the searches for the marks
+    continue from where the previous search stopped, this way each byte of the content is moved and scanned only a
+    constant number of times.
     '''
-    __slots__ = ('_data', '_stream', '_markStart', '_markEnd', '_extraSize', '_flag', '_buffer')
+    __slots__ = ('_data', '_stream', '_markStart', '_markEnd', '_markSize', '_keepSize', '_flag', '_buffer', '_start',
+                 '_scan', '_body')
 
     def __init__(self, data, stream, boundary):
         '''
@@ -174,131 +184,145 @@ class StreamMultipart(IInputStream, IClosable):
 
         self._markStart = bytes(data.formatMarkStart % boundary, data.charSet)
         self._markEnd = bytes(data.formatMarkEnd % boundary, data.charSet)
-        self._extraSize = max(len(self._markStart), len(self._markEnd), len(data.markHeaderEnd))
+        self._markSize = max(len(self._markStart), len(self._markEnd))
+        self._keepSize = self._markSize + len(data.trimBodyAtEnd) - 1
+        # The bytes at the buffer end that might be part of a mark and cannot be provided as body content.
 
         self._flag = 0
         self._buffer = bytearray()
+        self._start = 0
+        self._scan = 0
+        self._body = None
 
-    def read(self, nbytes=None):
+    def readBody(self, nbytes=None):
         '''
-        @see: IInputStream.read
+        Reads the current body content.
+        
+        @param nbytes: integer|None
+            The maximum number of bytes to read, if None or negative all the body content is read.
+        @return: bytes
+            The body bytes, empty if the body end has been reached.
         '''
-        if self._flag & FLAG_CLOSED: raise ValueError('I/O operation on a closed content file')
         if self._flag & FLAG_END: return b''
+        if nbytes is not None and nbytes < 0: nbytes = None
+        return self._readToMark(nbytes)
 
-        if nbytes:
-            if nbytes <= self._data.packageSize:
-                return self._readToMark(nbytes)
-            else:
-                data = bytearray()
-                while True:
-                    data.extend(self._readToMark(min(nbytes - len(data), self._data.packageSize)))
-                    if len(data) >= nbytes or self._flag & FLAG_END: break
-        else:
-            data = bytearray()
-            while True:
-                data.extend(self._readToMark(self._data.packageSize))
-                if self._flag & FLAG_END: break
-
-        return bytes(data)
-
-    def close(self):
+    def startBody(self):
         '''
-        @see: IClosable.close
+        Provides the content of the body that starts at the current position.
+        
+        @return: ContentMultipart
+            The body content.
         '''
-        self._flag |= FLAG_CLOSED
+        assert self._body is None, 'The current body %s has not been left' % self._body
+        self._body = ContentMultipart(self)
+        return self._body
 
+    def leaveBody(self):
+        '''
+        Leaves the current body, if the body content is not closed then the content that has not been read is spooled
+        in order to be still readable, otherwise the content is discarded.
+        '''
+        body, self._body = self._body, None
+        if body is None: return
+        assert isinstance(body, ContentMultipart), 'Invalid body %s' % body
+        
+        if not body._closed and not self._flag & FLAG_END:
+            spool = SpooledTemporaryFile(max_size=self._data.spoolThreshold)
+            while not self._flag & FLAG_END: spool.write(self._readToMark(max(self._data.packageSize, SPOOL_PACKAGE)))
+            spool.seek(0)
+            body._spool = spool
+        body._stream = None
+        
     # ----------------------------------------------------------------
 
     def _readInBuffer(self, nbytes):
         '''
-        Reads in the instance buffer the specified number of bytes, always when reading it will read in the buffer
-        additional bytes for the mark processing. It will adjust the flags if END is encountered.
+        Reads in the instance buffer at least the package size number of bytes, the consumed bytes are discarded when
+        they are more then the bytes not consumed. It will adjust the flags if the source end is encountered.
         '''
-        assert not self._flag & FLAG_CONTENT_END, 'End reached, cannot read anymore'
-        data = self._stream.read(nbytes + self._extraSize - len(self._buffer))
-        if data: self._buffer.extend(data)
-        if not self._buffer: self._flag |= FLAG_CONTENT_END
+        assert not self._flag & FLAG_SOURCE_END, 'Source end reached, cannot read anymore'
+        buffer, start = self._buffer, self._start
+        if start and start >= len(buffer) - start:
+            del buffer[:start]
+            self._scan -= start
+            self._start = 0
+        
+        data = self._stream.read(max(nbytes, self._data.packageSize))
+        if data: buffer.extend(data)
+        else: self._flag |= FLAG_SOURCE_END
 
-    def _readToMark(self, nbytes):
+    def _consume(self, end, skip=0):
         '''
-        Read the provided number of bytes or read until a mark separator is encountered (including the end separator).
-        It will adjust the flags according to the findings.
-        
-        @return: bytes
-            The bytes read.
+        Provides the bytes from the buffer start to the end and moves the buffer start after the skipped bytes.
         '''
-        assert not self._flag & FLAG_MARK, 'Already at a mark, cannot read until flag is reset'
-
-        self._readInBuffer(nbytes)
-
-        if not self._buffer: return b''
-        indexSep = self._buffer.find(self._markStart)
-        if indexSep >= 0:
-            self._flag |= FLAG_MARK_START
-            indexBody = indexSep - len(self._data.trimBodyAtEnd)
-            if not self._buffer.endswith(self._data.trimBodyAtEnd, indexBody, indexSep): indexBody = indexSep
-            data = self._buffer[:indexBody]
-            del self._buffer[:indexSep + len(self._markStart)]
-        else:
-            nbytes = max(len(self._buffer), nbytes)
-            data = self._buffer[:nbytes]
-            del self._buffer[:nbytes]
-
-        indexEnd = data.find(self._markEnd)
-        if indexEnd >= 0:
-            self._flag |= FLAG_MARK_END
-            indexBody = indexEnd - len(self._data.trimBodyAtEnd)
-            if not data.endswith(self._data.trimBodyAtEnd, indexBody, indexEnd): indexBody = indexEnd
-            data = data[:indexBody]
-            self._buffer = data[indexEnd + len(self._markEnd):]
-
+        with memoryview(self._buffer) as view: data = view[self._start:end].tobytes()
+        self._start = end + skip
+        if self._scan < self._start: self._scan = self._start
         return data
 
-    def _readToHeader(self, nbytes):
+    def _readToMark(self, nbytes):
         '''
-        Read the provided number of bytes or read until the mark header is encountered.
+        Read the provided number of bytes or read until a mark separator is encountered (including the end separator).
         It will adjust the flags according to the findings.
         
+        @param nbytes: integer|None
+            The maximum number of bytes to read, if None it reads until a mark or the content end.
         @return: bytes
             The bytes read.
         '''
-        assert not self._flag & FLAG_HEADER_END, 'Already at header end, cannot read until flag is reset'
-
-        self._readInBuffer(nbytes)
-
-        if not self._buffer: return b''
-        indexHeader = self._buffer.find(self._data.markHeaderEnd)
-        if indexHeader >= 0:
-            self._flag |= FLAG_HEADER_END
-            data = self._buffer[:indexHeader]
-            del self._buffer[:indexHeader + len(self._data.markHeaderEnd)]
-        else:
-            nbytes = max(len(self._buffer), nbytes)
-            data = self._buffer[:nbytes]
-            del self._buffer[:nbytes]
-
-        return data
+        assert not self._flag & FLAG_MARK, 'Already at a mark, cannot read until flag is reset'
+        trim, hasRead = self._data.trimBodyAtEnd, False
+        while True:
+            buffer, start = self._buffer, self._start
+            index, mark, flag = buffer.find(self._markStart, self._scan), self._markStart, FLAG_MARK_START
+            indexEnd = buffer.find(self._markEnd, self._scan, index + len(self._markEnd) if index >= 0 else len(buffer))
+            if indexEnd >= 0: index, mark, flag = indexEnd, self._markEnd, FLAG_MARK_END
+            
+            if index >= 0:
+                self._scan = index
+                indexBody = index - len(trim)
+                if indexBody < start or not buffer.endswith(trim, indexBody, index): indexBody = index
+                if nbytes is not None and indexBody - start > nbytes: return self._consume(start + nbytes)
+                self._flag |= flag
+                return self._consume(indexBody, index + len(mark) - indexBody)
+            
+            if self._flag & FLAG_SOURCE_END:
+                if start >= len(buffer):
+                    self._flag |= FLAG_CONTENT_END
+                    return b''
+                available = len(buffer) - start
+            else:
+                self._scan = max(start, len(buffer) - self._markSize + 1)
+                available = len(buffer) - self._keepSize - start
+                
+            if nbytes is not None and available >= nbytes: return self._consume(start + nbytes)
+            if available > 0 and (hasRead and nbytes is not None or self._flag & FLAG_SOURCE_END):
+                return self._consume(start + available)
+            
+            self._readInBuffer(SPOOL_PACKAGE if nbytes is None else nbytes - max(available, 0))
+            hasRead = True
 
     def _pullHeaders(self):
         '''
         Pull the multi part headers, it will leave the content stream attached to the header reader at the body begin.
         
-        @return: dictionary{string, string}
+        @return: Headers
             The multi part headers.
         '''
         assert self._flag & FLAG_MARK_START, 'Not at a separator mark position, cannot process headers'
 
-        data = bytearray()
+        markHeaderEnd = self._data.markHeaderEnd
         while True:
-            data.extend(self._readToHeader(self._data.packageSize))
-            if self._flag & FLAG_HEADER_END:
-                self._flag ^= FLAG_HEADER_END  # Clearing the header flag
-                break
-            if self._flag & FLAG_CONTENT_END: raise DevelError('No empty line after multipart header')
+            index = self._buffer.find(markHeaderEnd, self._scan)
+            if index >= 0: break
+            if self._flag & FLAG_SOURCE_END: raise DevelError('No empty line after multipart header')
+            self._scan = max(self._start, len(self._buffer) - len(markHeaderEnd) + 1)
+            self._readInBuffer(0)
+        data = self._consume(index, len(markHeaderEnd))
 
         reader = codecs.getreader(self._data.charSet)(BytesIO(data))
-        headers = {}
+        headers = Headers()
         while True:
             line = reader.readline()
             if line == '':  break
@@ -309,6 +333,45 @@ class StreamMultipart(IInputStream, IClosable):
         self._flag ^= FLAG_MARK_START
         return headers
 
+class ContentMultipart(IInputStream, IClosable):
+    '''
+    Provides the multipart body content, the content is read from the multipart stream while the body is the current one
+    and from the spooled content after the body has been left.
+    '''
+    __slots__ = ('_stream', '_spool', '_closed')
+
+    def __init__(self, stream):
+        '''
+        Constructs the body content.
+        
+        @param stream: StreamMultipart
+            The multipart stream positioned at the body start.
+        '''
+        assert isinstance(stream, StreamMultipart), 'Invalid stream %s' % stream
+
+        self._stream = stream
+        self._spool = None
+        self._closed = False
+
+    def read(self, nbytes=None):
+        '''
+        @see: IInputStream.read
+        '''
+        if self._closed: raise ValueError('I/O operation on a closed content file')
+        if self._spool is not None: return self._spool.read(-1 if nbytes is None else nbytes)
+        if self._stream is None: return b''
+        assert isinstance(self._stream, StreamMultipart), 'Invalid stream %s' % self._stream
+        return self._stream.readBody(nbytes)
+
+    def close(self):
+        '''
+        @see: IClosable.close
+        '''
+        self._closed = True
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
 class NextContent(IDo):
     '''
     Callable used for processing the next request content.
@@ -357,10 +420,11 @@ class NextContent(IDo):
         assert isinstance(stream, StreamMultipart), 'Invalid stream %s' % stream
         assert isinstance(processing, Processing), 'Invalid processing %s' % processing
 
+        stream.leaveBody()
         if not stream._flag & (FLAG_CONTENT_END | FLAG_MARK_END):
             if not stream._flag & FLAG_MARK_START:
                 while True:
-                    stream._readToMark(self._data.packageSize)
+                    stream._readToMark(max(self._data.packageSize, SPOOL_PACKAGE))
                     if stream._flag & FLAG_MARK_START: break
                     if stream._flag & FLAG_END: return
 
@@ -370,9 +434,7 @@ class NextContent(IDo):
             assert isinstance(reqCnt, RequestContent), 'Invalid request content %s' % reqCnt
 
             req.headers = stream._pullHeaders()
-            if stream._flag & FLAG_CLOSED: stream._flag ^= FLAG_CLOSED
-
-            reqCnt.source = stream
+            reqCnt.source = stream.startBody()
             reqCnt.doFetchNextContent = NextContent(reqCnt, self._response, self._processing, self._data, stream)
             reqCnt.previousContent = self._requestCnt
             
@@ -0,0 +1,124 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally core
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing and benchmarking for the JSON renderers.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.core.impl.processor.render.base import Content
+from ally.core.impl.processor.render.json import RenderJSON, RenderJSONLean, \
+    RenderJSONHandler
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import defines
+from ally.design.processor.context import Context
+from ally.design.processor.handler import HandlerProcessor
+import json
+import logging
+import timeit
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+class ContentDefines(Context):
+    charSet = defines(str)
+    indexes = defines(list)
+    isIndexed = defines(bool)
+
+class ContentHandler(HandlerProcessor):
+
+    def process(self, chain, content:Content, **keyargs): pass
+
+assembly = Assembly('Test JSON', reportUnused=False)
+assembly.add(ContentHandler())
+processing = assembly.create(content=ContentDefines)
+
+def contentFor(**data):
+    content = processing.ctx.content()
+    content.charSet = 'utf-8'
+    for name, value in data.items(): setattr(content, name, value)
+    return content
+
+def renderModels(render, count):
+    render.beginCollection('UserList', attributes={'href': 'resources/User'})
+    for k in range(count):
+        render.beginObject('User', attributes={'href': 'resources/User/%s' % k})
+        render.property('Id', k)
+        render.property('Name', 'User "%s" ăî\n' % k)
+        render.property('Rate', k / 3)
+        render.property('Active', bool(k % 2))
+        render.property('Tags', ['a', 'b%s' % k])
+        render.property('Meta', {'key': 'value%s' % k})
+        render.beginObject('Address').end()
+        render.beginObject('Group', attributes={'href': 'resources/Group/%s' % (k % 5)})
+        render.property('Name', 'Group %s' % (k % 5))
+        render.end()
+        render.end()
+    render.end()
+
+def renderWith(Render, count, **data):
+    content = contentFor(**data)
+    renderModels(Render('backslashreplace', content), count)
+    value = content.source.read()
+    assert len(value) == content.length
+    return value
+
+# --------------------------------------------------------------------
+
+class TestRenderJSON(unittest.TestCase):
+
+    def testSameContent(self):
+        indexed = renderWith(RenderJSON, 10, indexes=None)
+        lean = renderWith(RenderJSONLean, 10)
+        obj = json.loads(lean.decode('utf-8'))
+        self.assertEqual(10, len(obj['UserList']))
+        self.assertEqual('User "3" ăî\n', obj['UserList'][3]['Name'])
+        self.assertEqual({'href': 'resources/Group/3', 'Name': 'Group 3'}, obj['UserList'][3]['Group'])
+        # The indexed renderer misses the comma after an empty object, the rest of the content is the same.
+        self.assertEqual(indexed, lean.replace(b'{},', b'{}'))
+
+    def testSelection(self):
+        handler = RenderJSONHandler()
+        self.assertIsInstance(handler.renderFactory(contentFor()), RenderJSON)
+        self.assertIsInstance(handler.renderFactory(contentFor(isIndexed=True)), RenderJSON)
+        self.assertIsInstance(handler.renderFactory(contentFor(isIndexed=False)), RenderJSONLean)
+
+        content = Assembly('Test JSON', reportUnused=False)
+        content.add(ContentHandler())
+        contentNoIndexes = content.create(content=type('ContentNoIndexes', (Context,), {'charSet': defines(str)}))
+        content = contentNoIndexes.ctx.content()
+        content.charSet = 'utf-8'
+        self.assertIsInstance(handler.renderFactory(content), RenderJSONLean)
+
+# --------------------------------------------------------------------
+
+class BenchmarkRenderJSON(unittest.TestCase):
+
+    models = 10000
+    # The number of models in the rendered collection.
+
+    def testBenchmark(self):
+        timeIndexed = timeit.timeit(lambda: renderWith(RenderJSON, self.models, indexes=None), number=1)
+        timeLean = timeit.timeit(lambda: renderWith(RenderJSONLean, self.models), number=1)
+        log.info('Rendered %s models, indexed %.4fs, lean %.4fs (%.2fx)', self.models, timeIndexed, timeLean,
+                 timeIndexed / timeLean)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -18,7 +18,7 @@ from ally.design.processor.context import Context
 from ally.design.processor.execution import Abort
 from ally.design.processor.handler import HandlerProcessor
 from ally.support.util_context import asData
-from ally.support.util_io import IInputStream
+from ally.support.util_io import IInputStream, IClosable
 from ally.support.util_spec import IDo
 import logging
 
@@ -201,6 +201,8 @@ class ContentData(Content):
 
         self._closed = True
         if RequestContent.doFetchNextContent in self._content and self._content.doFetchNextContent is not None:
+            # The current content is closed so the next content does not need to preserve it.
+            if isinstance(self._content.source, IClosable): self._content.source.close()
             content = self._content.doFetchNextContent()
         else: content = None
 
@@ -10,7 +10,7 @@ Provides the slice option values handling.
 '''
 
 from ally.api.operator.type import TypeProperty
-from ally.api.option import Slice, SliceAndTotal
+from ally.api.option import Slice, SliceAndTotal, SliceAndCursor
 from ally.api.type import Input, typeFor, Type
 from ally.design.processor.attribute import requires, defines
 from ally.design.processor.context import Context
@@ -83,6 +83,7 @@ class OptionSliceHandler(HandlerProcessor):
         
         self.typeLimit = typeFor(Slice.limit)
         self.typeTotal = typeFor(SliceAndTotal.withTotal)
+        self.typeCursor = typeFor(SliceAndCursor.cursor)
         
     def process(self, chain, create:Create, register:Register, invoker:Invoker, **keyargs):
         '''
@@ -103,7 +104,7 @@ class OptionSliceHandler(HandlerProcessor):
             
             if not isinstance(decoding.type, TypeProperty) and decoding.input:
                 assert isinstance(decoding.input, Input), 'Invalid input %s' % decoding.input
-                if isAvailableIn(SliceAndTotal, decoding.input.name, decoding.type):
+                if isAvailableIn(SliceAndCursor, decoding.input.name, decoding.type):
                     if compatible is None: compatible = {}
                     compatible[decoding.input.name] = decoding.input
                 continue
@@ -115,7 +116,8 @@ class OptionSliceHandler(HandlerProcessor):
                 decoding.doDefault = self.createDefaultTotal(decoding.doSet)
             
         if compatible:
-            if self.typeTotal.name in compatible: clazz = SliceAndTotal
+            if self.typeCursor.name in compatible: clazz = SliceAndCursor
+            elif self.typeTotal.name in compatible: clazz = SliceAndTotal
             else: clazz = Slice
             assert isinstance(register.doSuggest, IDo), 'Invalid do suggest %s' % register.doSuggest
             register.doSuggest('Instead of inputs \'%s\' you could use %s.%s, at:%s', ', '.join(sorted(compatible)),
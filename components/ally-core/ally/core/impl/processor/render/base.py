@@ -10,7 +10,8 @@ Provides the text base encoder processor handler.
 '''
 
 from ally.container.ioc import injected
-from ally.design.processor.attribute import requires, defines, definesIf
+from ally.design.processor.attribute import requires, defines, definesIf, \
+    optional
 from ally.design.processor.context import Context
 from ally.design.processor.execution import Chain
 from ally.design.processor.handler import HandlerProcessor
@@ -48,6 +49,11 @@ class Content(Context):
     @rtype: list[Index]
     The indexes list.
     ''')
+    # ---------------------------------------------------------------- Optional
+    isIndexed = optional(bool, doc='''
+    @rtype: boolean
+    If False the content is rendered without indexes, the renderers can then use a faster rendering.
+    ''')
     # ---------------------------------------------------------------- Required
     charSet = requires(str)
 
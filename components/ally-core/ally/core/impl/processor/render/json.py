@@ -275,7 +275,8 @@ class RenderJSONHandler(RenderBaseHandler):
         '''
         @see: RenderBaseHandler.renderFactory
         '''
-        return RenderJSON(self.encodingError, content)
+        if isIndexed(content): return RenderJSON(self.encodingError, content)
+        return RenderJSONLean(self.encodingError, content)
 
 # --------------------------------------------------------------------
 
@@ -512,8 +513,144 @@ class RenderJSON(IRender):
             assert isinstance(name, str), 'Invalid name %s' % name
             index.values[name] = offset
 
+class RenderJSONLean(IRender):
+    '''
+    Renderer for JSON without indexing, the JSON is collected in parts that are joined and encoded at the end.
+    '''
+    __slots__ = ('_content', '_encodingError', '_parts', '_stack', '_first')
+    
+    def __init__(self, encodingError, content):
+        '''
+        Construct the JSON object renderer.
+        
+        @param encodingError: string
+            The encoding error resolving.
+        @param content: Content
+            The content to render in.
+        '''
+        assert isinstance(encodingError, str), 'Invalid encoding error %s' % encodingError
+        assert isinstance(content, Content), 'Invalid content %s' % content
+        assert isinstance(content.charSet, str), 'Invalid content char set %s' % content.charSet
+        
+        self._content = content
+        self._encodingError = encodingError
+        self._parts = []
+        self._stack = []
+        self._first = True
+
+    def property(self, name, value, **specifications):
+        '''
+        @see: IRender.property
+        '''
+        assert self._stack and self._stack[-1] == OF_OBJECT, 'No object for property'
+        
+        if self._first:
+            self._parts.append(prefixFor(name))
+            self._first = False
+        else: self._parts.append(prefixFor(name, ','))
+        
+        if isinstance(value, list):
+            self._parts.append('[%s]' % ','.join(encode(item) for item in value))
+        elif isinstance(value, dict):
+            self._parts.append('{%s}' % ','.join('%s:%s' % (encode(key), encode(item)) for key, item in value.items()))
+        else: self._parts.append(encode(value))
+
+    def beginObject(self, name, attributes=None, **specifications):
+        '''
+        @see: IRender.beginObject
+        '''
+        self.begin(name, attributes)
+        self._stack.append(OF_OBJECT)
+        return self
+
+    def beginCollection(self, name, attributes=None, **specifications):
+        '''
+        @see: IRender.beginCollection
+        '''
+        self.begin(name, attributes)
+        if self._first: self._parts.append(prefixFor(name))
+        else: self._parts.append(prefixFor(name, ','))
+        self._parts.append('[')
+        self._first = True
+        self._stack.append(OF_COLLECTION)
+        return self
+
+    def end(self):
+        '''
+        @see: IRender.end
+        '''
+        assert self._stack, 'No collection to end'
+        if self._stack.pop() == OF_COLLECTION: self._parts.append(']}')
+        else: self._parts.append('}')
+        self._first = False
+        
+        if not self._stack:
+            content = self._content
+            assert isinstance(content, Content), 'Invalid content %s' % content
+            value = ''.join(self._parts).encode(content.charSet, self._encodingError)
+            content.length = len(value)
+            content.source = BytesIO(value)
+            self._parts = None
+    
+    # ----------------------------------------------------------------
+    
+    def begin(self, name, attributes):
+        '''
+        Used to open a JSON object.
+        '''
+        assert isinstance(name, str), 'Invalid name %s' % name
+        parts = self._parts
+        if self._stack and self._stack[-1] == OF_OBJECT:
+            if self._first: parts.append(prefixFor(name))
+            else: parts.append(prefixFor(name, ','))
+        elif not self._first: parts.append(',')
+        parts.append('{')
+        
+        self._first = True
+        if attributes:
+            assert isinstance(attributes, dict), 'Invalid attributes %s' % attributes
+            for nameAttr, valueAttr in attributes.items():
+                assert isinstance(nameAttr, str), 'Invalid attribute name %s' % nameAttr
+                if self._first:
+                    parts.append(prefixFor(nameAttr))
+                    self._first = False
+                else: parts.append(prefixFor(nameAttr, ','))
+                parts.append(encode(valueAttr))
+
 # --------------------------------------------------------------------
 
+def isIndexed(content):
+    '''
+    Checks if the content needs to be rendered with indexes.
+    
+    @param content: Content
+        The content to check.
+    @return: boolean
+        True if the indexes are used for the content.
+    '''
+    assert isinstance(content, Content), 'Invalid content %s' % content
+    if Content.indexes not in content: return False
+    return Content.isIndexed not in content or content.isIndexed is not False
+
+def prefixFor(name, separator=''):
+    '''
+    Provides the JSON name prefix for a property.
+    
+    @param name: string
+        The property name.
+    @param separator: string
+        The separator to place before the name.
+    @return: string
+        The name prefix.
+    '''
+    key = (separator, name)
+    prefix = _prefixes.get(key)
+    if prefix is None:
+        if len(_prefixes) >= 10000: _prefixes.clear()
+        prefix = _prefixes[key] = '%s"%s":' % (separator, name)
+    return prefix
+_prefixes = {}
+
 def encode(value):
     '''
     Encodes the value as a JSON value.
@@ -0,0 +1,25 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Contains setup and configuration files for the HTTP asyncio server.
+'''
+
+
+# --------------------------------------------------------------------
+
+NAME = 'ally HTTP asyncio server'
+VERSION = '1.0'
+DESCRIPTION = 'Provides the HTTP asyncio server'
+AUTHOR = 'Gabriel Nistor'
+AUTHOR_EMAIL = 'gabriel.nistor@sourcefabric.org'
+KEYWORDS = ['Ally', 'REST', 'HTTP', 'asyncio', 'server']
+LONG_DESCRIPTION = '''Provides an HTTP server substitute for the asyncore server 
+that handles the requests by using the python built in asyncio package.'''
+TEST_SUITE = '__unit_test__'
+CLASSIFIERS = ['Development Status :: 4 - Beta']
+INSTALL_REQUIRES = ['ally-http >= 1.0']
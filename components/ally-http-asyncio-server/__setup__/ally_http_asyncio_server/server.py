@@ -0,0 +1,46 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Runs the asyncio py web server.
+'''
+
+from ..ally_http.server import assemblyServer, server_type, server_protocol, \
+    server_version, server_host, server_port
+from ally.container import ioc
+from ally.http.server import server_asyncio
+from threading import Thread
+
+# --------------------------------------------------------------------
+
+SERVER_ASYNCIO = 'asyncio'
+# The asyncio server name
+
+# --------------------------------------------------------------------
+
+ioc.doc(server_type, '''
+    "asyncio" - server made based on asyncio package, runs on a single CPU and supports keep alive pipelining.
+''')
+
+# --------------------------------------------------------------------
+
+@ioc.entity
+def serverAsyncio():
+    b = server_asyncio.AsyncioServer()
+    b.serverVersion = server_version()
+    b.serverHost = server_host()
+    b.serverPort = server_port()
+    b.serverProtocol = server_protocol()
+    b.assembly = assemblyServer()
+    return b
+
+# --------------------------------------------------------------------
+
+@ioc.start
+def runServer():
+    if server_type() == SERVER_ASYNCIO:
+        Thread(name='HTTP server thread', target=server_asyncio.run, args=(serverAsyncio(),)).start()
@@ -0,0 +1,269 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the asyncio server and load testing against the asyncore server.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container.ioc import initialize
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import defines, requires, optional
+from ally.design.processor.context import Context
+from ally.design.processor.handler import HandlerProcessor
+from ally.http.impl.processor.asyncore_content import AsyncoreContentHandler
+from ally.http.server.server_asyncio import AsyncioServer
+from ally.http.server.server_asyncore import AsyncServer, RequestHandler
+from ally.support.util_io import IInputStream, FileRegion
+from http.client import HTTPConnection
+from io import BytesIO
+from threading import Thread
+import logging
+import os
+import socket
+import tempfile
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+FILE_CONTENT = bytes(range(256)) * 12000
+# The content of the file delivered as a file region.
+FILE_PATH = os.path.join(tempfile.gettempdir(), 'server_asyncio_test.bin')
+# The file delivered as a file region.
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    uri = requires(str)
+    method = requires(str)
+
+class RequestLength(Context):
+    headers = requires(dict)
+
+class RequestContentLength(Context):
+    length = defines(int)
+
+class RequestContent(Context):
+    source = optional(IInputStream)
+
+class ResponseSuccess(Context):
+    isSuccess = defines(bool)
+
+class Response(Context):
+    status = defines(int)
+    headers = defines(dict)
+
+class ResponseContent(Context):
+    source = defines(IInputStream)
+
+class EchoHandler(HandlerProcessor):
+    '''
+    Provides as a response the request content or the request method and URI.
+    '''
+
+    def process(self, chain, request:Request, requestCnt:RequestContent, response:Response,
+                responseCnt:ResponseContent, **keyargs):
+        response.status = 200
+        if request.uri == 'file':
+            # The file region starts after the first byte.
+            response.headers = {'Content-Length': str(len(FILE_CONTENT) - 1)}
+            responseCnt.source = FileRegion(open(FILE_PATH, 'rb'), 1, len(FILE_CONTENT) - 1)
+            return
+
+        if RequestContent.source in requestCnt and requestCnt.source is not None: content = requestCnt.source.read()
+        else: content = ('%s %s' % (request.method, request.uri)).encode()
+        response.headers = {'Content-Length': str(len(content))}
+        responseCnt.source = BytesIO(content)
+
+class LengthHandler(HandlerProcessor):
+
+    def process(self, chain, request:RequestLength, requestCnt:RequestContentLength, response:ResponseSuccess,
+                **keyargs):
+        requestCnt.length = int(request.headers.get('Content-Length', 0))
+
+# --------------------------------------------------------------------
+
+def createAssembly():
+    content = AsyncoreContentHandler()
+    content.dumpRequestsPath = tempfile.gettempdir()
+
+    assembly = Assembly('Test server', reportUnused=False)
+    assembly.add(LengthHandler(), initialize(content), EchoHandler())
+    return assembly
+
+def startAsyncio():
+    server = AsyncioServer()
+    server.serverVersion = 'Test'
+    server.serverHost = '127.0.0.1'
+    server.serverPort = 0
+    server.assembly = createAssembly()
+    initialize(server)
+
+    thread = Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, server.sockets[0].getsockname()[1]
+
+def startAsyncore():
+    server = AsyncServer()
+    server.serverVersion = 'Test'
+    server.serverHost = '127.0.0.1'
+    server.serverPort = 0
+    server.requestHandlerFactory = type('RequestHandler', (RequestHandler,), {'protocol_version': 'HTTP/1.1'})
+    server.assembly = createAssembly()
+    server.timeout = 0.1
+    initialize(server)
+
+    thread = Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, server.socket.getsockname()[1]
+
+def requestAll(port, clients, requests):
+    '''
+    Performs from the clients the requests on keep alive connections and provides the responses.
+    '''
+    responses = []
+    def client(k):
+        connection = HTTPConnection('127.0.0.1', port)
+        for n in range(requests):
+            if n % 2: connection.request('POST', '/', ('client%s/content%s' % (k, n)).encode())
+            else: connection.request('GET', '/client%s/request%s' % (k, n))
+            response = connection.getresponse()
+            responses.append((response.status, response.read()))
+        connection.close()
+
+    threads = [Thread(target=client, args=(k,)) for k in range(clients)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    return responses
+
+def receiveAll(sock):
+    data = bytearray()
+    while True:
+        byts = sock.recv(8192)
+        if not byts: break
+        data.extend(byts)
+    return bytes(data)
+
+# --------------------------------------------------------------------
+
+class TestAsyncioServer(unittest.TestCase):
+
+    def testKeepAlive(self):
+        server, port = startAsyncio()
+        try:
+            responses = requestAll(port, 3, 6)
+            self.assertEqual(18, len(responses))
+            for status, content in responses:
+                self.assertEqual(200, status)
+                self.assertTrue(content.startswith(b'GET client') or content.startswith(b'client'))
+        finally: server.close()
+
+    def testPipelining(self):
+        server, port = startAsyncio()
+        try:
+            sock = socket.create_connection(('127.0.0.1', port))
+            sock.sendall(b'GET /first HTTP/1.1\r\nHost: test\r\n\r\n'
+                         b'POST /second HTTP/1.1\r\nContent-Length: 7\r\n\r\ncontent'
+                         b'GET /third?x=1 HTTP/1.1\r\nConnection: close\r\n\r\n')
+            data = receiveAll(sock)
+            sock.close()
+
+            self.assertEqual(3, data.count(b'HTTP/1.1 200 OK\r\n'))
+            self.assertIn(b'Server: Test\r\n', data)
+            first, second, third = data.index(b'GET first'), data.index(b'content'), data.index(b'GET third')
+            self.assertTrue(first < second < third)
+            self.assertTrue(data.endswith(b'GET third'))
+        finally: server.close()
+
+    def testUploadInParts(self):
+        server, port = startAsyncio()
+        try:
+            content = b'x' * 100000
+            sock = socket.create_connection(('127.0.0.1', port))
+            sock.sendall(('POST / HTTP/1.0\r\nContent-Length: %s\r\n\r\n' % len(content)).encode())
+            for k in range(0, len(content), 30000):
+                sock.sendall(content[k:k + 30000])
+                time.sleep(0.01)
+            data = receiveAll(sock)
+            sock.close()
+
+            self.assertTrue(data.startswith(b'HTTP/1.1 200 OK\r\n'))
+            self.assertTrue(data.endswith(b'\r\n\r\n' + content))
+        finally: server.close()
+
+    def testFileRegion(self):
+        with open(FILE_PATH, 'wb') as f: f.write(FILE_CONTENT)
+        try:
+            for start in (startAsyncore, startAsyncio):
+                server, port = start()
+                try:
+                    connection = HTTPConnection('127.0.0.1', port)
+                    for _k in range(2):
+                        connection.request('GET', '/file')
+                        response = connection.getresponse()
+                        self.assertEqual(200, response.status)
+                        self.assertEqual(FILE_CONTENT[1:], response.read())
+                    connection.close()
+                finally: server.close()
+        finally: os.remove(FILE_PATH)
+
+    def testBadRequest(self):
+        server, port = startAsyncio()
+        try:
+            sock = socket.create_connection(('127.0.0.1', port))
+            sock.sendall(b'INVALID\r\n\r\n')
+            data = receiveAll(sock)
+            sock.close()
+            self.assertTrue(data.startswith(b'HTTP/1.1 400 '))
+        finally: server.close()
+
+# --------------------------------------------------------------------
+
+class LoadTestServers(unittest.TestCase):
+
+    clients = 16
+    # The number of concurrent clients.
+    requests = 50
+    # The number of requests made by each client.
+
+    def testLoad(self):
+        throughputs = {}
+        for name, start in (('asyncore', startAsyncore), ('asyncio', startAsyncio)):
+            server, port = start()
+            try:
+                started = time.time()
+                responses = requestAll(port, self.clients, self.requests)
+                elapsed = time.time() - started
+            finally: server.close()
+
+            self.assertEqual(self.clients * self.requests, len(responses))
+            self.assertTrue(all(status == 200 for status, _content in responses))
+            throughputs[name] = len(responses) / elapsed
+            log.info('Server %s, %s clients with %s requests each: %.2fs, %.1f requests/s',
+                     name, self.clients, self.requests, elapsed, throughputs[name])
+
+        log.info('The asyncio server has %.2fx the asyncore server throughput',
+                 throughputs['asyncio'] / throughputs['asyncore'])
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,454 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the asyncio web server based on the python build in asyncio package.
+'''
+
+from ally.container.ioc import injected
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import optional
+from ally.design.processor.execution import Chain, Processing, FILL_ALL
+from ally.http.spec.headers import Headers
+from ally.http.spec.server import RequestHTTP, ResponseHTTP, RequestContentHTTP, \
+    ResponseContentHTTP, HTTP, setEventLoop
+from ally.support.util_io import IInputStream, IClosable, FileRegion
+from ally.support.util_spec import IDo
+from collections import Iterable
+from email.utils import formatdate
+from http.client import responses
+from urllib.parse import urlparse, parse_qsl
+import asyncio
+import logging
+import time
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+class RequestContentHTTPAsyncio(RequestContentHTTP):
+    '''
+    The request content context.
+    '''
+    # ---------------------------------------------------------------- Optional
+    doContentReader = optional(IDo)
+
+# --------------------------------------------------------------------
+
+class RequestProtocol(asyncio.Protocol):
+    '''
+    The asyncio protocol that handles a HTTP connection, the request header is parsed directly from the read buffer and
+    the requests are processed in the order received, thus supporting keep alive and pipelining.
+    '''
+
+    bufferSize = 64 * 1024
+    # The buffer size used for reading the response content streams.
+    maximumRequestSize = 1024 * 1024
+    # The maximum request header size, 1M
+    requestTerminator = b'\r\n\r\n'
+    # Terminator that signals the http request header is complete
+
+    def __init__(self, server):
+        '''
+        Construct the request protocol.
+
+        @param server: AsyncioServer
+            The server that created the protocol.
+        '''
+        assert isinstance(server, AsyncioServer), 'Invalid server %s' % server
+        self.server = server
+
+        self._transport = None
+        self._clientIP = None
+        self._buffer = bytearray()
+        self._chain = None
+        self._reader = None
+        self._source = None
+        self._paused = False
+        self._busy = False
+        self._keepAlive = True
+        self._closed = False
+
+    def connection_made(self, transport):
+        '''
+        @see: asyncio.Protocol.connection_made
+        '''
+        self._transport = transport
+        peer = transport.get_extra_info('peername')
+        if peer: self._clientIP = peer[0]
+
+    def connection_lost(self, exc):
+        '''
+        @see: asyncio.Protocol.connection_lost
+        '''
+        if self._reader is not None:
+            # We finalize the content reader since there is no more content to be received.
+            self._reader(b'')
+            self._chain = self._reader = None
+        if isinstance(self._source, IClosable): self._source.close()
+        self._source = None
+        self._transport = None
+
+    def data_received(self, data):
+        '''
+        @see: asyncio.Protocol.data_received
+        '''
+        self._buffer.extend(data)
+        if not self._busy: self._proceed()
+
+    def pause_writing(self):
+        '''
+        @see: asyncio.Protocol.pause_writing
+        '''
+        self._paused = True
+
+    def resume_writing(self):
+        '''
+        @see: asyncio.Protocol.resume_writing
+        '''
+        self._paused = False
+        if self._source is not None: self._writeSource()
+
+    # ----------------------------------------------------------------
+
+    def _proceed(self):
+        '''
+        Processes the requests available in the read buffer.
+        '''
+        while not self._closed and not self._busy:
+            if self._reader is not None:
+                if not self._buffer: break
+                data, self._buffer = bytes(self._buffer), bytearray()
+                ret = self._reader(data)
+                if ret is True: break
+                assert ret is None or isinstance(ret, (bytes, memoryview)), 'Invalid return %s' % ret
+                if ret: self._buffer.extend(ret)
+
+                chain = self._chain
+                self._chain = self._reader = None
+                self._execute(chain)
+                continue
+
+            index = self._buffer.find(self.requestTerminator)
+            if index < 0:
+                if len(self._buffer) > self.maximumRequestSize: self._respondError(400, 'Request to long')
+                break
+
+            header = self._buffer[:index].decode('latin-1')
+            del self._buffer[:index + len(self.requestTerminator)]
+            try: self._process(header)
+            except:
+                log.exception('A problem occurred while processing the request \'%s\'' % header.partition('\r\n')[0])
+                self._close()
+
+    def _process(self, header):
+        '''
+        Process the request header.
+
+        @param header: string
+            The request header, without the terminator.
+        '''
+        lines = header.split('\r\n')
+        words = lines[0].split()
+        if len(words) != 3 or not words[2].startswith('HTTP/'):
+            return self._respondError(400, 'Bad request syntax (%r)' % lines[0])
+        method, path, version = words
+
+        headers, last, connection, expect = Headers(), None, '', ''
+        for line in lines[1:]:
+            if line[:1] in (' ', '\t'):
+                # Obsolete line folding, the value continues the previous header.
+                if last is not None: headers[last] = '%s %s' % (headers[last], line.strip())
+                continue
+            name, sep, value = line.partition(':')
+            if not sep: return self._respondError(400, 'Bad header line (%r)' % line)
+            name, value = name.strip(), value.strip()
+            # Same as for the python HTTP message the first header value is the one used.
+            if name in headers:
+                last = None
+                continue
+            headers[name] = value
+            last = name
+
+            lname = name.lower()
+            if lname == 'connection': connection = value.lower()
+            elif lname == 'expect': expect = value.lower()
+
+        if version >= 'HTTP/1.1': self._keepAlive = connection != 'close'
+        else: self._keepAlive = connection == 'keep-alive'
+        if self.server.serverProtocol < 'HTTP/1.1': self._keepAlive = False
+
+        if version >= 'HTTP/1.1' and expect == '100-continue':
+            self._transport.write(('%s 100 Continue\r\n\r\n' % self.server.serverProtocol).encode('latin-1'))
+
+        proc = self.server.processing
+        assert isinstance(proc, Processing), 'Invalid processing %s' % proc
+        chain = self._processChain(proc, method, path, headers)
+        if RequestContentHTTPAsyncio.doContentReader in chain.arg.requestCnt:
+            while chain.do():
+                if chain.arg.requestCnt.doContentReader:
+                    assert callable(chain.arg.requestCnt.doContentReader), \
+                    'Invalid content reader %s' % chain.arg.requestCnt.doContentReader
+                    # The chain is continued after the content reader has finalized.
+                    self._chain, self._reader = chain, chain.arg.requestCnt.doContentReader
+                    return
+        else: self._execute(chain)
+
+    def _execute(self, chain):
+        '''
+        Executes the chain of the request.
+        '''
+        assert isinstance(chain, Chain), 'Invalid chain %s' % chain
+        try: chain.execute()
+        except:
+            log.exception('A problem occurred while processing the request')
+            self._close()
+
+    def _processChain(self, proc, method, path, headers):
+        '''
+        Creates the chain that processes the request.
+        '''
+        assert isinstance(proc, Processing), 'Invalid processing %s' % proc
+
+        request, requestCnt = proc.ctx.request(), proc.ctx.requestCnt()
+        assert isinstance(request, RequestHTTP), 'Invalid request %s' % request
+        assert isinstance(requestCnt, RequestContentHTTP), 'Invalid request content %s' % requestCnt
+
+        if RequestHTTP.clientIP in request: request.clientIP = self._clientIP
+        url = urlparse(path)
+        request.scheme, request.method = HTTP, method.upper()
+        request.uri = url.path.lstrip('/')
+        if RequestHTTP.headers in request: request.headers = headers
+        if RequestHTTP.parameters in request: request.parameters = parse_qsl(url.query, True, False)
+
+        chain = Chain(proc, FILL_ALL, request=request, requestCnt=requestCnt)
+        chain.onFinalize(self._processRespond)
+        return chain
+
+    def _processRespond(self, final, response, responseCnt, **keyargs):
+        assert isinstance(response, ResponseHTTP), 'Invalid response %s' % response
+        assert isinstance(responseCnt, ResponseContentHTTP), 'Invalid response content %s' % responseCnt
+        assert isinstance(response.status, int), 'Invalid response status code %s' % response.status
+
+        if ResponseHTTP.text in response and response.text: text = response.text
+        elif ResponseHTTP.code in response and response.code: text = response.code
+        else: text = None
+
+        if ResponseHTTP.headers in response and response.headers is not None: headers = response.headers
+        else: headers = None
+
+        if ResponseContentHTTP.source in responseCnt: source = responseCnt.source
+        else: source = None
+
+        self._respond(response.status, text, headers, source)
+
+    # ----------------------------------------------------------------
+
+    def _respond(self, status, text, headers, source):
+        '''
+        Writes the response, the header and the bytes content are written at once without intermediate copies.
+        '''
+        if self._transport is None:
+            if isinstance(source, IClosable): source.close()
+            return
+
+        if text is None: text = responses.get(status, '')
+        lines = ['%s %s %s\r\n' % (self.server.serverProtocol, status, text),
+                 'Server: %s\r\n' % self.server.serverVersion, 'Date: %s\r\n' % self.server.date()]
+        if headers is not None:
+            for name, value in headers.items():
+                lines.append('%s: %s\r\n' % (name, value))
+                if name.lower() == 'connection' and value.lower() == 'close': self._keepAlive = False
+        lines.append('\r\n')
+
+        data = [''.join(lines).encode('latin-1', 'strict')]
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            data.append(source)
+            source = None
+        self._transport.writelines(data)
+
+        if source is not None:
+            if isinstance(source, IInputStream): self._source = source
+            else:
+                assert isinstance(source, Iterable), 'Invalid source %s' % source
+                self._source = iter(source)
+            self._writeSource()
+        else: self._finalize()
+
+    def _respondError(self, status, text):
+        '''
+        Writes an error response and closes the connection.
+        '''
+        self._keepAlive = False
+        self._respond(status, text, {'Content-Length': '0', 'Connection': 'close'}, None)
+
+    def _writeSource(self):
+        '''
+        Writes the response content source until the transport requires the writing to be paused, the processing of
+        other requests is paused until the source is completely written.
+        '''
+        assert self._source is not None, 'No source to write'
+        if self._transport is None: return
+
+        if isinstance(self._source, IInputStream):
+            if self._sendFile(self._source): return
+            while not self._paused:
+                data = self._source.read(self.bufferSize)
+                if not data: break
+                self._transport.write(data)
+            else: return self._pause()
+            if isinstance(self._source, IClosable): self._source.close()
+        else:
+            while not self._paused:
+                try: data = next(self._source)
+                except StopIteration: break
+                self._transport.write(data)
+            else: return self._pause()
+
+        self._source = None
+        self._finalize()
+
+    def _sendFile(self, source):
+        '''
+        Sends the file region source by using the event loop send file support, if available.
+
+        @return: boolean
+            True if the source is sent as a file, False otherwise.
+        '''
+        if not isinstance(source, FileRegion): return False
+        sendfile = getattr(self.server.loop, 'sendfile', None)
+        if sendfile is None: return False
+
+        def sent(future):
+            source.close()
+            if future.cancelled() or future.exception() is not None:
+                if not future.cancelled(): log.error('Could not send the file: %s', future.exception())
+                self._close()
+            else: self._finalize()
+
+        self._source = None
+        self._pause()
+        asyncio.ensure_future(sendfile(self._transport, source.file, source.offset, source.remaining),
+                              loop=self.server.loop).add_done_callback(sent)
+        return True
+
+    def _pause(self):
+        '''
+        Pauses the processing of requests until the current response has been written.
+        '''
+        if not self._busy:
+            self._busy = True
+            if self._transport is not None: self._transport.pause_reading()
+
+    def _finalize(self):
+        '''
+        Finalize the response writing.
+        '''
+        if self._transport is None: return
+        if not self._keepAlive: return self._close()
+        if self._busy:
+            self._busy = False
+            self._transport.resume_reading()
+            self._proceed()
+
+    def _close(self):
+        '''
+        Closes the connection after the written data is flushed.
+        '''
+        self._closed = True
+        if self._transport is not None: self._transport.close()
+
+# --------------------------------------------------------------------
+
+@injected
+class AsyncioServer:
+    '''
+    The asyncio server handling the connections.
+    '''
+
+    serverVersion = str
+    # The server version name
+    serverHost = str
+    # The server address host
+    serverPort = int
+    # The server port
+    serverProtocol = 'HTTP/1.1'
+    # The HTTP protocol used by the server.
+    assembly = Assembly
+    # The assembly used for resolving the requests
+    protocolFactory = RequestProtocol
+    # The factory that provides the connections protocols, takes as an argument the server.
+
+    def __init__(self):
+        '''
+        Construct the server.
+        '''
+        assert isinstance(self.serverVersion, str), 'Invalid server version %s' % self.serverVersion
+        assert isinstance(self.serverHost, str), 'Invalid server host %s' % self.serverHost
+        assert isinstance(self.serverPort, int), 'Invalid server port %s' % self.serverPort
+        assert isinstance(self.serverProtocol, str), 'Invalid server protocol %s' % self.serverProtocol
+        assert isinstance(self.assembly, Assembly), 'Invalid assembly %s' % self.assembly
+        assert callable(self.protocolFactory), 'Invalid protocol factory %s' % self.protocolFactory
+
+        self.processing = self.assembly.create(request=RequestHTTP, requestCnt=RequestContentHTTPAsyncio,
+                                               response=ResponseHTTP, responseCnt=ResponseContentHTTP)
+
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(self.loop.create_server(lambda: self.protocolFactory(self),
+                                                   self.serverHost, self.serverPort, reuse_address=True, backlog=1024))
+        self.sockets = self.server.sockets
+        self._time, self._date = None, None
+
+    def date(self):
+        '''
+        Provides the date header value, the value is cached for a second.
+
+        @return: string
+            The current date formated for the HTTP header.
+        '''
+        now = int(time.time())
+        if self._time != now: self._time, self._date = now, formatdate(now, usegmt=True)
+        return self._date
+
+    def serve_forever(self):
+        '''
+        Loops and servers the connections.
+        '''
+        asyncio.set_event_loop(self.loop)
+        setEventLoop()
+        try: self.loop.run_forever()
+        finally:
+            self.server.close()
+            self.loop.run_until_complete(self.server.wait_closed())
+            self.loop.close()
+
+    def close(self):
+        '''
+        Stops the server, this method is safe to be used from any thread.
+        '''
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+# --------------------------------------------------------------------
+
+def run(server):
+    '''
+    Run the asyncio server.
+
+    @param server: AsyncioServer
+        The asyncio server to run.
+    '''
+    assert isinstance(server, AsyncioServer), 'Invalid server %s' % server
+
+    try:
+        log.info('=' * 50 + ' Started Asyncio HTTP server...')
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info('=' * 50 + ' ^C received, shutting down server')
+    except:
+        log.exception('=' * 50 + ' The server has stooped')
@@ -29,6 +29,27 @@ def server_type_asyncore():
     '''
     return SERVER_ASYNCORE
 
+@ioc.config
+def server_workers() -> int:
+    '''
+    The number of worker threads that process the requests for the asyncore server, if 0 then the requests are processed
+    on the server thread, this means that a slow request will block all the other connections.
+    '''
+    return 0
+
+@ioc.config
+def server_processes() -> int:
+    '''
+    The number of processes that serve the requests for the asyncore server, if more then 1 then the started application
+    binds the server socket and forks the serving processes from the server thread. The serving processes use the
+    services of the application as they are at fork, only the requests processing and the workers are created by each
+    serving process, the database connections are not shared and the services that run threads, like the gateways
+    cleanup and refresh, are restarted in each serving process. The file system notifier keeps running only in the
+    application process. The serving processes that die are restarted.
+    This option is not available on platforms that do not support fork.
+    '''
+    return 1
+
 # --------------------------------------------------------------------
 
 @ioc.entity
@@ -43,6 +64,8 @@ def serverAsyncore():
     b.serverPort = server_port()
     b.requestHandlerFactory = serverAsyncoreRequestHandler()
     b.assembly = assemblyServer()
+    b.workers = server_workers()
+    b.processes = server_processes()
     return b
 
 # --------------------------------------------------------------------
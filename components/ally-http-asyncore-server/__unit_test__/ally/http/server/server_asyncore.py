@@ -0,0 +1,197 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing and concurrency benchmarking for the asyncore server workers.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container.ioc import initialize
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import defines, requires, optional
+from ally.design.processor.context import Context
+from ally.design.processor.handler import HandlerProcessor
+from ally.http.impl.processor.asyncore_content import AsyncoreContentHandler
+from ally.http.server.server_asyncore import AsyncServer, RequestHandler
+from http.client import HTTPConnection
+from ally.support.util_io import IInputStream
+from io import BytesIO
+from threading import Thread
+import logging
+import os
+import signal
+import tempfile
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    uri = requires(str)
+
+class RequestLength(Context):
+    headers = requires(dict)
+
+class RequestContentLength(Context):
+    length = defines(int)
+
+class RequestContent(Context):
+    source = optional(IInputStream)
+
+class ResponseSuccess(Context):
+    isSuccess = defines(bool)
+
+class Response(Context):
+    status = defines(int)
+    headers = defines(dict)
+
+class ResponseContent(Context):
+    source = defines(IInputStream)
+
+class SlowHandler(HandlerProcessor):
+    '''
+    Simulates a slow service call, like a database query.
+    '''
+    delay = 0.01
+
+    def process(self, chain, request:Request, requestCnt:RequestContent, response:Response,
+                responseCnt:ResponseContent, **keyargs):
+        time.sleep(self.delay)
+        if RequestContent.source in requestCnt and requestCnt.source is not None: content = requestCnt.source.read()
+        elif request.uri == 'pid': content = str(os.getpid()).encode()
+        else: content = request.uri.encode()
+        response.status = 200
+        response.headers = {'Content-Length': str(len(content))}
+        responseCnt.source = BytesIO(content)
+
+class LengthHandler(HandlerProcessor):
+
+    def process(self, chain, request:RequestLength, requestCnt:RequestContentLength, response:ResponseSuccess,
+                **keyargs):
+        requestCnt.length = int(request.headers.get('Content-Length', 0))
+
+# --------------------------------------------------------------------
+
+def startServer(workers, processes=1):
+    content = AsyncoreContentHandler()
+    content.dumpRequestsPath = tempfile.gettempdir()
+
+    assembly = Assembly('Test server', reportUnused=False)
+    assembly.add(LengthHandler(), initialize(content), SlowHandler())
+
+    server = AsyncServer()
+    server.serverVersion = 'Test'
+    server.serverHost = '127.0.0.1'
+    server.serverPort = 0
+    server.requestHandlerFactory = type('RequestHandler', (RequestHandler,), {'protocol_version': 'HTTP/1.1'})
+    server.assembly = assembly
+    server.workers = workers
+    server.processes = processes
+    server.timeout = 0.1
+    server.superviseInterval = 0.1
+    initialize(server)
+
+    thread = Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, server.socket.getsockname()[1]
+
+def requestAll(port, clients, requests, method='GET', uri=None):
+    '''
+    Performs from the clients the requests on keep alive connections and provides the responses.
+    '''
+    responses = []
+    def client(k):
+        connection = HTTPConnection('127.0.0.1', port)
+        for n in range(requests):
+            if method == 'POST': connection.request(method, '/', ('client%s/content%s' % (k, n)).encode())
+            elif uri: connection.request(method, '/%s' % uri)
+            else: connection.request(method, '/client%s/request%s' % (k, n))
+            response = connection.getresponse()
+            responses.append((response.status, response.read()))
+        connection.close()
+
+    threads = [Thread(target=client, args=(k,)) for k in range(clients)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    return responses
+
+# --------------------------------------------------------------------
+
+class TestAsyncServer(unittest.TestCase):
+
+    def testWorkers(self):
+        for workers in (0, 2):
+            server, port = startServer(workers)
+            try:
+                for method, expected in (('GET', b'/request'), ('POST', b'/content')):
+                    responses = requestAll(port, 3, 4, method)
+                    self.assertEqual(12, len(responses))
+                    for status, content in responses:
+                        self.assertEqual(200, status)
+                        self.assertTrue(content.startswith(b'client') and expected in content)
+            finally: server.close()
+
+    def testProcesses(self):
+        server, port = startServer(0, 2)
+        try:
+            pids = set()
+            for _k in range(20):
+                pids.update(int(content) for _status, content in requestAll(port, 4, 1, 'GET', 'pid'))
+                if len(pids) == 2: break
+            self.assertEqual(2, len(pids))
+            self.assertNotIn(os.getpid(), pids)
+
+            killed = pids.pop()
+            os.kill(killed, signal.SIGKILL)
+            time.sleep(server.restartDelay + 0.5)
+            self.assertEqual(2, len(server._children))
+            self.assertNotIn(killed, server._children)
+            self.assertEqual(200, requestAll(port, 1, 1)[0][0])
+        finally: server.close()
+
+# --------------------------------------------------------------------
+
+class BenchmarkAsyncServer(unittest.TestCase):
+
+    clients = 16
+    # The number of concurrent clients.
+    requests = 10
+    # The number of requests made by each client.
+
+    def testBenchmark(self):
+        throughputs = []
+        for workers in (0, 1, 4, 16):
+            server, port = startServer(workers)
+            try:
+                start = time.time()
+                responses = requestAll(port, self.clients, self.requests)
+                elapsed = time.time() - start
+            finally: server.close()
+
+            self.assertEqual(self.clients * self.requests, len(responses))
+            throughputs.append(len(responses) / elapsed)
+            log.info('Workers %s, %s clients with %s requests each: %.2fs, %.1f requests/s',
+                     workers, self.clients, self.requests, elapsed, throughputs[-1])
+
+        self.assertTrue(throughputs[-1] > throughputs[1], 'Throughput does not scale with the workers')
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -13,22 +13,32 @@ from ally.container.ioc import injected
 from ally.design.processor.assembly import Assembly
 from ally.design.processor.attribute import optional
 from ally.design.processor.execution import Chain, Processing, FILL_ALL
+from ally.http.spec.headers import Headers
 from ally.http.spec.server import RequestHTTP, ResponseHTTP, RequestContentHTTP, \
-    ResponseContentHTTP, HTTP
-from ally.support.util_io import IInputStream, IClosable
+    ResponseContentHTTP, HTTP, setEventLoop
+from ally.support.util_fork import fork
+from ally.support.util_io import IInputStream, IClosable, FileRegion
 from ally.support.util_spec import IDo
 from asyncore import dispatcher, loop
-from collections import deque
+from collections import deque, Iterable
 from http.server import BaseHTTPRequestHandler
 from io import BytesIO
+from queue import Queue
+from threading import Thread
 from urllib.parse import urlparse, parse_qsl
 import logging
+import os
+import signal
 import socket
+import time
 
 # --------------------------------------------------------------------
 
 log = logging.getLogger(__name__)
 
+SENDFILE = hasattr(os, 'sendfile')
+# Flag indicating that the file regions can be sent directly from the file descriptors.
+
 # --------------------------------------------------------------------
 
 class RequestContentHTTPAsyncore(RequestContentHTTP):
@@ -53,6 +63,8 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
     # The maximum request size, 1M
     requestTerminator = b'\r\n\r\n'
     # Terminator that signals the http request is complete 
+    fileChunkSize = 1024 * 1024
+    # The maximum number of bytes sent at once from a file region.
 
     def __init__(self, request, address, server):
         '''
@@ -114,6 +126,13 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
             if content is None:
                 if self.close_connection: close = True
                 break
+            if isinstance(content, FileRegion) and SENDFILE:
+                if data.tell():
+                    # The buffered data needs to be sent before the file region.
+                    self._writeq.appendleft(content)
+                    break
+                self._sendFile(content)
+                return
             if isinstance(content, (bytes, memoryview)): data.write(content)
             elif isinstance(content, IInputStream):
                 assert isinstance(content, IInputStream)
@@ -137,6 +156,34 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
             
     def handle_error(self):
         log.exception('A problem occurred in the server')
+        
+    def close(self):
+        '''
+        @see: dispatcher.close
+        
+        Also closes the response sources that have not been delivered, as an example the forwarded responses need to
+        have the connections recycled even if the client disconnected.
+        '''
+        dispatcher.close(self)
+        while self._writeq:
+            content = self._writeq.popleft()
+            if isinstance(content, IClosable): content.close()
+        
+    def _sendFile(self, region):
+        '''
+        Sends the file region directly from the file descriptor to the connection socket.
+        '''
+        assert isinstance(region, FileRegion), 'Invalid file region %s' % region
+        try: sent = os.sendfile(self.socket.fileno(), region.fileno(), region.offset, min(region.remaining, self.fileChunkSize))
+        except BlockingIOError:
+            self._writeq.appendleft(region)
+            return
+        region.advance(sent)
+        if region.remaining and sent: self._writeq.appendleft(region)
+        else:
+            # The file has been sent or it has been truncated in the meantime.
+            region.close()
+            if region.remaining: self.close()
     
     def end_headers(self):
         '''
@@ -263,43 +310,71 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
             self._reader = None
             self._chain = None
             
-            self._readContinue()
-            chain.execute()
+            if self.server.workers:
+                self.readable = self._notReadable
+                self.handle_data = self._carryHandleData
+                self.server.pool.execute(self._processWorkerContinue, chain)
+            else:
+                self._readContinue()
+                chain.execute()
+            
+    def _carryHandleData(self, data):
+        '''
+        Handle the data received while the request is processed by the workers, the data is kept until the workers finalize.
+        '''
+        if self._readCarry is not None: self._readCarry += data
+        else: self._readCarry = data
 
     # ----------------------------------------------------------------
     
     def _process(self, method):
         assert isinstance(method, str), 'Invalid method %s' % method
+        if self.server.workers:
+            # The processing is delegated to the workers, until the response is provided the connection is not read anymore.
+            self.readable = self._notReadable
+            self.handle_data = self._carryHandleData
+            self.server.pool.submit(self._processWorker, method, self.path, dict(self.headers))
+            return
+        
         proc = self.server.processing
         assert isinstance(proc, Processing), 'Invalid processing %s' % proc
         
+        chain = self._processChain(proc, method, self.path, self.headers)
+        if RequestContentHTTPAsyncore.doContentReader in chain.arg.requestCnt:
+            while True:
+                if not chain.do():
+                    self._readContinue()
+                    break
+                if chain.arg.requestCnt.doContentReader:
+                    assert callable(chain.arg.requestCnt.doContentReader), \
+                    'Invalid content reader %s' % chain.arg.requestCnt.doContentReader
+                    self._chain, self._reader = chain, chain.arg.requestCnt.doContentReader
+                    self._readContent()  # Now we proceed to read content stage
+                    break
+        else:
+            self._readContinue()
+            chain.execute()
+            
+    def _processChain(self, proc, method, path, headers):
+        '''
+        Creates the chain that processes the request.
+        '''
+        assert isinstance(proc, Processing), 'Invalid processing %s' % proc
+        
         request, requestCnt = proc.ctx.request(), proc.ctx.requestCnt()
         assert isinstance(request, RequestHTTP), 'Invalid request %s' % request
         assert isinstance(requestCnt, RequestContentHTTP), 'Invalid request content %s' % requestCnt
         
         if RequestHTTP.clientIP in request: request.clientIP = self.client_address[0]
-        url = urlparse(self.path)
+        url = urlparse(path)
         request.scheme, request.method = HTTP, method.upper()
         request.uri = url.path.lstrip('/')
-        if RequestHTTP.headers in request: request.headers = dict(self.headers)
+        if RequestHTTP.headers in request: request.headers = Headers(headers)
         if RequestHTTP.parameters in request: request.parameters = parse_qsl(url.query, True, False)
 
         chain = Chain(proc, FILL_ALL, request=request, requestCnt=requestCnt)
         chain.onFinalize(self._processRespond)
-        
-        if RequestContentHTTPAsyncore.doContentReader in requestCnt:
-            while True:
-                if not chain.do():
-                    self._readContinue()
-                    break
-                if requestCnt.doContentReader:
-                    assert callable(requestCnt.doContentReader), 'Invalid content reader %s' % requestCnt.doContentReader
-                    self._chain, self._reader = chain, requestCnt.doContentReader
-                    self._readContent()  # Now we proceed to read content stage
-                    break
-        else:
-            self._readContinue()
-            chain.execute()
+        return chain
             
     def _processRespond(self, final, response, responseCnt, **keyargs):
         assert isinstance(response, ResponseHTTP), 'Invalid response %s' % response
@@ -309,17 +384,219 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
         if ResponseHTTP.text in response and response.text: text = response.text
         elif ResponseHTTP.code in response and response.code: text = response.code
         else: text = None
-        self.send_response(response.status, text)
         
-        if ResponseHTTP.headers in response and response.headers is not None:
-            for name, value in response.headers.items(): self.send_header(name, value)
+        if ResponseHTTP.headers in response and response.headers is not None: headers = response.headers
+        else: headers = None
+        
+        if ResponseContentHTTP.source in responseCnt: source = responseCnt.source
+        else: source = None
+        
+        if self.server.workers: self.server.trigger.call(self._respond, response.status, text, headers, source, True)
+        else: self._respond(response.status, text, headers, source)
             
+    def _respond(self, status, text, headers, source, resume=False):
+        '''
+        Writes the response, this needs to be called only on the server loop thread.
+        '''
+        if not self.connected:
+            # The client disconnected while the response was processed.
+            if isinstance(source, IClosable): source.close()
+            return
+        
+        self.send_response(status, text)
+        if headers is not None:
+            for name, value in headers.items(): self.send_header(name, value)
         self.end_headers()
         
-        if ResponseContentHTTP.source in responseCnt and responseCnt.source is not None:
-            self._writeq.append(responseCnt.source)
-            
+        if source is not None: self._writeq.append(source)
         self._writeq.append(None)
+        
+        if resume: self._readResume()
+    
+    # ----------------------------------------------------------------
+    
+    def _processWorker(self, proc, method, path, headers):
+        '''
+        Processes the request on a worker thread.
+        '''
+        try:
+            chain = self._processChain(proc, method, path, headers)
+            if RequestContentHTTPAsyncore.doContentReader in chain.arg.requestCnt:
+                while chain.do():
+                    if chain.arg.requestCnt.doContentReader:
+                        assert callable(chain.arg.requestCnt.doContentReader), \
+                        'Invalid content reader %s' % chain.arg.requestCnt.doContentReader
+                        self.server.trigger.call(self._readContentFor, chain, chain.arg.requestCnt.doContentReader)
+                        break
+            else: chain.execute()
+        except:
+            log.exception('A problem occurred while processing the request for \'%s\'' % path)
+            self.server.trigger.call(self.close)
+            
+    def _processWorkerContinue(self, chain):
+        '''
+        Continues on a worker thread the processing after the request content has been read.
+        '''
+        try: chain.execute()
+        except:
+            log.exception('A problem occurred while processing the request content')
+            self.server.trigger.call(self.close)
+    
+    def _readContentFor(self, chain, reader):
+        '''
+        Prepare on the server loop thread for reading the content for the worker processed chain.
+        '''
+        self._chain, self._reader = chain, reader
+        self._readContent()
+        if self._readCarry is not None:
+            data, self._readCarry = self._readCarry, None
+            self.handle_data(data)
+        
+    def _readResume(self):
+        '''
+        Resume the reading on the server loop thread after the worker has finalized the processing.
+        '''
+        self._readContinue()
+        if self._readCarry is not None and self.handle_data:
+            data, self._readCarry = self._readCarry, None
+            self.handle_data(data)
+
+class Trigger(dispatcher):
+    '''
+    Dispatcher that allows other threads to have calls executed on the server loop thread, the loop is woken up by
+    writing into a socket pair.
+    '''
+    
+    def __init__(self, map):
+        '''
+        Construct the trigger.
+        
+        @param map: dictionary{integer: dispatcher}
+            The server map to register the trigger with.
+        '''
+        assert isinstance(map, dict), 'Invalid map %s' % map
+        reader, self._writer = socket.socketpair()
+        self._writer.setblocking(False)
+        dispatcher.__init__(self, reader, map=map)
+        
+        self._calls = deque()
+        
+    def call(self, call, *args):
+        '''
+        Schedules the call to be executed on the server loop thread, this method is safe to be used from any thread.
+        
+        @param call: callable
+            The call to be executed.
+        @param args: arguments
+            The arguments to use on the call.
+        '''
+        assert callable(call), 'Invalid call %s' % call
+        self._calls.append((call, args))
+        try: self._writer.send(b'x')
+        except socket.error: pass  # The socket buffer is full so the loop is already going to wake up.
+        
+    def readable(self):
+        '''
+        @see: dispatcher.readable
+        '''
+        return True
+    
+    def writable(self):
+        '''
+        @see: dispatcher.writable
+        '''
+        return False
+        
+    def handle_read(self):
+        '''
+        @see: dispatcher.handle_read
+        '''
+        try: self.recv(8192)
+        except socket.error: pass
+        while self._calls:
+            call, args = self._calls.popleft()
+            try: call(*args)
+            except: log.exception('A problem occurred while executing %s' % call)
+            
+    def handle_error(self):
+        log.exception('A problem occurred in the server trigger')
+            
+    def close(self):
+        '''
+        @see: dispatcher.close
+        '''
+        dispatcher.close(self)
+        self._writer.close()
+
+class WorkerPool:
+    '''
+    Pool of worker threads that execute the request processing, each worker has its own processing since a processing
+    is not allowed to be used by multiple threads.
+    '''
+    
+    def __init__(self, processings):
+        '''
+        Construct the workers pool.
+        
+        @param processings: Iterable(Processing)
+            The processings to be used by the workers, a worker thread is started for each processing.
+        '''
+        assert isinstance(processings, Iterable), 'Invalid processings %s' % processings
+        
+        self._tasks = Queue()
+        self._threads = []
+        for k, processing in enumerate(processings):
+            assert isinstance(processing, Processing), 'Invalid processing %s' % processing
+            thread = Thread(name='HTTP worker %s' % k, target=self._work, args=(processing,))
+            thread.daemon = True
+            self._threads.append(thread)
+        assert self._threads, 'At least one processing is required'
+        for thread in self._threads: thread.start()
+        
+    def submit(self, call, *args):
+        '''
+        Submits a task to be executed by a worker.
+        
+        @param call: callable(Processing, *args)
+            The task call, it will receive as the first argument the processing of the worker that executes the task.
+        @param args: arguments
+            The additional arguments to use on the call.
+        '''
+        assert callable(call), 'Invalid call %s' % call
+        self._tasks.put((call, args, True))
+        
+    def execute(self, call, *args):
+        '''
+        Submits a task that does not need the processing to be executed by a worker.
+        
+        @param call: callable(*args)
+            The task call.
+        @param args: arguments
+            The arguments to use on the call.
+        '''
+        assert callable(call), 'Invalid call %s' % call
+        self._tasks.put((call, args, False))
+        
+    def close(self):
+        '''
+        Stops the workers after the already submitted tasks are finalized.
+        '''
+        for _thread in self._threads: self._tasks.put(None)
+        
+    # ----------------------------------------------------------------
+        
+    def _work(self, processing):
+        '''
+        The worker thread loop.
+        '''
+        while True:
+            task = self._tasks.get()
+            if task is None: break
+            call, args, withProcessing = task
+            try:
+                if withProcessing: call(processing, *args)
+                else: call(*args)
+            except: log.exception('A problem occurred in worker while executing %s' % call)
 
 # --------------------------------------------------------------------
 
@@ -343,6 +620,16 @@ class AsyncServer(dispatcher):
     
     timeout = 10.0
     # The timeout for select loop.
+    workers = 0
+    # The number of worker threads that execute the requests processing, if 0 then the processing is done on the server
+    # loop thread.
+    processes = 1
+    # The number of processes that serve the requests, if more then one then the server process becomes a supervisor
+    # that binds the server socket and forks the serving processes, any serving process that dies is restarted.
+    restartDelay = 1
+    # The minimum time in seconds a serving process needs to run in order to be restarted without delay.
+    superviseInterval = 0.5
+    # The time in seconds between checking the serving processes.
 
     def __init__(self):
         '''
@@ -354,38 +641,127 @@ class AsyncServer(dispatcher):
         assert callable(self.requestHandlerFactory), 'Invalid request handler factory %s' % self.requestHandlerFactory
         assert isinstance(self.assembly, Assembly), 'Invalid assembly %s' % self.assembly
         assert isinstance(self.timeout, float), 'Invalid timeout %s' % self.timeout
+        assert isinstance(self.workers, int) and self.workers >= 0, 'Invalid workers %s' % self.workers
+        assert isinstance(self.processes, int) and self.processes > 0, 'Invalid processes %s' % self.processes
+        assert self.processes == 1 or hasattr(os, 'fork'), 'Multiple processes are not supported on this platform'
+        assert isinstance(self.restartDelay, (int, float)), 'Invalid restart delay %s' % self.restartDelay
+        assert isinstance(self.superviseInterval, (int, float)), 'Invalid supervise interval %s' % self.superviseInterval
         self.map = {}
         dispatcher.__init__(self, map=self.map)
-
-        self.processing = self.assembly.create(request=RequestHTTP, requestCnt=RequestContentHTTPAsyncore,
-                                               response=ResponseHTTP, responseCnt=ResponseContentHTTP)
         
         self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
         self.set_reuse_addr()
         self.bind((self.serverHost, self.serverPort))
         self.listen(1024)  # lower this to 5 if your OS complains
+        
+        self._children = {}
+        self._supervising = False
+        # The processing is created by each serving process after fork.
+        if self.processes == 1: self.prepare()
+        
+    def prepare(self):
+        '''
+        Prepares the server for serving requests, this means creating the processing and the workers.
+        '''
+        self.processing = self.createProcessing()
+        if self.workers:
+            self.trigger = Trigger(self.map)
+            self.pool = WorkerPool(self.createProcessing() for _k in range(self.workers))
 
     def handle_accept(self):
         '''
         @see: dispatcher.handle_accept
         '''
         try:
-            request, address = self.accept()
+            accepted = self.accept()
         except socket.error:
             log.exception('A problem occurred while waiting connections')
             return
-        except TypeError:
-            log.exception('A EWOULDBLOCK problem occurred while waiting connections')
-            return
+        # The connection has been accepted by another serving process.
+        if accepted is None: return
+        request, address = accepted
         # creates an instance of the handler class to handle the request/response
         # on the incoming connection
         self.requestHandlerFactory(request, address, self)
     
     def serve_forever(self):
         '''
-        Loops and servers the connections.
+        Loops and servers the connections, if multiple processes are required then it will supervise the serving processes.
+        '''
+        setEventLoop()
+        if self.processes == 1: loop(self.timeout, map=self.map)
+        else:
+            self._supervising = True
+            for _k in range(self.processes): self._fork()
+            self._supervise()
+        
+    def close(self):
+        '''
+        @see: dispatcher.close
+        '''
+        dispatcher.close(self)
+        if self.processes > 1:
+            self._supervising = False
+            for pid in list(self._children):
+                try: os.kill(pid, signal.SIGTERM)
+                except OSError: pass
+        elif self.workers:
+            self.pool.close()
+            self.trigger.close()
+        
+    def createProcessing(self):
+        '''
+        Creates a new processing for the server assembly.
+        
+        @return: Processing
+            The processing used in resolving the requests.
+        '''
+        return self.assembly.create(request=RequestHTTP, requestCnt=RequestContentHTTPAsyncore,
+                                    response=ResponseHTTP, responseCnt=ResponseContentHTTP)
+    
+    # ----------------------------------------------------------------
+    
+    def _fork(self):
+        '''
+        Forks a serving process, the forked process uses the services of the server process but creates its own processing
+        and workers and loops the server socket. The fork is made with @see: util_fork.fork so the services that run
+        threads are restarted in the forked process.
         '''
-        loop(self.timeout, map=self.map)
+        pid = fork()
+        if pid:
+            self._children[pid] = time.time()
+            return
+        
+        code = 0
+        try:
+            self._children.clear()
+            self.processes = 1
+            self.prepare()
+            log.info('Started HTTP serving process %s', os.getpid())
+            loop(self.timeout, map=self.map)
+        except:
+            log.exception('The serving process %s has stopped', os.getpid())
+            code = 1
+        finally: os._exit(code)
+        
+    def _supervise(self):
+        '''
+        Supervises the serving processes, restarting the ones that die.
+        '''
+        while self._children:
+            # We only wait for the serving processes since the application might have other child processes.
+            for pid in list(self._children):
+                try: waited, status = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError: waited, status = pid, None
+                if not waited: continue
+                
+                started = self._children.pop(pid)
+                if not self._supervising: continue
+                log.error('The HTTP serving process %s has died with status %s, restarting', pid, status)
+                # We delay the restart for processes that die at start in order to avoid forking continuously.
+                if time.time() - started < self.restartDelay: time.sleep(self.restartDelay)
+                if self._supervising: self._fork()
+            time.sleep(self.superviseInterval)
 
 # --------------------------------------------------------------------
 
@@ -13,6 +13,7 @@ from ..support import tnetstrings
 from ally.container.ioc import injected
 from ally.design.processor.assembly import Assembly
 from ally.design.processor.execution import Processing, FILL_ALL
+from ally.http.spec.headers import Headers
 from ally.http.spec.server import RequestHTTP, ResponseHTTP, RequestContentHTTP, \
     ResponseContentHTTP, HTTP
 from ally.support.util_io import IInputStream, IClosable
@@ -75,7 +76,7 @@ class RequestHandler:
         if RequestHTTP.clientIP in request: request.clientIP = req.headers.pop('x-forwarded-for')
         request.scheme, request.method = self.scheme, req.headers.pop('METHOD').upper()
         request.uri = req.path.lstrip('/')
-        if RequestHTTP.headers in request: request.headers = dict(req.headers)
+        if RequestHTTP.headers in request: request.headers = Headers(req.headers)
         if RequestHTTP.parameters in request: request.parameters = parse_qsl(req.headers.pop('QUERY', ''), True, False)
         
         if RequestContentHTTP.source in requestCnt:
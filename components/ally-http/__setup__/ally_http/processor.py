@@ -12,6 +12,7 @@ Provides the configurations for the processors used in handling the request.
 from ally.container import ioc
 from ally.design.processor.assembly import Assembly
 from ally.design.processor.handler import Handler
+from ally.http.impl.processor.asyncore_content import AsyncoreContentHandler
 from ally.http.impl.processor.chunked_transfer import \
     ChunkedTransferEncodingHandler
 from ally.http.impl.processor.connection import ConnectionCloseHandler, \
@@ -30,6 +31,43 @@ from ally.http.impl.processor.method_override import MethodOverrideHandler, \
     MethodOverrideAllowHandler
 from ally.http.impl.processor.path_encoder import EncoderPathHandler
 from ally.http.spec.codes import PATH_NOT_FOUND
+from os import path
+
+# --------------------------------------------------------------------
+
+@ioc.config
+def forward_maximum_connections() -> int:
+    '''The maximum number of connections opened by a forward to an external server'''
+    return 100
+
+@ioc.config
+def forward_maximum_idle() -> int:
+    '''The maximum number of idle connections kept by a forward for reusing'''
+    return 20
+
+@ioc.config
+def forward_idle_timeout() -> int:
+    '''The number of seconds after which an idle forward connection is closed'''
+    return 30
+
+@ioc.config
+def forward_wait_timeout() -> int:
+    '''
+    The number of seconds a forward waits for a connection when the maximum number of connections is reached, after
+    this time the forward responds with service unavailable. Only the forwards processed on worker threads wait, the
+    forwards processed on the server event loop are rejected right away.
+    '''
+    return 10
+
+@ioc.config
+def dump_requests_size():
+    '''The minimum size of the request length to be dumped on the file system in bytes'''
+    return 1024 * 1024
+
+@ioc.config
+def dump_requests_path():
+    '''The path where the requests are dumped when they are to big to keep in memory'''
+    return path.join('workspace', 'asyncore')
 
 # --------------------------------------------------------------------
 # Creating the processors used in handling the request
@@ -85,6 +123,13 @@ def connectionClose() -> Handler: return ConnectionCloseHandler()
 @ioc.entity
 def connection() -> Handler: return ConnectionHandler()
 
+@ioc.entity
+def asyncoreContent() -> Handler:
+    b = AsyncoreContentHandler()
+    b.dumpRequestsSize = dump_requests_size()
+    b.dumpRequestsPath = dump_requests_path()
+    return b
+
 # --------------------------------------------------------------------
 
 @ioc.entity
@@ -0,0 +1,211 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the forward connections pool and request content streaming.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container.ioc import initialize
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import defines
+from ally.design.processor.context import Context
+from ally.design.processor.execution import FILL_ALL
+from ally.http.impl.processor.forward import ForwardHTTPHandler, \
+    ConnectionsPool, Response, ResponseContent
+from ally.http.spec.server import RequestHTTP, setEventLoop
+from ally.support.util_io import IInputStream
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from threading import Thread
+import gc
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+class RequestContent(Context):
+    source = defines(IInputStream)
+    length = defines(int)
+
+class Source(IInputStream):
+    '''
+    Source that generates the content and records the size of the reads.
+    '''
+
+    def __init__(self, size):
+        self.size = size
+        self.reads = []
+
+    def read(self, nbytes=None):
+        if nbytes is None: nbytes = self.size
+        nbytes = min(nbytes, self.size)
+        self.size -= nbytes
+        self.reads.append(nbytes)
+        return b'x' * nbytes
+
+class BackendHandler(BaseHTTPRequestHandler):
+    '''
+    Responds with the URI for GET and with the received content size for POST.
+    '''
+    protocol_version = 'HTTP/1.1'
+    timeout = 0.2
+
+    def do_GET(self):
+        self.respond(self.path.encode())
+
+    def do_POST(self):
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            size = 0
+            while True:
+                length = int(self.rfile.readline().strip(), 16)
+                size += len(self.rfile.read(length))
+                self.rfile.readline()
+                if not length: break
+        else: size = len(self.rfile.read(int(self.headers['Content-Length'])))
+        self.respond(str(size).encode())
+
+    def respond(self, content):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args): pass
+
+class Backend(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+# --------------------------------------------------------------------
+
+class TestForward(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = Backend(('127.0.0.1', 0), BackendHandler)
+        thread = Thread(target=self.backend.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.prepare()
+
+    def prepare(self, **attributes):
+        self.handler = handler = ForwardHTTPHandler()
+        handler.externalHost, handler.externalPort = self.backend.server_address
+        handler.chunkSize = 1000
+        for name, value in attributes.items(): setattr(handler, name, value)
+        assembly = Assembly('Forward', reportUnused=False)
+        assembly.add(initialize(handler))
+        self.processing = assembly.create(request=RequestHTTP, requestCnt=RequestContent, response=Response,
+                                          responseCnt=ResponseContent)
+
+    def tearDown(self):
+        self.backend.shutdown()
+        self.backend.server_close()
+
+    def forward(self, method='GET', uri='resource', source=None, length=None):
+        request = self.processing.ctx.request()
+        request.scheme, request.method, request.uri = 'http', method, uri
+        request.headers, request.parameters = {}, []
+        requestCnt = self.processing.ctx.requestCnt()
+        requestCnt.source, requestCnt.length = source, length
+        arg = self.processing.execute(FILL_ALL, request=request, requestCnt=requestCnt)
+        if arg.responseCnt.source is None: return arg.response.status, None
+        content = arg.responseCnt.source.read()
+        arg.responseCnt.source.close()
+        return arg.response.status, content
+
+    def testReuse(self):
+        for k in range(3): self.assertEqual((200, ('/resource%s' % k).encode()), self.forward(uri='resource%s' % k))
+        statistics = self.handler.statistics()
+        self.assertEqual(1, statistics['created'])
+        self.assertEqual(2, statistics['reused'])
+        self.assertEqual(1, statistics['idle'])
+        self.assertEqual(0, statistics['active'])
+
+        # The backend closes the idle connection after its time out.
+        time.sleep(0.4)
+        self.assertEqual(200, self.forward()[0])
+        statistics = self.handler.statistics()
+        self.assertEqual(1, statistics['stale'])
+        self.assertEqual(2, statistics['created'])
+
+    def testDroppedSource(self):
+        # The response source dropped without closing, as for an aborted client, gives back the connection permit.
+        request = self.processing.ctx.request()
+        request.scheme, request.method, request.uri = 'http', 'GET', 'resource'
+        request.headers, request.parameters = {}, []
+        arg = self.processing.execute(FILL_ALL, request=request, requestCnt=self.processing.ctx.requestCnt())
+        self.assertEqual(1, self.handler.statistics()['active'])
+        del arg
+        gc.collect()
+        self.assertEqual(0, self.handler.statistics()['active'])
+
+    def testStreamContent(self):
+        source = Source(10500)
+        self.assertEqual((200, b'10500'), self.forward('POST', source=source, length=10500))
+        self.assertEqual(11, len(source.reads))
+        self.assertTrue(max(source.reads) <= 1000)
+
+        source = Source(2500)
+        self.assertEqual((200, b'2500'), self.forward('POST', source=source))
+        self.assertTrue(max(source.reads) <= 1000)
+
+    def testUnavailable(self):
+        self.tearDown()
+        self.assertEqual(503, self.forward()[0])
+        self.setUp()
+
+    def testPoolLimits(self):
+        pool, key = ConnectionsPool(maximum=1, maximumIdle=1, idleTimeout=0.1, waitTimeout=0.1), ('localhost', 80)
+        connection, isReused = pool.acquire(key)
+        self.assertFalse(isReused)
+        self.assertEqual((None, False), pool.acquire(key))
+        pool.release(key, connection)
+        self.assertEqual((connection, True), pool.acquire(key))
+        pool.release(key, connection)
+        time.sleep(0.15)
+        self.assertIsNot(connection, pool.acquire(key)[0])
+        statistics = pool.statistics()
+        self.assertEqual(1, statistics['rejected'])
+        self.assertEqual(1, statistics['expired'])
+        self.assertEqual(1, statistics['active'])
+
+    def testEventLoopLimit(self):
+        # On the event loop thread the connections are released by the same thread so the forward cannot wait for them.
+        self.prepare(maximumConnections=1, waitTimeout=5)
+        results = []
+        def loop():
+            setEventLoop()
+            request = self.processing.ctx.request()
+            request.scheme, request.method, request.uri = 'http', 'GET', 'resource'
+            request.headers, request.parameters = {}, []
+            arg = self.processing.execute(FILL_ALL, request=request, requestCnt=self.processing.ctx.requestCnt())
+            started = time.time()
+            results.append(self.forward()[0])
+            results.append(time.time() - started)
+            arg.responseCnt.source.read()
+            arg.responseCnt.source.close()
+            results.append(self.forward())
+        thread = Thread(target=loop)
+        thread.start()
+        thread.join()
+        
+        self.assertEqual(503, results[0])
+        self.assertLess(results[1], 1)
+        self.assertEqual((200, b'/resource'), results[2])
+        statistics = self.handler.statistics()
+        self.assertEqual((1, 0), (statistics['rejected'], statistics['waited']))
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the case insensitive headers.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.http.spec.headers import Headers, HeaderRaw, HeaderCmx, CONTENT_TYPE, \
+    ACCEPT, HOST, encode, remove
+import copy
+import logging
+import pickle
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+RAW = {'Host': 'localhost', 'accept': 'text/json, text/xml', 'ACCEPT': 'text/plain',
+       'content-type': 'text/json; charset=UTF-8; boundary="12"', 'X-Custom': 'custom'}
+
+# --------------------------------------------------------------------
+
+class TestHeaders(unittest.TestCase):
+
+    def testOperators(self):
+        for headers in (dict(RAW), Headers(RAW)):
+            self.assertTrue(HOST.has(headers))
+            self.assertEqual('localhost', HOST.fetch(headers))
+            self.assertEqual('custom', HeaderRaw('x-custom').fetch(headers))
+            self.assertEqual(['text/json', 'text/xml', 'text/plain'], sorted(ACCEPT.decode(headers), key=['text/json',
+                             'text/xml', 'text/plain'].index))
+            self.assertEqual([('text/json', {'charset': 'UTF-8', 'boundary': '12'})], CONTENT_TYPE.decode(headers))
+
+            ACCEPT.extend(headers, 'text/html')
+            self.assertEqual(1, len([name for name in headers if name.lower() == 'accept']))
+            self.assertIn('text/html', ACCEPT.decode(headers))
+            HOST.put(headers, 'remote')
+            self.assertEqual('remote', headers['Host'])
+            self.assertEqual('remote', HeaderRaw('HOST').fetchOnce(headers))
+            self.assertFalse(HOST.has(headers))
+
+            remove(headers, 'X-Custom')
+            encode(headers, 'x-custom', 'a', ('b', {'q': '1'}))
+            self.assertEqual('a,b;q=1', HeaderRaw('X-CUSTOM').fetch(headers))
+            remove(headers, ('X-Custom', 'Content-Type'))
+            self.assertEqual(['Accept'], list(headers))
+
+    def testContainer(self):
+        headers = Headers(RAW)
+        self.assertIsInstance(headers, dict)
+        self.assertEqual(RAW, headers)
+        self.assertEqual('text/json, text/xml', headers.first('Accept'))
+        self.assertEqual(['text/json, text/xml', 'text/plain'], headers.valuesFor('accept'))
+
+        del headers['accept']
+        self.assertEqual('text/plain', headers.first('accept'))
+        self.assertEqual('text/plain', headers.pop('ACCEPT'))
+        self.assertFalse(headers.has('Accept'))
+        self.assertIsNone(headers.pop('Accept', None))
+
+        headers.setdefault('Accept', 'text/xml')
+        headers.update({'accept': 'text/json'}, Host='remote')
+        self.assertEqual(['text/xml', 'text/json'], headers.valuesFor('ACCEPT'))
+        self.assertEqual('remote', headers.first('host'))
+        other = headers.copy()
+        self.assertIsInstance(other, Headers)
+        headers.clear()
+        self.assertFalse(headers.has('Host'))
+        self.assertEqual(['text/xml', 'text/json'], other.valuesFor('Accept'))
+
+        while other: other.popitem()
+        self.assertEqual([], other.valuesFor('accept'))
+
+    def testCopyAndPickle(self):
+        headers = Headers(RAW)
+        for other in (copy.copy(headers), copy.deepcopy(headers), pickle.loads(pickle.dumps(headers))):
+            self.assertIsInstance(other, Headers)
+            self.assertEqual(RAW, other)
+            # The copies have their own names index so changing them does not affect the original headers.
+            other.discard('Accept')
+            self.assertFalse(other.has('accept'))
+            self.assertEqual(['text/json, text/xml', 'text/plain'], headers.valuesFor('Accept'))
+            headers.discard('Host')
+            self.assertEqual('localhost', other.first('host'))
+            headers['Host'] = 'localhost'
+
+    def testDecodedCache(self):
+        headers, parser = Headers(RAW), HeaderCmx('Content-Type', True)
+        decoded = parser.decode(headers)
+        decoded[0][1]['charset'] = 'changed'
+        decoded.append('changed')
+        self.assertEqual([('text/json', {'charset': 'UTF-8', 'boundary': '12'})], parser.decode(headers))
+
+        headers['Content-Type'] = 'text/xml'
+        self.assertEqual([('text/json', {'charset': 'UTF-8', 'boundary': '12'}), ('text/xml', {})],
+                         parser.decode(headers))
+        headers.discard('content-type')
+        self.assertEqual([], parser.decode(headers))
+
+# --------------------------------------------------------------------
+
+class BenchmarkHeaders(unittest.TestCase):
+
+    lookups = 50000
+    # The number of header lookups.
+
+    def testBenchmark(self):
+        raw = dict(RAW)
+        raw.update(('X-Header-%s' % k, str(k)) for k in range(20))
+        timings = {}
+        for name, headers in (('dict', raw), ('headers', Headers(raw))):
+            started = time.time()
+            for _k in range(self.lookups):
+                HOST.fetch(headers)
+                ACCEPT.decode(headers)
+                CONTENT_TYPE.has(headers)
+            timings[name] = time.time() - started
+        log.info('Headers %s lookups: dict %.4fs, headers %.4fs (%.2fx)', self.lookups, timings['dict'],
+                 timings['headers'], timings['dict'] / timings['headers'])
+        self.assertTrue(timings['headers'] < timings['dict'])
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -117,10 +117,10 @@ def createReader(stream, callBack, length):
             size += len(data)
             if length is not None:
                 if size > length:
-                    dif = size - length
+                    dif = len(data) - (size - length)
                     size = length
                     data = memoryview(data)
-                    ret = data[dif:]
+                    ret = bytes(data[dif:])
                     stream.write(data[:dif])
                 else:
                     stream.write(data)
@@ -13,14 +13,18 @@ from ally.container.ioc import injected
 from ally.design.processor.attribute import requires, defines
 from ally.design.processor.context import Context
 from ally.design.processor.handler import HandlerProcessor
-from ally.http.spec.codes import SERVICE_UNAVAILABLE, CodedHTTP, PATH_NOT_FOUND
-from ally.http.spec.headers import remove, CONNECTION, CONNECTION_KEEP
-from ally.http.spec.server import HTTP
+from ally.http.spec.codes import SERVICE_UNAVAILABLE, CodedHTTP
+from ally.http.spec.headers import remove, CONNECTION, CONNECTION_KEEP, \
+    CONTENT_LENGTH, TRANSFER_ENCODING, TRANSFER_ENCODING_CHUNKED
+from ally.http.spec.server import HTTP, isEventLoop
 from ally.support.util_io import IInputStream, IInputStreamClosable
-from http.client import HTTPConnection, BadStatusLine
+from http.client import HTTPConnection, HTTPException, HTTPResponse
+from threading import Condition
 from urllib.parse import urlencode, urlunsplit
 import logging
+import select
 import socket
+import time
 
 # --------------------------------------------------------------------
 
@@ -52,6 +56,7 @@ class Response(CodedHTTP):
     Context for response. 
     '''
     # ---------------------------------------------------------------- Defined
+    text = defines(str)
     headers = defines(dict)
 
 class ResponseContent(Context):
@@ -74,7 +79,19 @@ class ForwardHTTPHandler(HandlerProcessor):
     externalPort = int
     # The external server port.
     maximumRetries = 10
-    # The maximum number of retries.
+    # The maximum number of retries with a new connection in case a pooled connection has been closed by the external
+    # server, the retry is made only if no request content has been forwarded.
+    maximumConnections = 100
+    # The maximum number of connections opened to the external server.
+    maximumIdle = 20
+    # The maximum number of idle connections kept in the pool.
+    idleTimeout = 30
+    # The number of seconds after which an idle connection is closed.
+    waitTimeout = 10
+    # The number of seconds to wait for a connection if the maximum number of connections has been reached, the forward
+    # executed on a server event loop thread does not wait and is rejected right away.
+    chunkSize = 0x10000
+    # The size of the chunks in which the request content is forwarded.
     removeHeaders = {'Server', 'Date', 'Connection'}
     # The headers to be removed automatically from the response.
         
@@ -82,10 +99,15 @@ class ForwardHTTPHandler(HandlerProcessor):
         assert isinstance(self.externalHost, str), 'Invalid external host %s' % self.externalHost
         assert isinstance(self.externalPort, int), 'Invalid external port %s' % self.externalPort
         assert isinstance(self.maximumRetries, int), 'Invalid maximum retries %s' % self.maximumRetries
+        assert isinstance(self.maximumConnections, int), 'Invalid maximum connections %s' % self.maximumConnections
+        assert isinstance(self.maximumIdle, int), 'Invalid maximum idle %s' % self.maximumIdle
+        assert isinstance(self.idleTimeout, (int, float)), 'Invalid idle timeout %s' % self.idleTimeout
+        assert isinstance(self.waitTimeout, (int, float)), 'Invalid wait timeout %s' % self.waitTimeout
+        assert isinstance(self.chunkSize, int), 'Invalid chunk size %s' % self.chunkSize
         assert isinstance(self.removeHeaders, set), 'Invalid remove headers %s' % self.removeHeaders
         super().__init__()
         
-        self._pool = []
+        self._pool = ConnectionsPool(self.maximumConnections, self.maximumIdle, self.idleTimeout, self.waitTimeout)
     
     def process(self, chain, request:Request, requestCnt:RequestContent, response:Response,
                 responseCnt:ResponseContent, **keyargs):
@@ -100,73 +122,246 @@ class ForwardHTTPHandler(HandlerProcessor):
         assert isinstance(responseCnt, ResponseContent), 'Invalid response content %s' % responseCnt
         assert request.scheme == HTTP, 'Cannot forward for scheme %s' % request.scheme
         
-        if requestCnt.source is not None:
-            assert isinstance(requestCnt.source, IInputStream), 'Invalid request source %s' % requestCnt.source
-            body = requestCnt.source.read(requestCnt.length)
-        else: body = None
-        
         if request.parameters: parameters = urlencode(request.parameters)
         else: parameters = None
 
         if request.headers: headers = dict(request.headers)
         else: headers = {}
         CONNECTION.put(headers, CONNECTION_KEEP)
-
-        retries, rsp = 0, None
-        while retries < self.maximumRetries:
-            connection = self._connection()
+        
+        source = requestCnt.source
+        if source is not None:
+            assert isinstance(source, IInputStream), 'Invalid request source %s' % source
+            if requestCnt.length is None:
+                CONTENT_LENGTH.remove(headers)
+                TRANSFER_ENCODING.put(headers, TRANSFER_ENCODING_CHUNKED)
+            else:
+                TRANSFER_ENCODING.remove(headers)
+                CONTENT_LENGTH.put(headers, str(requestCnt.length))
+        
+        key, retries = (self.externalHost, self.externalPort), 0
+        while True:
+            # The response content is consumed by the event loop so the loop thread cannot wait for a connection.
+            connection, isReused = self._pool.acquire(key, not isEventLoop())
+            if connection is None:
+                SERVICE_UNAVAILABLE.set(response)
+                response.text = 'Too many connections'
+                return
+            
+            isSent = False
             try:
                 connection.putrequest(request.method, urlunsplit(('', '', '/%s' % request.uri, parameters, '')),
                                       skip_host=True, skip_accept_encoding=True)
                 for hname, hvalue in headers.items(): connection.putheader(hname, hvalue)
-                connection.endheaders(body)
-            except socket.error as e:
+                connection.endheaders()
+                if source is not None:
+                    isSent = True
+                    self.forwardContent(connection, source, requestCnt.length)
+                rsp = connection.getresponse()
+            except (socket.error, HTTPException) as e:
+                self._pool.discard(key, connection)
+                # A pooled connection might have been closed by the external server, we try with a new connection.
+                if isReused and not isSent and retries < self.maximumRetries:
+                    retries += 1
+                    continue
                 SERVICE_UNAVAILABLE.set(response)
-                if e.errno == 111: response.text = 'Connection refused'
-                else: response.text = str(e)
+                if isinstance(e, socket.error) and e.errno == 111: response.text = 'Connection refused'
+                else: response.text = str(e) or e.__class__.__name__
                 return
-            
-            try: rsp = connection.getresponse()
-            except BadStatusLine as e:
-                if e.line == '':
-                    retries += 1
-                    continue  # We try again with a new connection, this one might be closed.
             break
-        
-        if rsp is None:
-            PATH_NOT_FOUND.set(response)
-            return
             
         response.status = rsp.status
         response.code = response.text = rsp.reason
         response.headers = dict(rsp.headers)
         
-        responseCnt.source = Recycle(self._pool, rsp, connection)
+        responseCnt.source = Recycle(self._pool, key, rsp, connection)
         
         if self.removeHeaders: remove(response, self.removeHeaders)
         
+    def statistics(self):
+        '''
+        Provides the connections pool statistics.
+        
+        @return: dictionary{string: integer}
+            The statistics, @see: ConnectionsPool.statistics.
+        '''
+        return self._pool.statistics()
+    
     # ----------------------------------------------------------------
     
-    def _connection(self):
+    def forwardContent(self, connection, source, length):
         '''
-        Provides a connection to work with.
+        Forwards the request content in chunks, if the length is not known the content is sent chunk encoded.
+        
+        @param connection: HTTPConnection
+            The connection to send the content on.
+        @param source: IInputStream
+            The request content source.
+        @param length: integer|None
+            The length of the content.
         '''
-        if self._pool: return self._pool.pop()
-        return HTTPConnection(self.externalHost, self.externalPort)
+        assert isinstance(connection, HTTPConnection), 'Invalid connection %s' % connection
+        assert isinstance(source, IInputStream), 'Invalid source %s' % source
+        
+        if length is None:
+            while True:
+                chunk = source.read(self.chunkSize)
+                if not chunk: break
+                connection.send(('%x\r\n' % len(chunk)).encode())
+                connection.send(chunk)
+                connection.send(b'\r\n')
+            connection.send(b'0\r\n\r\n')
+            return
+            
+        while length > 0:
+            chunk = source.read(min(length, self.chunkSize))
+            if not chunk: raise HTTPException('The request content is shorter than the content length')
+            connection.send(chunk)
+            length -= len(chunk)
 
 # --------------------------------------------------------------------
 
+class ConnectionsPool:
+    '''
+    Pool for the HTTP connections kept alive, the connections are pooled for each host and port.
+    '''
+    
+    def __init__(self, maximum=None, maximumIdle=None, idleTimeout=None, waitTimeout=None):
+        '''
+        Construct the pool.
+        
+        @param maximum: integer|None
+            The maximum number of connections opened for a host, None for no limit.
+        @param maximumIdle: integer|None
+            The maximum number of idle connections kept for a host, None for no limit.
+        @param idleTimeout: integer|float|None
+            The number of seconds after which an idle connection is closed, None to keep the idle connections.
+        @param waitTimeout: integer|float|None
+            The number of seconds to wait for a connection when the maximum is reached, None to wait indefinitely.
+        '''
+        assert maximum is None or isinstance(maximum, int), 'Invalid maximum %s' % maximum
+        assert maximumIdle is None or isinstance(maximumIdle, int), 'Invalid maximum idle %s' % maximumIdle
+        assert idleTimeout is None or isinstance(idleTimeout, (int, float)), 'Invalid idle timeout %s' % idleTimeout
+        assert waitTimeout is None or isinstance(waitTimeout, (int, float)), 'Invalid wait timeout %s' % waitTimeout
+        
+        self.maximum = maximum
+        self.maximumIdle = maximumIdle
+        self.idleTimeout = idleTimeout
+        self.waitTimeout = waitTimeout
+        
+        self._condition = Condition()
+        self._idle = {}
+        self._active = {}
+        self._counts = dict.fromkeys(('created', 'reused', 'stale', 'expired', 'discarded', 'waited', 'rejected'), 0)
+        
+    def acquire(self, key, wait=True):
+        '''
+        Provides a connection for the key, the idle connections that have expired or have been closed by the server are
+        closed and a new connection is provided instead.
+        
+        @param key: tuple(string, integer)
+            The host and port to provide the connection for.
+        @param wait: boolean
+            Flag indicating that if the maximum is reached the acquire should wait for a connection to be released,
+            if False the acquire is rejected right away.
+        @return: tuple(HTTPConnection|None, boolean)
+            The connection, None if no connection is available in the wait time out, and True if the connection is a
+            reused one.
+        '''
+        assert isinstance(key, tuple) and len(key) == 2, 'Invalid key %s' % key
+        assert isinstance(wait, bool), 'Invalid wait flag %s' % wait
+        
+        with self._condition:
+            idle = self._idle.get(key)
+            while idle:
+                connection, released = idle.pop()
+                if self.idleTimeout is not None and time.time() - released > self.idleTimeout:
+                    self._counts['expired'] += 1
+                elif isStale(connection): self._counts['stale'] += 1
+                else:
+                    self._counts['reused'] += 1
+                    self._active[key] = self._active.get(key, 0) + 1
+                    return connection, True
+                connection.close()
+            
+            if self.maximum is not None and self._active.get(key, 0) >= self.maximum:
+                if not wait:
+                    self._counts['rejected'] += 1
+                    return None, False
+                self._counts['waited'] += 1
+                if not self._condition.wait_for(lambda: self._active.get(key, 0) < self.maximum or self._idle.get(key),
+                                                self.waitTimeout):
+                    self._counts['rejected'] += 1
+                    return None, False
+                if self._idle.get(key): return self.acquire(key, wait)
+                
+            self._counts['created'] += 1
+            self._active[key] = self._active.get(key, 0) + 1
+        return HTTPConnection(*key), False
+    
+    def release(self, key, connection):
+        '''
+        Releases the connection back into the pool.
+        
+        @param key: tuple(string, integer)
+            The host and port of the connection.
+        @param connection: HTTPConnection
+            The connection to release.
+        '''
+        assert isinstance(connection, HTTPConnection), 'Invalid connection %s' % connection
+        with self._condition:
+            self._active[key] -= 1
+            idle = self._idle.get(key)
+            if idle is None: idle = self._idle[key] = []
+            if self.maximumIdle is None or len(idle) < self.maximumIdle: idle.append((connection, time.time()))
+            else: connection.close()
+            self._condition.notify()
+    
+    def discard(self, key, connection):
+        '''
+        Discards the connection, used whenever the connection cannot be used anymore.
+        
+        @param key: tuple(string, integer)
+            The host and port of the connection.
+        @param connection: HTTPConnection
+            The connection to discard.
+        '''
+        assert isinstance(connection, HTTPConnection), 'Invalid connection %s' % connection
+        connection.close()
+        with self._condition:
+            self._active[key] -= 1
+            self._counts['discarded'] += 1
+            self._condition.notify()
+            
+    def statistics(self):
+        '''
+        Provides the pool statistics.
+        
+        @return: dictionary{string: integer}
+            The statistics containing the current number of active and idle connections, the number of created and
+            reused connections, the number of idle connections closed as stale or expired, the number of discarded
+            connections, and the number of acquires that waited or have been rejected.
+        '''
+        with self._condition:
+            statistics = dict(self._counts)
+            statistics['active'] = sum(self._active.values())
+            statistics['idle'] = sum(len(idle) for idle in self._idle.values())
+        return statistics
+
 class Recycle(IInputStreamClosable):
     '''
     Wrapper for @see: IInputStreamClosable that ensures the recycle of the connection on source close.
     '''
-    __slots__ = ('_pool', '_stream', '_connection')
+    __slots__ = ('_pool', '_key', '_stream', '_connection')
     
-    def __init__(self, pool, stream, connection):
+    def __init__(self, pool, key, stream, connection):
         '''
         Construct the recycle.
         '''
+        assert isinstance(pool, ConnectionsPool), 'Invalid pool %s' % pool
+        assert isinstance(stream, HTTPResponse), 'Invalid stream %s' % stream
         self._pool = pool
+        self._key = key
         self._stream = stream
         self._connection = connection
         
@@ -179,7 +374,32 @@ class Recycle(IInputStreamClosable):
     
     def close(self):
         if self._stream:
+            # The connection can be reused only if the response has been completely read.
+            isConsumed = self._stream.isclosed() or self._stream.length == 0
             self._stream.close()
-            self._pool.append(self._connection)
+            if isConsumed and not self._stream.will_close: self._pool.release(self._key, self._connection)
+            else: self._pool.discard(self._key, self._connection)
             self._stream = None
             self._connection = None
+
+    def __del__(self):
+        # The source might be dropped without closing, as an example when the client disconnects before the response is
+        # delivered, the connection needs to be given back to the pool otherwise the pool permit is lost.
+        if getattr(self, '_stream', None) is not None: self.close()
+
+# --------------------------------------------------------------------
+
+def isStale(connection):
+    '''
+    Checks if the idle connection has been closed by the server, an idle connection should have nothing to read.
+    
+    @param connection: HTTPConnection
+        The connection to check.
+    @return: boolean
+        True if the connection cannot be used anymore.
+    '''
+    assert isinstance(connection, HTTPConnection), 'Invalid connection %s' % connection
+    if connection.sock is None: return False
+    try: readable, _w, _x = select.select((connection.sock,), (), (), 0)
+    except (socket.error, ValueError): return True
+    return bool(readable)
@@ -13,6 +13,7 @@ thread serving requests one at a time).
 from ally.container.ioc import injected
 from ally.design.processor.assembly import Assembly
 from ally.design.processor.execution import Processing, FILL_ALL
+from ally.http.spec.headers import Headers
 from ally.http.spec.server import RequestHTTP, ResponseHTTP, RequestContentHTTP, \
     ResponseContentHTTP, HTTP_GET, HTTP_POST, HTTP_PUT, HTTP_DELETE, HTTP_OPTIONS, \
     HTTP
@@ -78,7 +79,7 @@ class RequestHandler(BaseHTTPRequestHandler):
         url = urlparse(self.path)
         request.scheme, request.method = HTTP, method.upper()
         request.uri = url.path.lstrip('/')
-        if RequestHTTP.headers in request: request.headers = dict(self.headers)
+        if RequestHTTP.headers in request: request.headers = Headers(self.headers)
         if RequestHTTP.parameters in request: request.parameters = parse_qsl(url.query, True, False)
         
         if RequestContentHTTP.source in requestCnt: requestCnt.source = keepOpen(self.rfile)
@@ -12,6 +12,7 @@ Provides the WSGI web server support.
 from ally.container.ioc import injected
 from ally.design.processor.assembly import Assembly
 from ally.design.processor.execution import Processing, FILL_ALL
+from ally.http.spec.headers import Headers
 from ally.http.spec.server import RequestHTTP, ResponseHTTP, RequestContentHTTP, \
     ResponseContentHTTP
 from ally.support.util_io import IInputStream, readGenerator
@@ -74,7 +75,7 @@ class RequestHandler:
         request.scheme, request.method = context.get('wsgi.url_scheme', '').upper(), context.get('REQUEST_METHOD', '').upper()
         request.uri = context.get('PATH_INFO', '').lstrip('/')
         if RequestHTTP.headers in request:
-            request.headers = {}
+            request.headers = Headers()
             for hname, hvalue in context.items():
                 if hname.startswith(self.headerPrefix):
                     request.headers[hname[self.headerPrefixLen:].replace('_', '-')] = hvalue
@@ -85,6 +85,8 @@ def isSuccess(status):
 PATH_NOT_FOUND = CodeHTTP('Not found', 404)  # HTTP code 404 Not Found
 PATH_ERROR = CodeHTTP('Path error', 404)  # HTTP code 404 Not Found
 PATH_FOUND = CodeHTTP('OK', 200)  # HTTP code 200 OK
+PARTIAL_CONTENT = CodeHTTP('Partial content', 206)  # HTTP code 206 Partial Content
+NOT_MODIFIED = CodeHTTP('Not modified', 304)  # HTTP code 304 Not Modified
 
 METHOD_NOT_AVAILABLE = CodeHTTP('Method not allowed', 405)  # HTTP code 405 Method Not Allowed
 
@@ -95,6 +97,8 @@ BAD_REQUEST = CodeHTTP('Bad Request', 400)  # HTTP code 400 Bad Request
 
 HEADER_ERROR = CodeHTTP('Invalid header', 400)  # HTTP code 400 Bad Request
 
+RANGE_NOT_SATISFIABLE = CodeHTTP('Range not satisfiable', 416)  # HTTP code 416 Requested Range Not Satisfiable
+
 INTERNAL_ERROR = CodeHTTP('Internal error', 500)  # HTTP code 500 Internal Server Error
 
 # --------------------------------------------------------------------
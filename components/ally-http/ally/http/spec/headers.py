@@ -25,6 +25,156 @@ SEPARATOR_VALUE = '='
 
 # --------------------------------------------------------------------
 
+class Headers(dict):
+    '''
+    Dictionary of raw headers that indexes the header names by their lower case, this way the case insensitive access to
+    the headers does not need to scan all the header names. Multiple headers that have the same name in different cases
+    are kept, also the decoded complex headers values are cached until a header is changed.
+    '''
+    __slots__ = ('_names', '_cache')
+
+    def __init__(self, *args, **keyargs):
+        '''
+        Construct the headers, @see: dict.__init__
+        '''
+        super().__init__()
+        self._names = {}
+        self._cache = None
+        self.update(*args, **keyargs)
+
+    def has(self, name):
+        '''
+        Checks if the header (case insensitive) is present.
+
+        @param name: string
+            The header name.
+        @return: boolean
+            True if the header is present, False otherwise.
+        '''
+        assert isinstance(name, str), 'Invalid name %s' % name
+        return name.lower() in self._names
+
+    def first(self, name):
+        '''
+        Provides the first value of the header (case insensitive).
+
+        @param name: string
+            The header name.
+        @return: string|None
+            The header value or None if there is no such header.
+        '''
+        assert isinstance(name, str), 'Invalid name %s' % name
+        names = self._names.get(name.lower())
+        if names: return super().__getitem__(names[0])
+
+    def valuesFor(self, name):
+        '''
+        Provides all the values of the header (case insensitive).
+
+        @param name: string
+            The header name.
+        @return: list[string]
+            The header values.
+        '''
+        assert isinstance(name, str), 'Invalid name %s' % name
+        names = self._names.get(name.lower())
+        if not names: return []
+        return [super(Headers, self).__getitem__(hname) for hname in names]
+
+    def discard(self, name):
+        '''
+        Removes the header (case insensitive).
+
+        @param name: string
+            The header name.
+        '''
+        assert isinstance(name, str), 'Invalid name %s' % name
+        names = self._names.pop(name.lower(), None)
+        if names:
+            for hname in names: super().__delitem__(hname)
+            self._cache = None
+
+    def cached(self, key, create, *args):
+        '''
+        Provides the cached value for the key, the cached values are discarded whenever the headers are changed.
+
+        @param key: object
+            The hashable key of the cached value.
+        @param create: callable(*args) -> object
+            The call used for creating the value if is not cached.
+        @param args: arguments
+            The arguments used for the create call.
+        @return: object
+            The cached value.
+        '''
+        assert callable(create), 'Invalid create %s' % create
+        if self._cache is None: self._cache = {}
+        try: return self._cache[key]
+        except KeyError: value = self._cache[key] = create(*args)
+        return value
+
+    # ----------------------------------------------------------------
+
+    def __setitem__(self, name, value):
+        assert isinstance(name, str), 'Invalid header name %s' % name
+        if name not in self:
+            names = self._names.get(name.lower())
+            if names is None: self._names[name.lower()] = [name]
+            else: names.append(name)
+        super().__setitem__(name, value)
+        self._cache = None
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        lname = name.lower()
+        names = self._names[lname]
+        names.remove(name)
+        if not names: del self._names[lname]
+        self._cache = None
+
+    def pop(self, name, *default):
+        if name not in self: return super().pop(name, *default)
+        value = super().__getitem__(name)
+        del self[name]
+        return value
+
+    def popitem(self):
+        name, value = super().popitem()
+        super().__setitem__(name, value)
+        del self[name]
+        return name, value
+
+    def setdefault(self, name, default=None):
+        if name not in self: self[name] = default
+        return super().__getitem__(name)
+
+    def update(self, *args, **keyargs):
+        assert len(args) <= 1, 'Invalid arguments %s' % (args,)
+        if args:
+            other = args[0]
+            if hasattr(other, 'keys'):
+                for name in other.keys(): self[name] = other[name]
+            else:
+                for name, value in other: self[name] = value
+        for name, value in keyargs.items(): self[name] = value
+
+    def clear(self):
+        super().clear()
+        self._names.clear()
+        self._cache = None
+
+    def copy(self):
+        return self.__class__(self)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __reduce__(self):
+        # The copies and pickles need to rebuild the names index.
+        return self.__class__, (dict(self),)
+
+# --------------------------------------------------------------------
+
 class HeadersRequire(Context):
     '''
     Context for required headers. 
@@ -76,6 +226,7 @@ class Header:
         if isinstance(headers, Context):
             if HeadersRequire.headers not in headers or headers.headers is None: return False
             headers = headers.headers
+        if isinstance(headers, Headers): return headers.has(self.nameLower)
         assert isinstance(headers, dict), 'Invalid headers %s' % headers
         for hname in headers.keys():
             assert isinstance(hname, str), 'Invalid header name %s' % hname
@@ -92,6 +243,9 @@ class Header:
         if isinstance(headers, Context):
             if HeadersRequire.headers not in headers or headers.headers is None: return
             headers = headers.headers
+        if isinstance(headers, Headers):
+            headers.discard(self.nameLower)
+            return
         assert isinstance(headers, dict), 'Invalid headers %s' % headers
         for hname in list(headers.keys()):
             assert isinstance(hname, str), 'Invalid header name %s' % hname
@@ -123,6 +277,7 @@ class HeaderRaw(Header):
         if isinstance(headers, Context):
             if HeadersRequire.headers not in headers or headers.headers is None: return
             headers = headers.headers
+        if isinstance(headers, Headers): return headers.first(self.nameLower)
         assert isinstance(headers, dict), 'Invalid headers %s' % headers
         for hname, hvalue in headers.items():
             assert isinstance(hname, str), 'Invalid header name %s' % hname
@@ -153,7 +308,7 @@ class HeaderRaw(Header):
             The value to put for the header.
         '''
         if isinstance(headers, HeadersDefines):
-            if headers.headers is None: headers.headers = {}
+            if headers.headers is None: headers.headers = Headers()
             headers = headers.headers
         assert isinstance(headers, dict), 'Invalid headers %s' % headers
         assert isinstance(value, str), 'Invalid value %s' % value
@@ -210,12 +365,31 @@ class HeaderCmx(Header):
         if isinstance(headers, Context):
             if HeadersRequire.headers not in headers or headers.headers is None: return
             headers = headers.headers
+        if isinstance(headers, Headers):
+            parsed = headers.cached(self, self.parse, headers.valuesFor(self.nameLower))
+            if self.withAttributes: return [(value, dict(attributes)) for value, attributes in parsed]
+            return list(parsed)
         assert isinstance(headers, dict), 'Invalid headers %s' % headers
         
-        parsed = []
+        hvalues = []
         for hname, hvalue in headers.items():
             assert isinstance(hname, str), 'Invalid header name %s' % hname
-            if hname.lower() != self.nameLower: continue
+            if hname.lower() == self.nameLower: hvalues.append(hvalue)
+        return self.parse(hvalues)
+    
+    def parse(self, hvalues):
+        '''
+        Parse the raw header values.
+        
+        @param hvalues: Iterable(string)
+            The raw header values to parse.
+        @return: list[string]|list[tuple(string, dictionary{string:string})]
+            @see: decode
+        '''
+        assert isinstance(hvalues, Iterable), 'Invalid header values %s' % hvalues
+        
+        parsed = []
+        for hvalue in hvalues:
             for values in self._rexMain.split(hvalue):
                 valAttr = self._rexAttr.split(values)
                 if self.withAttributes:
@@ -259,7 +433,7 @@ class HeaderCmx(Header):
             and as the second value a dictionary with the values attribute.
         '''
         if isinstance(headers, HeadersDefines):
-            if headers.headers is None: headers.headers = {}
+            if headers.headers is None: headers.headers = Headers()
             headers = headers.headers
         assert isinstance(headers, dict), 'Invalid headers %s' % headers
         self.remove(headers)
@@ -309,8 +483,28 @@ CONTENT_LENGTH = HeaderRaw('Content-Length')
 # Content length as described at: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html chapter 14.13
 CONTENT_INDEX = HeaderRaw('Content-Index')
 # The content index header.
+CONTENT_INDEX_LENGTH = HeaderRaw('Content-Index-Length')
+# The content index trailer length header, if present the content index is provided at the end of the response content.
+ACCEPT_INDEX = HeaderRaw('Accept-Index')
+# The header that requests the content index, if not present the content is rendered without indexing.
 TRANSFER_ENCODING = HeaderRaw('Transfer-Encoding')
 # Transfer encoding as described at: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html chapter 14.41
+ETAG = HeaderRaw('ETag')
+# Entity tag as described at: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html chapter 14.19
+LAST_MODIFIED = HeaderRaw('Last-Modified')
+# Last modified as described at: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html chapter 14.29
+IF_NONE_MATCH = HeaderCmx('If-None-Match', False)
+# If none match as described at: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html chapter 14.26
+IF_MODIFIED_SINCE = HeaderRaw('If-Modified-Since')
+# If modified since as described at: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html chapter 14.25
+IF_RANGE = HeaderRaw('If-Range')
+# If range as described at: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html chapter 14.27
+RANGE = HeaderRaw('Range')
+# Range as described at: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html chapter 14.35
+ACCEPT_RANGES = HeaderRaw('Accept-Ranges')
+# Accept ranges as described at: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html chapter 14.5
+CONTENT_RANGE = HeaderRaw('Content-Range')
+# Content range as described at: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html chapter 14.16
 
 # Access control headers
 ALLOW_ORIGIN = HeaderCmx('Access-Control-Allow-Origin', False)
@@ -335,6 +529,8 @@ CONNECTION_KEEP = 'keep-alive'
 # The value keep to set on the CONNECTION header.
 TRANSFER_ENCODING_CHUNKED = 'chunked'
 # The chunked value to place on the TRANSFER_ENCODING header.
+ACCEPT_INDEX_TRUE = 'true'
+# The value to set on the ACCEPT_INDEX header in order to request the content index.
 
 # --------------------------------------------------------------------
 
@@ -352,7 +548,8 @@ def encode(headers, name, *value):
     '''
     assert isinstance(name, str), 'Invalid name %s' % name
     if isinstance(headers, HeadersDefines):
-        if headers.headers is None: headers.headers = {}
+        if headers.headers is None: headers.headers = Headers()
+        elif isinstance(headers.headers, Headers): headers.headers.discard(name)
         else:
             lname = name.lower()
             for hname in list(headers.headers.keys()):
@@ -390,6 +587,9 @@ def remove(headers, names):
     
     for name in names:
         assert isinstance(name, str), 'Invalid header name %s' % name
+        if isinstance(headers, Headers):
+            headers.discard(name)
+            continue
         name = name.lower()
         for hname in list(headers.keys()):
             assert isinstance(hname, str), 'Invalid header name %s' % hname
@@ -15,6 +15,7 @@ from ally.design.processor.attribute import requires, optional, defines, \
 from ally.design.processor.context import Context
 from ally.support.util_io import IInputStream
 from collections import Iterable
+from threading import current_thread
 
 # --------------------------------------------------------------------
 
@@ -99,3 +100,25 @@ class ResponseContentHTTP(Context):
     @rtype: IInputStream|Iterable
     The source for the response content.
     ''')
+
+# --------------------------------------------------------------------
+
+def setEventLoop(isEventLoop=True):
+    '''
+    Marks the current thread as the server event loop thread, the connections of an event loop are served by this single
+    thread so the processing executed on it must not wait for resources that are released by the same loop.
+
+    @param isEventLoop: boolean
+        True if the current thread is running a server event loop.
+    '''
+    assert isinstance(isEventLoop, bool), 'Invalid event loop flag %s' % isEventLoop
+    current_thread()._ally_http_event_loop = isEventLoop
+
+def isEventLoop():
+    '''
+    Checks if the current thread is running a server event loop, @see: setEventLoop.
+
+    @return: boolean
+        True if the current thread is running a server event loop.
+    '''
+    return getattr(current_thread(), '_ally_http_event_loop', False)
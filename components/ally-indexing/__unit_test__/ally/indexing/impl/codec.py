@@ -0,0 +1,129 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally indexing
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing and benchmarking for the content index format.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.indexing.impl.codec import IndexEncoder, decodeIndexes, zigzag, \
+    unzigzag, writeVarint, readVarint
+from ally.indexing.spec.model import Block, Action
+from ally.indexing.spec.perform import skip, feed
+import binascii
+import logging
+import time
+import unittest
+import zlib
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+BLOCKS = [Block(Action('stream', feed('end'))),
+          Block(Action('stream', skip('start'), feed('end')), keys=('name',))]
+
+def createIndexes(count, step):
+    '''
+    Creates the indexes block ids and values, the unnamed blocks alternate with the named blocks.
+    '''
+    indexes = []
+    for k in range(count):
+        if k % 2: indexes.append((1, dict(name='name%s' % (k % 200), start=k * step, end=(k + 1) * step - 1)))
+        else: indexes.append((0, dict(end=k * step + step // 2)))
+    return indexes
+
+def encode(indexes):
+    encoder = IndexEncoder()
+    for blockId, values in indexes: encoder.add(blockId, BLOCKS[blockId], values)
+    return encoder.finalize()
+
+def encodeLegacy(indexes):
+    '''
+    Encodes the indexes with the previous fixed size integers format.
+    '''
+    out, values = bytearray(len(indexes).to_bytes(3, 'little')), {}
+    for blockId, ivalues in indexes:
+        out.extend(blockId.to_bytes(1, 'little'))
+        for key in BLOCKS[blockId].keys:
+            valueId = values.get(ivalues[key])
+            if valueId is None: valueId = values[ivalues[key]] = len(values) + 1
+            out.extend(valueId.to_bytes(1, 'little'))
+        for name in BLOCKS[blockId].indexes: out.extend(ivalues[name].to_bytes(3, 'little'))
+    out.extend(len(values).to_bytes(1, 'little'))
+    for name, valueId in values.items():
+        out.extend(valueId.to_bytes(1, 'little'))
+        out.extend(len(name).to_bytes(1, 'little'))
+        out.extend(name.encode('ascii'))
+    return zlib.compress(bytes(out))
+
+# --------------------------------------------------------------------
+
+class TestCodec(unittest.TestCase):
+
+    def testVarint(self):
+        for value in (0, 1, 127, 128, 300, 2 ** 24, 2 ** 40):
+            out = bytearray()
+            writeVarint(out, value)
+            self.assertEqual((value, len(out)), readVarint(bytes(out), 0))
+        for value in (0, 1, -1, 2, -2, 2 ** 30, -2 ** 30):
+            self.assertTrue(zigzag(value) >= 0)
+            self.assertEqual(value, unzigzag(zigzag(value)))
+        self.assertRaises(ValueError, readVarint, b'\x80', 0)
+
+    def testRoundTrip(self):
+        # More then 256 distinct values and offsets beyond 16 MB that the previous format could not represent.
+        block = BLOCKS[1]
+        encoder = IndexEncoder()
+        expected = []
+        for k in range(600):
+            values = dict(name='value%s' % k, start=2 ** 25 + k * 10, end=2 ** 25 + k * 10 + 1)
+            encoder.add(1, block, values)
+            expected.append(values)
+        encoder.add(0, BLOCKS[0], dict(end=5))
+        expected.append(dict(end=5))
+        self.assertEqual(601, len(encoder))
+
+        indexes = decodeIndexes(encoder.finalize(), BLOCKS.__getitem__)
+        self.assertEqual(expected, [index.values for index in indexes])
+        self.assertEqual([BLOCKS[1]] * 600 + [BLOCKS[0]], [index.block for index in indexes])
+
+    def testInvalid(self):
+        data = encode(createIndexes(10, 20))
+        self.assertRaises(ValueError, decodeIndexes, b'', BLOCKS.__getitem__)
+        self.assertRaises(ValueError, decodeIndexes, encodeLegacy(createIndexes(10, 20)), BLOCKS.__getitem__)
+        self.assertRaises(ValueError, decodeIndexes, data[:-4], BLOCKS.__getitem__)
+        self.assertRaises(ValueError, decodeIndexes, data, lambda blockId: None)
+
+# --------------------------------------------------------------------
+
+class BenchmarkCodec(unittest.TestCase):
+
+    count = 20000
+    # The number of indexes.
+
+    def testBenchmark(self):
+        indexes = createIndexes(self.count, 200)
+        for name, encoder in (('legacy', encodeLegacy), ('compact', encode)):
+            started = time.time()
+            size = len(binascii.b2a_base64(encoder(indexes)))
+            log.info('Encoded %s indexes with the %s format in %.4fs as a %s bytes header', self.count, name,
+                     time.time() - started, size)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,210 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally indexing
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the compact content index format encoding and decoding.
+
+The encoded index starts with the format version byte followed by the zlib compressed entries. Each entry contains the
+block id, the ids of the block keys values and the block indexes offsets, all as variable length integers, the offsets
+are encoded as the difference to the previously encoded offset. The entries are terminated by a zero and are followed by
+the table of the strings used as key values.
+'''
+
+from ..spec.model import Block, Index
+import zlib
+
+# --------------------------------------------------------------------
+
+VERSION = 2
+# The content index format version.
+PACKAGE_SIZE = 64 * 1024
+# The size of the encoded entries package that is compressed at once.
+
+# --------------------------------------------------------------------
+
+class IndexEncoder:
+    '''
+    Incremental encoder for the content index, the entries are compressed in packages as they are added.
+    '''
+    __slots__ = ('encoding', '_compressor', '_packs', '_entries', '_values', '_offset', '_count')
+
+    def __init__(self, encoding='utf-8'):
+        '''
+        Construct the encoder.
+
+        @param encoding: string
+            The encoding used for the key values strings.
+        '''
+        assert isinstance(encoding, str), 'Invalid encoding %s' % encoding
+        self.encoding = encoding
+
+        self._compressor = zlib.compressobj()
+        self._packs = [bytes((VERSION,))]
+        self._entries = bytearray()
+        self._values = {}
+        self._offset = 0
+        self._count = 0
+
+    def add(self, blockId, block, values):
+        '''
+        Adds an index entry.
+
+        @param blockId: integer
+            The block id.
+        @param block: Block
+            The block of the index.
+        @param values: dictionary{string: integer|string}
+            The index values containing the block keys values and the block indexes offsets.
+        '''
+        assert isinstance(blockId, int) and blockId >= 0, 'Invalid block id %s' % blockId
+        assert isinstance(block, Block), 'Invalid block %s' % block
+        assert isinstance(values, dict), 'Invalid values %s' % values
+
+        entry = self._entries
+        writeVarint(entry, blockId + 1)
+        for key in block.keys:
+            assert key in values, 'Missing key value for %s' % key
+            value = values[key]
+            valueId = self._values.get(value)
+            if valueId is None: valueId = self._values[value] = len(self._values)
+            writeVarint(entry, valueId)
+        for name in block.indexes:
+            assert name in values, 'Missing index value \'%s\'' % name
+            offset = values[name]
+            writeVarint(entry, zigzag(offset - self._offset))
+            self._offset = offset
+
+        self._count += 1
+        if len(entry) >= PACKAGE_SIZE:
+            self._packs.append(self._compressor.compress(bytes(entry)))
+            del entry[:]
+
+    def __len__(self):
+        '''
+        Provides the number of added entries.
+        '''
+        return self._count
+
+    def finalize(self):
+        '''
+        Finalizes the encoding, no entries can be added after finalizing.
+
+        @return: bytes
+            The encoded content index.
+        '''
+        table = self._entries
+        table.append(0)
+        writeVarint(table, len(self._values))
+        for value in sorted(self._values, key=self._values.get):
+            value = value.encode(self.encoding)
+            writeVarint(table, len(value))
+            table.extend(value)
+        self._packs.append(self._compressor.compress(bytes(table)))
+        self._packs.append(self._compressor.flush())
+        return b''.join(self._packs)
+
+def decodeIndexes(data, provider, encoding='utf-8'):
+    '''
+    Decodes the content index.
+
+    @param data: bytes
+        The encoded content index.
+    @param provider: callable(integer) -> Block|None
+        The blocks provider.
+    @param encoding: string
+        The encoding used for the key values strings.
+    @return: list[Index]
+        The decoded indexes.
+    @raise ValueError: If the encoded index is invalid.
+    '''
+    assert isinstance(data, (bytes, bytearray)), 'Invalid data %s' % data
+    assert callable(provider), 'Invalid blocks provider %s' % provider
+
+    if not data or data[0] != VERSION: raise ValueError('Unknown content index format')
+    try: data = zlib.decompress(bytes(data[1:]))
+    except zlib.error as e: raise ValueError('Invalid content index compression: %s' % e)
+
+    indexes, pending, offset, position = [], [], 0, 0
+    while True:
+        blockId, position = readVarint(data, position)
+        if blockId == 0: break
+        block = provider(blockId - 1)
+        if block is None: raise ValueError('Unknown block id %s' % (blockId - 1))
+        assert isinstance(block, Block), 'Invalid block %s' % block
+
+        index = Index(block)
+        indexes.append(index)
+        for key in block.keys:
+            valueId, position = readVarint(data, position)
+            pending.append((index, key, valueId))
+        for name in block.indexes:
+            delta, position = readVarint(data, position)
+            offset += unzigzag(delta)
+            index.values[name] = offset
+
+    count, position = readVarint(data, position)
+    values = []
+    for _k in range(count):
+        length, position = readVarint(data, position)
+        if position + length > len(data): raise ValueError('Missing value bytes')
+        values.append(str(data[position:position + length], encoding))
+        position += length
+
+    for index, key, valueId in pending:
+        if valueId >= len(values): raise ValueError('Unknown value id %s' % valueId)
+        index.values[key] = values[valueId]
+    return indexes
+
+# --------------------------------------------------------------------
+
+def writeVarint(out, value):
+    '''
+    Writes the not negative integer as a variable length integer.
+
+    @param out: bytearray
+        The bytes to write to.
+    @param value: integer
+        The value to write.
+    '''
+    assert isinstance(value, int) and value >= 0, 'Invalid value %s' % value
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def readVarint(data, position):
+    '''
+    Reads a variable length integer.
+
+    @param data: bytes
+        The data to read from.
+    @param position: integer
+        The position to read from.
+    @return: tuple(integer, integer)
+        The value and the position after the value.
+    @raise ValueError: If the data ends before the value.
+    '''
+    value, shift = 0, 0
+    while True:
+        if position >= len(data): raise ValueError('Missing index bytes')
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80: return value, position
+        shift += 7
+
+def zigzag(value):
+    '''
+    Maps the signed integer to a not negative integer, small absolute values map to small integers.
+    '''
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+def unzigzag(value):
+    '''
+    Reverses the @see: zigzag mapping.
+    '''
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
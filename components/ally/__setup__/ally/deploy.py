@@ -17,7 +17,9 @@ import unittest
 
 from ally.container import event, ioc, context, aop, support, deploy
 from ally.container.impl.config import load, save
-from ally.design.priority import Priority, PRIORITY_NORMAL
+from ally.design.priority import Priority, PRIORITY_NORMAL, PRIORITY_LAST
+from ally.design.processor.assembly import Assembly
+from ally.support.util_profile import phasesReport
 from application import parser, options
 
 from .logging import format, debug_for, info_for, warning_for, log_file
@@ -46,6 +48,10 @@ FLAG_TEST = 'test'
 # Flag indicating the application should perform unit testing.
 FLAG_REPAIR = 'repair'
 # Flag indicating the application should perform repair events in the distribution.
+FLAG_PROFILE = 'profile'
+# Flag indicating the application should report the time spent in the startup phases.
+FLAG_REPORT = 'report'
+# Flag indicating the application should report the unused attributes of the processors assemblies.
 
 # --------------------------------------------------------------------
 
@@ -57,6 +63,8 @@ def prepareActions():
     options.registerFlag(FLAG_DUMP, FLAG_START)
     options.registerFlag(FLAG_TEST, FLAG_START)
     options.registerFlag(FLAG_REPAIR, FLAG_START)
+    options.registerFlag(FLAG_PROFILE)
+    options.registerFlag(FLAG_REPORT)
     
     parser.add_argument('-dump', dest=FLAG_DUMP, action='store_true',
                         help='Provide this option in order to write all the configuration files and exit')
@@ -65,6 +73,14 @@ def prepareActions():
     parser.add_argument('-repair', dest=FLAG_REPAIR, action='store_true',
                         help='Provide this option in order to run the application distribution repair, this will'
                         ' trigger all default data and resources to be populated')
+    parser.add_argument('--startup-profile', dest=FLAG_PROFILE, action='store_true',
+                        help='Provide this option in order to report the time spent in each of the application startup '
+                        'phases, like modules discovery, modules import, assemblies creation, configurations load and '
+                        'events')
+    parser.add_argument('--report-assemblies', dest=FLAG_REPORT, action='store_true',
+                        help='Provide this option in order to report the unused attributes of the processors assemblies '
+                        'as they are created while starting the application, the reporting slows down the startup so it '
+                        'is not performed by default')
 
 @deploy.prepare(PRIORITY_PREFERENCE)
 def preparePreferences():
@@ -94,6 +110,7 @@ def loggingApplication():
 @deploy.start
 def start():
     if not options.isFlag(FLAG_START): return
+    if options.isFlag(FLAG_REPORT): Assembly.reporting = True
     if not os.path.isfile(options.configuration):
         log.warn('The configuration file "%s" doesn\'t exist, create one by running the the application '
                  'with "-dump" option', options.configuration)
@@ -125,6 +142,15 @@ def test():
 def repair():
     if not options.isFlag(FLAG_REPAIR): return
     support.performEventsFor(event.REPAIR)
+
+@deploy.start(PRIORITY_LAST)
+def profile():
+    if not options.isFlag(FLAG_PROFILE): return
+    report = sorted(phasesReport().items(), key=lambda item: item[1][0], reverse=True)
+    log.info('-' * 71)
+    log.info('Startup profile, the time spent in each phase excluding the nested phases:')
+    for name, (spent, count) in report: log.info('%-20s %8.3f seconds in %s calls', name, spent, count)
+    log.info('%-20s %8.3f seconds', 'total', sum(spent for _name, (spent, _count) in report))
             
 # --------------------------------------------------------------------
 
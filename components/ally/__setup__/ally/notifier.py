@@ -14,6 +14,7 @@ from ally.design.processor.assembly import Assembly
 from ally.design.processor.execution import Processing, FILL_ALL
 from ally.design.processor.handler import Handler
 from ally.notifier.impl.processor.scanner_file_system import FileSystemScanner
+from ally.notifier.impl.processor.scanner_inotify import INotifyScanner
 from ally.design.priority import Priority, PRIORITY_NORMAL
 
 # --------------------------------------------------------------------
@@ -22,6 +23,23 @@ PRIORITY_NOTIFIER = Priority('Start notifier', after=PRIORITY_NORMAL)
 
 # --------------------------------------------------------------------
 
+@ioc.config
+def notifier_inotify():
+    '''
+    Flag indicating that the file system changes should be detected using the Linux inotify events, if the inotify is not
+    available or the flag is False the file system is polled every second
+    '''
+    return True
+
+@ioc.config
+def notifier_debounce():
+    '''
+    The number of seconds to wait for the file system to settle after a change before notifying, only used with inotify
+    '''
+    return 0.1
+
+# --------------------------------------------------------------------
+
 @ioc.entity
 def registersListeners() -> list:
     ''' The list of register like handlers that push the listeners for notifying'''
@@ -35,7 +53,11 @@ def assemblyNotifier() -> Assembly:
 # --------------------------------------------------------------------
 
 @ioc.entity
-def fileSystemScanner() -> Handler: return FileSystemScanner()
+def fileSystemScanner() -> Handler:
+    if not notifier_inotify(): return FileSystemScanner()
+    b = INotifyScanner()
+    b.debounce = notifier_debounce()
+    return b
 
 # --------------------------------------------------------------------
 
@@ -0,0 +1,117 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally base
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing and benchmarking for the assemblies solved contexts reuse.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import requires, defines, optional
+from ally.design.processor.context import Context
+from ally.design.processor.execution import FILL_ALL
+from ally.design.processor.handler import HandlerProcessor
+import logging
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+class Data(Context):
+    value = defines(int)
+    name = defines(str)
+
+class DataRequired(Context):
+    value = requires(int)
+    name = optional(str)
+
+class DataRequiredOther(Context):
+    value = requires(int)
+    other = defines(list)
+
+class InitializeHandler(HandlerProcessor):
+
+    def process(self, chain, data:Data, **keyargs):
+        data.value, data.name = 0, 'data'
+
+class CounterHandler(HandlerProcessor):
+
+    def process(self, chain, data:DataRequired, **keyargs):
+        data.value += 1
+
+class OtherHandler(HandlerProcessor):
+
+    def process(self, chain, data:DataRequiredOther, **keyargs):
+        data.other = [data.value]
+
+def assemblyFor(*handlers):
+    assembly = Assembly('Test')
+    assembly.add(*handlers)
+    return assembly
+
+# --------------------------------------------------------------------
+
+class TestAssembly(unittest.TestCase):
+
+    def testReuse(self):
+        first = assemblyFor(InitializeHandler(), CounterHandler()).create()
+        second = assemblyFor(InitializeHandler(), CounterHandler(), CounterHandler()).create()
+        other = assemblyFor(InitializeHandler(), CounterHandler(), OtherHandler()).create()
+
+        self.assertIs(first.ctx.data, second.ctx.data)
+        self.assertIsNot(first.ctx.data, other.ctx.data)
+        self.assertEqual(1, first.execute(FILL_ALL).data.value)
+        self.assertEqual(2, second.execute(FILL_ALL).data.value)
+        self.assertEqual([1], other.execute(FILL_ALL).data.other)
+
+    def testReporting(self):
+        first = assemblyFor(InitializeHandler(), CounterHandler()).create()
+        Assembly.reporting = True
+        try: second = assemblyFor(InitializeHandler(), CounterHandler()).create()
+        finally: Assembly.reporting = False
+        self.assertIsNot(first.ctx.data, second.ctx.data)
+        self.assertEqual(1, second.execute(FILL_ALL).data.value)
+
+# --------------------------------------------------------------------
+
+class BenchmarkAssembly(unittest.TestCase):
+
+    count = 1000
+    # The number of assemblies to create.
+
+    def testBenchmark(self):
+        assembly = assemblyFor(InitializeHandler(), CounterHandler(), OtherHandler())
+        timings = {}
+        for name, reporting, reuse in (('reporting', True, False), ('solving', False, False), ('reusing', False, True)):
+            Assembly.reporting = reporting
+            started = time.time()
+            try:
+                for _k in range(self.count):
+                    if not reuse: Assembly._solved.clear()
+                    assembly.create()
+            finally: Assembly.reporting = False
+            timings[name] = time.time() - started
+        log.info('Created %s assemblies with reporting in %.4fs, solving in %.4fs and reusing the solved contexts in '
+                 '%.4fs (%.2fx)', self.count, timings['reporting'], timings['solving'], timings['reusing'],
+                 timings['reporting'] / timings['reusing'])
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger('ally.design.processor.assembly').setLevel(logging.WARN)
+    unittest.main()
@@ -17,12 +17,19 @@ if True:
 # --------------------------------------------------------------------
 
 from ally.design.processor.attribute import requires, defines, optional
-from ally.design.processor.context import Context, create
+from ally.design.processor.context import Context, create, attributeOf
 from ally.design.processor.resolvers import merge, resolversFor
+from weakref import WeakSet
+import logging
+import timeit
 import unittest
 
 # --------------------------------------------------------------------
 
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
 class A(Context):
     p1 = requires(str)
     p2 = defines(int)
@@ -68,7 +75,68 @@ class TestDesign(unittest.TestCase):
         i.p1 = 'astr'
         self.assertEqual(i.p1, 'astr')
         
+    def testContains(self):
+        i = I()
+        self.assertTrue(B.p1 in i)
+        self.assertTrue(A.p1 in i)
+        self.assertTrue(F.p3 in i)
+        self.assertTrue(E.p2 in i)
+        self.assertFalse(C.p2 in i)
+        self.assertTrue(I.p1 in i)
+        self.assertFalse(None in i)
+        self.assertFalse('p1' in i)
+        self.assertFalse([] in i)
+        
+        class G(Context):
+            p1 = defines(str)
+            p4 = defines(str)
+        # The attributes of contexts that are not resolved in the object context are solved when first checked.
+        self.assertTrue(G.p1 in i)
+        self.assertFalse(G.p4 in i)
+        self.assertTrue(G.p1 in i)
+        
+# --------------------------------------------------------------------
+
+def containsLegacy(self, attribute):
+    '''
+    The attribute presence check before the presence tables.
+    '''
+    attribute = attributeOf(attribute)
+    if attribute is None: return False
+    contained, uncontained = self.__class__.__dict__.get('_contained'), self.__class__.__dict__.get('_uncontained')
+    if contained and attribute in contained: return True
+    if uncontained and attribute in uncontained: return False
+    if attribute.isIn(self.__class__):
+        if contained is None:
+            contained = WeakSet()
+            setattr(self.__class__, '_contained', contained)
+        contained.add(attribute)
+        return True
+    if uncontained is None:
+        uncontained = WeakSet()
+        setattr(self.__class__, '_uncontained', uncontained)
+    uncontained.add(attribute)
+    return False
+
+class BenchmarkContains(unittest.TestCase):
+    
+    number = 200000
+    # The number of presence checks.
+    
+    def testBenchmark(self):
+        i = I()
+        checks = (B.p1, D.p2, C.p2, F.p3)
+        for attribute in checks: self.assertEqual(attribute in i, containsLegacy(i, attribute))
+        
+        legacy = timeit.timeit(lambda: [containsLegacy(i, attribute) for attribute in checks], number=self.number)
+        tables = timeit.timeit(lambda: [attribute in i for attribute in checks], number=self.number)
+        log.info('Attribute presence checks per second, with the presence tables %.0f and before %.0f (%.2fx)',
+                 len(checks) * self.number / tables, len(checks) * self.number / legacy, legacy / tables)
+        
+
 # --------------------------------------------------------------------
 
-if __name__ == '__main__': unittest.main()
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
 
@@ -0,0 +1,157 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally base
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing and benchmarking for the compiled processing execution.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import requires, defines
+from ally.design.processor.context import Context
+from ally.design.processor.execution import Processing, Chain, CONSUMED, \
+    CANCELED, FILL_ALL
+from ally.design.processor.handler import HandlerProcessor
+import logging
+import timeit
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+class Data(Context):
+    value = defines(int)
+
+class DataRequired(Context):
+    value = requires(int)
+
+class CounterHandler(HandlerProcessor):
+
+    def process(self, chain, data:DataRequired, **keyargs):
+        data.value += 1
+
+class InitializeHandler(HandlerProcessor):
+
+    def process(self, chain, data:Data, **keyargs):
+        data.value = 0
+
+# --------------------------------------------------------------------
+
+def record(name):
+    def call(chain, trace, **keyargs): trace.append(name)
+    return call
+
+def processingsFor(*calls):
+    return Processing(calls), Processing(calls, compiled=True)
+
+# --------------------------------------------------------------------
+
+class TestExecution(unittest.TestCase):
+
+    def testSequence(self):
+        for processing in processingsFor(record('a'), record('b'), record('c')):
+            trace = []
+            self.assertTrue(Chain(processing, trace=trace).execute(CONSUMED))
+            self.assertEqual(['a', 'b', 'c'], trace)
+
+    def testBranchWingAndFinalize(self):
+        def branching(chain, trace, **keyargs):
+            trace.append('branching')
+            chain.branch(Processing((record('b1'), record('b2')), compiled=chain._compiled))
+            chain.onFinalize(record('finalize'))
+
+        for processing in processingsFor(record('a'), branching, record('c')):
+            trace = []
+            self.assertTrue(Chain(processing, trace=trace).execute(CONSUMED))
+            self.assertEqual(['a', 'branching', 'b1', 'b2', 'c', 'finalize'], trace)
+
+            trace = []
+            winged = []
+            def winging(chain, **keyargs):
+                processing.wingIn(chain, True, trace=winged)
+            Chain(Processing((winging, record('after')), compiled=processing.compiled), trace=trace).execute()
+            self.assertEqual(['a', 'branching', 'b1', 'b2', 'c', 'finalize'], winged)
+            self.assertEqual(['after'], trace)
+
+    def testRouteAndCancel(self):
+        def routing(chain, **keyargs): chain.route((record('r1'), record('r2')))
+        def canceling(chain, **keyargs): chain.cancel()
+
+        for processing in processingsFor(record('a'), routing, record('b')):
+            trace = []
+            Chain(processing, trace=trace).execute()
+            self.assertEqual(['a', 'r1', 'r2'], trace)
+
+        for processing in processingsFor(record('a'), canceling, record('b')):
+            trace = []
+            self.assertTrue(Chain(processing, trace=trace).execute(CANCELED))
+            self.assertEqual(['a'], trace)
+
+    def testErrorRetry(self):
+        def failing(chain, trace, **keyargs):
+            if 'failed' not in trace:
+                trace.append('failed')
+                raise ValueError()
+            trace.append('passed')
+        def registering(chain, **keyargs):
+            chain.onError(retrying)
+        def retrying(error, trace, **keyargs):
+            trace.append('retry')
+            error.retry()
+
+        for processing in processingsFor(registering, failing, record('b')):
+            trace = []
+            Chain(processing, trace=trace).execute()
+            self.assertEqual(['failed', 'retry', 'b'], trace)
+
+        for processing in processingsFor(failing, record('b')):
+            self.assertRaises(ValueError, Chain(processing, trace=[]).execute)
+
+    def testAssembly(self):
+        for compiled in (False, True):
+            assembly = Assembly('Test', reportUnused=False, compiled=compiled)
+            assembly.add(InitializeHandler(), CounterHandler(), CounterHandler())
+            processing = assembly.create(data=Data)
+            self.assertEqual(compiled, processing.compiled)
+            self.assertEqual(2, processing.execute(FILL_ALL).data.value)
+
+# --------------------------------------------------------------------
+
+class BenchmarkExecution(unittest.TestCase):
+
+    handlers = 20
+    # The number of handlers in the benchmarked assembly.
+    number = 2000
+    # The number of chains executed for each execution mode.
+
+    def testBenchmark(self):
+        timings = {}
+        for compiled in (False, True):
+            assembly = Assembly('Benchmark', reportUnused=False, compiled=compiled)
+            assembly.add(InitializeHandler(), *(CounterHandler() for _k in range(self.handlers)))
+            processing = assembly.create(data=Data)
+
+            self.assertEqual(self.handlers, processing.execute(FILL_ALL).data.value)
+            timings[compiled] = timeit.timeit(lambda: processing.execute(FILL_ALL), number=self.number)
+
+        log.info('Executed %s chains of %s handlers, interpreted %.4fs, compiled %.4fs (%.2fx)', self.number,
+                 self.handlers + 1, timings[False], timings[True], timings[False] / timings[True])
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,169 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally base
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing and benchmarking for the inotify file system notifier.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container.ioc import initialize, injected
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.execution import FILL_ALL
+from ally.notifier.impl.processor.register import RegisterListeners
+from ally.notifier.impl.processor.scanner_file_system import FileSystemScanner
+from ally.notifier.impl.processor.scanner_inotify import INotifyScanner, INotify
+from threading import Condition
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+@injected
+class RecordListeners(RegisterListeners):
+    '''
+    Records the notifications.
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+        self.condition = Condition()
+
+    def doOnContentCreated(self, uri, content): self.record('created', uri, content)
+    def doOnContentChanged(self, uri, content): self.record('changed', uri, content)
+    def doOnContentRemoved(self, uri): self.record('removed', uri, None)
+
+    def record(self, event, uri, content):
+        with self.condition:
+            self.events.append((event, uri[uri.rindex('/') + 1:], content.read() if content else None))
+            self.condition.notify_all()
+
+    def waitFor(self, count, timeout=5):
+        '''
+        Waits for the provided number of notifications and provides the notifications.
+        '''
+        deadline = time.time() + timeout
+        with self.condition:
+            while len(self.events) < count and time.time() < deadline:
+                self.condition.wait(deadline - time.time())
+            events, self.events = self.events, []
+        return events
+
+def startNotifier(path, scanner):
+    '''
+    Starts the notifier for the files in the provided path.
+    '''
+    listeners = RecordListeners()
+    listeners.patterns = ['file://%s/*' % '/'.join(path.split(os.path.sep))]
+    assembly = Assembly('Notifier')
+    assembly.add(initialize(listeners), initialize(scanner))
+    assembly.create().execute(FILL_ALL)
+    return listeners
+
+def write(path, content):
+    with open(path, 'wb') as stream: stream.write(content)
+
+# --------------------------------------------------------------------
+
+class TestINotifyScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def testNotify(self):
+        try: INotify().close()
+        except OSError: self.skipTest('The inotify is not available')
+
+        write(os.path.join(self.path, 'existing.txt'), b'existing')
+        scanner = INotifyScanner()
+        scanner.debounce = 0.05
+        listeners = startNotifier(self.path, scanner)
+        self.assertEqual([('created', 'existing.txt', b'existing')], listeners.waitFor(1))
+
+        # The burst of writes is notified only once with the last content.
+        for k in range(10): write(os.path.join(self.path, 'existing.txt'), ('version %s' % k).encode())
+        self.assertEqual([('changed', 'existing.txt', b'version 9')], listeners.waitFor(2, 0.5))
+
+        write(os.path.join(self.path, 'new.txt'), b'new')
+        self.assertEqual([('created', 'new.txt', b'new')], listeners.waitFor(2, 0.5))
+
+        os.remove(os.path.join(self.path, 'existing.txt'))
+        self.assertEqual([('removed', 'existing.txt', None)], listeners.waitFor(2, 0.5))
+
+        # The file replaced by renaming is notified as changed.
+        write(os.path.join(self.path, 'new.tmp'), b'renamed')
+        os.rename(os.path.join(self.path, 'new.tmp'), os.path.join(self.path, 'new.txt'))
+        self.assertEqual([('changed', 'new.txt', b'renamed')], listeners.waitFor(2, 0.5))
+
+    def testFallback(self):
+        import ally.notifier.impl.processor.scanner_inotify as scanner_inotify
+
+        class INotifyUnavailable:
+            def __init__(self): raise OSError('Not available')
+
+        write(os.path.join(self.path, 'existing.txt'), b'existing')
+        scanner_inotify.INotify, INotifyBackup = INotifyUnavailable, scanner_inotify.INotify
+        try: listeners = startNotifier(self.path, INotifyScanner())
+        finally: scanner_inotify.INotify = INotifyBackup
+        self.assertEqual([('created', 'existing.txt', b'existing')], listeners.waitFor(1))
+
+        time.sleep(1)  # The polling has a one second resolution for the modified time.
+        write(os.path.join(self.path, 'existing.txt'), b'changed')
+        self.assertEqual([('changed', 'existing.txt', b'changed')], listeners.waitFor(1))
+
+# --------------------------------------------------------------------
+
+class BenchmarkINotifyScanner(unittest.TestCase):
+
+    count = 5
+    # The number of changes to measure the notifying latency for.
+
+    def testBenchmark(self):
+        try: INotify().close()
+        except OSError: self.skipTest('The inotify is not available')
+
+        latencies = {}
+        for name, scanner in (('polling', FileSystemScanner()), ('inotify', INotifyScanner())):
+            path = tempfile.mkdtemp()
+            try:
+                write(os.path.join(path, 'file.txt'), b'created')
+                listeners = startNotifier(path, scanner)
+                listeners.waitFor(1)
+                total = 0
+                for k in range(self.count):
+                    time.sleep(1.1)  # The polling has a one second resolution for the modified time.
+                    started = time.time()
+                    write(os.path.join(path, 'file.txt'), ('changed %s' % k).encode())
+                    self.assertEqual(1, len(listeners.waitFor(1)))
+                    total += time.time() - started
+                latencies[name] = total / self.count
+            finally: shutil.rmtree(path)
+        log.info('Average change notifying latency with polling %.4fs, with inotify %.4fs (%.2fx)', latencies['polling'],
+                 latencies['inotify'], latencies['polling'] / latencies['inotify'])
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
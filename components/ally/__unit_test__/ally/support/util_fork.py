@@ -0,0 +1,103 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally base
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Testing for the fork utility.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.support import util_fork
+from ally.support.util_fork import atFork, fork
+from io import StringIO
+from threading import Thread, Event
+import gc
+import logging
+import os
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+class Service:
+
+    def __init__(self):
+        self.calls = []
+
+    def before(self): self.calls.append('before')
+    def parent(self): self.calls.append('parent')
+    def child(self): os.write(self.pipe, b'child')
+
+# --------------------------------------------------------------------
+
+@unittest.skipUnless(hasattr(os, 'fork'), 'The platform does not support fork')
+class TestFork(unittest.TestCase):
+
+    def forkAndRead(self, service):
+        read, service.pipe = os.pipe()
+        pid = fork()
+        if not pid:
+            # Logging in the forked process needs to work even if another thread was logging at fork.
+            log.debug('Forked process %s', os.getpid())
+            os._exit(0)
+        os.close(service.pipe)
+        os.waitpid(pid, 0)
+        content = os.read(read, 100)
+        os.close(read)
+        return content
+
+    def testFork(self):
+        service = Service()
+        atFork(service.before, service.parent, service.child)
+        self.assertEqual(b'child', self.forkAndRead(service))
+        self.assertEqual(['before', 'parent'], service.calls)
+
+    def testLoggingLocked(self):
+        handler = logging.StreamHandler(StringIO())
+        log.addHandler(handler)
+        log.setLevel(logging.DEBUG)
+        started, stop = Event(), Event()
+        def logs():
+            started.set()
+            while not stop.is_set(): log.debug('Logging while forking')
+        thread = Thread(target=logs)
+        thread.start()
+        started.wait()
+        try:
+            for _k in range(10):
+                service = Service()
+                atFork(child=service.child)
+                self.assertEqual(b'child', self.forkAndRead(service))
+        finally:
+            stop.set()
+            thread.join()
+            log.removeHandler(handler)
+            log.setLevel(logging.NOTSET)
+
+    def testWeakMethods(self):
+        # The fork removes the registrations that are not available anymore.
+        gc.collect()
+        self.forkAndRead(Service())
+        count = len(util_fork._handlers)
+        atFork(child=Service().child)
+        self.assertEqual(count + 1, len(util_fork._handlers))
+        gc.collect()
+        self.assertEqual(b'', self.forkAndRead(Service()))
+        self.assertEqual(count, len(util_fork._handlers))
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally base
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the phases timing.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.support.util_profile import Phase, phasesReport, phasesReset
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+class TestProfile(unittest.TestCase):
+
+    def setUp(self):
+        phasesReset()
+
+    def testNested(self):
+        with Phase('outer'):
+            time.sleep(0.02)
+            for _k in range(2):
+                with Phase('inner'): time.sleep(0.05)
+            running = phasesReport()
+        report = phasesReport()
+
+        self.assertEqual(2, report['inner'][1])
+        self.assertEqual(1, report['outer'][1])
+        self.assertAlmostEqual(0.1, report['inner'][0], delta=0.02)
+        self.assertAlmostEqual(0.02, report['outer'][0], delta=0.02)
+        # The running phases are reported with the time spent until now.
+        self.assertEqual(0, running['outer'][1])
+        self.assertAlmostEqual(0.02, running['outer'][0], delta=0.02)
+
+        phasesReset()
+        self.assertEqual({}, phasesReport())
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
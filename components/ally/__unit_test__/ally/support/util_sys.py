@@ -16,11 +16,23 @@ if True:
 
 # --------------------------------------------------------------------
 
-from ally.support.util_sys import validateTypeFor
+from ally.support import util_sys
+from ally.support.util_sys import validateTypeFor, searchModules, useManifest, \
+    saveManifest
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
 import unittest
 
 # --------------------------------------------------------------------
 
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
 class A:
     __slots__ = ('a',)
 
@@ -38,7 +50,70 @@ class TestSys(unittest.TestCase):
         self.assertRaises(ValueError, setattr, a, 'a', 'ola')
         a.a = 12
 
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.manifest = os.path.join(self.path, 'application.manifest')
+        self.package = os.path.join(self.path, '__manifest_test__')
+        for name in ('__init__.py', 'a.py', os.path.join('b', '__init__.py'), os.path.join('b', 'c.py')):
+            os.makedirs(os.path.dirname(os.path.join(self.package, name)), exist_ok=True)
+            with open(os.path.join(self.package, name), 'w'): pass
+        sys.path.append(self.path)
+
+    def tearDown(self):
+        util_sys._manifest = None
+        sys.path.remove(self.path)
+        shutil.rmtree(self.path)
+
+    def testManifest(self):
+        expected = {'__manifest_test__.a', '__manifest_test__.b', '__manifest_test__.b.c'}
+        self.assertFalse(useManifest(self.manifest))
+        self.assertEqual(expected, set(searchModules('__manifest_test__.**')))
+        saveManifest()
+        self.assertTrue(os.path.isfile(self.manifest))
+
+        searchPaths, util_sys._searchPaths = util_sys._searchPaths, None
+        try:
+            self.assertTrue(useManifest(self.manifest))
+            self.assertEqual(expected, set(searchModules('__manifest_test__.**')))
+        finally: util_sys._searchPaths = searchPaths
+
+        # Adding a module modifies the package directory so the manifest is obsolete.
+        with open(os.path.join(self.package, 'b', 'd.py'), 'w'): pass
+        stamp = time.time() + 10
+        os.utime(os.path.join(self.package, 'b'), (stamp, stamp))
+        self.assertFalse(useManifest(self.manifest))
+        self.assertEqual(expected | {'__manifest_test__.b.d'}, set(searchModules('__manifest_test__.**')))
+
+# --------------------------------------------------------------------
+
+class BenchmarkManifest(unittest.TestCase):
+
+    def testBenchmark(self):
+        path = tempfile.mkdtemp()
+        try:
+            util_sys._manifest = None
+            started = time.time()
+            modules = searchModules('__setup__.**')
+            scanned = time.time() - started
+
+            useManifest(os.path.join(path, 'application.manifest'))
+            searchModules('__setup__.**')
+            saveManifest()
+            self.assertTrue(useManifest(os.path.join(path, 'application.manifest')))
+            started = time.time()
+            self.assertEqual(modules, searchModules('__setup__.**'))
+            loaded = time.time() - started
+        finally:
+            util_sys._manifest = None
+            shutil.rmtree(path)
+        log.info('Discovered %s setup modules by scanning in %.4fs, from the manifest in %.4fs (%.2fx)', len(modules),
+                 scanned, loaded, scanned / loaded)
+
 # --------------------------------------------------------------------
 
-if __name__ == '__main__': unittest.main()
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
 
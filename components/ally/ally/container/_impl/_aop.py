@@ -10,6 +10,7 @@ Provides the AOP implementations.
 '''
 
 from ._assembly import Assembly
+from ally.support.util_profile import Phase, PHASE_IMPORT
 from inspect import isclass
 import re
 import sys
@@ -151,13 +152,14 @@ class AOPModules(AOP):
         # cache that will not provide the loaded modules again, basically once the modules are loaded they cannot
         # be found again.
         broken = set()
-        for path in self._paths:
-            if path not in sys.modules:
-                try: __import__(path)
-                except:
-                    if mandatory: raise
-                    log.warn('Cannot import module \'%s\'', path, exc_info=True)
-                    broken.add(path)
+        with Phase(PHASE_IMPORT):
+            for path in self._paths:
+                if path not in sys.modules:
+                    try: __import__(path)
+                    except:
+                        if mandatory: raise
+                        log.warn('Cannot import module \'%s\'', path, exc_info=True)
+                        broken.add(path)
         self._paths = {path:sys.modules[path] for path in self._paths if path not in broken}
         return self
 
@@ -14,6 +14,7 @@ from inspect import ismodule
 import logging
 
 from ally.design.priority import sortByPriorities
+from ally.support.util_profile import Phase, PHASE_CONFIG
 
 from ._impl._aop import AOPModules
 from ._impl._assembly import Assembly, Activator
@@ -156,18 +157,19 @@ def configurationsLoad(configs, assembly=None):
     used = set()
     Assembly.stack.append(assembly)
     try:
-        for name, call in assembly.calls.items():
-            if not isinstance(call, CallConfig): continue
-            assert isinstance(call, CallConfig)
-            
-            for name, value in configs.items():
-                if name == call.name or call.name.endswith('.' + name):
-                    if name in used:
-                        raise SetupError('The configuration "%s" is already in use and the configuration "%s" cannot use it '
-                                         'again, provide a more detailed path for the configuration (ex: "ally_core.url" '
-                                         'instead of "url")' % (name, call.name))
-                    used.add(name)
-                    call.setValue(value)
+        with Phase(PHASE_CONFIG):
+            for name, call in assembly.calls.items():
+                if not isinstance(call, CallConfig): continue
+                assert isinstance(call, CallConfig)
+                
+                for name, value in configs.items():
+                    if name == call.name or call.name.endswith('.' + name):
+                        if name in used:
+                            raise SetupError('The configuration "%s" is already in use and the configuration "%s" cannot '
+                                             'use it again, provide a more detailed path for the configuration (ex: '
+                                             '"ally_core.url" instead of "url")' % (name, call.name))
+                        used.add(name)
+                        call.setValue(value)
                     
     finally: Assembly.stack.pop()
     
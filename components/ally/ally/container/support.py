@@ -15,6 +15,7 @@ from inspect import isclass, ismodule, getsource, isfunction, ismethod
 
 from ally.design.priority import Priority, PRIORITY_NORMAL, sortByPriorities
 
+from ..support.util_profile import Phase, PHASE_EVENTS
 from ..support.util_sys import callerLocals
 from ._impl._assembly import Assembly
 from ._impl._call import CallEntity, CallConfig, CallEventControlled
@@ -372,7 +373,8 @@ def performEventsFor(*triggers, source=None):
     
     @see: eventsFor
     '''
-    for call, *_other in eventsFor(*triggers, source=source): call()
+    with Phase(PHASE_EVENTS):
+        for call, *_other in eventsFor(*triggers, source=source): call()
     
 # --------------------------------------------------------------------
 
@@ -11,11 +11,13 @@ Contains the assembly support.
 
 from .context import create
 from .execution import Processing
-from .resolvers import resolversFor, checkIf, solve, reportFor
+from .resolvers import resolversFor, checkIf, solve, reportFor, keyFor
 from .spec import IProcessor, AssemblyError, LIST_UNAVAILABLE
 from abc import ABCMeta  # @UnusedImport
 from ally.design.processor.report import ReportUnused, ReportNone
+from ally.support.util_profile import Phase, PHASE_ASSEMBLY
 from collections import Iterable
+from threading import Lock
 import logging
 
 # --------------------------------------------------------------------
@@ -41,20 +43,33 @@ class Assembly(Container):
     The assembly provides a container for the processors.
     '''
     
-    def __init__(self, name, reportUnused=True):
+    reporting = False
+    # Flag indicating that the assemblies that have the unused attributes reporting enabled should report when created,
+    # the reporting is expensive so it is performed only when requested, like for the application --report-assemblies.
+    _solved = {}
+    # The solved contexts classes indexed by the key of the resolvers they have been solved for.
+    _solvedLock = Lock()
+    # The lock used for the solved contexts.
+    
+    def __init__(self, name, reportUnused=True, compiled=False):
         '''
         Constructs the assembly.
         
         @param name: string
             The name of the assembly mainly used for reporting purposes.
         @param reportUnused: boolean
-            Flag indicating that the unused attributes in the assembly should be reported.
+            Flag indicating that the unused attributes in the assembly should be reported, the reporting is performed
+            only if the assemblies reporting is enabled, @see: Assembly.reporting.
+        @param compiled: boolean
+            Flag indicating that the processing created by the assembly should use the compiled execution.
         '''
         assert isinstance(name, str), 'Invalid name %s' % name
         assert isinstance(reportUnused, bool), 'Invalid flag %s' % reportUnused
+        assert isinstance(compiled, bool), 'Invalid compiled flag %s' % compiled
         super().__init__()
         self.name = name
         self.reportUnused = reportUnused
+        self.compiled = compiled
 
     def add(self, *processors, before=None, after=None):
         '''
@@ -125,25 +140,37 @@ class Assembly(Container):
         @return: Processing
             A processing created based on the current structure of the assembly.
         '''
-        if self.reportUnused: report = ReportUnused()
+        reporting = self.reportUnused and Assembly.reporting
+        if reporting: report = ReportUnused()
         else: report = ReportNone()
-        sources, current, extensions, calls = resolversFor(contexts), {}, {}, []
-        for processor in self.processors:
-            assert isinstance(processor, IProcessor), 'Invalid processor %s' % processor
-            processor.register(sources, current, extensions, calls, report)
-        for processor in self.processors:
-            processor.finalized(sources, current, extensions, report)
-        
-        solve(current, sources)
-        if checkIf(current, LIST_UNAVAILABLE):
-            raise AssemblyError('Assembly \'%s\' has unavailable attributes:\n%s' % 
-                                (self.name, reportFor(current, LIST_UNAVAILABLE)))
-        solve(current, extensions)
-        processing = Processing(calls, create(current))
-        reportAss = report.open('assembly \'%s\'' % self.name)
-        reportAss.add(current)
+        with Phase(PHASE_ASSEMBLY):
+            sources, current, extensions, calls = resolversFor(contexts), {}, {}, []
+            for processor in self.processors:
+                assert isinstance(processor, IProcessor), 'Invalid processor %s' % processor
+                processor.register(sources, current, extensions, calls, report)
+            for processor in self.processors:
+                processor.finalized(sources, current, extensions, report)
+            
+            # The assemblies that register the same resolvers solve the same contexts, so the solved contexts are reused.
+            key = None if reporting else keyFor(sources, current, extensions)
+            if key is None: solved = None
+            else:
+                with Assembly._solvedLock: solved = Assembly._solved.get(key)
+            
+            if solved is None:
+                solve(current, sources)
+                if checkIf(current, LIST_UNAVAILABLE):
+                    raise AssemblyError('Assembly \'%s\' has unavailable attributes:\n%s' % 
+                                        (self.name, reportFor(current, LIST_UNAVAILABLE)))
+                solve(current, extensions)
+                solved = create(current)
+                if key is not None:
+                    with Assembly._solvedLock: Assembly._solved[key] = solved
+            processing = Processing(calls, dict(solved), self.compiled)
         
-        if self.reportUnused:
+        if reporting:
+            reportAss = report.open('assembly \'%s\'' % self.name)
+            reportAss.add(current)
             message = report.report()
             if message: log.info('\n%s\n' % message)
             else: log.info('Nothing to report for \'%s\', everything fits nicely', self.name)
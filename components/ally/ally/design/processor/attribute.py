@@ -452,6 +452,22 @@ class Resolver(IResolver):
         
         return attributes
     
+    def key(self):
+        '''
+        Provides the key that identifies the specifications of the resolver, resolvers with the same key solve and create
+        the same contexts.
+        
+        @return: tuple
+            The hashable key of the resolver specifications.
+        '''
+        key = []
+        for name in sorted(self.specifications):
+            spec = self.specifications[name]
+            assert isinstance(spec, Specification), 'Invalid specification %s' % spec
+            key.append((name, spec.__class__, spec.status, spec.types, spec.definedIn, spec.defined, spec.doc,
+                        frozenset(spec.usedIn.items())))
+        return (self.__class__,) + tuple(key)
+    
     def __str__(self):
         if not self.specifications: return '%s empty' % self.__class__.__name__
         return '%s[%s]' % (self.__class__.__name__, ', '.join('%s=%s' % (name, self.specifications.get(name))
@@ -185,7 +185,7 @@ class Routing(WithAssembly):
             report.add(uresolvers)
             contexts = create(uresolvers)
             
-            return Processing(calls, contexts)
+            return Processing(calls, contexts, self._assembly.compiled)
         
         except AssemblyError: raise
         except:
@@ -337,7 +337,7 @@ class Branch(WithAssembly):
         
             solve(resolvers, iresolvers)
             solve(extensions, iextensions)
-            return Processing(calls, contexts)
+            return Processing(calls, contexts, self._assembly.compiled)
         
         except AssemblyError: raise
         except:
@@ -11,7 +11,6 @@ Provides the context support.
 
 from .spec import IAttribute, ContextMetaClass, CREATE_DEFINITION, IResolver
 from ally.support.util import immut
-from weakref import WeakSet
 
 # --------------------------------------------------------------------
 
@@ -78,6 +77,7 @@ def definerObject(name, bases, namespace):
     assert '__attributes__' in namespace, 'No attributes defined for context object'
     
     namespace['__slots__'] = tuple(namespace['__attributes__'])
+    namespace['__presence__'] = {}
     return name, bases, namespace
 
 # --------------------------------------------------------------------
@@ -139,23 +139,9 @@ class Object(metaclass=ContextMetaClass):
         @param attribute: IAttribute or descriptor with '__name__' and '__objclass__'
             The attribute to check if contained.
         '''
-        attribute = attributeOf(attribute)
-        if attribute is None: return False
-        contained, uncontained = self.__class__.__dict__.get('_contained'), self.__class__.__dict__.get('_uncontained')
-        if contained and attribute in contained: return True
-        if uncontained and attribute in uncontained: return False
-        assert isinstance(attribute, IAttribute)
-        if attribute.isIn(self.__class__):
-            if contained is None:
-                contained = WeakSet()
-                setattr(self.__class__, '_contained', contained)
-            contained.add(attribute)
-            return True
-        if uncontained is None:
-            uncontained = WeakSet()
-            setattr(self.__class__, '_uncontained', uncontained)
-        uncontained.add(attribute)
-        return False
+        try: return self.__presence__[attribute]
+        except KeyError: return presenceIn(self.__class__, attribute)
+        except TypeError: return False
     
     def __str__(self):
         '''
@@ -204,10 +190,41 @@ def create(resolvers, *flags):
             
         else:
             namespace = dict(__module__=__name__, __attributes__=attributes)
-            contexts[name] = type('Object$%s' % nameClass, (Object,), namespace)
+            contexts[name] = clazz = type('Object$%s' % nameClass, (Object,), namespace)
+            # The attributes of the contexts that have been resolved into the object context are known so the presence
+            # of those attributes is solved ahead.
+            for nameAttr, attribute in attributes.items():
+                presenceIn(clazz, attribute)
+                presenceIn(clazz, clazz.__dict__.get(nameAttr))
+                specification = getattr(attribute, 'specification', None)
+                if specification is None: continue
+                for context in specification.usedIn:
+                    if isinstance(context, ContextMetaClass): presenceIn(clazz, context.__attributes__.get(nameAttr))
 
     return contexts
 
+def presenceIn(clazz, attribute):
+    '''
+    Solves and registers in the object context presence table if the attribute is contained by the object context.
+    
+    @param clazz: ContextMetaClass
+        The object context class to solve the presence for.
+    @param attribute: IAttribute or descriptor with '__name__' and '__objclass__'
+        The attribute to solve the presence for.
+    @return: boolean
+        True if the attribute is contained, False otherwise.
+    '''
+    assert isinstance(clazz, ContextMetaClass), 'Invalid class %s' % clazz
+    assert isinstance(clazz.__dict__.get('__presence__'), dict), 'Invalid object context class %s' % clazz
+    
+    solved = attributeOf(attribute)
+    if solved is None: isIn = False
+    else:
+        assert isinstance(solved, IAttribute)
+        isIn = solved.isIn(clazz)
+    if attribute is not None: clazz.__presence__[attribute] = isIn
+    return isIn
+
 def attributeOf(descriptor):
     '''
     Provides the @see: IAttribute for the provided descriptor or attribute.
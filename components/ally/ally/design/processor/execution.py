@@ -83,7 +83,7 @@ class Processing:
                 assert isinstance(clazz, ContextMetaClass), 'Invalid context class %s for %s' % (clazz, key)
                 object.__setattr__(self, key, clazz)
 
-    def __init__(self, calls, contexts=None):
+    def __init__(self, calls, contexts=None, compiled=False):
         '''
         Construct the processing.
         
@@ -91,10 +91,15 @@ class Processing:
             The iterable of calls that consists this processing.
         @param contexts: dictionary{string, ContextMetaClass}|None
             The initial contexts to be associated.
+        @param compiled: boolean
+            Flag indicating that the chains created for this processing should use the compiled execution, this means
+            that the calls are executed in a tight loop rather then being interpreted one by one, @see: Chain.execute.
         '''
         assert isinstance(calls, Iterable), 'Invalid calls %s' % calls
+        assert isinstance(compiled, bool), 'Invalid compiled flag %s' % compiled
         
-        self._calls = list(calls)
+        self._calls = tuple(calls) if compiled else list(calls)
+        self.compiled = compiled
         assert self._calls, 'At least one call is required for processing'
         if __debug__:
             for call in self._calls: assert callable(call), 'Invalid call %s' % call
@@ -312,7 +317,7 @@ class Chain(Execution):
     '''
     A chain that contains a list of processors (callables) that are executed one by one.
     '''
-    __slots__ = ('_errors', '_finalizers')
+    __slots__ = ('_errors', '_finalizers', '_compiled')
 
     def __init__(self, processing, *fill, **keyargs):
         '''
@@ -330,6 +335,7 @@ class Chain(Execution):
         super().__init__(processing, arg=keyargs.pop('_arg', None))
         self._errors = []
         self._finalizers = []
+        self._compiled = isinstance(processing, Processing) and processing.compiled
         
         if fill:
             assert isinstance(processing, Processing), 'Invalid processing %s for fill in' % processing
@@ -342,6 +348,43 @@ class Chain(Execution):
                     elif fillValues: keyargs[name] = clazz()
         
         if keyargs: self.process(**keyargs)
+        
+    def execute(self, *flags):
+        '''
+        @see: Execution.execute
+        
+        If the chain has been created for a compiled processing then the calls are executed in a tight loop that avoids
+        the per call overhead of the 'do' method, the nested executions (wings, branches and finalization) are executed
+        as a whole, the semantic is the same as executing 'do' until there is nothing more to execute.
+        '''
+        if not self._compiled: return super().execute(*flags)
+        
+        calls = self._calls
+        while True:
+            keyargs = self.arg.__dict__
+            while calls and self._status is None:
+                call = calls[0]
+                if isinstance(call, Execution): break
+                calls.popleft()
+                try: call(self, **keyargs)
+                except Exception as e:
+                    if isinstance(e, TypeError) and 'arguments' in str(e):
+                        raise TypeError('A problem occurred while invoking with arguments %s, at:%s' % 
+                                        (', '.join(keyargs), locationStack(call)))
+                    
+                    self._status = EXCEPTION
+                    if self._handleError(e): continue
+                    raise
+            
+            if calls and isinstance(calls[0], Execution):
+                execution = calls[0]
+                assert isinstance(execution, Execution)
+                execution.execute()
+                if calls and calls[0] is execution: calls.popleft()
+            elif not self.do(): break
+            
+        if flags and self._status in flags: return True
+        return False
     
     def wing(self, chain):
         '''
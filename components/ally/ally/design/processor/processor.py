@@ -21,7 +21,6 @@ from ally.design.processor.spec import isNameForClass
 from ally.support.util_sys import locationStack, updateWrapper
 from collections import Iterable
 from inspect import ismethod, isfunction, getfullargspec
-import itertools
 
 # --------------------------------------------------------------------
 
@@ -187,8 +186,9 @@ class Brancher(Contextual):
             except: raise AssemblyError('Cannot create processing at:%s' % locationStack(self.function))
             assert processing is None or isinstance(processing, Processing), 'Invalid processing %s' % processing
             processings.append(processing)
+        processings, call = tuple(processings), self.call
         
-        def wrapper(*args, **keyargs): self.call(*itertools.chain(args, processings), **keyargs)
+        def wrapper(chain, **keyargs): call(chain, *processings, **keyargs)
         updateWrapper(wrapper, self.call)
         calls.append(wrapper)
         
@@ -199,6 +199,31 @@ def solve(resolvers, other, joined=True):
             else: resolvers[name] = resolver.solve(resolverOther.copy(resolver.list()))
     return resolvers
 
+def keyFor(*resolvers):
+    '''
+    Provides the key that identifies the provided resolvers, solving and creating the contexts for resolvers that have the
+    same key provides the same contexts.
+    
+    @param resolvers: arguments[dictionary{string: IResolver}]
+        The resolvers dictionaries to provide the key for.
+    @return: tuple|None
+        The hashable key or None if there is a resolver that cannot provide a key, the resolvers provide the key through a
+        "key" method like @see: Resolver.key
+    '''
+    key = []
+    for resolversItem in resolvers:
+        assert isinstance(resolversItem, dict), 'Invalid resolvers %s' % resolversItem
+        
+        keyItem = []
+        for name in sorted(resolversItem):
+            resolver = resolversItem[name]
+            assert isinstance(resolver, IResolver), 'Invalid resolver %s' % resolver
+            keyResolver = getattr(resolver, 'key', None)
+            if keyResolver is None: return None
+            keyItem.append((name, keyResolver()))
+        key.append(tuple(keyItem))
+    return tuple(key)
+
 # --------------------------------------------------------------------
 
 def checkIf(resolvers, *flags):
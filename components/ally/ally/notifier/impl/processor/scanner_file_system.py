@@ -127,9 +127,13 @@ class FileSystemScanner(HandlerProcessor):
         
         if not listeners: return
         self.createItemTree(listeners, register.itemTree, Item)
-        
-        scanThread = ScannerThread(target=self.scanItems, name='File system notifier scanner thread',
-                                   args=(register.itemTree, Item))
+        self.startScanner(register.itemTree, Item)
+    
+    def startScanner(self, root, Item):
+        '''
+        Starts the thread that keeps the items tree updated, by default the items tree is scanned every second.
+        '''
+        scanThread = ScannerThread(target=self.scanItems, name='File system notifier scanner thread', args=(root, Item))
         scanThread.daemon = True
         scanThread.start()
     
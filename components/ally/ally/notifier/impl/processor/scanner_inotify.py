@@ -0,0 +1,292 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally base
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the items tree scanner that is driven by the Linux inotify events, if the inotify is not available the items tree
+is polled.
+'''
+
+from .scanner_file_system import FileSystemScanner, ItemFile, Listener
+from ally.container.ioc import injected
+from collections import deque
+from threading import Thread
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import time
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+# The inotify event flags.
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# The inotify initialization flags.
+
+MASK_WATCH = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | \
+             IN_MOVE_SELF
+# The events that are watched.
+MASK_STRUCTURE = IN_CREATE | IN_DELETE | IN_MOVED_FROM
+# The events that change the directory structure.
+MASK_SELF = IN_DELETE_SELF | IN_MOVE_SELF
+# The events that remove the watched item itself.
+
+EVENT = struct.Struct('iIII')
+# The inotify event header containing the watch descriptor, mask, cookie and name length.
+READ_SIZE = 64 * 1024
+# The size of the events buffer read at once.
+
+# --------------------------------------------------------------------
+
+@injected
+class INotifyScanner(FileSystemScanner):
+    '''
+    Keeps the items tree updated based on the inotify events, the events bursts are debounced so the listeners are notified
+    once the file system settles. If the inotify is not available the items tree is polled like in @see: FileSystemScanner.
+    '''
+
+    debounce = 0.1
+    # The number of seconds without file system events to wait before notifying the listeners.
+    debounceMaximum = 1
+    # The maximum number of seconds the listeners notifying is delayed while the file system events keep coming.
+
+    def __init__(self):
+        assert isinstance(self.debounce, (int, float)), 'Invalid debounce %s' % self.debounce
+        assert isinstance(self.debounceMaximum, (int, float)), 'Invalid maximum debounce %s' % self.debounceMaximum
+        super().__init__()
+
+    def startScanner(self, root, Item):
+        '''
+        @see: FileSystemScanner.startScanner
+
+        Starts the thread that waits for the inotify events, falls back to polling if the inotify is not available.
+        '''
+        try:
+            watcher = INotify()
+            try: self.watchItems(watcher, root)
+            except:
+                watcher.close()
+                raise
+        except OSError as e:
+            log.info('Cannot use inotify (%s), the file system is polled instead', e)
+            return super().startScanner(root, Item)
+
+        scanThread = Thread(target=self.scanEvents, name='File system notifier inotify thread', args=(watcher, root, Item))
+        scanThread.daemon = True
+        scanThread.start()
+
+    def watchItems(self, watcher, root):
+        '''
+        Adds watches for the directories in the items tree, the files are watched through their directories except the
+        files that are directly in the tree root.
+
+        @param watcher: INotify
+            The inotify to add the watches to.
+        @param root: ItemFile
+            The root item to add the watches for.
+        '''
+        assert isinstance(watcher, INotify), 'Invalid watcher %s' % watcher
+        assert isinstance(root, ItemFile), 'Invalid item %s' % root
+
+        queue = deque()
+        queue.append(root)
+        while queue:
+            item = queue.popleft()
+            assert isinstance(item, ItemFile), 'Invalid item %s' % item
+
+            if item.path is not None and watcher.items.get(watcher.paths.get(item.path)) is not item:
+                if os.path.isdir(item.path) or item.parent.path is None: watcher.watch(item.path, item)
+            if item.children: queue.extend(item.children.values())
+
+    def scanEvents(self, watcher, root, Item):
+        '''
+        Waits for the inotify events and updates the items tree.
+        '''
+        assert isinstance(watcher, INotify), 'Invalid watcher %s' % watcher
+
+        while True:
+            events = watcher.read(None)
+            if not events: continue
+
+            # debouncing the events burst
+            deadline = time.time() + self.debounceMaximum
+            while True:
+                timeout = min(self.debounce, deadline - time.time())
+                if timeout <= 0: break
+                burst = watcher.read(timeout)
+                if not burst: break
+                events.extend(burst)
+
+            try: self.processEvents(watcher, root, Item, events)
+            except: log.exception('Cannot process the file system events')
+
+    def processEvents(self, watcher, root, Item, events):
+        '''
+        Updates the items tree based on the provided events and launches the create, update, delete notifications for
+        listeners.
+
+        @param events: list[tuple(ItemFile, integer, string)]
+            The events as provided by @see: INotify.read
+        '''
+        assert isinstance(watcher, INotify), 'Invalid watcher %s' % watcher
+        assert isinstance(events, list), 'Invalid events %s' % events
+
+        rebuild, changed, removed = {}, {}, {}
+        for item, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                # events have been lost so the entire tree needs to be scanned
+                log.warning('The inotify events queue overflowed, scanning the entire file system items tree')
+                self.scanItems(root, Item)
+                self.watchItems(watcher, root)
+                return
+            assert isinstance(item, ItemFile), 'Invalid item %s' % item
+
+            if name is None:
+                # the event is for the watched item itself
+                if mask & MASK_SELF:
+                    if item.parent.path is None: removed[item.path] = item
+                    # otherwise the removal is handled by the parent directory events
+                elif not mask & IN_ISDIR: changed[item.path] = item
+                continue
+
+            child = item.children.get(name)
+            if child is None or mask & MASK_STRUCTURE: rebuild[item.path] = item
+            elif not mask & IN_ISDIR: changed[child.path] = child
+
+        for item in removed.values():
+            assert isinstance(item, ItemFile), 'Invalid item %s' % item
+            if os.path.exists(item.path) or item.parent.children.get(item.name) is not item: continue
+            item.parent.children.pop(item.name)
+            self.onDeleteItem(item)
+
+        for item in rebuild.values():
+            assert isinstance(item, ItemFile), 'Invalid item %s' % item
+            if not os.path.isdir(item.path): continue
+            self.rebuildItems(item, Item)
+            item.lastModified = int(os.path.getmtime(item.path))
+            try: self.watchItems(watcher, item)
+            except OSError as e: log.warning('Cannot watch the new items of %s: %s', item.path, e)
+
+        for item in changed.values():
+            assert isinstance(item, ItemFile), 'Invalid item %s' % item
+            # the items that have been removed or replaced by the rebuild are not notified
+            if item.parent.children.get(item.name) is not item or not os.path.isfile(item.path): continue
+            assert log.debug('Item changed: %s' % item.path) or True
+            for listener in item.listeners:
+                assert isinstance(listener, Listener), 'Invalid listener %s' % listener
+                with open(item.path, 'rb') as content: listener.doOnContentChanged(item.uri, content)
+            item.lastModified = int(os.path.getmtime(item.path))
+
+# --------------------------------------------------------------------
+
+class INotify:
+    '''
+    Wrapper for the Linux inotify instance used through ctypes.
+    '''
+    __slots__ = ('fd', 'items', 'paths', '_libc')
+
+    def __init__(self):
+        '''
+        Construct the inotify instance.
+
+        @raise OSError: If the inotify is not available.
+        '''
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            self._libc.inotify_init1.argtypes = (ctypes.c_int,)
+            self._libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+            self._libc.inotify_rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+        except AttributeError: raise OSError(errno.ENOSYS, 'The inotify is not supported on this platform')
+
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+
+        self.items = {}
+        self.paths = {}
+
+    def watch(self, path, item):
+        '''
+        Adds a watch for the path.
+
+        @param path: string
+            The path to watch.
+        @param item: object
+            The item that is provided for the path events.
+        @raise OSError: If the watch cannot be added.
+        '''
+        assert isinstance(path, str), 'Invalid path %s' % path
+
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), MASK_WATCH)
+        if wd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, '%s for %s' % (os.strerror(code), path))
+        self.items[wd] = item
+        self.paths[path] = wd
+
+    def read(self, timeout):
+        '''
+        Reads the available events.
+
+        @param timeout: float|None
+            The number of seconds to wait for events, None to wait until events are available.
+        @return: list[tuple(object, integer, string|None)]
+            The events as the watched item, the event mask and the name of the changed child or None if the event is for the
+            watched item, the queue overflow is provided with None item.
+        '''
+        ready, _w, _x = select.select((self.fd,), (), (), timeout)
+        if not ready: return []
+        try: data = os.read(self.fd, READ_SIZE)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EINTR): return []
+            raise
+
+        events, position = [], 0
+        while position + EVENT.size <= len(data):
+            wd, mask, _cookie, length = EVENT.unpack_from(data, position)
+            position += EVENT.size
+            name = data[position:position + length].rstrip(b'\0')
+            position += length
+
+            if mask & IN_Q_OVERFLOW:
+                events.append((None, mask, None))
+                continue
+            if mask & IN_IGNORED:
+                # the watch has been removed because the watched path no longer exists
+                item = self.items.pop(wd, None)
+                if item is not None and self.paths.get(item.path) == wd: del self.paths[item.path]
+                continue
+
+            item = self.items.get(wd)
+            if item is not None: events.append((item, mask, os.fsdecode(name) if name else None))
+        return events
+
+    def close(self):
+        '''
+        Closes the inotify instance, all the watches are removed.
+        '''
+        os.close(self.fd)
+        self.items.clear()
+        self.paths.clear()
@@ -0,0 +1,128 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally base
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the process forking that keeps the forked process consistent, only the forking thread is carried in the forked
+process so the services that run threads or hold locks need to register handlers in order to restart them.
+'''
+
+from threading import Lock
+import inspect
+import logging
+import os
+import weakref
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+_handlers = []
+# The registered fork handlers as lists [before, parent, child], the bound methods are kept as weak references.
+_lock = Lock()
+# The lock used for the handlers.
+
+def atFork(before=None, parent=None, child=None):
+    '''
+    Registers the calls to be made when a process is forked with @see: fork, the bound methods are referenced weakly so
+    the registration is dropped once the method instance is not used anymore.
+
+    @param before: callable()|None
+        Called in the forking process before the fork, the before calls are made in the reverse registration order.
+    @param parent: callable()|None
+        Called in the forking process after the fork.
+    @param child: callable()|None
+        Called in the forked process after the fork, this is where the threads need to be restarted.
+    '''
+    assert before is None or callable(before), 'Invalid before call %s' % before
+    assert parent is None or callable(parent), 'Invalid parent call %s' % parent
+    assert child is None or callable(child), 'Invalid child call %s' % child
+    with _lock: _handlers.append([_reference(call) for call in (before, parent, child)])
+
+def fork():
+    '''
+    Forks the current process making the registered calls.
+
+    @return: integer
+        The forked process id in the forking process and 0 in the forked process.
+    '''
+    handlers = []
+    with _lock:
+        for handler in list(_handlers):
+            calls = [_dereference(reference) for reference in handler]
+            if any(call is _DEAD for call in calls): _handlers.remove(handler)
+            else: handlers.append(calls)
+
+    for before, _parent, _child in reversed(handlers):
+        if before is not None: before()
+    try: pid = os.fork()
+    except:
+        # The forking process needs to be consistent even if the fork failed.
+        _after(handlers, True)
+        raise
+    _after(handlers, bool(pid))
+    return pid
+
+# --------------------------------------------------------------------
+
+def _after(handlers, isParent):
+    '''
+    Makes the after fork calls of the handlers.
+    '''
+    for _before, parent, child in handlers:
+        call = parent if isParent else child
+        if call is None: continue
+        try: call()
+        except: log.exception('A problem occurred while handling the fork in %s', os.getpid())
+
+# --------------------------------------------------------------------
+
+_DEAD = object()
+# Marker for a weakly referenced call that is not available anymore.
+
+def _reference(call):
+    '''
+    Provides the reference for the call.
+    '''
+    if call is not None and inspect.ismethod(call): return (weakref.ref(call.__self__), call.__func__)
+    return call
+
+def _dereference(reference):
+    '''
+    Provides the call for the reference.
+    '''
+    if isinstance(reference, tuple):
+        instance = reference[0]()
+        if instance is None: return _DEAD
+        return reference[1].__get__(instance)
+    return reference
+
+# --------------------------------------------------------------------
+
+def _loggingBefore():
+    '''
+    Acquires the logging locks so no other thread holds them when the process is forked.
+    '''
+    logging._acquireLock()
+    for handler in _loggingHandlers(): handler.acquire()
+
+def _loggingAfter():
+    '''
+    Releases the logging locks acquired before the fork.
+    '''
+    for handler in reversed(_loggingHandlers()): handler.release()
+    logging._releaseLock()
+
+def _loggingHandlers():
+    '''
+    Provides the logging handlers, needs to be called while holding the logging lock.
+    '''
+    handlers = (reference() for reference in logging._handlerList)
+    return [handler for handler in handlers if handler is not None]
+
+atFork(_loggingBefore, _loggingAfter, _loggingAfter)
@@ -561,3 +561,71 @@ class ReplaceInStream(IInputStreamClosable):
         @see: IInputStreamClosable.close
         '''
         if isinstance(self._stream, IClosable): self._stream.close()
+
+class FileRegion(IInputStreamCT):
+    '''
+    Provides a stream over a region of a file, the servers can send the region directly from the file descriptor by
+    using the region file, offset and remaining count.
+    '''
+    __slots__ = ('file', 'offset', 'remaining')
+
+    def __init__(self, file, offset, count):
+        '''
+        Construct the file region stream.
+
+        @param file: file object
+            The binary file object, it needs to provide a file descriptor.
+        @param offset: integer
+            The offset in the file where the region starts.
+        @param count: integer
+            The number of bytes in the region.
+        '''
+        assert hasattr(file, 'fileno'), 'Invalid file %s' % file
+        assert isinstance(offset, int) and offset >= 0, 'Invalid offset %s' % offset
+        assert isinstance(count, int) and count >= 0, 'Invalid count %s' % count
+        self.file = file
+        self.offset = offset
+        self.remaining = count
+
+    def read(self, nbytes=None):
+        '''
+        @see: IInputStreamCT.read
+        '''
+        if self.file is None: raise ValueError('I/O operation on closed stream.')
+        if nbytes is None or nbytes < 0 or nbytes > self.remaining: nbytes = self.remaining
+        if not nbytes: return b''
+        self.file.seek(self.offset)
+        data = self.file.read(nbytes)
+        self.advance(len(data))
+        return data
+
+    def advance(self, count):
+        '''
+        Advances the region offset, used whenever the region content has been sent directly from the file.
+
+        @param count: integer
+            The number of bytes that have been consumed from the region.
+        '''
+        assert isinstance(count, int) and 0 <= count <= self.remaining, 'Invalid count %s' % count
+        self.offset += count
+        self.remaining -= count
+
+    def fileno(self):
+        '''
+        Provides the region file descriptor.
+        '''
+        return self.file.fileno()
+
+    def tell(self):
+        '''
+        @see: IInputStreamCT.tell
+        '''
+        return self.offset
+
+    def close(self):
+        '''
+        @see: IInputStreamCT.close
+        '''
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,101 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally base
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the timing of the application phases, used mainly for profiling the application startup.
+'''
+
+from threading import local, Lock
+import time
+
+# --------------------------------------------------------------------
+
+PHASE_DISCOVERY = 'discovery'
+# The phase of searching the modules.
+PHASE_IMPORT = 'import'
+# The phase of importing the modules.
+PHASE_ASSEMBLY = 'assembly create'
+# The phase of creating the processors assemblies.
+PHASE_CONFIG = 'config load'
+# The phase of loading the configurations.
+PHASE_EVENTS = 'events'
+# The phase of performing the setup events.
+
+# --------------------------------------------------------------------
+
+_totals = {}
+# The phases totals as a dictionary{string: list[float, integer]} containing the spent seconds and count.
+_lock = Lock()
+# The lock used for updating the totals.
+_local = local()
+# The thread local that contains the stack of running phases.
+
+# --------------------------------------------------------------------
+
+class Phase:
+    '''
+    Context manager that times a phase, the time spent in phases nested in the phase is not accounted for the phase, this
+    way the phases times can be summed up.
+    ex:
+        with Phase(PHASE_IMPORT):
+            ...
+    '''
+    __slots__ = ('name', 'started', 'nested')
+
+    def __init__(self, name):
+        '''
+        Construct the phase.
+
+        @param name: string
+            The phase name.
+        '''
+        assert isinstance(name, str), 'Invalid phase name %s' % name
+        self.name = name
+
+    def __enter__(self):
+        try: stack = _local.stack
+        except AttributeError: stack = _local.stack = []
+        stack.append(self)
+        self.nested = 0
+        self.started = time.time()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.time() - self.started
+        stack = _local.stack
+        stack.pop()
+        if stack: stack[-1].nested += elapsed
+        with _lock:
+            total = _totals.get(self.name)
+            if total is None: total = _totals[self.name] = [0, 0]
+            total[0] += elapsed - self.nested
+            total[1] += 1
+
+def phasesReport():
+    '''
+    Provides the phases times, the phases that are running in the current thread are also included with the time spent
+    until now.
+
+    @return: dictionary{string: tuple(float, integer)}
+        The phases spent seconds and count indexed by phase name.
+    '''
+    with _lock: report = {name: tuple(total) for name, total in _totals.items()}
+
+    nested, now = 0, time.time()
+    for running in reversed(getattr(_local, 'stack', ())):
+        assert isinstance(running, Phase), 'Invalid phase %s' % running
+        elapsed = now - running.started
+        spent, count = report.get(running.name, (0, 0))
+        report[running.name] = (spent + elapsed - running.nested - nested, count)
+        nested = elapsed
+    return report
+
+def phasesReset():
+    '''
+    Resets the phases times.
+    '''
+    with _lock: _totals.clear()
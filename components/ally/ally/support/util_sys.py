@@ -9,18 +9,29 @@ Created on Dec 19, 2011
 Provides utility functions for handling system packages/modules/classes.
 '''
 
+from .util_profile import Phase, PHASE_DISCOVERY
 from collections import deque
 from inspect import isclass, ismodule, stack, getsourcelines, getsourcefile
 from os.path import dirname, relpath
 from pkgutil import iter_modules, get_importer, iter_importers, \
     iter_importer_modules
 import functools
+import json
+import os
 import re
 import sys
 import types
 
 # --------------------------------------------------------------------
 
+MANIFEST_VERSION = 1
+# The module discovery manifest format version.
+
+_manifest = None
+# The module discovery manifest in use, @see: useManifest.
+
+# --------------------------------------------------------------------
+
 def fullyQName(obj):
     '''
     Provides the fully qualified class name of the instance or class provided.
@@ -216,7 +227,7 @@ def searchModules(pattern):
         A dictionary containing as a key a tuple with a flag indicating that the the module full name, and as a value a list of paths where this module is
         defined.
     '''
-    return {keyPack[1]: paths for keyPack, paths in searchPaths(pattern).items()}
+    with Phase(PHASE_DISCOVERY): return {keyPack[1]: paths for keyPack, paths in searchPaths(pattern).items()}
 
 def searchPaths(pattern):
     '''
@@ -244,6 +255,27 @@ def searchPaths(pattern):
         and as a value a list of paths where this package/module is defined.
     '''
     assert isinstance(pattern, str), 'Invalid module pattern %s' % pattern
+    if _manifest is None: return _searchPaths(pattern)
+
+    key = '%s:%s' % (pattern, os.pathsep.join(sys.path))
+    found = _manifest['patterns'].get(key)
+    if found is None:
+        modules = _searchPaths(pattern)
+        stamps = _manifest['stamps']
+        for path in sys.path:
+            if path not in stamps: stamps[path] = stampOf(path)
+        for paths in modules.values():
+            for path in paths:
+                if path not in stamps: stamps[path] = stampOf(path)
+        _manifest['patterns'][key] = [(isPkg, name, list(paths)) for (isPkg, name), paths in modules.items()]
+        _manifest['changed'] = True
+        return modules
+    return {(isPkg, name): list(paths) for isPkg, name, paths in found}
+
+def _searchPaths(pattern):
+    '''
+    Finds the modules/packages by walking the importers, @see: searchPaths.
+    '''
     modules, importers = {}, None
     k = pattern.rfind('.')
     if k >= 0:
@@ -290,6 +322,7 @@ def searchPaths(pattern):
         importers = [(True, '', imp) for imp in iter_importers()]
 
     for isPackage, package, importer in importers:
+        if importer is None: continue  # No importer available for the path.
         if isPackage:
             moduleLoader = importer.find_module(name)
             if moduleLoader:
@@ -312,6 +345,65 @@ def searchPaths(pattern):
 
     return modules
 
+def useManifest(path):
+    '''
+    Uses a persisted module discovery manifest for @see: searchPaths, the found modules are provided from the manifest
+    as long as the sys.path entries and the directories where the modules have been found are not modified. If the
+    manifest is missing or obsolete the modules are searched and recorded in a new manifest, call @see: saveManifest in
+    order to persist it.
+    
+    @param path: string
+        The path of the manifest file.
+    @return: boolean
+        True if a valid manifest has been loaded, False if a new manifest is recorded.
+    '''
+    global _manifest
+    assert isinstance(path, str), 'Invalid manifest path %s' % path
+    
+    try:
+        with open(path, 'r') as f: manifest = json.load(f)
+        if manifest.get('version') != MANIFEST_VERSION: raise ValueError('Invalid version')
+        stamps, patterns = manifest['stamps'], manifest['patterns']
+        if not isinstance(stamps, dict) or not isinstance(patterns, dict): raise ValueError('Invalid manifest')
+    except (OSError, IOError, ValueError, KeyError, AttributeError): stamps = patterns = None
+    
+    valid = stamps is not None and all(stampOf(stampPath) == stamp for stampPath, stamp in stamps.items())
+    if not valid: stamps, patterns = {}, {}
+    _manifest = dict(path=path, stamps=stamps, patterns=patterns, changed=not valid)
+    return valid
+
+def saveManifest():
+    '''
+    Persists the module discovery manifest that is in use, @see: useManifest. The manifest is persisted only if new
+    modules searches have been recorded.
+    '''
+    assert _manifest is not None, 'No manifest in use'
+    if not _manifest['changed']: return
+    
+    path, stamps = _manifest['path'], _manifest['stamps']
+    if not os.path.exists(path):
+        # Creating the manifest file modifies the directory that contains it, which might be a recorded path.
+        with open(path, 'w'): pass
+        directory = os.path.dirname(os.path.abspath(path))
+        for stampPath in stamps:
+            if os.path.abspath(stampPath) == directory: stamps[stampPath] = stampOf(stampPath)
+    
+    manifest = dict(version=MANIFEST_VERSION, stamps=stamps, patterns=_manifest['patterns'])
+    with open(path, 'w') as f: json.dump(manifest, f)
+    _manifest['changed'] = False
+
+def stampOf(path):
+    '''
+    Provides the modification stamp for the path.
+    
+    @param path: string
+        The file system path.
+    @return: float|None
+        The modification time of the path or None if the path is not available on the file system.
+    '''
+    try: return os.stat(path).st_mtime
+    except OSError: return None
+
 def packageModules(package):
     '''
     Provides all modules that are found in the provided module package.
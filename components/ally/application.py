@@ -21,6 +21,7 @@ try:
     package_extender.PACKAGE_EXTENDER.addFreezedPackage('__setup__.')
     from ally.container import aop, context, support
     from ally.container.deploy import Options, APP_PREPARE, APP_START
+    from ally.support.util_sys import useManifest, saveManifest
 except ImportError:
     print('Corrupted or missing ally component, make sure that this component is not missing from python path '
           'or components eggs', file=sys.stderr)
@@ -32,16 +33,20 @@ except ImportError:
 parser = argparse.ArgumentParser(description='ally-py application options.')  # The parser to be prepared.
 options = Options()
 
+MANIFEST = 'application.manifest'  # The modules discovery manifest file, it is recreated whenever the modules change.
+
 # --------------------------------------------------------------------
 
 def __deploy__():
     # Deploy the application
+    useManifest(MANIFEST)
     with context.activate(context.open(aop.modulesIn('__setup__.**')), 'deploy'):
         support.performEventsFor(APP_PREPARE)
         # In the second stage we parse the application arguments.
         parser.parse_args(namespace=options)
     
         support.performEventsFor(APP_START)
+    saveManifest()
 
 if __name__ == '__main__':
     sys.modules['application'] = sys.modules['__main__']
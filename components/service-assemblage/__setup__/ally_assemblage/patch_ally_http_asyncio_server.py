@@ -0,0 +1,33 @@
+'''
+Created on Oct 18, 2026
+
+@package: service assemblage
+@copyright: 2011 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the setup patch when the server is asyncio.
+'''
+
+from ..ally_http.processor import contentLengthDecode, asyncoreContent
+from ..ally_http.server import server_type
+from .processor import updateAssemblyForward, server_provide_assemblage, \
+    assemblyForward, externalForward, ASSEMBLAGE_EXTERNAL
+from ally.container import ioc
+import logging
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+try: from .. import ally_http_asyncio_server # @UnusedImport
+except ImportError: log.info('No asyncio available thus skip the assemblage patching')
+else:
+    from ..ally_http_asyncio_server.server import SERVER_ASYNCIO
+            
+    @ioc.after(updateAssemblyForward)
+    def updateAssemblyForwardForHTTPAsyncio():
+        if server_type() == SERVER_ASYNCIO and server_provide_assemblage() == ASSEMBLAGE_EXTERNAL:
+            assemblyForward().add(contentLengthDecode(), asyncoreContent(), before=externalForward())
@@ -9,7 +9,7 @@ Created on Jan 25, 2013
 Provides the setup patch when the server is asyncore.
 '''
 
-from ..ally_http.processor import contentLengthDecode
+from ..ally_http.processor import contentLengthDecode, asyncoreContent
 from ..ally_http.server import server_type
 from .processor import updateAssemblyForward, server_provide_assemblage, \
     assemblyForward, externalForward, ASSEMBLAGE_EXTERNAL
@@ -25,7 +25,6 @@ log = logging.getLogger(__name__)
 try: from .. import ally_http_asyncore_server # @UnusedImport
 except ImportError: log.info('No asyncore available thus skip the assemblage patching')
 else:
-    from ..ally_http_asyncore_server.processor import asyncoreContent
     from ..ally_http_asyncore_server.server import SERVER_ASYNCORE
             
     @ioc.after(updateAssemblyForward)
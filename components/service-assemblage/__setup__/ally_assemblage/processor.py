@@ -11,7 +11,8 @@ Provides the processors setups for assemblage.
 
 from ..ally_http.processor import chunkedTransferEncoding, \
     contentTypeResponseDecode, internalError, acceptRequestEncode, \
-    contentLengthDecode
+    contentLengthDecode, \
+    forward_maximum_connections, forward_maximum_idle, forward_idle_timeout, forward_wait_timeout
 from ..ally_http.server import notFoundRouter, server_protocol
 from ally.assemblage.http.impl.processor.assembler import AssemblerHandler
 from ally.assemblage.http.impl.processor.block import BlockHandler
@@ -94,6 +95,21 @@ def inner_headers_remove() -> list:
     '''
     return [METHOD_OVERRIDE.name, CONTENT_LENGTH.name]
 
+@ioc.config
+def assemblage_workers():
+    '''
+    The maximum number of inner requests that are dispatched concurrently for the assemblies, if 0 the inner requests
+    are dispatched one by one while streaming the assembled content.
+    '''
+    return 4
+
+@ioc.config
+def assemblage_prefetch_size():
+    '''
+    The maximum main content size in bytes that is buffered in order to dispatch the inner requests ahead of streaming.
+    '''
+    return 1024 * 1024
+
 # --------------------------------------------------------------------
 
 @ioc.entity
@@ -187,6 +203,8 @@ def encodingProvider() -> Handler:
 def assembler() -> Handler:
     b = AssemblerHandler()
     b.doProcessors = perform_do.processors
+    b.maximumWorkers = assemblage_workers()
+    b.maximumPrefetchSize = assemblage_prefetch_size()
     return b
 
 @ioc.entity
@@ -194,6 +212,10 @@ def externalForward() -> Handler:
     b = ForwardHTTPHandler()
     b.externalHost = external_host()
     b.externalPort = external_port()
+    b.maximumConnections = forward_maximum_connections()
+    b.maximumIdle = forward_maximum_idle()
+    b.idleTimeout = forward_idle_timeout()
+    b.waitTimeout = forward_wait_timeout()
     return b
 
 @ioc.entity
@@ -201,6 +223,10 @@ def externalForwardREST() -> Handler:
     b = ForwardHTTPHandler()
     b.externalHost = external_rest_host()
     b.externalPort = external_rest_port()
+    b.maximumConnections = forward_maximum_connections()
+    b.maximumIdle = forward_maximum_idle()
+    b.idleTimeout = forward_idle_timeout()
+    b.waitTimeout = forward_wait_timeout()
     return b
 
 # --------------------------------------------------------------------
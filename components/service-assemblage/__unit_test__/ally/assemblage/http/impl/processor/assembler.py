@@ -0,0 +1,181 @@
+'''
+Created on Oct 18, 2026
+
+@package: assemblage service
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing and benchmarking for the concurrent and coalesced assembly inner requests.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.assemblage.http.impl.processor.assembler import AssemblerHandler, \
+    ACTION_REFERENCE, ACTION_CHECK_CLOB, ACTION_INJECT, ACTION_STREAM, \
+    ACTION_ERROR_STATUS
+from ally.assemblage.http.spec.assemblage import RequestNode
+from ally.container.ioc import initialize
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import defines
+from ally.design.processor.context import Context, create
+from ally.design.processor.execution import FILL_ALL
+from ally.design.processor.resolvers import resolversFor
+from ally.indexing.impl import perform_do
+from ally.indexing.spec.model import Block, Action, Index
+from ally.indexing.spec.perform import skip, feed, feedValue, feedContent
+from ally.support.util_io import IInputStream
+from ally.support.util_spec import IDo
+from io import BytesIO
+from threading import Lock
+import logging
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+class Content(Context):
+    errorStatus = defines(int)
+    errorText = defines(str)
+    source = defines(IInputStream)
+    indexes = defines(list)
+    doEncode = defines(IDo)
+    doDecode = defines(IDo)
+
+class ResponseContent(Context):
+    source = defines(object)
+
+class Assemblage(Context):
+    requestNode = defines(RequestNode)
+    main = defines(object)
+    doRequest = defines(IDo)
+
+ContentResponse = create(resolversFor(dict(Content=Content)))['Content']
+
+BLOCK = Block(Action(ACTION_REFERENCE, skip('sref'), feed('eref'), rewind=True, final=False),
+              Action(ACTION_CHECK_CLOB, feedValue('true'), final=False),
+              Action(ACTION_ERROR_STATUS, feed('start'), feedValue('!'), skip('end')),
+              Action(ACTION_INJECT, feed('start'), skip('end'), feedContent()),
+              Action(ACTION_STREAM, feed('end')))
+
+def createContent(references):
+    '''
+    Creates the main content with a block for each reference, like "0[/a]1[/b]".
+    '''
+    content, indexes = BytesIO(), []
+    for k, reference in enumerate(references):
+        content.write(str(k).encode())
+        index = Index(BLOCK)
+        index.values['start'] = content.tell()
+        content.write(b'[')
+        index.values['sref'] = content.tell()
+        content.write(reference.encode())
+        index.values['eref'] = content.tell()
+        content.write(b']')
+        index.values['end'] = content.tell()
+        indexes.append(index)
+    return content.getvalue(), indexes
+
+def encode(content):
+    if isinstance(content, str): return content.encode('ascii')
+    return content
+
+def decode(content): return str(content, 'ascii')
+
+class Requester:
+    '''
+    Provides the inner requests responses after a delay and records the requests.
+    '''
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.requests = []
+        self.lock = Lock()
+
+    def doRequest(self, url, parameters=None):
+        with self.lock: self.requests.append(url)
+        time.sleep(self.delay)
+        response = ContentResponse()
+        if url == '/error': response.errorStatus, response.errorText = 404, 'Not found'
+        else: response.source = BytesIO(('<%s>' % url).encode())
+        response.doEncode, response.doDecode = encode, decode
+        return response
+
+def assemble(references, delay=0, **config):
+    '''
+    Assembles a main content with the provided references.
+    '''
+    handler = AssemblerHandler()
+    handler.doProcessors = perform_do.processors
+    for name, value in config.items(): setattr(handler, name, value)
+    assembly = Assembly('Assembler', reportUnused=False)
+    assembly.add(initialize(handler))
+    processing = assembly.create(responseCnt=ResponseContent, assemblage=Assemblage, Content=Content)
+
+    requester = Requester(delay)
+    source, indexes = createContent(references)
+    main = ContentResponse()
+    main.source, main.indexes = BytesIO(source), indexes
+    main.doEncode, main.doDecode = encode, decode
+    node = RequestNode()
+    node.requests['*'] = RequestNode()
+
+    assemblage = processing.ctx.assemblage()
+    assemblage.requestNode, assemblage.main, assemblage.doRequest = node, main, requester.doRequest
+    arg = processing.execute(FILL_ALL, responseCnt=processing.ctx.responseCnt(), assemblage=assemblage)
+    return b''.join(arg.responseCnt.source), requester.requests, handler.statistics()
+
+# --------------------------------------------------------------------
+
+class TestAssembler(unittest.TestCase):
+
+    def testAssemble(self):
+        expected = b'0</a>1</b>2</a>3!'
+        for config in (dict(maximumWorkers=0), dict(maximumWorkers=2), dict(maximumWorkers=2, maximumPrefetchSize=10)):
+            content, requests, statistics = assemble(('/a', '/b', '/a', '/error'), **config)
+            self.assertEqual(expected, content)
+            self.assertEqual(['/a', '/b', '/error'], sorted(requests))
+            self.assertEqual(1, statistics['assemblies'])
+            self.assertEqual(4, statistics['requests'])
+            self.assertEqual(3, statistics['dispatched'])
+            self.assertEqual(1, statistics['coalesced'])
+            if config.get('maximumWorkers') and 'maximumPrefetchSize' not in config:
+                self.assertEqual(3, statistics['prefetched'])
+            else: self.assertEqual(0, statistics['prefetched'])
+
+# --------------------------------------------------------------------
+
+class BenchmarkAssembler(unittest.TestCase):
+
+    count = 16
+    # The number of distinct references in the main content.
+    delay = 0.02
+    # The inner request delay in seconds.
+
+    def testBenchmark(self):
+        references = ['/item%s' % (k % self.count) for k in range(self.count * 2)]
+        timings = {}
+        for name, workers in (('sequential', 0), ('concurrent', 8)):
+            started = time.time()
+            content, requests, _statistics = assemble(references, self.delay, maximumWorkers=workers)
+            timings[name] = time.time() - started
+            self.assertEqual(self.count, len(requests))
+            self.assertEqual(b'1</item1>', content[len(b'0</item0>'):len(b'0</item0>1</item1>')])
+        log.info('Assembled %s references (%s distinct) with %.3fs inner requests sequential in %.4fs, concurrent in '
+                 '%.4fs (%.2fx)', len(references), self.count, self.delay, timings['sequential'], timings['concurrent'],
+                 timings['sequential'] / timings['concurrent'])
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -17,11 +17,16 @@ from ally.design.processor.execution import Chain
 from ally.design.processor.handler import HandlerProcessor
 from ally.indexing.impl.modifier import iterateModified
 from ally.indexing.spec.modifier import Content, IAlter, IModifier
+from ally.indexing.impl.modifier import ModifierByIndex
 from ally.support.util_context import asData
-from ally.support.util_io import IInputStream
+from ally.support.util_io import IInputStream, IInputStreamClosable, IClosable
 from ally.support.util_spec import IDo
 from collections import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from threading import Lock
 import logging
+import time
 
 # --------------------------------------------------------------------
 
@@ -83,18 +88,32 @@ class ContentResponse(ContentModifiable):
 @injected
 class AssemblerHandler(HandlerProcessor, IAlter):
     '''
-    Implementation for a handler that provides the assembling.
+    Implementation for a handler that provides the assembling. The references of the main content are collected ahead of
+    streaming and the inner requests are dispatched concurrently, the identical inner requests of an assembly are
+    dispatched only once.
     '''
     
     doProcessors = dict
     # The do perform processors used in assembly.
     maximumPackSize = 1024
     # The maximum block size in bytes before dispatching.
+    maximumWorkers = 4
+    # The maximum number of inner requests dispatched concurrently, if 0 the inner requests are dispatched while streaming.
+    maximumPrefetchSize = 1024 * 1024
+    # The maximum main content size in bytes that is buffered in order to collect the references ahead of streaming.
     
     def __init__(self):
         assert isinstance(self.doProcessors, dict), 'Invalid do processors %s' % self.doProcessors
         assert isinstance(self.maximumPackSize, int), 'Invalid maximum pack size %s' % self.maximumPackSize
+        assert isinstance(self.maximumWorkers, int), 'Invalid maximum workers %s' % self.maximumWorkers
+        assert isinstance(self.maximumPrefetchSize, int), 'Invalid maximum prefetch size %s' % self.maximumPrefetchSize
         super().__init__(Content=ContentResponse)
+        
+        if self.maximumWorkers > 0: self._executor = ThreadPoolExecutor(self.maximumWorkers)
+        else: self._executor = None
+        self._counts = dict.fromkeys(('assemblies', 'requests', 'dispatched', 'coalesced', 'prefetched'), 0)
+        self._elapsed = 0
+        self._lock = Lock()
 
     def process(self, chain, responseCnt:ResponseContent, assemblage:Assemblage, **keyargs):
         '''
@@ -112,9 +131,26 @@ class AssemblerHandler(HandlerProcessor, IAlter):
             chain.cancel()
             return
         
-        content = ContentAssembly(assemblage.doRequest, assemblage.requestNode, False,
-                                  maximum=self.maximumPackSize, **asData(assemblage.main, ContentModifiable))
-        responseCnt.source = iterateModified(self, self.doProcessors, content, ACTION_STREAM)
+        requests = AssemblyRequests(assemblage.doRequest, self._executor)
+        data = asData(assemblage.main, ContentModifiable)
+        if self._executor is not None: data['source'] = self.prefetch(requests, assemblage.requestNode, data)
+        
+        content = ContentAssembly(requests.doRequest, assemblage.requestNode, False, maximum=self.maximumPackSize, **data)
+        responseCnt.source = self.iterateAssembly(requests, iterateModified(self, self.doProcessors, content, ACTION_STREAM))
+        
+    def statistics(self):
+        '''
+        Provides the assemblies statistics.
+        
+        @return: dictionary{string: integer|float}
+            The statistics containing the number of assemblies, the number of inner requests, how many of them have been
+            dispatched, coalesced with an identical request or dispatched ahead of streaming and the total assemblies
+            elapsed time in seconds.
+        '''
+        with self._lock:
+            statistics = dict(self._counts)
+            statistics['elapsed'] = self._elapsed
+        return statistics
         
     # --------------------------------------------------------------------
     
@@ -123,6 +159,35 @@ class AssemblerHandler(HandlerProcessor, IAlter):
         @see: IAlter.alter
         '''
         assert isinstance(content, ContentAssembly), 'Invalid content %s' % content
+        
+        request = self.requestFor(content, modifier)
+        if request is None: return
+        bnode, reference = request
+        
+        response = content.doRequest(reference, bnode.parameters)
+        assert isinstance(response, ContentResponse), 'Invalid content %s' % response
+        if response.errorStatus is not None:
+            assert log.debug('Error %s %s for %s', response.errorStatus, response.errorText, reference) or True
+            modifier.register(ACTION_ERROR_STATUS, value=str(response.errorStatus))
+            modifier.register(ACTION_ERROR_MESSAGE, value=response.errorText)
+            return
+        
+        icontent = ContentAssembly(content.doRequest, bnode, True,
+                                   maximum=content.maximum, **asData(response, ContentModifiable))
+        modifier.register(ACTION_INJECT, value=icontent)
+        
+    def requestFor(self, content, modifier):
+        '''
+        Provides the inner request for the block that the modifier is positioned on.
+        
+        @param content: ContentAssembly
+            The content being altered.
+        @param modifier: IModifier
+            The modifier positioned on the block.
+        @return: tuple(RequestNode, string)|None
+            The request node and the reference URL of the block, None if there is no request for the block.
+        '''
+        assert isinstance(content, ContentAssembly), 'Invalid content %s' % content
         assert isinstance(content.node, RequestNode), 'Invalid request node %s' % content.node
         assert isinstance(content.node.requests, dict), 'Invalid requests %s' % content.node.requests
         assert isinstance(modifier, IModifier), 'Invalid modifier %s' % modifier
@@ -141,18 +206,69 @@ class AssemblerHandler(HandlerProcessor, IAlter):
         if not bnode.requests:
             check = modifier.fetch(ACTION_CHECK_CLOB)
             if not check: return  # Is probably and indexed reference so without requests we continue.
-            
-        response = content.doRequest(reference, bnode.parameters)
-        assert isinstance(response, ContentResponse), 'Invalid content %s' % response
-        if response.errorStatus is not None:
-            assert log.debug('Error %s %s for %s', response.errorStatus, response.errorText, reference) or True
-            modifier.register(ACTION_ERROR_STATUS, value=str(response.errorStatus))
-            modifier.register(ACTION_ERROR_MESSAGE, value=response.errorText)
-            return
+        return bnode, reference
+    
+    def prefetch(self, requests, node, data):
+        '''
+        Buffers the main content and dispatches the inner requests for the references found in it. If the main content is
+        larger then the maximum prefetch size no references are collected and the inner requests are dispatched while
+        streaming.
         
-        icontent = ContentAssembly(content.doRequest, bnode, True,
-                                   maximum=content.maximum, **asData(response, ContentModifiable))
-        modifier.register(ACTION_INJECT, value=icontent)
+        @param requests: AssemblyRequests
+            The assembly requests to dispatch with.
+        @param node: RequestNode
+            The request node of the main content.
+        @param data: dictionary{string: object}
+            The main content data.
+        @return: IInputStream
+            The source to be used for streaming the main content.
+        '''
+        assert isinstance(requests, AssemblyRequests), 'Invalid requests %s' % requests
+        assert isinstance(data, dict), 'Invalid data %s' % data
+        source = data['source']
+        assert isinstance(source, IInputStream), 'Invalid source %s' % source
+        
+        packs, size = [], 0
+        while size <= self.maximumPrefetchSize:
+            pack = source.read(self.maximumPrefetchSize + 1 - size)
+            if not pack: break
+            packs.append(pack)
+            size += len(pack)
+        content = b''.join(packs)
+        if size > self.maximumPrefetchSize: return StreamPrefixed(content, source)
+        if isinstance(source, IClosable): source.close()
+        
+        scan = dict(data)
+        scan['source'] = BytesIO(content)
+        scan = ContentAssembly(requests.prefetch, node, False, maximum=self.maximumPackSize, **scan)
+        for _pack in ModifierByIndex(self.doProcessors, scan).process(Prefetch(self), {}, set()): pass
+        return BytesIO(content)
+    
+    def iterateAssembly(self, requests, packs):
+        '''
+        Iterates the assembled packs and registers the assembly statistics once the assembly is done.
+        
+        @param requests: AssemblyRequests
+            The assembly requests used in assembling.
+        @param packs: Iterable(bytes)
+            The assembled packs.
+        @return: Iterable(bytes)
+            The assembled packs.
+        '''
+        assert isinstance(requests, AssemblyRequests), 'Invalid requests %s' % requests
+        assert isinstance(packs, Iterable), 'Invalid packs %s' % packs
+        
+        try:
+            for pack in packs: yield pack
+        finally:
+            statistics = requests.statistics()
+            assert log.debug('Assembled in %.4fs with %s inner requests, %s dispatched, %s coalesced and %s prefetched',
+                             statistics['elapsed'], statistics['requests'], statistics['dispatched'],
+                             statistics['coalesced'], statistics['prefetched']) or True
+            with self._lock:
+                self._counts['assemblies'] += 1
+                for name in ('requests', 'dispatched', 'coalesced', 'prefetched'): self._counts[name] += statistics[name]
+                self._elapsed += statistics['elapsed']
     
 # --------------------------------------------------------------------
 
@@ -182,3 +298,165 @@ class ContentAssembly(Content):
         self.doRequest = doRequest
         self.node = node
         self.isTrimmed = isTrimmed
+
+class Prefetch(IAlter):
+    '''
+    The alter that dispatches ahead the inner requests of the scanned content.
+    '''
+    __slots__ = ('handler',)
+    
+    def __init__(self, handler):
+        '''
+        Construct the prefetch alter.
+        
+        @param handler: AssemblerHandler
+            The assembler handler that provides the blocks requests.
+        '''
+        assert isinstance(handler, AssemblerHandler), 'Invalid handler %s' % handler
+        self.handler = handler
+        
+    def alter(self, content, modifier):
+        '''
+        @see: IAlter.alter
+        '''
+        assert isinstance(content, ContentAssembly), 'Invalid content %s' % content
+        
+        request = self.handler.requestFor(content, modifier)
+        if request is None: return
+        bnode, reference = request
+        content.doRequest(reference, bnode.parameters)
+
+class AssemblyRequests:
+    '''
+    The inner requests of an assembly, the response contents are buffered so identical requests are dispatched only once.
+    '''
+    __slots__ = ('_doRequest', '_executor', '_responses', '_used', '_started', 'requests', 'dispatched', 'coalesced',
+                 'prefetched')
+    
+    def __init__(self, doRequest, executor=None):
+        '''
+        Construct the assembly requests.
+        
+        @param doRequest: callable(string, list[tuple(string, string)]) -> ContentResponse
+            The request handler.
+        @param executor: Executor|None
+            The executor used for dispatching the inner requests concurrently, if None the requests are dispatched when
+            they are needed.
+        '''
+        assert callable(doRequest), 'Invalid do request handler %s' % doRequest
+        
+        self._doRequest = doRequest
+        self._executor = executor
+        self._responses = {}
+        self._used = set()
+        self._started = time.time()
+        self.requests = self.dispatched = self.coalesced = self.prefetched = 0
+        
+    def prefetch(self, url, parameters=None):
+        '''
+        Dispatches the request on the executor ahead of using the response.
+        
+        @param url: string
+            The URL to request.
+        @param parameters: list[tuple(string, string)]|None
+            The parameters of the request.
+        '''
+        if self._executor is None: return
+        key = (url, tuple(parameters) if parameters else ())
+        if key in self._responses: return
+        
+        self._responses[key] = self._executor.submit(self._fetch, url, parameters)
+        self.dispatched += 1
+        self.prefetched += 1
+        
+    def doRequest(self, url, parameters=None):
+        '''
+        Provides the response content for the request, the request is dispatched only if there is not a response already
+        fetched or pending for an identical request.
+        
+        @param url: string
+            The URL to request.
+        @param parameters: list[tuple(string, string)]|None
+            The parameters of the request.
+        @return: ContentResponse
+            The response content with a source of its own.
+        '''
+        self.requests += 1
+        key = (url, tuple(parameters) if parameters else ())
+        if key in self._used: self.coalesced += 1
+        else: self._used.add(key)
+        
+        fetched = self._responses.get(key)
+        if fetched is None:
+            fetched = self._responses[key] = self._fetch(url, parameters)
+            self.dispatched += 1
+        elif isinstance(fetched, Future): fetched = self._responses[key] = fetched.result()
+        
+        response, content = fetched
+        if content is not None: response.source = BytesIO(content)
+        return response
+    
+    def statistics(self):
+        '''
+        Provides the assembly statistics.
+        
+        @return: dictionary{string: integer|float}
+            The number of inner requests, how many of them have been dispatched, coalesced with an identical request or
+            dispatched ahead of streaming and the assembly elapsed time in seconds.
+        '''
+        return dict(requests=self.requests, dispatched=self.dispatched, coalesced=self.coalesced,
+                    prefetched=self.prefetched, elapsed=time.time() - self._started)
+    
+    # ----------------------------------------------------------------
+    
+    def _fetch(self, url, parameters):
+        '''
+        Dispatches the request and buffers the response content.
+        '''
+        response = self._doRequest(url, parameters)
+        assert isinstance(response, ContentResponse), 'Invalid content %s' % response
+        if response.source is None: return response, None
+        
+        try:
+            if response.errorStatus is None: return response, response.source.read()
+            return response, None
+        finally:
+            if isinstance(response.source, IClosable): response.source.close()
+            
+class StreamPrefixed(IInputStreamClosable):
+    '''
+    Stream that provides the already read content before the remaining content of the source stream.
+    '''
+    __slots__ = ('_prefix', '_source')
+    
+    def __init__(self, prefix, source):
+        '''
+        Construct the prefixed stream.
+        
+        @param prefix: bytes
+            The content already read from the source.
+        @param source: IInputStream
+            The source stream.
+        '''
+        assert isinstance(prefix, bytes), 'Invalid prefix %s' % prefix
+        assert isinstance(source, IInputStream), 'Invalid source %s' % source
+        self._prefix = memoryview(prefix)
+        self._source = source
+        
+    def read(self, nbytes=None):
+        '''
+        @see: IInputStreamClosable.read
+        '''
+        if not self._prefix: return self._source.read(nbytes)
+        if nbytes is None or nbytes < 0:
+            content, self._prefix = bytes(self._prefix) + self._source.read(), memoryview(b'')
+            return content
+        content, self._prefix = bytes(self._prefix[:nbytes]), self._prefix[nbytes:]
+        return content
+        
+    def close(self):
+        '''
+        @see: IInputStreamClosable.close
+        '''
+        self._prefix = memoryview(b'')
+        if isinstance(self._source, IClosable): self._source.close()
@@ -18,7 +18,7 @@ from ally.design.processor.execution import Chain, Processing, Execution
 from ally.design.processor.handler import HandlerBranching
 from ally.design.processor.spec import ContextMetaClass
 from ally.http.spec.codes import isSuccess
-from ally.http.spec.headers import remove
+from ally.http.spec.headers import remove, ACCEPT_INDEX, ACCEPT_INDEX_TRUE
 from ally.http.spec.server import RequestHTTP, ResponseHTTP, HTTP_GET, \
     ResponseContentHTTP
 from ally.support.util_io import StreamOnIterable, IInputStream
@@ -115,7 +115,8 @@ class ContentHandler(HandlerBranching):
         assert isinstance(self.innerHeadersRemove, list), 'Invalid inner headers remove %s' % self.innerHeadersRemove
         super().__init__(Routing(self.assemblyForward).using('requestCnt', 'response', 'responseCnt', request=RequestHTTP).
                          excluded('assemblage', 'Content'),
-                         Branch(self.assemblyContent).included('response', 'assemblage', ('content', 'Content')))
+                         Branch(self.assemblyContent).included('response', 'responseCnt', 'assemblage',
+                                                               ('content', 'Content')))
 
     def process(self, chain, processingForward, processingContent, request:Request, requestCnt:Context, response:Context,
                 responseCnt:Context, assemblage:Assemblage, Content:ContentResponse, **keyargs):
@@ -139,7 +140,10 @@ class ContentHandler(HandlerBranching):
         data.Response, data.ResponseContent = response.__class__, responseCnt.__class__
         data.Content = Content
         data.clientIP, data.scheme = request.clientIP, request.scheme
+        # The content index is required for assembling the main and inner contents.
+        if request.headers is not None: ACCEPT_INDEX.put(request.headers, ACCEPT_INDEX_TRUE)
         data.headers = dict(request.headers) if request.headers else {}
+        ACCEPT_INDEX.put(data.headers, ACCEPT_INDEX_TRUE)
         
         remove(data.headers, self.innerHeadersRemove)
         
@@ -278,7 +282,8 @@ class ContentHandler(HandlerBranching):
             
             proc = data.processingContent
             assert isinstance(proc, Processing), 'Invalid processing %s' % proc
-            argc = proc.execute(response=argf.response, assemblage=data.assemblage, content=data.Content())
+            argc = proc.execute(response=argf.response, responseCnt=argf.responseCnt, assemblage=data.assemblage,
+                                content=data.Content())
                     
             return self.populate(data, argc.content, argf.response, argf.responseCnt)
         return doRequest
@@ -13,11 +13,13 @@ from ally.container.ioc import injected
 from ally.design.processor.attribute import requires, defines
 from ally.design.processor.context import Context
 from ally.design.processor.handler import HandlerProcessor
-from ally.http.spec.headers import HeadersRequire, CONTENT_INDEX
+from ally.http.spec.headers import HeadersRequire, CONTENT_INDEX, \
+    CONTENT_INDEX_LENGTH, CONTENT_LENGTH
+from ally.indexing.impl.codec import decodeIndexes, VERSION
 from ally.indexing.spec.model import Block
 from ally.indexing.spec.modifier import Index
-from ally.support.util_io import IInputStream
-from collections import Callable
+from ally.support.util_io import IInputStream, IClosable, StreamOnIterable
+from collections import Callable, Iterable
 from io import BytesIO
 import binascii
 import zlib
@@ -36,6 +38,16 @@ class Assemblage(Context):
     # ---------------------------------------------------------------- Required
     provider = requires(Callable)
 
+class ResponseContent(Context):
+    '''
+    The response content context.
+    '''
+    # ---------------------------------------------------------------- Defined
+    source = defines(Iterable, doc='''
+    @rtype: Iterable|IInputStream
+    The response content without the content index trailer.
+    ''')
+    
 class Content(Context):
     '''
     The assemblage content context.
@@ -51,7 +63,9 @@ class Content(Context):
 @injected
 class IndexProviderHandler(HandlerProcessor):
     '''
-    Provides the index for the content.
+    Provides the index for the content, the content index is taken from the content index header or from the end of the
+    response content, @see: ally.indexing.impl.codec for the index format. The bytes configurations are used only for the
+    content indexes that have the previous fixed size integers format.
     '''
     
     byteOrder = 'little'
@@ -79,12 +93,14 @@ class IndexProviderHandler(HandlerProcessor):
         assert isinstance(self.encoding, str), 'Invalid encoding %s' % self.encoding
         super().__init__()
 
-    def process(self, chain, response:HeadersRequire, assemblage:Assemblage, content:Content, **keyargs):
+    def process(self, chain, response:HeadersRequire, responseCnt:ResponseContent, assemblage:Assemblage, content:Content,
+                **keyargs):
         '''
         @see: HandlerProcessor.process
         
         Provide the index for content.
         '''
+        assert isinstance(responseCnt, ResponseContent), 'Invalid response content %s' % responseCnt
         assert isinstance(assemblage, Assemblage), 'Invalid assemblage %s' % assemblage
         assert isinstance(content, Content), 'Invalid content %s' % content
         
@@ -93,10 +109,70 @@ class IndexProviderHandler(HandlerProcessor):
         assert callable(assemblage.provider), 'Invalid blocks provider %s' % assemblage.provider
         
         value = CONTENT_INDEX.fetchOnce(response)
-        if not value: return  # No content index available for processing.
-        assert isinstance(value, str), 'Invalid value %s' % value
-        bvalue = value.encode(self.encoding)
-        bvalue = binascii.a2b_base64(bvalue)
+        if value:
+            assert isinstance(value, str), 'Invalid value %s' % value
+            bvalue = binascii.a2b_base64(value.encode(self.encoding))
+        else:
+            value = CONTENT_INDEX_LENGTH.fetchOnce(response)
+            if not value: return  # No content index available for processing.
+            bvalue = self.trailer(response, responseCnt, int(value))
+            if bvalue is None: return
+        
+        if bvalue[:1] == bytes((VERSION,)):
+            try: indexes = decodeIndexes(bvalue, assemblage.provider, self.encoding)
+            except ValueError as e:
+                log.error('Cannot decode the content index: %s' % e)
+                return
+        else:
+            indexes = self.decodeLegacy(bvalue, assemblage.provider)
+            if indexes is None: return
+        
+        if content.indexes is None: content.indexes = indexes
+        else: content.indexes.extend(indexes)
+        
+    def trailer(self, response, responseCnt, length):
+        '''
+        Separates the content index from the end of the response content.
+        
+        @param response: HeadersRequire
+            The response to adjust the content length for.
+        @param responseCnt: ResponseContent
+            The response content that ends with the content index.
+        @param length: integer
+            The content index length.
+        @return: bytes|None
+            The content index or None if the response content is not available.
+        '''
+        assert isinstance(responseCnt, ResponseContent), 'Invalid response content %s' % responseCnt
+        assert isinstance(length, int), 'Invalid length %s' % length
+        
+        source = responseCnt.source
+        if source is None: return
+        if not isinstance(source, IInputStream):
+            assert isinstance(source, Iterable), 'Invalid source %s' % source
+            source = StreamOnIterable(source)
+        try: body = source.read()
+        finally:
+            if isinstance(source, IClosable): source.close()
+        if len(body) < length:
+            log.error('The content is shorter then the content index length %s' % length)
+            return
+        
+        responseCnt.source = BytesIO(body[:len(body) - length])
+        if CONTENT_LENGTH.fetch(response) is not None: CONTENT_LENGTH.put(response.headers, str(len(body) - length))
+        return body[len(body) - length:]
+        
+    def decodeLegacy(self, bvalue, provider):
+        '''
+        Decodes the content index that has the fixed size integers format.
+        
+        @param bvalue: bytes
+            The compressed content index.
+        @param provider: callable(integer) -> Block|None
+            The blocks provider.
+        @return: list[Index]|None
+            The indexes or None if the content index cannot be decoded.
+        '''
         bvalue = zlib.decompress(bvalue)
         read = BytesIO(bvalue)
         
@@ -105,7 +181,7 @@ class IndexProviderHandler(HandlerProcessor):
             count -= 1
             
             blockId = self._int(read, self.bytesBlock)
-            block = assemblage.provider(blockId)
+            block = provider(blockId)
             if block is None:
                 log.error('Cannot get a block for id %s' % blockId)
                 return
@@ -133,9 +209,8 @@ class IndexProviderHandler(HandlerProcessor):
             for key in index.block.keys:
                 index.values[key] = values[index.values[key]]
         
-        if content.indexes is None: content.indexes = indexes
-        else: content.indexes.extend(indexes)
-
+        return indexes
+    
     # ----------------------------------------------------------------
     
     def _int(self, inp, nbytes):
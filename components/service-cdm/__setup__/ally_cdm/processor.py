@@ -24,6 +24,24 @@ def repository_paths():
     ''' The repository absolute or relative (to the distribution folder) path from where to serve the files '''
     return [path.join('workspace', 'shared', 'cdm')]
 
+@ioc.config
+def content_cache_size():
+    '''
+    The maximum number of bytes of the small files content that are kept in memory, the files metadata is also cached
+    and checked against the file modification time every "content_cache_check" seconds.
+    '''
+    return 16 * 1024 * 1024
+
+@ioc.config
+def content_cache_file_size():
+    ''' The maximum size in bytes of a file that has the content kept in memory'''
+    return 256 * 1024
+
+@ioc.config
+def content_cache_check():
+    ''' The time in seconds after which a cached file is checked for modifications'''
+    return 1
+
 # --------------------------------------------------------------------
 # Creating the processors used in handling the request
 
@@ -31,6 +49,9 @@ def repository_paths():
 def contentDelivery() -> Handler:
     b = ContentDeliveryHandler()
     b.repositoryPaths = repository_paths()
+    b.cacheSize = content_cache_size()
+    b.cacheFileSize = content_cache_file_size()
+    b.cacheCheckInterval = content_cache_check()
     return b
 
 # --------------------------------------------------------------------
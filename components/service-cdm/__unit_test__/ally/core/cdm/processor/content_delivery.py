@@ -0,0 +1,163 @@
+'''
+Created on Oct 18, 2026
+
+@package: service CDM
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the content delivery validators and ranges.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container.ioc import initialize
+from ally.core.cdm.processor.content_delivery import ContentDeliveryHandler, \
+    Response, ResponseContent
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.execution import FILL_ALL
+from ally.http.spec.server import RequestHTTP
+from ally.support.util_io import FileRegion
+from tempfile import TemporaryDirectory
+import os
+import unittest
+
+# --------------------------------------------------------------------
+
+CONTENT = bytes(range(256)) * 4
+
+class TestContentDelivery(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        with open(os.path.join(self.directory.name, 'file.bin'), 'wb') as f: f.write(CONTENT)
+
+        self.handler = handler = ContentDeliveryHandler()
+        handler.repositoryPaths = [self.directory.name]
+        handler.cacheSize = 3000
+        handler.cacheFileSize = 2000
+        handler.cacheCheckInterval = 0
+        assembly = Assembly('CDM', reportUnused=False)
+        assembly.add(initialize(handler))
+        self.processing = assembly.create(request=RequestHTTP, response=Response, responseCnt=ResponseContent)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def deliver(self, uri='file.bin', **headers):
+        request = self.processing.ctx.request()
+        request.scheme, request.method, request.uri = 'http', 'GET', uri
+        request.headers = {name.replace('_', '-'): value for name, value in headers.items()}
+        arg = self.processing.execute(FILL_ALL, request=request)
+        if arg.responseCnt.source is not None:
+            content = arg.responseCnt.source.read()
+            arg.responseCnt.source.close()
+        else: content = None
+        return arg.response, arg.responseCnt, content
+
+    def testFull(self):
+        response, responseCnt, content = self.deliver()
+        self.assertEqual(200, response.status)
+        self.assertEqual(CONTENT, content)
+        self.assertEqual(len(CONTENT), responseCnt.length)
+        self.assertEqual('bytes', response.headers['Accept-Ranges'])
+        self.assertIn('ETag', response.headers)
+        self.assertIn('Last-Modified', response.headers)
+
+        self.assertEqual(404, self.deliver('missing.bin')[0].status)
+        self.assertEqual(404, self.deliver('../file.bin')[0].status)
+
+    def testConditional(self):
+        response, _responseCnt, _content = self.deliver()
+        etag, modified = response.headers['ETag'], response.headers['Last-Modified']
+
+        response, responseCnt, content = self.deliver(If_None_Match=etag)
+        self.assertEqual(304, response.status)
+        self.assertIsNone(content)
+        self.assertEqual(304, self.deliver(If_None_Match='"other", %s' % etag)[0].status)
+        self.assertEqual(304, self.deliver(If_Modified_Since=modified)[0].status)
+        self.assertEqual(200, self.deliver(If_None_Match='"other"', If_Modified_Since=modified)[0].status)
+        self.assertEqual(200, self.deliver(If_Modified_Since='Thu, 01 Jan 1970 00:00:00 GMT')[0].status)
+
+    def testSingleRange(self):
+        response, responseCnt, content = self.deliver(Range='bytes=10-19')
+        self.assertEqual(206, response.status)
+        self.assertEqual(CONTENT[10:20], content)
+        self.assertEqual(10, responseCnt.length)
+        self.assertEqual('bytes 10-19/%s' % len(CONTENT), response.headers['Content-Range'])
+
+        self.assertEqual(CONTENT[-100:], self.deliver(Range='bytes=-100')[2])
+        self.assertEqual(CONTENT[1000:], self.deliver(Range='bytes=1000-')[2])
+        self.assertEqual(CONTENT[1000:], self.deliver(Range='bytes=1000-5000')[2])
+
+        response, responseCnt, _content = self.deliver()
+        self.assertEqual(206, self.deliver(Range='bytes=0-0', If_Range=response.headers['ETag'])[0].status)
+        self.assertEqual(200, self.deliver(Range='bytes=0-0', If_Range='"other"')[0].status)
+        self.assertEqual(200, self.deliver(Range='bytes=5-1')[0].status)
+
+        response, responseCnt, _content = self.deliver(Range='bytes=5000-6000')
+        self.assertEqual(416, response.status)
+        self.assertEqual('bytes */%s' % len(CONTENT), response.headers['Content-Range'])
+
+    def testMultipleRanges(self):
+        response, responseCnt, content = self.deliver(Range='bytes=0-9, 100-109')
+        self.assertEqual(206, response.status)
+        self.assertTrue(responseCnt.type.startswith('multipart/byteranges; boundary='))
+        boundary = responseCnt.type.partition('boundary=')[2].encode()
+        self.assertEqual(responseCnt.length, len(content))
+
+        parts = content.split(b'--' + boundary)
+        self.assertEqual(4, len(parts))
+        self.assertEqual(b'--\r\n', parts[-1])
+        self.assertTrue(parts[1].endswith(b'\r\n\r\n' + CONTENT[0:10] + b'\r\n'))
+        self.assertIn(('Content-Range: bytes 100-109/%s' % len(CONTENT)).encode(), parts[2])
+        self.assertTrue(parts[2].endswith(b'\r\n\r\n' + CONTENT[100:110] + b'\r\n'))
+
+    def testCache(self):
+        self.assertEqual(CONTENT, self.deliver()[2])
+        self.assertEqual((0, 1), (self.handler.hits, self.handler.misses))
+        self.assertEqual(CONTENT, self.deliver()[2])
+        self.assertEqual(CONTENT[1:3], self.deliver(Range='bytes=1-2')[2])
+        self.assertEqual((2, 1), (self.handler.hits, self.handler.misses))
+        self.assertEqual(CONTENT, self.handler.entryFor('file.bin').content)
+
+        # The modified file is detected by the modification time and size check.
+        with open(os.path.join(self.directory.name, 'file.bin'), 'wb') as f: f.write(CONTENT * 2)
+        response, responseCnt, content = self.deliver()
+        self.assertEqual(CONTENT * 2, content)
+        self.assertIsInstance(responseCnt.source, FileRegion)
+        self.assertIsNone(self.handler.entryFor('file.bin').content)
+        self.assertEqual(2, self.handler.misses)
+
+        for name in ('a', 'b', 'c'):
+            with open(os.path.join(self.directory.name, name), 'wb') as f: f.write(CONTENT)
+            self.assertEqual(CONTENT, self.deliver(name)[2])
+        # Only two files content fits in the cache size so the least recently used is evicted.
+        self.assertEqual(['file.bin', 'b', 'c'], list(self.handler._entries))
+
+        os.remove(os.path.join(self.directory.name, 'c'))
+        self.assertEqual(404, self.deliver('c')[0].status)
+        self.assertEqual(['file.bin', 'b'], list(self.handler._entries))
+
+    def testOverlappingRepositories(self):
+        # The file from the last repository takes precedence over the same file from the previous repositories.
+        with TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'file.bin'), 'wb') as f: f.write(b'overlapping')
+            with open(os.path.join(directory, 'other.bin'), 'wb') as f: f.write(b'other')
+            os.mkdir(os.path.join(self.directory.name, 'other.bin'))
+            self.handler.repositoryPaths.append(directory)
+            self.assertEqual(b'overlapping', self.deliver()[2])
+            self.assertEqual(b'other', self.deliver('other.bin')[2])
+
+            os.remove(os.path.join(directory, 'file.bin'))
+            self.assertEqual(CONTENT, self.deliver()[2])
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    unittest.main()
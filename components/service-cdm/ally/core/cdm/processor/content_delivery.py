@@ -14,14 +14,26 @@ from ally.design.processor.attribute import requires, defines
 from ally.design.processor.context import Context
 from ally.design.processor.handler import HandlerProcessor
 from ally.http.spec.codes import METHOD_NOT_AVAILABLE, PATH_NOT_FOUND, \
-    PATH_FOUND, CodedHTTP
+    PATH_FOUND, CodedHTTP, NOT_MODIFIED, PARTIAL_CONTENT, RANGE_NOT_SATISFIABLE
+from ally.http.spec.headers import HeadersRequire, HeadersDefines, ETAG, \
+    LAST_MODIFIED, IF_NONE_MATCH, IF_MODIFIED_SINCE, IF_RANGE, RANGE, \
+    ACCEPT_RANGES, CONTENT_RANGE
 from ally.http.spec.server import HTTP_GET
-from ally.support.util_io import IInputStream
+from ally.support.util_io import IInputStream, IInputStreamClosable, FileRegion
+from collections import OrderedDict
+from email.utils import formatdate, parsedate
+from io import BytesIO
 from mimetypes import guess_type
-from os.path import isdir, isfile, join, normpath
+from os.path import isdir, join, normpath
+from stat import S_ISREG
+from threading import Lock
 from urllib.parse import unquote
+from uuid import uuid4
+import calendar
 import logging
 import os
+import re
+import time
 
 # --------------------------------------------------------------------
 
@@ -29,7 +41,7 @@ log = logging.getLogger(__name__)
 
 # --------------------------------------------------------------------
 
-class Request(Context):
+class Request(HeadersRequire):
     '''
     The request context.
     '''
@@ -38,7 +50,7 @@ class Request(Context):
     uri = requires(str)
     method = requires(str)
 
-class Response(CodedHTTP):
+class Response(CodedHTTP, HeadersDefines):
     '''
     The response context.
     '''
@@ -82,10 +94,25 @@ class ContentDeliveryHandler(HandlerProcessor):
     # The directory where the file repository is
     defaultContentType = 'application/octet-stream'
     # The default mime type to set on the content response if None could be guessed
+    maximumRanges = 20
+    # The maximum number of ranges accepted in a request, if more are requested the whole content is delivered.
+    cacheMaximumEntries = 10000
+    # The maximum number of repository entries kept in the cache, if 0 then no entries are cached.
+    cacheSize = 16 * 1024 * 1024
+    # The maximum number of bytes of files content kept in the cache.
+    cacheFileSize = 256 * 1024
+    # The maximum size in bytes of a file that has the content kept in the cache.
+    cacheCheckInterval = 1
+    # The time in seconds after which a cached entry is checked against the file modification time.
 
     def __init__(self):
         assert isinstance(self.repositoryPaths, list), 'Invalid repository paths value %s' % self.repositoryPaths
         assert isinstance(self.defaultContentType, str), 'Invalid default content type %s' % self.defaultContentType
+        assert isinstance(self.cacheMaximumEntries, int), 'Invalid cache maximum entries %s' % self.cacheMaximumEntries
+        assert isinstance(self.cacheSize, int), 'Invalid cache size %s' % self.cacheSize
+        assert isinstance(self.cacheFileSize, int), 'Invalid cache file size %s' % self.cacheFileSize
+        assert isinstance(self.cacheCheckInterval, (int, float)), \
+        'Invalid cache check interval %s' % self.cacheCheckInterval
         self.repositoryPaths = [ normpath(path) for path in self.repositoryPaths ]
         if __debug__:
             for path in self.repositoryPaths:
@@ -96,6 +123,13 @@ class ContentDeliveryHandler(HandlerProcessor):
                         log.warning('Unable to access the repository directory %s', path)
         super().__init__()
 
+        self._rexRange = re.compile('^\\s*(\\d*)\\s*-\\s*(\\d*)\\s*$')
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        # The cache statistics.
+        self.hits = self.misses = 0
+
     def process(self, chain, request:Request, response:Response, responseCnt:ResponseContent, **keyargs):
         '''
         @see: HandlerProcessor.process
@@ -112,23 +146,285 @@ class ContentDeliveryHandler(HandlerProcessor):
             METHOD_NOT_AVAILABLE.set(response)
             return
 
-        # Initialize the read file handler with None value
-        # This will be set upon successful file open
-        rf, size = None, None
-        for repositoryPath in self.repositoryPaths:
-            entryPath = normpath(join(repositoryPath, unquote(request.uri)))
-            # Make sure the given path points inside the repository
-            if not entryPath.startswith(repositoryPath):
-                break
-            elif isfile(entryPath):
-                rf, size = open(entryPath, 'rb'), os.path.getsize(entryPath)
-    
-        if rf is None:
+        entry = self.entryFor(request.uri)
+        if entry is None:
             PATH_NOT_FOUND.set(response)
-        else:
-            PATH_FOUND.set(response)
-            responseCnt.source = rf
-            responseCnt.length = size
-            responseCnt.type, responseCnt.charSet = guess_type(entryPath)
-            if not responseCnt.type: responseCnt.type = self.defaultContentType
             return
+        assert isinstance(entry, Entry), 'Invalid entry %s' % entry
+
+        ETAG.put(response, entry.etag)
+        LAST_MODIFIED.put(response, entry.lastModified)
+        ACCEPT_RANGES.put(response, 'bytes')
+
+        if self.isNotModified(request, entry.etag, entry.modified):
+            NOT_MODIFIED.set(response)
+            return
+
+        ranges = None
+        value = RANGE.fetch(request)
+        if value:
+            ifRange = IF_RANGE.fetch(request)
+            if not ifRange or ifRange in (entry.etag, entry.lastModified): ranges = self.parseRanges(value, entry.size)
+
+        responseCnt.type, responseCnt.charSet = entry.type, entry.charSet
+
+        if ranges is None:
+            PATH_FOUND.set(response)
+            if entry.content is not None: responseCnt.source = BytesIO(entry.content)
+            else: responseCnt.source = FileRegion(open(entry.path, 'rb'), 0, entry.size)
+            responseCnt.length = entry.size
+        elif not ranges:
+            RANGE_NOT_SATISFIABLE.set(response)
+            CONTENT_RANGE.put(response, 'bytes */%s' % entry.size)
+            responseCnt.type = responseCnt.charSet = None
+            responseCnt.length = 0
+        elif len(ranges) == 1:
+            PARTIAL_CONTENT.set(response)
+            start, end = ranges[0]
+            CONTENT_RANGE.put(response, 'bytes %s-%s/%s' % (start, end, entry.size))
+            if entry.content is not None: responseCnt.source = BytesIO(entry.content[start:end + 1])
+            else: responseCnt.source = FileRegion(open(entry.path, 'rb'), start, end - start + 1)
+            responseCnt.length = end - start + 1
+        else:
+            PARTIAL_CONTENT.set(response)
+            if entry.charSet: contentType = '%s; charset=%s' % (entry.type, entry.charSet)
+            else: contentType = entry.type
+            parts, length, boundary = [], 0, uuid4().hex
+            for start, end in ranges:
+                header = ('\r\n--%s\r\nContent-Type: %s\r\nContent-Range: bytes %s-%s/%s\r\n\r\n' %
+                          (boundary, contentType, start, end, entry.size)).encode('latin-1')
+                parts.append(header)
+                parts.append((start, end - start + 1))
+                length += len(header) + end - start + 1
+            parts.append(('\r\n--%s--\r\n' % boundary).encode('latin-1'))
+            length += len(parts[-1])
+
+            if entry.content is not None: responseCnt.source = StreamRanges(BytesIO(entry.content), parts)
+            else: responseCnt.source = StreamRanges(open(entry.path, 'rb'), parts)
+            responseCnt.length = length
+            responseCnt.type, responseCnt.charSet = 'multipart/byteranges; boundary=%s' % boundary, None
+
+    # ----------------------------------------------------------------
+
+    def entryFor(self, uri):
+        '''
+        Provides the repository entry for the URI, the entries are kept in a least recently used cache and they are
+        checked against the file modification time if the check interval has passed since the last check.
+
+        @param uri: string
+            The URI to provide the entry for.
+        @return: Entry|None
+            The entry or None if there is no file for the URI.
+        '''
+        assert isinstance(uri, str), 'Invalid URI %s' % uri
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(uri)
+            if entry is None: self.misses += 1
+            else: self._entries.move_to_end(uri)
+        if entry is not None:
+            assert isinstance(entry, Entry), 'Invalid entry %s' % entry
+            if now - entry.checked < self.cacheCheckInterval or entry.isValid(now):
+                with self._lock: self.hits += 1
+                return entry
+            with self._lock:
+                self.misses += 1
+                if self._entries.get(uri) is entry: self._remove(uri)
+
+        # The last repository that has the file takes precedence.
+        for repositoryPath in reversed(self.repositoryPaths):
+            path = normpath(join(repositoryPath, unquote(uri)))
+            # Make sure the given path points inside the repository
+            if not path.startswith(repositoryPath): return
+            try: stat = os.stat(path)
+            except OSError: continue
+            if S_ISREG(stat.st_mode): break
+        else: return
+
+        entry = Entry(path, stat, now)
+        entry.type, entry.charSet = guess_type(path)
+        if not entry.type: entry.type = self.defaultContentType
+        if self.cacheMaximumEntries <= 0: return entry
+
+        if entry.size <= self.cacheFileSize:
+            with open(path, 'rb') as f: content = f.read(entry.size + 1)
+            # We only keep the content if the file has not been changed while reading.
+            if len(content) == entry.size: entry.content = content
+
+        with self._lock:
+            if uri in self._entries: self._remove(uri)
+            self._entries[uri] = entry
+            if entry.content is not None: self._size += entry.size
+            while len(self._entries) > self.cacheMaximumEntries: self._remove(next(iter(self._entries)))
+            if self._size > self.cacheSize:
+                # Only the least recently used entries that have content are removed in order to free the cache size.
+                for key in [key for key, entry in self._entries.items() if entry.content is not None]:
+                    self._remove(key)
+                    if self._size <= self.cacheSize: break
+        return entry
+
+    def _remove(self, uri):
+        '''
+        Removes the entry for the URI from the cache, needs to be called while holding the cache lock.
+        '''
+        entry = self._entries.pop(uri)
+        if entry.content is not None: self._size -= entry.size
+
+    # ----------------------------------------------------------------
+
+    def isNotModified(self, request, etag, modified):
+        '''
+        Checks the request conditional headers.
+
+        @param request: Request
+            The request to check.
+        @param etag: string
+            The entity tag of the file.
+        @param modified: float
+            The file modification time stamp.
+        @return: boolean
+            True if the client already has the file content, False otherwise.
+        '''
+        assert isinstance(request, Request), 'Invalid request %s' % request
+
+        tags = IF_NONE_MATCH.decode(request)
+        if tags:
+            for tag in tags:
+                if tag == '*' or tag == etag or (tag.startswith('W/') and tag[2:] == etag): return True
+            # If none match takes precedence over the if modified since.
+            return False
+
+        value = IF_MODIFIED_SINCE.fetch(request)
+        if value:
+            since = parsedate(value)
+            if since is not None and int(modified) <= calendar.timegm(since): return True
+        return False
+
+    def parseRanges(self, value, size):
+        '''
+        Parse the bytes ranges.
+
+        @param value: string
+            The range header value.
+        @param size: integer
+            The file size.
+        @return: list[tuple(integer, integer)]|None
+            The satisfiable ranges as tuples with the first and last byte position, an empty list if no range is
+            satisfiable, None if the ranges are invalid or to many in which case the whole content is delivered.
+        '''
+        assert isinstance(value, str), 'Invalid value %s' % value
+        unit, _sep, specs = value.partition('=')
+        if unit.strip().lower() != 'bytes': return
+
+        ranges = []
+        for spec in specs.split(','):
+            match = self._rexRange.match(spec)
+            if not match: return
+            first, last = match.groups()
+            if first:
+                start = int(first)
+                if last:
+                    end = int(last)
+                    if end < start: return
+                else: end = size - 1
+                if start >= size: continue
+                ranges.append((start, min(end, size - 1)))
+            elif last:
+                if not int(last) or not size: continue
+                ranges.append((max(size - int(last), 0), size - 1))
+            else: return
+        if len(ranges) > self.maximumRanges: return
+        return ranges
+
+# --------------------------------------------------------------------
+
+class Entry:
+    '''
+    The repository file entry.
+    '''
+    __slots__ = ('path', 'size', 'modified', 'etag', 'lastModified', 'type', 'charSet', 'content', 'checked')
+
+    def __init__(self, path, stat, checked):
+        '''
+        Construct the entry.
+
+        @param path: string
+            The file path.
+        @param stat: stat_result
+            The file status.
+        @param checked: float
+            The time stamp when the file status has been taken.
+        '''
+        assert isinstance(path, str), 'Invalid path %s' % path
+        self.path = path
+        self.size = stat.st_size
+        self.modified = stat.st_mtime
+        self.etag = '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+        self.lastModified = formatdate(stat.st_mtime, usegmt=True)
+        self.type = self.charSet = self.content = None
+        self.checked = checked
+
+    def isValid(self, now):
+        '''
+        Checks if the entry file has not been modified.
+
+        @param now: float
+            The current time stamp.
+        @return: boolean
+            True if the entry is still valid, False otherwise.
+        '''
+        try: stat = os.stat(self.path)
+        except OSError: return False
+        if not S_ISREG(stat.st_mode) or stat.st_mtime != self.modified or stat.st_size != self.size: return False
+        self.checked = now
+        return True
+
+class StreamRanges(IInputStreamClosable):
+    '''
+    Provides the multiple ranges content stream for a file.
+    '''
+    __slots__ = ('_file', '_parts', '_region')
+
+    def __init__(self, file, parts):
+        '''
+        Construct the ranges stream.
+
+        @param file: file object
+            The file to provide the ranges from.
+        @param parts: list[bytes|tuple(integer, integer)]
+            The parts of the content, either bytes or tuples with the file offset and count.
+        '''
+        assert isinstance(parts, list), 'Invalid parts %s' % parts
+        self._file = file
+        self._parts = parts
+        self._region = None
+
+    def read(self, nbytes=None):
+        '''
+        @see: IInputStreamClosable.read
+        '''
+        if self._file is None: raise ValueError('I/O operation on closed stream.')
+        if nbytes is None or nbytes < 0:
+            data = bytearray()
+            while True:
+                part = self.read(1024 * 1024)
+                if not part: return bytes(data)
+                data.extend(part)
+
+        while self._region is None or not self._region.remaining:
+            if not self._parts: return b''
+            part = self._parts.pop(0)
+            if isinstance(part, bytes):
+                if len(part) > nbytes: self._parts.insert(0, part[nbytes:])
+                return part[:nbytes]
+            self._region = FileRegion(self._file, *part)
+        return self._region.read(nbytes)
+
+    def close(self):
+        '''
+        @see: IInputStreamClosable.close
+        '''
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -12,7 +12,8 @@ Provides the configurations for delivering files from the local file system.
 from ..ally_gateway.processor import assemblyGateway, \
     gatewayAuthorizedRepository, assemblyRESTRequest, updateAssemblyGateway, \
     cleanup_interval, gatewaySelector, gatewayForward
-from ..ally_http.processor import contentLengthEncode, headerEncodeResponse
+from ..ally_http.processor import contentLengthEncode, headerEncodeResponse, \
+    forward_maximum_connections, forward_maximum_idle, forward_idle_timeout, forward_wait_timeout
 from ally.container import ioc
 from ally.container.error import ConfigError
 from ally.design.processor.assembly import Assembly
@@ -85,6 +86,10 @@ def recaptchaForward() -> Handler:
     b = ForwardHTTPHandler()
     b.externalHost = recaptcha_external_host()
     b.externalPort = recaptcha_external_port()
+    b.maximumConnections = forward_maximum_connections()
+    b.maximumIdle = forward_maximum_idle()
+    b.idleTimeout = forward_idle_timeout()
+    b.waitTimeout = forward_wait_timeout()
     return b
 
 @ioc.entity
@@ -11,7 +11,8 @@ Provides the configurations for delivering files from the local file system.
 
 
 from ..ally_http.processor import acceptRequestEncode, internalError, \
-    contentLengthDecode
+    contentLengthDecode, \
+    forward_maximum_connections, forward_maximum_idle, forward_idle_timeout, forward_wait_timeout
 from ally.container import ioc
 from ally.design.processor.assembly import Assembly
 from ally.design.processor.handler import Handler
@@ -84,9 +85,17 @@ def cleanup_interval() -> float:
 def cleanup_authorized_interval() -> float:
     '''
     The authorized gateway data cleanup interval in seconds, this is the inactivity time for an authorization until it
-    gets cleared
+    gets cleared, also the interval the authorized gateway refreshes the data for an active authorization
     '''
     return 60
+
+@ioc.config
+def cleanup_authorized_maximum() -> int:
+    '''
+    The maximum number of authorizations to keep the gateway data for, when exceeded the least recently used
+    authorizations are cleared
+    '''
+    return 10000
 @ioc.config
 def read_from_params():
     '''If true will allow the gateway proxy server to read the authorization headers also from parameters.'''
@@ -161,6 +170,7 @@ def gatewayAuthorizedRepository() -> Handler:
     b = GatewayAuthorizedRepositoryHandler()
     b.uri = gateway_authorized_uri()
     b.cleanupInterval = cleanup_authorized_interval()
+    b.maximumAuthorizations = cleanup_authorized_maximum()
     b.requesterGetJSON = requesterRESTGetJSON()
     return b
 
@@ -187,6 +197,10 @@ def externalForward() -> Handler:
     b = ForwardHTTPHandler()
     b.externalHost = external_host()
     b.externalPort = external_port()
+    b.maximumConnections = forward_maximum_connections()
+    b.maximumIdle = forward_maximum_idle()
+    b.idleTimeout = forward_idle_timeout()
+    b.waitTimeout = forward_wait_timeout()
     return b
 
 # --------------------------------------------------------------------
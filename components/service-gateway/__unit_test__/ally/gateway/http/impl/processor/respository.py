@@ -0,0 +1,289 @@
+'''
+Created on Oct 18, 2026
+
+@package: gateway service
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing and benchmarking for the indexed gateways repository.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.handler import HandlerProcessor
+from ally.gateway.http.impl.processor.respository import GatewayRepository, \
+    MatchRepository, GatewayRepositoryHandler, Identifier, Identifiers, Repository, \
+    IdentifiersCache, literalPrefix
+from ally.http.spec.server import HTTP_OPTIONS
+import logging
+from threading import Thread
+import random
+import re
+import time
+import timeit
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+class ContextsHandler(HandlerProcessor):
+
+    def process(self, chain, gateway:GatewayRepository, match:MatchRepository, **keyargs): pass
+
+assembly = Assembly('Test gateways', reportUnused=False)
+assembly.add(ContextsHandler())
+processing = assembly.create(gateway=GatewayRepository, match=MatchRepository)
+Gateway, Match = processing.ctx.gateway, processing.ctx.match
+
+def identifiersFor(objs):
+    handler = GatewayRepositoryHandler()
+    return [handler.populate(Identifier(Gateway()), obj) for obj in objs]
+
+def aclPattern(root, *names):
+    '''
+    Provides the pattern in the same way as the ACL gateways are generated.
+    '''
+    pattern = [re.escape(root), '\\/']
+    for name in names:
+        if name: pattern.extend((re.escape(name), '\\/'))
+        else: pattern.append('([^\\/]+)\\/')
+    pattern[-1] = '[\\/]?(?:\\.|$)'
+    return '^%s' % ''.join(pattern)
+
+def randomGateways(count, seed=1):
+    '''
+    Provides the random gateway objects like the ones provided by the ACL and the plugins.
+    '''
+    rnd = random.Random(seed)
+    models = ['Model%s' % k for k in range(count // 10 + 1)]
+    objs = []
+    for k in range(count):
+        obj = {}
+        kind = k % 100
+        if kind == 0: obj['Pattern'] = '^resources(?:/|(?=\\.)|$)(.*)'
+        elif kind == 1: obj['Pattern'] = '^(?:resources|content)/%s' % rnd.choice(models)
+        else:
+            names = ['Plugin%s' % rnd.randint(0, 9), rnd.choice(models)]
+            if rnd.random() < 0.5: names.append(None)
+            if rnd.random() < 0.3: names.append('Sub%s' % rnd.randint(0, 3))
+            obj['Pattern'] = aclPattern('resources', *names)
+        if rnd.random() < 0.4: obj['Methods'] = rnd.sample(['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'], 2)
+        if rnd.random() < 0.1: obj['Headers'] = ['X-Filter:%s' % rnd.randint(0, 2)]
+        if rnd.random() < 0.05: obj['Errors'] = [401, 404]
+        if rnd.random() < 0.01: obj['Clients'] = ['127\\.0\\.0\\.%s' % rnd.randint(0, 3)]
+        objs.append(obj)
+    return objs
+
+def randomRequests(count, gateways, seed=2):
+    rnd = random.Random(seed)
+    models = ['Model%s' % k for k in range(gateways // 10 + 1)]
+    requests = []
+    for _k in range(count):
+        uri = 'resources/Plugin%s/%s' % (rnd.randint(0, 9), rnd.choice(models))
+        if rnd.random() < 0.5: uri += '/%s' % rnd.randint(1, 100)
+        if rnd.random() < 0.3: uri += '/Sub%s' % rnd.randint(0, 3)
+        if rnd.random() < 0.2: uri += '.json'
+        if rnd.random() < 0.1: uri = 'content/%s' % rnd.choice(models)
+        if rnd.random() < 0.02: uri = None
+        method = rnd.choice(['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
+        headers = {'X-Filter': str(rnd.randint(0, 3))} if rnd.random() < 0.5 else None
+        error = rnd.choice([None, None, None, 401, 404])
+        requests.append((method, headers, uri, error))
+    return requests
+
+# --------------------------------------------------------------------
+
+class RepositoryLinear:
+    '''
+    The linear scanning repository used as a reference.
+    '''
+
+    def __init__(self, clientIP, identifiers):
+        self._clientIP = clientIP
+        self._identifiers = identifiers
+
+    def find(self, method=None, headers=None, uri=None, error=None):
+        for identifier in self._identifiers:
+            if identifier.clients and self._clientIP is not None:
+                for client in identifier.clients:
+                    if client.match(self._clientIP): break
+                else: return
+            groupsURI = self._macth(identifier, method, headers, uri, error)
+            if groupsURI is not None: return identifier.gateway, groupsURI
+
+    def allowsFor(self, headers=None, uri=None):
+        allowed = set()
+        for identifier in self._identifiers:
+            if self._macth(identifier, None, headers, uri, None) is not None: allowed.update(identifier.methods)
+        allowed.discard(HTTP_OPTIONS)
+        return allowed
+
+    def _macth(self, identifier, method, headers, uri, error):
+        if method is not None and identifier.methods and method.upper() not in identifier.methods: return
+        if headers is not None:
+            if identifier.headers and not any(pattern.match('%s:%s' % nameValue)
+                                              for nameValue in headers.items() for pattern in identifier.headers):
+                return
+        elif identifier.headers: return
+        groupsURI = ()
+        if identifier.pattern:
+            if uri is None: return
+            matcher = identifier.pattern.match(uri)
+            if not matcher: return
+            groupsURI = matcher.groups()
+        if error is not None:
+            if error not in identifier.errors: return
+        elif identifier.errors: return
+        return groupsURI
+
+# --------------------------------------------------------------------
+
+class TestRepository(unittest.TestCase):
+
+    def testLiteralPrefix(self):
+        prefixes = {
+                    '^resources\\/HR\\/User\\/([^\\/]+)[\\/]?(?:\\.|$)': 'resources/HR/User/',
+                    '^resources(?:/|(?=\\.)|$)(.*)': 'resources',
+                    '^resources|content': '',
+                    '^(?:resources|content)/': '',
+                    '^[|(]resources': '',
+                    'resources/Users?': 'resources/User',
+                    'resources/Use{1,2}r': 'resources/Us',
+                    'resources/Us+er': 'resources/Us',
+                    '^resources\\d+': 'resources',
+                    '(?i)resources': '',
+                    '.*': '',
+                    }
+        for pattern, prefix in prefixes.items(): self.assertEqual(prefix, literalPrefix(re.compile(pattern)), pattern)
+
+    def testFirstMatchAndClients(self):
+        identifiers = identifiersFor([
+                                      {'Pattern': '^resources/Public/(.*)'},
+                                      {'Pattern': '^resources/Admin/(.*)', 'Clients': ['10\\.0\\.0\\.1']},
+                                      {'Pattern': '^resources/(.*)', 'Methods': ['GET']},
+                                      {'Errors': [404]},
+                                      ])
+        repository = Repository('10.0.0.2', Identifiers(identifiers), Match)
+        match = repository.find('GET', None, 'resources/Public/x')
+        self.assertIs(identifiers[0].gateway, match.gateway)
+        self.assertEqual(('x',), match.groupsURI)
+        # Any identifier positioned after an identifier that forbids the client is not reachable.
+        self.assertIsNone(repository.find('GET', None, 'resources/Other/x'))
+        self.assertIsNone(repository.find(error=404))
+
+        repository = Repository('10.0.0.1', Identifiers(identifiers), Match)
+        self.assertIs(identifiers[1].gateway, repository.find('GET', None, 'resources/Admin/x').gateway)
+        self.assertIs(identifiers[2].gateway, repository.find('GET', None, 'resources/Other/x').gateway)
+        self.assertIs(identifiers[3].gateway, repository.find(error=404).gateway)
+        self.assertEqual({'GET'}, repository.allowsFor(None, 'resources/Other/x'))
+
+    def testSameAsLinear(self):
+        identifiers = identifiersFor(randomGateways(500))
+        indexed = Identifiers(identifiers)
+        for clientIP in (None, '127.0.0.1', '127.0.0.2', '10.0.0.1'):
+            repository, linear = Repository(clientIP, indexed, Match), RepositoryLinear(clientIP, identifiers)
+            for method, headers, uri, error in randomRequests(2000, 500):
+                match, expected = repository.find(method, headers, uri, error), linear.find(method, headers, uri, error)
+                if expected is None: self.assertIsNone(match)
+                else:
+                    self.assertIsNotNone(match, 'No match for %s %s' % (method, uri))
+                    self.assertIs(expected[0], match.gateway)
+                    self.assertEqual(expected[1], match.groupsURI)
+                self.assertEqual(linear.allowsFor(headers, uri), repository.allowsFor(headers, uri))
+
+class TestIdentifiersCache(unittest.TestCase):
+
+    def testCoalesce(self):
+        cache, fetched, results = IdentifiersCache('Test refresh', 60), [], []
+        def fetch():
+            fetched.append(True)
+            time.sleep(0.1)
+            return Identifiers([]), None
+        threads = [Thread(target=lambda: results.append(cache.get('key', fetch))) for _k in range(10)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+
+        self.assertEqual(1, len(fetched))
+        self.assertEqual(10, len(results))
+        self.assertEqual(1, len(set(id(identifiers) for identifiers, _error in results)))
+
+    def testStaleWhileRefresh(self):
+        cache, fetched = IdentifiersCache('Test refresh', 0.05), []
+        def fetch():
+            fetched.append(Identifiers([]))
+            if len(fetched) > 1: time.sleep(0.1)
+            return fetched[-1], None
+
+        first, _error = cache.get('key', fetch)
+        time.sleep(0.06)
+        # The refresh is made in background while the previous identifiers are provided.
+        self.assertIs(first, cache.get('key', fetch)[0])
+        self.assertIs(first, cache.get('key', fetch)[0])
+        time.sleep(0.2)
+        self.assertEqual(2, len(fetched))
+        self.assertIs(fetched[-1], cache.get('key', fetch)[0])
+
+    def testFailures(self):
+        class Error:
+            def __init__(self, status): self.status = status
+        cache = IdentifiersCache('Test refresh', 0, isKept=lambda error: error.status != 400)
+
+        self.assertEqual((None, 'error'), cache.get('key', lambda: (None, 'error')))
+        identifiers = Identifiers([])
+        self.assertIs(identifiers, cache.get('key', lambda: (identifiers, None))[0])
+        # A server failure on refresh keeps the previous identifiers.
+        self.assertIs(identifiers, cache.get('key', lambda: (None, Error(500)))[0])
+        time.sleep(0.05)
+        self.assertIs(identifiers, cache.get('key', lambda: (None, Error(400)))[0])
+        time.sleep(0.05)
+        self.assertNotIn('key', cache._entries)
+
+    def testLimits(self):
+        cache = IdentifiersCache('Test refresh', 60, timeOut=0.05, maximum=2)
+        for key in ('a', 'b', 'a', 'c'): cache.get(key, lambda: (Identifiers([]), None))
+        self.assertEqual(['a', 'c'], list(cache._entries))
+        time.sleep(0.06)
+        cache.get('d', lambda: (Identifiers([]), None))
+        cache.cleanup()
+        self.assertEqual(['d'], list(cache._entries))
+
+# --------------------------------------------------------------------
+
+class BenchmarkRepository(unittest.TestCase):
+
+    gateways = 10000
+    # The number of gateways in the benchmarked repository.
+    requests = 200
+    # The number of requests matched.
+
+    def testBenchmark(self):
+        identifiers = identifiersFor(randomGateways(self.gateways))
+        repository = Repository(None, Identifiers(identifiers), Match)
+        linear = RepositoryLinear(None, identifiers)
+        requests = randomRequests(self.requests, self.gateways)
+
+        def findAll(repository):
+            for method, headers, uri, error in requests:
+                repository.find(method, headers, uri, error)
+                repository.allowsFor(headers, uri)
+
+        timeLinear = timeit.timeit(lambda: findAll(linear), number=1)
+        timeIndexed = timeit.timeit(lambda: findAll(repository), number=1)
+        log.info('Matched %s requests against %s gateways, linear %.4fs, indexed %.4fs (%.2fx)', self.requests,
+                 self.gateways, timeLinear, timeIndexed, timeLinear / timeIndexed)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -17,8 +17,13 @@ from ally.gateway.http.spec.gateway import IRepository, RepositoryJoined
 from ally.http.spec.codes import BAD_GATEWAY, CodedHTTP
 from ally.http.spec.server import HTTP_OPTIONS
 from ally.support.http.request import RequesterGetJSON
+from ally.support.util_fork import atFork
+from collections import OrderedDict
+from datetime import datetime
+from queue import Queue
 from sched import scheduler
-from threading import Thread
+from threading import Thread, Lock, Event
+import heapq
 import logging
 import re
 import time
@@ -104,7 +109,8 @@ class GatewayRepositoryHandler(HandlerProcessor):
     uri = str
     # The URI used in fetching the gateways.
     cleanupInterval = float
-    # The number of seconds to perform clean up for cached gateways.
+    # The number of seconds after which the cached gateways are refreshed, the refresh is made in background while the
+    # previous gateways are still used.
     requesterGetJSON = RequesterGetJSON
     # The requester for getting the JSON gateway objects.
     
@@ -126,16 +132,13 @@ class GatewayRepositoryHandler(HandlerProcessor):
         assert issubclass(Gateway, GatewayRepository), 'Invalid gateway class %s' % Gateway
         assert issubclass(Match, MatchRepository), 'Invalid match class %s' % Match
         
-        if self._identifiers is None:
-            jobj, error = self.requesterGetJSON.request(self.uri, details=True)
-            if jobj is None:
-                BAD_GATEWAY.set(response)
-                response.text = error.text
-                return
-            assert 'GatewayList' in jobj, 'Invalid objects %s, not GatewayList' % jobj
-            self._identifiers = [self.populate(Identifier(Gateway()), obj) for obj in jobj['GatewayList']]
+        identifiers, error = self._cache.get(self.uri, lambda: self.fetchIdentifiers(self.uri, Gateway))
+        if identifiers is None:
+            BAD_GATEWAY.set(response)
+            response.text = error.text
+            return
             
-        repository = Repository(request.clientIP, self._identifiers, Match)
+        repository = Repository(request.clientIP, identifiers, Match)
         if request.repository: request.repository = RepositoryJoined(request.repository, repository)
         else: request.repository = repository
 
@@ -145,33 +148,53 @@ class GatewayRepositoryHandler(HandlerProcessor):
         '''
         Initialize the repository.
         '''
-        self._identifiers = None
-        self.startCleanupThread('Cleanup gateways thread')
+        self._cache = IdentifiersCache('Refresh gateways thread', self.cleanupInterval)
    
     def startCleanupThread(self, name):
         '''
-        Starts the cleanup thread.
+        Starts the cleanup thread, the thread is also restarted in the forked processes.
         
         @param name: string
             The name for the thread.
         '''
-        schedule = scheduler(time.time, time.sleep)
-        def executeCleanup():
-            self.performCleanup()
+        def startCleanup():
+            schedule = scheduler(time.time, time.sleep)
+            def executeCleanup():
+                self.performCleanup()
+                schedule.enter(self.cleanupInterval, 1, executeCleanup, ())
             schedule.enter(self.cleanupInterval, 1, executeCleanup, ())
-        schedule.enter(self.cleanupInterval, 1, executeCleanup, ())
-        scheduleRunner = Thread(name=name, target=schedule.run)
-        scheduleRunner.daemon = True
-        scheduleRunner.start()
+            scheduleRunner = Thread(name=name, target=schedule.run)
+            scheduleRunner.daemon = True
+            scheduleRunner.start()
+        startCleanup()
+        atFork(child=startCleanup)
 
     def performCleanup(self):
         '''
         Performs the cleanup for gateways.
         '''
-        self._identifiers = None
+        self._cache.cleanup()
     
     # ----------------------------------------------------------------
     
+    def fetchIdentifiers(self, uri, Gateway, headers=None):
+        '''
+        Fetches the gateways identifiers.
+        
+        @param uri: string
+            The URI to fetch the gateways from.
+        @param Gateway: class
+            The gateway context class.
+        @param headers: dictionary{string: string}|None
+            Additional headers to be placed on the request.
+        @return: tuple(Identifiers|None, RequesterGetJSON.Error)
+            The identifiers, None if the gateways could not be fetched, and the request error.
+        '''
+        jobj, error = self.requesterGetJSON.request(uri, details=True, headers=headers)
+        if jobj is None: return None, error
+        assert 'GatewayList' in jobj, 'Invalid objects %s, not GatewayList' % jobj
+        return Identifiers([self.populate(Identifier(Gateway()), obj) for obj in jobj['GatewayList']]), error
+    
     def populate(self, identifier, obj):
         '''
         Populates the gateway based on the provided dictionary object.
@@ -192,7 +215,7 @@ class GatewayRepositoryHandler(HandlerProcessor):
             assert isinstance(clients, list), 'Invalid clients %s' % clients
             if __debug__:
                 for client in clients: assert isinstance(client, str), 'Invalid client value %s' % client
-            identifier.clients.extend(re.compile(client) for client in clients)
+            identifier.clients.extend(compiled(client) for client in clients)
             
         pattern = obj.get('Pattern')
         if pattern:
@@ -204,7 +227,7 @@ class GatewayRepositoryHandler(HandlerProcessor):
             assert isinstance(headers, list), 'Invalid headers %s' % headers
             if __debug__:
                 for header in headers: assert isinstance(header, str), 'Invalid header value %s' % header
-            identifier.headers.extend(re.compile(header) for header in headers)
+            identifier.headers.extend(compiled(header) for header in headers)
         
         methods = obj.get('Methods')
         if methods:
@@ -275,6 +298,243 @@ class Identifier:
         self.errors = set()
         self.methods = set()
 
+class Identifiers:
+    '''
+    Provides the identifiers indexed by the literal prefix of the URI patterns, this way only the identifiers that have
+    a chance to match an URI are checked.
+    '''
+    __slots__ = ('identifiers', '_byPrefix', '_lengths', '_withClients', '_barriers')
+    
+    maximumBarriers = 10000
+    # The maximum number of client IPs to keep the barrier positions for.
+    
+    def __init__(self, identifiers):
+        '''
+        Construct the indexed identifiers.
+        
+        @param identifiers: list[Identifier]
+            The identifiers to be indexed, the order of the identifiers is the order in which they are matched.
+        '''
+        assert isinstance(identifiers, list), 'Invalid identifiers %s' % identifiers
+        self.identifiers = identifiers
+        
+        self._byPrefix = {}
+        self._withClients = []
+        for position, identifier in enumerate(identifiers):
+            assert isinstance(identifier, Identifier), 'Invalid identifier %s' % identifier
+            if identifier.pattern is None: prefix = ''
+            else: prefix = literalPrefix(identifier.pattern)
+            positions = self._byPrefix.get(prefix)
+            if positions is None: positions = self._byPrefix[prefix] = []
+            positions.append(position)
+            if identifier.clients: self._withClients.append(position)
+        self._lengths = sorted(set(len(prefix) for prefix in self._byPrefix))
+        self._barriers = {}
+        
+    def candidates(self, uri):
+        '''
+        Provides the positions of the identifiers that might match the URI.
+        
+        @param uri: string|None
+            The URI to provide the candidates for, if None only the identifiers that have no literal prefix are provided.
+        @return: Iterable(integer)
+            The identifiers positions in ascending order.
+        '''
+        if uri is None: return self._byPrefix.get('', ())
+        assert isinstance(uri, str), 'Invalid URI %s' % uri
+        
+        found = []
+        for length in self._lengths:
+            if length > len(uri): break
+            positions = self._byPrefix.get(uri[:length])
+            if positions: found.append(positions)
+        
+        if not found: return ()
+        if len(found) == 1: return found[0]
+        return heapq.merge(*found)
+    
+    def barrierFor(self, clientIP):
+        '''
+        Provides the position of the first identifier that has clients and none of them matches the client IP, the
+        identifiers from this position onward are not reachable by the client.
+        
+        @param clientIP: string|None
+            The client IP.
+        @return: integer
+            The barrier position.
+        '''
+        if clientIP is None or not self._withClients: return len(self.identifiers)
+        
+        barrier = self._barriers.get(clientIP)
+        if barrier is None:
+            barrier = len(self.identifiers)
+            for position in self._withClients:
+                for client in self.identifiers[position].clients:
+                    if client.match(clientIP): break
+                else:
+                    barrier = position
+                    break
+            if len(self._barriers) >= self.maximumBarriers: self._barriers.clear()
+            self._barriers[clientIP] = barrier
+        return barrier
+
+class IdentifiersCache:
+    '''
+    Cache for the fetched identifiers, the cached identifiers are used while they are refreshed in background, and the
+    concurrent fetches for the same key are coalesced into one fetch.
+    '''
+    
+    def __init__(self, name, refreshInterval, timeOut=None, maximum=None, isKept=None):
+        '''
+        Construct the cache.
+        
+        @param name: string
+            The name for the refresh thread.
+        @param refreshInterval: integer|float
+            The number of seconds after which the identifiers are refreshed.
+        @param timeOut: integer|float|None
+            The number of seconds without access after which an entry is removed on cleanup, None to keep the entries.
+        @param maximum: integer|None
+            The maximum number of entries, when exceeded the least recently used entries are removed.
+        @param isKept: callable(object) -> boolean|None
+            Called with the error of a failed refresh, if it returns False the entry is removed, by default the
+            previous identifiers are kept.
+        '''
+        assert isinstance(name, str), 'Invalid name %s' % name
+        assert isinstance(refreshInterval, (int, float)), 'Invalid refresh interval %s' % refreshInterval
+        assert timeOut is None or isinstance(timeOut, (int, float)), 'Invalid time out %s' % timeOut
+        assert maximum is None or isinstance(maximum, int), 'Invalid maximum %s' % maximum
+        assert isKept is None or callable(isKept), 'Invalid kept callable %s' % isKept
+        
+        self.name = name
+        self.refreshInterval = refreshInterval
+        self.timeOut = timeOut
+        self.maximum = maximum
+        self.isKept = isKept
+        
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._refresh = None
+        atFork(child=self.reset)
+        
+    def get(self, key, fetch):
+        '''
+        Provides the identifiers for the key.
+        
+        @param key: object
+            The key of the identifiers.
+        @param fetch: callable() -> tuple(Identifiers|None, object)
+            The fetch used if there are no identifiers cached, also used for refreshing, provides the identifiers
+            and the error.
+        @return: tuple(Identifiers|None, object)
+            The identifiers, None if the identifiers could not be fetched, and the error.
+        '''
+        assert callable(fetch), 'Invalid fetch %s' % fetch
+        
+        current = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = Entry(fetch, current)
+                if self.maximum is not None and len(self._entries) > self.maximum: self._entries.popitem(last=False)
+                isFetcher = True
+            else:
+                self._entries.move_to_end(key)
+                entry.fetch, entry.accessed, isFetcher = fetch, current, False
+                if entry.identifiers is not None:
+                    if not entry.refreshing and current - entry.fetched >= self.refreshInterval:
+                        entry.refreshing = True
+                        self.scheduleRefresh(key, entry)
+                    return entry.identifiers, None
+        
+        if isFetcher:
+            identifiers = error = None
+            try: identifiers, error = fetch()
+            finally:
+                # The identifiers are published under the lock together with the fetch time since the other callers
+                # check the refresh interval as soon as the identifiers are available.
+                with self._lock:
+                    entry.fetched = time.time()
+                    entry.identifiers, entry.error = identifiers, error
+                    if identifiers is None and self._entries.get(key) is entry: del self._entries[key]
+                entry.fetching.set()
+        else:
+            entry.fetching.wait()
+            # The fetch has raised an exception, we try to fetch again.
+            if entry.identifiers is None and entry.error is None: return self.get(key, fetch)
+        return entry.identifiers, entry.error
+    
+    def cleanup(self):
+        '''
+        Removes the entries that have not been accessed in the time out interval.
+        '''
+        if self.timeOut is None: return
+        expired = time.time() - self.timeOut
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry.accessed < expired]
+            for key in keys: del self._entries[key]
+        assert log.debug('Cleared %s entries at %s', len(keys), datetime.now()) or True
+        
+    def reset(self):
+        '''
+        Resets the cache in a forked process, the entries are not kept since the fetch and refresh threads of the forking
+        process are not available anymore.
+        '''
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._refresh = None
+        
+    # ----------------------------------------------------------------
+    
+    def scheduleRefresh(self, key, entry):
+        '''
+        Schedules the refresh of the entry, the refresh thread is started if is not running.
+        '''
+        if self._refresh is None:
+            self._refresh = Queue()
+            refreshRunner = Thread(name=self.name, target=self.performRefresh, args=(self._refresh,))
+            refreshRunner.daemon = True
+            refreshRunner.start()
+        self._refresh.put((key, entry))
+    
+    def performRefresh(self, refresh):
+        '''
+        Performs the refresh of the entries placed in the refresh queue.
+        '''
+        assert isinstance(refresh, Queue), 'Invalid refresh queue %s' % refresh
+        while True:
+            key, entry = refresh.get()
+            assert isinstance(entry, Entry), 'Invalid entry %s' % entry
+            try: identifiers, error = entry.fetch()
+            except:
+                log.exception('Cannot refresh the identifiers for \'%s\'', key)
+                identifiers, error = None, None
+            
+            with self._lock:
+                entry.refreshing = False
+                if identifiers is not None: entry.identifiers, entry.fetched = identifiers, time.time()
+                elif self.isKept is not None and not self.isKept(error):
+                    if self._entries.get(key) is entry: del self._entries[key]
+                else: entry.fetched = time.time()  # The previous identifiers are used until the next refresh.
+
+class Entry:
+    '''
+    The identifiers cache entry.
+    '''
+    __slots__ = ('fetch', 'identifiers', 'error', 'fetched', 'accessed', 'refreshing', 'fetching')
+    
+    def __init__(self, fetch, accessed):
+        '''
+        Construct the entry.
+        '''
+        self.fetch = fetch
+        self.identifiers = None
+        self.error = None
+        self.fetched = None
+        self.accessed = accessed
+        self.refreshing = False
+        self.fetching = Event()
+
 class Repository(IRepository):
     '''
     The gateways repository.
@@ -285,11 +545,11 @@ class Repository(IRepository):
         '''
         Construct the gateways repository based on the provided dictionary object.
         
-        @param identifiers: list[Identifier]
-            The identifiers to be used by the repository.
+        @param identifiers: Identifiers
+            The indexed identifiers to be used by the repository.
         '''
         assert clientIP is None or isinstance(clientIP, str), 'Invalid client IP %s' % clientIP
-        assert isinstance(identifiers, list), 'Invalid identifiers %s' % identifiers
+        assert isinstance(identifiers, Identifiers), 'Invalid identifiers %s' % identifiers
         assert issubclass(Match, MatchRepository), 'Invalid match class %s' % Match
         
         self._clientIP = clientIP
@@ -300,33 +560,55 @@ class Repository(IRepository):
         '''
         @see: IRepository.find
         '''
-        for identifier in self._identifiers:
-            assert isinstance(identifier, Identifier), 'Invalid identifier %s' % identifier
-            
-            if identifier.clients and self._clientIP is not None:
-                for client in identifier.clients:
-                    if client.match(self._clientIP): break
-                else: return
-                
-            groupsURI = self._macth(identifier, method, headers, uri, error)
+        identifiers = self._identifiers
+        assert isinstance(identifiers, Identifiers)
+        
+        barrier = identifiers.barrierFor(self._clientIP)
+        matcher = Matcher(headers)
+        for position in identifiers.candidates(uri):
+            # An identifier that is not accessible by the client stops the search.
+            if position >= barrier: return
+            identifier = identifiers.identifiers[position]
+            groupsURI = matcher.match(identifier, method, uri, error)
             if groupsURI is not None: return self._Match(gateway=identifier.gateway, groupsURI=groupsURI)
         
     def allowsFor(self, headers=None, uri=None):
         '''
         @see: IRepository.allowsFor
         '''
+        identifiers = self._identifiers
+        assert isinstance(identifiers, Identifiers)
+        
         allowed = set()
-        for identifier in self._identifiers:
-            assert isinstance(identifier, Identifier), 'Invalid identifier %s' % identifier
-            groupsURI = self._macth(identifier, None, headers, uri, None)
+        matcher = Matcher(headers)
+        for position in identifiers.candidates(uri):
+            identifier = identifiers.identifiers[position]
+            groupsURI = matcher.match(identifier, None, uri, None)
             if groupsURI is not None: allowed.update(identifier.methods)
         # We need to remove auxiliar methods
         allowed.discard(HTTP_OPTIONS)
         return allowed
 
-    # ----------------------------------------------------------------
+class Matcher:
+    '''
+    Checks the identifiers match for the provided headers, the headers patterns results are cached since the same
+    patterns are used by many identifiers.
+    '''
+    __slots__ = ('_headers', '_matched')
+    
+    def __init__(self, headers):
+        '''
+        Construct the matcher.
+        
+        @param headers: dictionary{string: string}|None
+            The headers to be matched.
+        '''
+        assert headers is None or isinstance(headers, dict), 'Invalid headers %s' % headers
+        if headers is not None: self._headers = ['%s:%s' % nameValue for nameValue in headers.items()]
+        else: self._headers = None
+        self._matched = {}
     
-    def _macth(self, identifier, method, headers, uri, error):
+    def match(self, identifier, method, uri, error):
         '''
         Checks the match for the provided identifier and parameters.
         
@@ -341,18 +623,14 @@ class Repository(IRepository):
             if identifier.methods:
                 if method.upper() not in identifier.methods: return
         
-        if headers is not None:
-            assert isinstance(headers, dict), 'Invalid headers %s' % uri
-            isOk = False
+        if self._headers is not None:
             if identifier.headers:
-                for nameValue in headers.items():
-                    header = '%s:%s' % nameValue
-                    for pattern in identifier.headers:
-                        if pattern.match(header):
-                            isOk = True
-                            break
+                for pattern in identifier.headers:
+                    isOk = self._matched.get(pattern)
+                    if isOk is None:
+                        isOk = self._matched[pattern] = any(pattern.match(header) for header in self._headers)
                     if isOk: break
-                if not isOk: return
+                else: return
         elif identifier.headers: return
                 
         if uri is not None:
@@ -371,3 +649,72 @@ class Repository(IRepository):
         elif identifier.errors: return
             
         return groupsURI
+
+# --------------------------------------------------------------------
+
+def compiled(pattern):
+    '''
+    Provides the compiled regex for the pattern, the same compiled regex is provided for the same pattern.
+    
+    @param pattern: string
+        The regex pattern.
+    @return: regex
+        The compiled regex.
+    '''
+    regex = _compiled.get(pattern)
+    if regex is None:
+        if len(_compiled) >= 10000: _compiled.clear()
+        regex = _compiled[pattern] = re.compile(pattern)
+    return regex
+_compiled = {}
+
+def literalPrefix(regex):
+    '''
+    Provides the literal prefix that every string matched by the regex starts with.
+    
+    @param regex: regex
+        The compiled regex to provide the prefix for.
+    @return: string
+        The literal prefix, empty string if the regex has no literal prefix.
+    '''
+    pattern = regex.pattern
+    if not isinstance(pattern, str) or regex.flags & re.IGNORECASE or hasAlternative(pattern): return ''
+    
+    prefix, k = [], 1 if pattern.startswith('^') else 0
+    while k < len(pattern):
+        char, step = pattern[k], 1
+        if char == '\\':
+            # Only the escaped non alpha numeric characters are literals.
+            if k + 1 >= len(pattern) or pattern[k + 1].isalnum(): break
+            char, step = pattern[k + 1], 2
+        elif char in '.^$*+?{}[]()': break
+        # The character is optional if followed by a quantifier that allows zero occurrences.
+        if pattern[k + step:k + step + 1] in ('*', '?', '{'): break
+        prefix.append(char)
+        k += step
+    return ''.join(prefix)
+
+def hasAlternative(pattern):
+    '''
+    Checks if the regex pattern has alternatives that are not enclosed in a group.
+    
+    @param pattern: string
+        The regex pattern to check.
+    @return: boolean
+        True if the pattern has top level alternatives, False otherwise.
+    '''
+    depth, inSet, k = 0, False, 0
+    while k < len(pattern):
+        char = pattern[k]
+        if char == '\\': k += 1
+        elif inSet: inSet = char != ']'
+        elif char == '[':
+            inSet = True
+            # A closing bracket placed first in the set is a literal.
+            if pattern[k + 1:k + 2] == '^': k += 1
+            if pattern[k + 1:k + 2] == ']': k += 1
+        elif char == '(': depth += 1
+        elif char == ')': depth -= 1
+        elif char == '|' and depth == 0: return True
+        k += 1
+    return False
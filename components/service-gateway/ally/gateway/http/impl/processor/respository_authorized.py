@@ -10,15 +10,14 @@ Provides the gateway repository processor.
 '''
 
 from . import respository
-from .respository import GatewayRepositoryHandler, Repository, Identifier, \
-    Response
+from .respository import GatewayRepositoryHandler, Repository, \
+    IdentifiersCache, Response
 from ally.container.ioc import injected
 from ally.design.processor.attribute import requires, defines
 from ally.design.processor.context import Context
 from ally.gateway.http.spec.gateway import IRepository, RepositoryJoined
 from ally.http.spec.codes import BAD_REQUEST, BAD_GATEWAY, INVALID_AUTHORIZATION
 from ally.http.spec.headers import HeaderRaw, HeadersRequire
-from datetime import datetime, timedelta
 from urllib.parse import quote
 import logging
 
@@ -54,12 +53,14 @@ class GatewayAuthorizedRepositoryHandler(GatewayRepositoryHandler):
     
     nameAuthorization = 'Authorization'
     # The header name for the session identifier.
+    maximumAuthorizations = 10000
+    # The maximum number of authorizations to keep the gateways for, the least recently used are removed first.
     
     def __init__(self):
         assert isinstance(self.nameAuthorization, str), 'Invalid authorization name %s' % self.nameAuthorization
+        assert isinstance(self.maximumAuthorizations, int), \
+        'Invalid maximum authorizations %s' % self.maximumAuthorizations
         super().__init__()
-        
-        self._timeOut = timedelta(seconds=self.cleanupInterval)
 
     def process(self, chain, request:Request, response:Response, Gateway:Context, Match:Context, **keyargs):
         '''
@@ -74,26 +75,21 @@ class GatewayAuthorizedRepositoryHandler(GatewayRepositoryHandler):
         authentication = AUTHORIZATION.fetch(request)
         if not authentication: return
         
-        repository = self._repositories.get(authentication)
-        if repository is None:
-            jobj, error = self.requesterGetJSON.request(self.uri % quote(authentication), details=True)
-            if jobj is None:
-                if error.status == BAD_REQUEST.status:
-                    INVALID_AUTHORIZATION.set(response)
-                    if request.repository:
-                        assert isinstance(request.repository, IRepository), 'Invalid repository %s' % request.repository
-                        request.match = request.repository.find(request.method, request.headers, request.uri,
-                                                                INVALID_AUTHORIZATION.status)
-                else:
-                    BAD_GATEWAY.set(response)
-                    response.text = error.text
-                return
-            assert 'GatewayList' in jobj, 'Invalid objects %s, not GatewayList' % jobj
-            repository = Repository(request.clientIP, [self.populate(Identifier(Gateway()), obj)
-                                                       for obj in jobj['GatewayList']], Match)
-            self._repositories[authentication] = repository
-        self._lastAccess[authentication] = datetime.now()
+        uri = self.uri % quote(authentication)
+        identifiers, error = self._cache.get(authentication, lambda: self.fetchIdentifiers(uri, Gateway))
+        if identifiers is None:
+            if error.status == BAD_REQUEST.status:
+                INVALID_AUTHORIZATION.set(response)
+                if request.repository:
+                    assert isinstance(request.repository, IRepository), 'Invalid repository %s' % request.repository
+                    request.match = request.repository.find(request.method, request.headers, request.uri,
+                                                            INVALID_AUTHORIZATION.status)
+            else:
+                BAD_GATEWAY.set(response)
+                response.text = error.text
+            return
         
+        repository = Repository(request.clientIP, identifiers, Match)
         if request.repository: request.repository = RepositoryJoined(repository, request.repository)
         else: request.repository = repository
     
@@ -103,19 +99,8 @@ class GatewayAuthorizedRepositoryHandler(GatewayRepositoryHandler):
         '''
         @see: GatewayRepositoryHandler.initialize
         '''
-        self._repositories = {}
-        self._lastAccess = {}
+        # An invalid authorization is removed, the next request for it will fail.
+        isKept = lambda error: error is None or error.status != BAD_REQUEST.status
+        self._cache = IdentifiersCache('Refresh authorized gateways thread', self.cleanupInterval,
+                                       self.cleanupInterval, self.maximumAuthorizations, isKept)
         self.startCleanupThread('Cleanup authorized gateways thread')
-
-    def performCleanup(self):
-        '''
-        @see: GatewayRepositoryHandler.performCleanup
-        '''
-        current, expired = datetime.now() - self._timeOut, []
-        for authentication, lastAccess in self._lastAccess.items():
-            if current > lastAccess: expired.append(authentication)
-        
-        assert log.debug('Clearing %s sessions at %s' % (len(expired), datetime.now())) or True
-        for authentication in expired:
-            self._repositories.pop(authentication, None)
-            self._lastAccess.pop(authentication, None)
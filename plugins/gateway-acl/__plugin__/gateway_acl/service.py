@@ -10,7 +10,8 @@ Contains the services for ACL.
 '''
     
 from ..gateway.service import updateAssemblyAnonymousGateways, \
-    assemblyAnonymousGateways, gatewayMethodMerge, registerMethodOverride
+    assemblyAnonymousGateways, gatewayMethodMerge, registerMethodOverride, \
+    gatewaysCache
 from ..plugin.registry import registerService
 from .database import binders
 from acl.api.group import IGroupService
@@ -19,6 +20,7 @@ from acl.core.impl.processor.gateway.acl_permission import \
 from acl.core.impl.processor.gateway.compensate import \
     RegisterCompensatePermissionHandler
 from acl.core.impl.processor.gateway.root_uri import RootURIHandler
+from acl.meta.metadata_acl import meta
 from ally.container import ioc, support, bind
 from ally.container.support import entityFor
 from ally.design.processor.assembly import Assembly
@@ -79,6 +81,9 @@ def updateAssemblyAnonymousGatewaysForAcl():
     assemblyAnonymousGateways().add(anonymousGroup(), rootURI(), registerAclPermission(), registerCompensatePermission(),
                                     registerPermissionGateway(), before=gatewayMethodMerge())
 
+@ioc.after(gatewaysCache)
+def updateGatewaysCacheForAcl(): gatewaysCache().watch(meta)
+
 @ioc.after(assemblyGroupGateways)
 def updateAssemblyGroupGateways():
     assemblyGroupGateways().add(registerAclPermission(), registerCompensatePermission(), rootURI(), registerPermissionGateway(),
@@ -0,0 +1,87 @@
+'''
+Created on Oct 18, 2026
+
+@package: gateway acl
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides unit testing for the permissions gateways generation.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from acl.api.access import Access
+from acl.core.impl.processor.gateway.permission_gateway import \
+    RegisterPermissionGatewayHandler, HEADER_FILTER_INPUT
+from ally.design.processor.attribute import defines
+from ally.design.processor.context import Context, create
+from ally.design.processor.resolvers import resolversFor
+import re
+import unittest
+
+# --------------------------------------------------------------------
+
+class PermissionDefine(Context):
+    access = defines(Access)
+    filters = defines(dict)
+    navigate = defines(str)
+
+Permission = create(resolversFor(dict(Permission=PermissionDefine)))['Permission']
+
+def accessFor(path, method='GET', priority=1):
+    access = Access()
+    access.Path, access.Method, access.Priority = path, method, priority
+    return access
+
+# --------------------------------------------------------------------
+
+class TestPermissionGateway(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = RegisterPermissionGatewayHandler()
+
+    def testPatterns(self):
+        permissions = [Permission(access=accessFor('User/*/Item/*', 'PUT', 2), filters={}),
+                       Permission(access=accessFor('User/*', priority=1), filters={}, navigate='User/%(user)s')]
+        gateways = list(self.handler.iterateGateways(permissions, 'resources', {'user': '1'}))
+
+        self.assertEqual(['GET', 'PUT'], [gateway.Methods[0] for gateway in gateways])
+        self.assertEqual('resources/User/1', gateways[0].Navigate)
+        self.assertTrue(re.match(gateways[0].Pattern, 'resources/User/12.json'))
+        self.assertFalse(re.match(gateways[0].Pattern, 'resources/User/12/Item'))
+        self.assertTrue(re.match(gateways[1].Pattern, 'resources/User/12/Item/3'))
+
+        self.assertIs(self.handler.patternFor('User/*', 'resources'), self.handler.patternFor('User/*', 'resources'))
+        self.assertNotEqual(self.handler.patternFor('User/*', 'resources'), self.handler.patternFor('User/*'))
+
+    def testFilters(self):
+        filtersFirst = {1: {'Filter/User/{1}'}}, {'User': {'Filter/User/{User}'}}
+        filtersSecond = {1: {'Filter/Admin/{1}'}, 2: {'Filter/Item/{2}'}}, {'User': {'Filter/Admin/{User}'}}
+        permission = Permission(access=accessFor('User/*/Item/*'), filters={'first': filtersFirst, 'second': filtersSecond})
+
+        gateway, = self.handler.iterateGateways([permission], 'resources')
+        self.assertEqual(['1:resources/Filter/Admin/{1}', '1:resources/Filter/User/{1}'], gateway.Filters)
+        self.assertEqual('Property;User=resources/Filter/Admin/{User}|resources/Filter/User/{User}',
+                         gateway.PutHeaders[HEADER_FILTER_INPUT])
+
+        # The permissions filters are not altered by the generation.
+        self.assertEqual(({1: {'Filter/User/{1}'}}, {'User': {'Filter/User/{User}'}}), filtersFirst)
+        gateway, = self.handler.iterateGateways([permission], 'resources')
+        self.assertEqual(['1:resources/Filter/Admin/{1}', '1:resources/Filter/User/{1}'], gateway.Filters)
+
+        # A group without filters cancels the other groups filters.
+        permission.filters['third'] = {}, {}
+        gateway, = self.handler.iterateGateways([permission], 'resources')
+        self.assertIsNone(gateway.Filters)
+        self.assertIsNone(gateway.PutHeaders)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    unittest.main()
@@ -63,6 +63,8 @@ class RegisterPermissionGatewayHandler(HandlerProcessor):
     
     def __init__(self):
         super().__init__(Permission=Permission)
+        
+        self._patterns = {}
     
     def process(self, chain, solicit:Solicit, **keyargs):
         '''
@@ -97,14 +99,9 @@ class RegisterPermissionGatewayHandler(HandlerProcessor):
             assert isinstance(perm.access, Access), 'Invalid permission access %s' % perm.access
             assert isinstance(perm.filters, dict), 'Invalid permission filters %s' % perm.filters
             assert isinstance(perm.access.Path, str), 'Invalid access path %s' % perm.access.Path
-        
-            pattern = '%s[\\/]?(?:\\.|$)' % '([^\\/]+)'.join(re.escape(pitem) for pitem in perm.access.Path.split('*'))
-            if rootURI:
-                assert isinstance(rootURI, str), 'Invalid root URI %s' % rootURI
-                pattern = '%s\/%s' % (re.escape(rootURI), pattern)
             
             gateway = Gateway()
-            gateway.Pattern = '^%s' % pattern
+            gateway.Pattern = self.patternFor(perm.access.Path, rootURI)
             gateway.Methods = [perm.access.Method]
             
             filtersEntry = filtersProperty = None
@@ -117,9 +114,7 @@ class RegisterPermissionGatewayHandler(HandlerProcessor):
                     for position, paths in pathsEntry.items():
                         assert isinstance(paths, set), 'Invalid indexed paths %s' % paths
                         cpaths = filtersEntry.get(position)
-                        if cpaths:
-                            paths.update(cpaths)
-                            nfilters[position] = paths
+                        if cpaths: nfilters[position] = paths | cpaths
                     filtersEntry = nfilters
                     
                 if filtersProperty is None: filtersProperty = pathsProperty
@@ -128,9 +123,7 @@ class RegisterPermissionGatewayHandler(HandlerProcessor):
                     for name, paths in pathsProperty.items():
                         assert isinstance(paths, set), 'Invalid indexed paths %s' % paths
                         cpaths = filtersProperty.get(name)
-                        if cpaths:
-                            paths.update(cpaths)
-                            nfilters[position] = paths
+                        if cpaths: nfilters[name] = paths | cpaths
                     filtersProperty = nfilters
                 
                 if not filtersEntry and not filtersProperty: break  # There are no more filters to process.
@@ -163,3 +156,23 @@ class RegisterPermissionGatewayHandler(HandlerProcessor):
                 gateway.Navigate = path
                 
             yield gateway
+
+    def patternFor(self, path, rootURI=None):
+        '''
+        Provides the gateway pattern for the access path, the patterns are compiled only once for a path.
+        
+        @param path: string
+            The access path to provide the pattern for.
+        @param rootURI: string|None
+            The root URI to prefix the pattern with.
+        @return: string
+            The gateway pattern.
+        '''
+        pattern = self._patterns.get((path, rootURI))
+        if pattern is None:
+            pattern = '%s[\\/]?(?:\\.|$)' % '([^\\/]+)'.join(re.escape(pitem) for pitem in path.split('*'))
+            if rootURI:
+                assert isinstance(rootURI, str), 'Invalid root URI %s' % rootURI
+                pattern = '%s\/%s' % (re.escape(rootURI), pattern)
+            pattern = self._patterns[(path, rootURI)] = '^%s' % pattern
+        return pattern
@@ -18,6 +18,7 @@ from ally.design.processor.attribute import defines, requires
 from ally.design.processor.context import Context
 from ally.design.processor.execution import Processing, FILL_CLASSES
 from collections import Iterable
+from gateway.core.impl.cache import GatewaysCache
 
 # --------------------------------------------------------------------
 
@@ -44,10 +45,13 @@ class GatewayACLService(IGatewayACLService):
     
     assemblyGroupGateways = Assembly; wire.entity('assemblyGroupGateways')
     # The assembly to be used for generating gateways
+    gatewaysCache = GatewaysCache; wire.entity('gatewaysCache')
+    # The cache for the generated gateways.
     
     def __init__(self):
         assert isinstance(self.assemblyGroupGateways, Assembly), \
         'Invalid assembly gateways %s' % self.assemblyGroupGateways
+        assert isinstance(self.gatewaysCache, GatewaysCache), 'Invalid gateways cache %s' % self.gatewaysCache
         
         self._processing = self.assemblyGroupGateways.create(solicit=Solicit)
     
@@ -56,7 +60,14 @@ class GatewayACLService(IGatewayACLService):
         @see: IGatewayACLService.getGateways
         '''
         assert isinstance(group, str), 'Invalid group name %s' % group
-        
+        return self.gatewaysCache.get((IGatewayACLService, group), lambda: self.generateGateways(group))
+    
+    # ----------------------------------------------------------------
+    
+    def generateGateways(self, group):
+        '''
+        Generates the gateways for the ACL group.
+        '''
         proc = self._processing
         assert isinstance(proc, Processing), 'Invalid processing %s' % proc
         
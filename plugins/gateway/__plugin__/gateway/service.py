@@ -16,6 +16,8 @@ from ally.container.support import entityFor
 from ally.design.processor.assembly import Assembly
 from ally.support.api.util_service import copyContainer
 from gateway.api.gateway import IGatewayService, Custom
+from gateway.core.impl.cache import GatewaysCache
+from gateway.meta.metadata_gateway import meta
 import logging
 import re
 from ally.api.error import InputError
@@ -40,6 +42,22 @@ support.loadAllEntities(SERVICES)
 
 # --------------------------------------------------------------------
 
+@ioc.config
+def gateways_cache_time_out():
+    '''
+    The number of seconds the generated gateways are cached for, the gateways are refreshed anyway whenever the data
+    used for generating them is changed by this application.
+    '''
+    return 60
+
+# --------------------------------------------------------------------
+
+@ioc.entity
+def gatewaysCache() -> GatewaysCache:
+    b = GatewaysCache()
+    b.timeOut = gateways_cache_time_out()
+    return b
+
 @ioc.entity
 def assemblyAnonymousGateways() -> Assembly:
     ''' The assembly used for generating anonymous gateways'''
@@ -56,6 +74,9 @@ def defaultGateways() -> list: return []
 def updateAssemblyAnonymousGateways():
     assemblyAnonymousGateways().add(registerDatabaseGateway(), gatewayMethodMerge(), registerMethodOverride())
 
+@ioc.after(gatewaysCache)
+def updateGatewaysCacheForGateway(): gatewaysCache().watch(meta)
+
 @app.populate(app.DEVEL)
 def populateDefaulyGateways():
     serviceGateway = entityFor(IGatewayService)
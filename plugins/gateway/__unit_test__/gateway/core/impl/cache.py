@@ -0,0 +1,176 @@
+'''
+Created on Oct 18, 2026
+
+@package: gateway
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides unit testing for the generated gateways cache.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container.ioc import initialize
+from ally.design.processor.assembly import Assembly
+from gateway.core.impl.cache import GatewaysCache, _caches
+from gateway.core.impl.processor.db_gateway import DatabaseGatewayProviderAlchemy, \
+    RegisterDatabaseGatewayHandler
+from gateway.impl.gateway import GatewayServiceAlchemy
+from gateway.meta.gateway import GatewayData
+from gateway.meta.metadata_gateway import meta
+from sql_alchemy.support.session import beginWith, openSession, endSessions
+from sqlalchemy.engine import create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm.session import sessionmaker
+from sqlalchemy.schema import Column
+from sqlalchemy.types import Integer
+import gc
+import json
+import logging
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+Other = declarative_base()
+
+class OtherData(Other):
+    __tablename__ = 'other'
+    id = Column('id', Integer, primary_key=True)
+
+def dataFor(k):
+    data = GatewayData()
+    data.name = 'gateway%s' % k
+    data.identifier = json.dumps({'Pattern': '^resources/item%s' % k, 'Methods': ['GET']}).encode()
+    data.navigate = json.dumps({'Navigate': None}).encode()
+    data.hash = str(k)
+    return data
+
+# --------------------------------------------------------------------
+
+class TestGatewaysCache(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine('sqlite:///:memory:')
+        meta.create_all(engine)
+        Other.metadata.create_all(engine)
+        beginWith(sessionmaker(bind=engine))
+        
+        self.provider = DatabaseGatewayProviderAlchemy()
+        self.cache = GatewaysCache()
+        initialize(self.cache)
+        self.cache.watch(meta)
+        self.generated = 0
+
+    def tearDown(self):
+        endSessions(lambda session: session.close())
+
+    def generate(self):
+        self.generated += 1
+        return self.provider.iterateGateways()
+
+    def patterns(self):
+        return [gateway.Pattern for gateway in self.cache.get('anonymous', self.generate)]
+
+    def testInvalidation(self):
+        openSession().add(dataFor(1))
+        openSession().commit()
+        self.assertEqual(['^resources/item1'], self.patterns())
+        self.assertEqual(['^resources/item1'], self.patterns())
+        self.assertEqual(1, self.generated)
+
+        # The session that has changes not committed does not use the cache.
+        openSession().add(dataFor(2))
+        openSession().flush()
+        self.assertEqual(['^resources/item1', '^resources/item2'], self.patterns())
+        self.assertEqual(2, self.generated)
+        openSession().rollback()
+        self.assertEqual(['^resources/item1'], self.patterns())
+        self.assertEqual(2, self.generated)
+
+        openSession().add(dataFor(2))
+        openSession().commit()
+        self.assertEqual(['^resources/item1', '^resources/item2'], self.patterns())
+        self.assertEqual(3, self.generated)
+
+        # Changes on tables that are not watched do not invalidate the cache.
+        openSession().add(OtherData(id=1))
+        openSession().commit()
+        self.patterns()
+        self.assertEqual(3, self.generated)
+
+        openSession().delete(openSession().query(GatewayData).get('gateway1'))
+        openSession().commit()
+        self.assertEqual(['^resources/item2'], self.patterns())
+        self.assertEqual(4, self.generated)
+
+        # The gateways deleted by the service invalidate the cache.
+        handler = RegisterDatabaseGatewayHandler()
+        handler.databaseGatewayProvider = self.provider
+        service = GatewayServiceAlchemy()
+        service.assemblyAnonymousGateways = Assembly('Anonymous gateways')
+        service.assemblyAnonymousGateways.add(initialize(handler))
+        service.gatewaysCache = self.cache
+        initialize(service)
+        self.assertEqual(['^resources/item2'], [gateway.Pattern for gateway in service.getAnonymous()])
+        self.assertTrue(service.delete('gateway2'))
+        self.assertFalse(service.delete('gateway3'))
+        openSession().commit()
+        self.assertEqual([], [gateway.Pattern for gateway in service.getAnonymous()])
+
+    def testReleased(self):
+        # The caches are notified through a single mapper listener so the caches not used anymore are released.
+        gc.collect()
+        count = len(_caches)
+        caches = [initialize(GatewaysCache()) for _k in range(3)]
+        for cache in caches: cache.watch(meta)
+        self.assertEqual(count + 3, len(_caches))
+        del caches, cache
+        gc.collect()
+        self.assertEqual(count, len(_caches))
+        openSession().add(dataFor(1))
+        openSession().commit()
+        self.assertEqual(['^resources/item1'], self.patterns())
+
+    def testExpiration(self):
+        self.cache.timeOut, self.cache.maximum = 0.1, 1
+        self.assertEqual([], self.patterns())
+        self.assertEqual(0, len(self.cache.get('other', tuple)))
+        self.patterns()
+        self.assertEqual(2, self.generated)
+        time.sleep(0.15)
+        self.patterns()
+        self.assertEqual(3, self.generated)
+
+    def testBenchmark(self):
+        for k in range(200): openSession().add(dataFor(k))
+        openSession().commit()
+
+        started = time.time()
+        for _k in range(100): gateways = tuple(self.generate())
+        generated = (time.time() - started) / 100
+        self.assertEqual(200, len(gateways))
+
+        self.patterns()
+        started = time.time()
+        for _k in range(100): self.patterns()
+        cached = (time.time() - started) / 100
+
+        log.info('Providing %s gateways, generated %.6fs, cached %.6fs (%.2fx)', len(gateways), generated, cached,
+                 generated / cached)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
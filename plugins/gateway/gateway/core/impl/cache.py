@@ -0,0 +1,160 @@
+'''
+Created on Oct 18, 2026
+
+@package: gateway
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the cache for the generated gateways.
+'''
+
+from ally.container.ioc import injected
+from collections import OrderedDict, Iterable
+from sql_alchemy.support.session import hasSession, openSession
+from sqlalchemy import event
+from sqlalchemy.orm import mapper
+from sqlalchemy.orm.session import object_session
+from sqlalchemy.schema import MetaData
+from threading import RLock
+from weakref import WeakSet
+import time
+
+# --------------------------------------------------------------------
+
+_caches = WeakSet()
+# The gateways caches that are notified about the mapped objects changes.
+
+def _onChange(mapper, connection, target):
+    '''
+    Notifies the gateways caches about the mapped object change, the mapper events are listened only once for all caches.
+    '''
+    for cache in list(_caches): cache.onChange(mapper, connection, target)
+
+event.listen(mapper, 'after_insert', _onChange)
+event.listen(mapper, 'after_update', _onChange)
+event.listen(mapper, 'after_delete', _onChange)
+
+# --------------------------------------------------------------------
+
+@injected
+class GatewaysCache:
+    '''
+    Cache for the generated gateways. The cached gateways are invalidated whenever a session that changed any of the
+    watched tables is committed, the sessions that have changes not committed are not using the cache. The changes are
+    detected through the session units of work, the bulk query updates and deletes on the watched tables are not
+    detected so the services of the watched tables need to change the mapped objects.
+    '''
+
+    timeOut = 60
+    # The number of seconds the gateways are cached for, this limits the time changes that are not made in this process
+    # are not reflected.
+    maximum = 1000
+    # The maximum number of cached gateways lists.
+
+    def __init__(self):
+        assert isinstance(self.timeOut, (int, float)), 'Invalid time out %s' % self.timeOut
+        assert isinstance(self.maximum, int), 'Invalid maximum %s' % self.maximum
+
+        self._tables = set()
+        self._entries = OrderedDict()
+        self._pending = WeakSet()
+        self._listened = WeakSet()
+        self._generation = 0
+        self._lock = RLock()
+
+        _caches.add(self)
+
+    def watch(self, meta):
+        '''
+        Watch the tables of the provided meta for changes that invalidate the cached gateways.
+
+        @param meta: MetaData
+            The meta data to watch the tables for.
+        '''
+        assert isinstance(meta, MetaData), 'Invalid meta %s' % meta
+        with self._lock: self._tables.update(meta.tables.values())
+
+    def get(self, key, generate):
+        '''
+        Provides the gateways for the key.
+
+        @param key: object
+            The hashable key that identifies the gateways.
+        @param generate: callable() -> Iterable(Gateway)
+            The call used for generating the gateways when they are not cached.
+        @return: tuple(Gateway)
+            The gateways.
+        '''
+        assert callable(generate), 'Invalid generate %s' % generate
+
+        if self.hasChanges(): return tuple(generate())
+        # The session has changes not committed so we cannot rely on the cache.
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, gateways = entry
+                if expires > time.time():
+                    self._entries.move_to_end(key)
+                    return gateways
+            generation = self._generation
+
+        gateways = generate()
+        assert isinstance(gateways, Iterable), 'Invalid gateways %s' % gateways
+        gateways = tuple(gateways)
+        with self._lock:
+            # If changes have been committed in the meantime the generated gateways might be already obsolete.
+            if generation == self._generation and not self.hasChanges():
+                self._entries.pop(key, None)
+                self._entries[key] = time.time() + self.timeOut, gateways
+                while len(self._entries) > self.maximum: self._entries.popitem(last=False)
+        return gateways
+
+    def clear(self):
+        '''
+        Clears all the cached gateways.
+        '''
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    # ----------------------------------------------------------------
+
+    def hasChanges(self):
+        '''
+        Checks if the current session has changes for the watched tables that are not committed.
+        '''
+        return hasSession() and openSession() in self._pending
+
+    def onChange(self, mapper, connection, target):
+        '''
+        Registers the session of the changed object if the object is mapped on a watched table.
+        '''
+        if self._tables.isdisjoint(mapper.tables): return
+        session = object_session(target)
+        if session is None: self.clear()
+        else:
+            with self._lock:
+                self._pending.add(session)
+                if session not in self._listened:
+                    # The session classes created by session makers do not receive the class level listeners registered
+                    # before they are created, so the listeners are registered on the session itself.
+                    event.listen(session, 'after_commit', self.onCommit)
+                    event.listen(session, 'after_rollback', self.onRollback)
+                    self._listened.add(session)
+
+    def onCommit(self, session):
+        '''
+        Clears the cached gateways if the committed session has changes.
+        '''
+        with self._lock:
+            if session in self._pending:
+                self._pending.discard(session)
+                self.clear()
+
+    def onRollback(self, session):
+        '''
+        Discards the changes of the rolled back session.
+        '''
+        with self._lock: self._pending.discard(session)
@@ -10,6 +10,7 @@ Implementation for the default anonymous gateway data.
 '''
 
 from ..api.gateway import IGatewayService, Gateway, Identifier, Custom
+from ..core.impl.cache import GatewaysCache
 from ..meta.gateway import GatewayData
 from ally.api.error import InputError, IdError
 from ally.container import wire
@@ -49,10 +50,13 @@ class GatewayServiceAlchemy(IGatewayService, SessionSupport):
     
     assemblyAnonymousGateways = Assembly; wire.entity('assemblyAnonymousGateways')
     # The assembly to be used for generating gateways
+    gatewaysCache = GatewaysCache; wire.entity('gatewaysCache')
+    # The cache for the generated gateways.
     
     def __init__(self):
         assert isinstance(self.assemblyAnonymousGateways, Assembly), \
         'Invalid assembly gateways %s' % self.assemblyAnonymousGateways
+        assert isinstance(self.gatewaysCache, GatewaysCache), 'Invalid gateways cache %s' % self.gatewaysCache
         
         self._processing = self.assemblyAnonymousGateways.create(solicit=Solicit)
          
@@ -60,6 +64,14 @@ class GatewayServiceAlchemy(IGatewayService, SessionSupport):
         '''
         @see: IGatewayService.getAnonymous
         '''
+        return self.gatewaysCache.get((IGatewayService, 'anonymous'), self.generateAnonymous)
+
+    # ----------------------------------------------------------------
+    
+    def generateAnonymous(self):
+        '''
+        Generates the anonymous gateways.
+        '''
         proc = self._processing
         assert isinstance(proc, Processing), 'Invalid processing %s' % proc
         
@@ -134,7 +146,11 @@ class GatewayServiceAlchemy(IGatewayService, SessionSupport):
         @see: IGatewayService.delete
         '''
         assert isinstance(name, str), 'Invalid gateway name %s' % name
-        return self.session().query(GatewayData).filter(GatewayData.name == name).delete() > 0
+        # The data is deleted through the session so the gateways cache is notified about the change.
+        data = self.session().query(GatewayData).get(name)
+        if data is None: return False
+        self.session().delete(data)
+        return True
 
     # ----------------------------------------------------------------
     
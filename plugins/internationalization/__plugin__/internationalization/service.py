@@ -24,7 +24,7 @@ SERVICES = 'internationalization.api.**.I*Service'
 @ioc.entity
 def binders(): return [bindInternationalizationSession]
 
-bind.bindToEntities('internationalization.impl.**.*Alchemy', binders=binders)
+bind.bindToEntities('internationalization.impl.**.*Alchemy', Scanner, binders=binders)
 support.createEntitySetup('internationalization.impl.**.*', 'internationalization.*.impl.**.*', Scanner)
 support.listenToEntities(SERVICES, listeners=addService(bindInternationalizationValidations), beforeBinding=False)
 support.loadAllEntities(SERVICES)
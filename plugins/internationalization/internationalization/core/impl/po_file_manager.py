@@ -22,13 +22,16 @@ from collections import Iterable
 from copy import copy
 from datetime import datetime
 from genericpath import isdir, isfile
+from hashlib import sha1
 from internationalization.api.message import IMessageService, Message
 from internationalization.api.source import ISourceService, QSource
 from internationalization.core.spec import IPOFileManager, InvalidLocaleError
 from internationalization.support.babel.util_babel import msgId, isMsgTranslated, \
     copyTranslation, fixBabelCatalogAddBug
 from io import BytesIO
+from json.encoder import JSONEncoder
 from os.path import dirname, join
+from threading import Lock
 import os
 
 # --------------------------------------------------------------------
@@ -117,6 +120,9 @@ class POFileManager(IPOFileManager):
         if not os.path.exists(self.locale_dir_path): os.makedirs(self.locale_dir_path)
         if not isdir(self.locale_dir_path) or not os.access(self.locale_dir_path, os.W_OK):
             raise IOError('Unable to access the locale directory %s' % self.locale_dir_path)
+        
+        self._compiled = {}
+        self._lock = Lock()
 
     def getGlobalPOTimestamp(self, locale):
         '''
@@ -159,12 +165,7 @@ class POFileManager(IPOFileManager):
         '''
         @see: IPOFileManager.getGlobalAsDict
         '''
-        try: locale = Locale.parse(locale)
-        except UnknownLocaleError: raise InvalidLocaleError(locale)
-
-        messages = self.messageService.getMessages()
-        catalog = self._build(locale, messages, self._filePath(locale))
-        return self._toDict('', catalog)
+        return self._compile(locale).dictionary
 
     def getComponentPOFile(self, component, locale):
         '''
@@ -180,12 +181,8 @@ class POFileManager(IPOFileManager):
         '''
         @see: IPOFileManager.getComponentAsDict
         '''
-        try: locale = Locale.parse(locale)
-        except UnknownLocaleError: raise InvalidLocaleError(locale)
-        messages = self.messageService.getComponentMessages(component)
-        catalog = self._build(locale, messages, self._filePath(locale, component=component),
-                              self._filePath(locale))
-        return self._toDict(component, catalog)
+        assert isinstance(component, str), 'Invalid component id %s' % component
+        return self._compile(locale, component=component).dictionary
 
     def getPluginPOFile(self, plugin, locale):
         '''
@@ -201,12 +198,31 @@ class POFileManager(IPOFileManager):
         '''
         @see: IPOFileManager.getPluginAsDict
         '''
-        try: locale = Locale.parse(locale)
-        except UnknownLocaleError: raise InvalidLocaleError(locale)
-        messages = self.messageService.getPluginMessages(plugin)
-        catalog = self._build(locale, messages, self._filePath(locale, plugin=plugin),
-                              self._filePath(locale))
-        return self._toDict(plugin, catalog)
+        assert isinstance(plugin, str), 'Invalid plugin id %s' % plugin
+        return self._compile(locale, plugin=plugin).dictionary
+
+    def getGlobalAsJSON(self, locale):
+        '''
+        @see: IPOFileManager.getGlobalAsJSON
+        '''
+        compiled = self._compile(locale)
+        return compiled.content, compiled.etag
+
+    def getComponentAsJSON(self, component, locale):
+        '''
+        @see: IPOFileManager.getComponentAsJSON
+        '''
+        assert isinstance(component, str), 'Invalid component id %s' % component
+        compiled = self._compile(locale, component=component)
+        return compiled.content, compiled.etag
+
+    def getPluginAsJSON(self, plugin, locale):
+        '''
+        @see: IPOFileManager.getPluginAsJSON
+        '''
+        assert isinstance(plugin, str), 'Invalid plugin id %s' % plugin
+        compiled = self._compile(locale, plugin=plugin)
+        return compiled.content, compiled.etag
 
     def updateGlobalPOFile(self, locale, poFile):
         '''
@@ -216,8 +232,9 @@ class POFileManager(IPOFileManager):
         except UnknownLocaleError: raise InvalidLocaleError(locale)
         assert isinstance(poFile, IInputStream), 'Invalid file object %s' % poFile
 
-        return self._update(locale, self.messageService.getMessages(), poFile, self._filePath(locale),
-                            self._filePath(locale, format=FORMAT_MO))
+        try: return self._update(locale, self.messageService.getMessages(), poFile, self._filePath(locale),
+                                 self._filePath(locale, format=FORMAT_MO))
+        finally: self._invalidate(locale)
 
     def updateComponentPOFile(self, component, locale, poFile):
         '''
@@ -227,9 +244,10 @@ class POFileManager(IPOFileManager):
         except UnknownLocaleError: raise InvalidLocaleError(locale)
         assert isinstance(poFile, IInputStream), 'Invalid file object %s' % poFile
 
-        return self._update(locale, self.messageService.getComponentMessages(component), poFile,
-                            self._filePath(locale, component=component),
-                            self._filePath(locale, component=component, format=FORMAT_MO), False)
+        try: return self._update(locale, self.messageService.getComponentMessages(component), poFile,
+                                 self._filePath(locale, component=component),
+                                 self._filePath(locale, component=component, format=FORMAT_MO), False)
+        finally: self._invalidate(locale)
 
     def updatePluginPOFile(self, plugin, locale, poFile):
         '''
@@ -239,9 +257,10 @@ class POFileManager(IPOFileManager):
         except UnknownLocaleError: raise InvalidLocaleError(locale)
         assert isinstance(poFile, IInputStream), 'Invalid file object %s' % poFile
 
-        return self._update(locale, self.messageService.getPluginMessages(plugin), poFile,
-                            self._filePath(locale, plugin=plugin),
-                            self._filePath(locale, plugin=plugin, format=FORMAT_MO), False)
+        try: return self._update(locale, self.messageService.getPluginMessages(plugin), poFile,
+                                 self._filePath(locale, plugin=plugin),
+                                 self._filePath(locale, plugin=plugin, format=FORMAT_MO), False)
+        finally: self._invalidate(locale)
 
     # --------------------------------------------------------------------
 
@@ -308,9 +327,65 @@ class POFileManager(IPOFileManager):
 
         path = self._filePath(locale, component, plugin)
         if isfile(path):
-            lastModified = max(lastModified, datetime.fromtimestamp(os.stat(path).st_mtime))
+            fileModified = datetime.fromtimestamp(os.stat(path).st_mtime)
+            if lastModified is None or lastModified < fileModified: lastModified = fileModified
         return lastModified
 
+    def _compile(self, locale, component=None, plugin=None):
+        '''
+        Provides the compiled catalog for the provided locale, the compiled catalog is cached for as long as the last
+        modification of the catalog sources and PO files is not changed. You can specify the component id or plugin id
+        in order to get the compiled catalog for the component or plugin domain, otherwise the global domain is used.
+
+        @param locale: string|Locale
+            The locale to compile the catalog for.
+        @param component: string|None
+            The component id to compile the catalog for.
+        @param plugin: string|None
+            The plugin id to compile the catalog for.
+        @return: Compiled
+            The compiled catalog.
+        '''
+        try: localeObj = Locale.parse(locale)
+        except UnknownLocaleError: raise InvalidLocaleError(locale)
+        
+        lastModified = self._lastModified(localeObj, component, plugin)
+        if component or plugin:
+            # The global PO file is used as a fall back for the component and plugin catalogs.
+            lastModified = max(lastModified or datetime.min, self._lastModified(localeObj) or datetime.min)
+        
+        key = (str(localeObj), component, plugin)
+        with self._lock: compiled = self._compiled.get(key)
+        if compiled is not None and compiled.lastModified == lastModified: return compiled
+        
+        if component:
+            messages, domain = self.messageService.getComponentMessages(component), component
+            catalog = self._build(localeObj, messages, self._filePath(localeObj, component=component),
+                                  self._filePath(localeObj))
+        elif plugin:
+            messages, domain = self.messageService.getPluginMessages(plugin), plugin
+            catalog = self._build(localeObj, messages, self._filePath(localeObj, plugin=plugin),
+                                  self._filePath(localeObj))
+        else:
+            messages, domain = self.messageService.getMessages(), ''
+            catalog = self._build(localeObj, messages, self._filePath(localeObj))
+        
+        compiled = Compiled(lastModified, self._toDict(domain, catalog))
+        with self._lock: self._compiled[key] = compiled
+        return compiled
+    
+    def _invalidate(self, locale):
+        '''
+        Removes all the compiled catalogs for the provided locale.
+        
+        @param locale: Locale
+            The locale to remove the compiled catalogs for.
+        '''
+        assert isinstance(locale, Locale), 'Invalid locale %s' % locale
+        locale = str(locale)
+        with self._lock:
+            for key in [key for key in self._compiled if key[0] == locale]: del self._compiled[key]
+
     def _processCatalog(self, catalog, messages, fallBack=None):
         '''
         Processes a catalog based on the given messages list. Basically the catalog will be made in sync with the list of
@@ -509,3 +584,28 @@ class POFileManager(IPOFileManager):
         with open(path, 'wb') as fObj: write_po(fObj, catalog, **self.write_po_config)
         os.makedirs(dirname(pathMO), exist_ok=True)
         with open(pathMO, 'wb') as fObj: write_mo(fObj, catalog)
+
+# --------------------------------------------------------------------
+
+class Compiled:
+    '''
+    The compiled catalog, contains the catalog dictionary and the JSON content for it.
+    '''
+    __slots__ = ('lastModified', 'dictionary', 'content', 'etag')
+    
+    def __init__(self, lastModified, dictionary):
+        '''
+        Construct the compiled catalog.
+        
+        @param lastModified: datetime|None
+            The last modification of the catalog sources and PO files that have been compiled.
+        @param dictionary: dictionary{string: dictionary}
+            The catalog dictionary, @see IPOFileManager.getGlobalAsDict
+        '''
+        assert lastModified is None or isinstance(lastModified, datetime), 'Invalid last modified %s' % lastModified
+        assert isinstance(dictionary, dict), 'Invalid dictionary %s' % dictionary
+        
+        self.lastModified = lastModified
+        self.dictionary = dictionary
+        self.content = JSONEncoder(ensure_ascii=False).encode(dictionary).encode('utf-8')
+        self.etag = sha1(self.content).hexdigest()
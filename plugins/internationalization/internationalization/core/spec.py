@@ -158,6 +158,46 @@ class IPOFileManager(metaclass=abc.ABCMeta):
             The dictionary containing the translation.
         '''
 
+    @abc.abstractmethod
+    def getGlobalAsJSON(self, locale):
+        '''
+        Provides the messages for the whole application and the given locale as JSON content, the content is the
+        JSON encoding of the dictionary @see IPOFileManager.getGlobalAsDict
+
+        @param locale: string
+            The locale for which to return the translation.
+        @return: tuple(bytes, string)
+            The UTF-8 JSON content containing the translation and the entity tag for the content.
+        '''
+
+    @abc.abstractmethod
+    def getComponentAsJSON(self, component, locale):
+        '''
+        Provides the messages for the given component and the given locale as JSON content.
+        @see IPOFileManager.getGlobalAsJSON
+
+        @param component: string
+            The component id for which to return the translation.
+        @param locale: string
+            The locale for which to return the translation.
+        @return: tuple(bytes, string)
+            The UTF-8 JSON content containing the translation and the entity tag for the content.
+        '''
+
+    @abc.abstractmethod
+    def getPluginAsJSON(self, plugin, locale):
+        '''
+        Provides the messages for the given plugin and the given locale as JSON content.
+        @see IPOFileManager.getGlobalAsJSON
+
+        @param plugin: string
+            The plugin id for which to return the translation.
+        @param locale: string
+            The locale for which to return the translation.
+        @return: tuple(bytes, string)
+            The UTF-8 JSON content containing the translation and the entity tag for the content.
+        '''
+
     # ----------------------------------------------------------------
 
     @abc.abstractmethod
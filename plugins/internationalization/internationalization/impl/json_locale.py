@@ -21,8 +21,6 @@ from datetime import datetime
 from internationalization.api.json_locale import IJSONLocaleFileService
 from internationalization.core.spec import IPOFileManager, InvalidLocaleError
 from io import BytesIO
-from json.encoder import JSONEncoder
-from sys import getdefaultencoding
 
 # --------------------------------------------------------------------
 
@@ -48,6 +46,8 @@ class JSONFileService(IJSONLocaleFileService):
         assert isinstance(self.cdmLocale, ICDM), 'Invalid PO CDM %s' % self.cdmLocale
         assert isinstance(self.pluginService, IPluginService), 'Invalid plugin service %s' % self.pluginService
         assert isinstance(self.componentService, IComponentService), 'Invalid component service %s' % self.componentService
+        
+        self._published = {}
 
     def getGlobalJSONFile(self, locale, scheme):
         '''
@@ -56,14 +56,15 @@ class JSONFileService(IJSONLocaleFileService):
         path = self._cdmPath(locale)
         try:
             try: cdmFileTimestamp = self.cdmLocale.getTimestamp(path)
-            except PathNotFound: republish = True
+            except PathNotFound:
+                self._published.pop(path, None)
+                republish = True
             else:
                 mngFileTimestamp = self.poFileManager.getGlobalPOTimestamp(locale)
                 republish = False if mngFileTimestamp is None else cdmFileTimestamp < mngFileTimestamp
 
             if republish:
-                jsonString = JSONEncoder(ensure_ascii=False).encode(self.poFileManager.getGlobalAsDict(locale))
-                self.cdmLocale.publishContent(path, BytesIO(bytes(jsonString, getdefaultencoding())))
+                self._publish(path, *self.poFileManager.getGlobalAsJSON(locale))
         except InvalidLocaleError: raise InputError(_('Invalid locale %(locale)s') % dict(locale=locale))
         return self.cdmLocale.getURI(path, scheme)
 
@@ -75,15 +76,16 @@ class JSONFileService(IJSONLocaleFileService):
         path = self._cdmPath(locale, component=component)
         try:
             try: cdmFileTimestamp = self.cdmLocale.getTimestamp(path)
-            except PathNotFound: republish = True
+            except PathNotFound:
+                self._published.pop(path, None)
+                republish = True
             else:
                 mngFileTimestamp = max(self.poFileManager.getGlobalPOTimestamp(locale) or datetime.min,
                                        self.poFileManager.getComponentPOTimestamp(component, locale) or datetime.min)
                 republish = False if mngFileTimestamp is None else cdmFileTimestamp < mngFileTimestamp
 
             if republish:
-                jsonString = JSONEncoder(ensure_ascii=False).encode(self.poFileManager.getComponentAsDict(component, locale))
-                self.cdmLocale.publishContent(path, BytesIO(bytes(jsonString, getdefaultencoding())))
+                self._publish(path, *self.poFileManager.getComponentAsJSON(component, locale))
         except InvalidLocaleError: raise InputError(_('Invalid locale %(locale)s') % dict(locale=locale))
         return self.cdmLocale.getURI(path, scheme)
 
@@ -98,20 +100,36 @@ class JSONFileService(IJSONLocaleFileService):
         path = self._cdmPath(locale, plugin=plugin)
         try:
             try: cdmFileTimestamp = self.cdmLocale.getTimestamp(path)
-            except PathNotFound: republish = True
+            except PathNotFound:
+                self._published.pop(path, None)
+                republish = True
             else:
                 mngFileTimestamp = max(self.poFileManager.getGlobalPOTimestamp(locale) or datetime.min,
                                        self.poFileManager.getPluginPOTimestamp(plugin, locale) or datetime.min)
                 republish = False if mngFileTimestamp is None else cdmFileTimestamp < mngFileTimestamp
 
             if republish:
-                jsonString = JSONEncoder(ensure_ascii=False).encode(self.poFileManager.getPluginAsDict(plugin, locale))
-                self.cdmLocale.publishContent(path, BytesIO(bytes(jsonString, getdefaultencoding())))
+                self._publish(path, *self.poFileManager.getPluginAsJSON(plugin, locale))
         except InvalidLocaleError: raise InputError(_('Invalid locale %(locale)s') % dict(locale=locale))
         return self.cdmLocale.getURI(path, scheme)
 
     # ----------------------------------------------------------------
 
+    def _publish(self, path, content, etag):
+        '''
+        Publishes the JSON content in the CDM, the content is not published again if the CDM already contains it.
+
+        @param path: string
+            The CDM path to publish the content at.
+        @param content: bytes
+            The JSON content to publish.
+        @param etag: string
+            The entity tag of the content.
+        '''
+        if self._published.get(path) == etag: return
+        self.cdmLocale.publishContent(path, BytesIO(content))
+        self._published[path] = etag
+
     def _cdmPath(self, locale, component=None, plugin=None):
         '''
         Returns the path to the CDM JSON file corresponding to the given locale and / or
@@ -18,17 +18,24 @@ from babel.messages.extract import extract_nothing, extract_python, \
     _strip_comment_tags, empty_msgid_warning, extract_javascript
 from internationalization.core.impl.extract_html import extract_html
 from babel.util import pathmatch
+from concurrent.futures.process import ProcessPoolExecutor
 from datetime import datetime
 from functools import partial
 from internationalization.api.file import IFileService, QFile, File
-from internationalization.api.message import IMessageService, Message
+from internationalization.api.message import IMessageService
 from internationalization.api.source import ISourceService, TYPES, Source, \
     QSource
+from internationalization.meta.file import table as tableFile
+from internationalization.meta.message import table as tableMessage
 from io import BytesIO, TextIOWrapper
+from multiprocessing import cpu_count
 from os import path
+from sql_alchemy.support.util_service import SessionSupport
+from sqlalchemy.sql.expression import select, bindparam
 from zipfile import ZipFile
 import logging
 import os
+import time
 
 # --------------------------------------------------------------------
 
@@ -57,15 +64,25 @@ KEYWORDS = {
 COMMENT_TAGS = ('NOTE')
 # A list of tags of translator comments to search for and include in the results
 
+MESSAGE_KEYS = ('Id', 'Source', 'Singular', 'plural1', 'plural2', 'plural3', 'plural4', 'Context', 'LineNumber', 'Comments')
+# The keys of the persisted message values.
+MESSAGE_COMPARED = ('plural1', 'plural2', 'plural3', 'plural4', 'Context', 'LineNumber', 'Comments')
+# The keys of the message values that are compared in order to detect the updated messages.
+CHUNK_REMOVE = 500
+# The maximum number of messages removed with one statement.
+
 # --------------------------------------------------------------------
 
 @injected
 @setup(name='scanner')
-class Scanner:
+class Scanner(SessionSupport):
     '''
     The class that provides the scanner.
     '''
 
+    extract_processes = cpu_count(); wire.config('extract_processes', doc='''
+    The number of processes used for extracting the localized messages from the source files, if 1 the messages are
+    extracted in the scanning process.''')
     componentService = IComponentService; wire.entity('componentService')
     pluginService = IPluginService; wire.entity('pluginService')
     fileService = IFileService; wire.entity('fileService')
@@ -76,27 +93,57 @@ class Scanner:
         '''
         Construct the scanner.
         '''
+        assert isinstance(self.extract_processes, int) and self.extract_processes > 0, \
+        'Invalid extract processes %s' % self.extract_processes
         assert isinstance(self.componentService, IComponentService), \
         'Invalid component service %s' % self.componentService
         assert isinstance(self.pluginService, IPluginService), 'Invalid plugin service %s' % self.pluginService
         assert isinstance(self.fileService, IFileService), 'Invalid file service %s' % self.fileService
         assert isinstance(self.sourceService, ISourceService), 'Invalid source service %s' % self.sourceService
         assert isinstance(self.messageService, IMessageService), 'Invalid message service %s' % self.messageService
-    
+
+        self.timings = {}
+        # The seconds spent in each phase of the last scan.
+
     @app.populate(app.CHANGED)
     def scanLocalization(self):
         '''
-        Scans the application for localization messages.
+        Scans the application for localization messages, the scan is made in three phases: the files that need to be
+        processed are collected, the messages are extracted from all the collected files and then the messages are
+        persisted in bulk for each scanned component and plugin.
         '''
         log.info('Scanning the application distribution for localized messages')
-        self.scanComponents()
-        self.scanPlugins()
-        
+        timings = self.timings = {}
+
+        started = time.time()
+        scopes = list(self.scanComponents())
+        scopes.extend(self.scanPlugins())
+        entries = [entry for scope in scopes for entry in scope[1]]
+        timings['scan'] = time.time() - started
+
+        started = time.time()
+        extracted = iter(self._extract(entries))
+        timings['extract'] = time.time() - started
+
+        started, counts = time.time(), [0, 0, 0]
+        for files, scopeEntries, componentId, pluginId, processModified in scopes:
+            results = [next(extracted) for _entry in scopeEntries]
+            for k, count in enumerate(self._persist(files, scopeEntries, results, componentId, pluginId, processModified)):
+                counts[k] += count
+        timings['persist'] = time.time() - started
+
+        log.info('Scanned %s files for localized messages in %.2fs (scan %.2fs, extract %.2fs, persist %.2fs), '
+                 'messages added %s, updated %s and removed %s', len(entries), sum(timings.values()), timings['scan'],
+                 timings['extract'], timings['persist'], *counts)
+
     # ----------------------------------------------------------------
 
     def scanComponents(self):
         '''
         Scan the current application components for the localized text messages.
+
+        @return: Iterable(tuple(dictionary{string: File}, list[tuple], string, None, boolean))
+            The scopes to be extracted and persisted, @see: _persist
         '''
         for component in self.componentService.getComponents():
             assert isinstance(component, Component)
@@ -122,11 +169,14 @@ class Scanner:
                 lastModified, scanner = None, scanFolder(component.Path)
 
             files.update({source.Path: source for source in self.sourceService.getAll(q=QSource(component=component.Id))})
-            self._persist(files, scanner, component.Path, lastModified, component.Id, None)
+            yield files, self._collect(files, scanner, lastModified), component.Id, None, lastModified is None
 
     def scanPlugins(self):
         '''
         Scan the current application plugins for the localized text messages.
+
+        @return: Iterable(tuple(dictionary{string: File}, list[tuple], None, string, boolean))
+            The scopes to be extracted and persisted, @see: _persist
         '''
         for pluginId in self.pluginService.getPlugins():
             plugin = self.pluginService.getById(pluginId)
@@ -152,74 +202,87 @@ class Scanner:
             else:
                 lastModified, scanner = None, scanFolder(plugin.Path)
 
-
             files.update({source.Path: source for source in self.sourceService.getAll(q=QSource(plugin=plugin.Id))})
-            self._persist(files, scanner, plugin.Path, lastModified, None, plugin.Id)
+            yield files, self._collect(files, scanner, lastModified), None, plugin.Id, lastModified is None
 
     # ----------------------------------------------------------------
 
-    def _persist(self, files, scanner, path, lastModified, componentId, pluginId):
+    def _collect(self, files, scanner, lastModified):
         '''
-        Persist the sources and messages. 
+        Collects the scanned files that need to be extracted.
+
+        @return: list[tuple(string, string, bytes|None, datetime)]
+            The entries containing: (filePath, method, content, lastModified)
         '''
         assert isinstance(files, dict), 'Invalid files %s' % files
-        processModified = lastModified is None
-        for filePath, method, extractor in scanner:
+        entries = []
+        for filePath, method, content in scanner:
             assert method in TYPES, 'Invalid method %s' % method
-
-            file = files.get(filePath)
-            if processModified:
-                lastModified = modificationTimeFor(filePath)
+            if lastModified is None:
+                modified = modificationTimeFor(filePath)
+                file = files.get(filePath)
                 if file:
                     assert isinstance(file, File)
-                    if lastModified <= file.LastModified:
+                    if modified <= file.LastModified:
                         log.info('No modifications for file "%s"', filePath)
                         continue
-                    file.LastModified = lastModified
-                    self.fileService.update(file)
+            else: modified = lastModified
+            entries.append((filePath, method, content, modified))
+        return entries
+
+    def _extract(self, entries):
+        '''
+        Extracts the messages for the collected entries, the extraction is distributed across a pool of processes.
+
+        @return: list[tuple(list[tuple]|None, string|None)]
+            The extracted results in the entries order, @see: extractMessages
+        '''
+        if not entries: return []
+        methods, paths, contents = [], [], []
+        for filePath, method, content, _lastModified in entries:
+            methods.append(method)
+            paths.append(filePath)
+            contents.append(content)
+
+        if self.extract_processes == 1 or len(entries) == 1: return list(map(extractMessages, methods, paths, contents))
+        with ProcessPoolExecutor(min(self.extract_processes, len(entries))) as executor:
+            return list(executor.map(extractMessages, methods, paths, contents))
+
+    def _persist(self, files, entries, results, componentId, pluginId, processModified):
+        '''
+        Persist the sources and messages. The messages of each source are compared with the persisted ones and only the
+        differences are persisted using bulk statements.
+
+        @return: tuple(integer, integer, integer)
+            The number of messages added, updated and removed.
+        '''
+        assert isinstance(files, dict), 'Invalid files %s' % files
+        assert len(entries) == len(results), 'Invalid results %s for entries %s' % (results, entries)
+        known = self._messagesFor(componentId, pluginId)
+        inserts, updates, removes = [], [], []
+        for (filePath, method, _content, lastModified), (messages, error) in zip(entries, results):
+            if error is not None:
+                log.error('%s: %s' % (filePath, error))
+                continue
 
+            file = files.get(filePath)
             if isinstance(file, Source): source = file
             else: source = None
-            messages = None
-            try:
-                for text, context, lineno, comments in extractor:
-                    if not source:
-                        if file: self.fileService.delete(file.Id)
-                        source = Source()
-                        source.Component = componentId
-                        source.Plugin = pluginId
-                        source.Path = filePath
-                        source.Type = method
-                        source.LastModified = lastModified
-                        files[filePath] = source
-                        self.sourceService.insert(source)
-
-                    if messages is None: messages = {msg.Singular:msg for msg in self.messageService.getMessages(source.Id)}
-
-                    if isinstance(text, str): singular, plurals = text, None
-                    elif len(text) == 1: singular, plurals = text[0], None
-                    else: singular, plurals = text[0], list(text[1:])
-
-                    msg = messages.get(singular)
-                    if not msg:
-                        msg = Message()
-                        msg.Source = source.Id
-                        msg.Singular = singular
-                        msg.Plural = plurals
-                        msg.Context = context
-                        msg.LineNumber = lineno
-                        msg.Comments = '\n'.join(comments)
-
-                        self.messageService.insert(msg)
-                        messages[singular] = msg
-                    else:
-                        msg.Plural = plurals
-                        msg.Context = context
-                        msg.LineNumber = lineno
-                        msg.Comments = '\n'.join(comments)
-                        self.messageService.update(msg)
-            except UnicodeDecodeError as e:
-                log.error('%s: %s' % (filePath, str(e)))
+            if messages and not source:
+                if file: self.fileService.delete(file.Id)
+                source = Source()
+                source.Component = componentId
+                source.Plugin = pluginId
+                source.Path = filePath
+                source.Type = method
+                source.LastModified = lastModified
+                files[filePath] = source
+                self.sourceService.insert(source)
+            elif processModified and file:
+                file.LastModified = lastModified
+                self.fileService.update(file)
+
+            if source: diffMessages(source.Id, messages, known.pop(source.Id, {}), inserts, updates, removes)
 
             if processModified and filePath not in files:
                 file = File()
@@ -230,6 +293,29 @@ class Scanner:
                 files[filePath] = file
                 self.fileService.insert(file)
 
+        session = self.session()
+        for k in range(0, len(removes), CHUNK_REMOVE):
+            session.execute(tableMessage.delete().where(tableMessage.c.Id.in_(removes[k:k + CHUNK_REMOVE])))
+        if updates: session.execute(tableMessage.update().where(tableMessage.c.Id == bindparam('_id')), updates)
+        if inserts: session.execute(tableMessage.insert(), inserts)
+        return len(inserts), len(updates), len(removes)
+
+    def _messagesFor(self, componentId, pluginId):
+        '''
+        Provides the persisted messages of the component or plugin.
+
+        @return: dictionary{integer: dictionary{string: dictionary{string: object}}}
+            The message values indexed by singular and indexed by source id.
+        '''
+        sql = select([tableMessage]).select_from(tableMessage.join(tableFile, tableFile.c.Id == tableMessage.c.Source))
+        sql = sql.where(tableFile.c.Component == componentId).where(tableFile.c.Plugin == pluginId)
+
+        known = {}
+        for row in self.session().execute(sql):
+            values = {key: row[tableMessage.c[key]] for key in MESSAGE_KEYS}
+            known.setdefault(values['Source'], {})[values['Singular']] = values
+        return known
+
 # --------------------------------------------------------------------
 
 modificationTimeFor = lambda path: datetime.fromtimestamp(os.stat(path).st_mtime).replace(microsecond=0)
@@ -241,20 +327,17 @@ def scanZip(zipFilePath):
     
     @param zipFilePath: string
         The zip path.
-    @return: tuple(string, string, generator)
-        Returns a tuple containing: (filePath, method, generator(@see: process))
+    @return: tuple(string, string, bytes)
+        Returns a tuple containing: (filePath, method, content)
     '''
-    zipFile = ZipFile(zipFilePath)
-    names = zipFile.namelist()
-    names.sort()
-    for name in names:
-        for pattern, method in METHOD_MAP:
-            if pathmatch(pattern, name):
-                filePath = zipFilePath + '/' + name
-                def openZip():
-                    with zipFile.open(name, 'r') as f:
-                        return BytesIO(f.read())
-                yield filePath, method, process(openZip, method)
+    with ZipFile(zipFilePath) as zipFile:
+        names = zipFile.namelist()
+        names.sort()
+        for name in names:
+            for pattern, method in METHOD_MAP:
+                if pathmatch(pattern, name):
+                    with zipFile.open(name, 'r') as f: content = f.read()
+                    yield zipFilePath + '/' + name, method, content
 
 def scanFolder(folderPath):
     '''
@@ -262,8 +345,8 @@ def scanFolder(folderPath):
     
     @param folderPath: string
         The folder path.
-    @return: tuple(string, string, generator)
-        Returns a tuple containing: (filePath, method, generator(@see: process))
+    @return: tuple(string, string, None)
+        Returns a tuple containing: (filePath, method, None), the content is read from the file path.
     '''
     assert isinstance(folderPath, str), 'Invalid folder path %s' % folderPath
     for root, _dirnames, filenames in os.walk(folderPath):
@@ -272,8 +355,65 @@ def scanFolder(folderPath):
             name = path.relpath(os.path.join(root, name)).replace(os.sep, '/')
             for pattern, method in METHOD_MAP:
                 if pathmatch(pattern, name):
-                    filePath = name.replace('/', os.sep)
-                    yield filePath, method, process(partial(open, name, 'rb'), method)
+                    yield name.replace('/', os.sep), method, None
+
+def extractMessages(method, filePath, content=None):
+    '''
+    Extracts the messages of a file, used in the extraction processes so the arguments and the result are picklable.
+
+    @param method: string
+        The method used for processing the file.
+    @param filePath: string
+        The file path.
+    @param content: bytes|None
+        The file content, if None the content is read from the file path.
+    @return: tuple(list[tuple]|None, string|None)
+        Returns a tuple containing: (messages(@see: process), error), the messages are None if the extraction failed.
+    '''
+    if content is None: openFile = partial(open, filePath, 'rb')
+    else: openFile = partial(BytesIO, content)
+    try: return list(process(openFile, method)), None
+    except UnicodeDecodeError as e: return None, str(e)
+
+def diffMessages(sourceId, messages, known, inserts, updates, removes):
+    '''
+    Compares the extracted messages of a source with the persisted ones.
+
+    @param sourceId: integer
+        The source id.
+    @param messages: list[tuple]|None
+        The extracted messages, @see: process
+    @param known: dictionary{string: dictionary{string: object}}
+        The persisted message values indexed by singular.
+    @param inserts: list[dictionary{string: object}]
+        The message values to be inserted.
+    @param updates: list[dictionary{string: object}]
+        The message values to be updated, the message id is provided by the '_id' key.
+    @param removes: list[integer]
+        The message ids to be removed.
+    '''
+    assert isinstance(known, dict), 'Invalid known messages %s' % known
+    values = {}
+    for text, context, lineno, comments in messages or ():
+        if isinstance(text, str): singular, plurals = text, ()
+        else: singular, plurals = text[0], tuple(text[1:])
+        if len(plurals) > 4:
+            log.error('Only a maximum of four plural forms is accepted, got %s for "%s"', len(plurals), singular)
+            continue
+        plurals += (None,) * (4 - len(plurals))
+
+        # The last occurrence of a message in the source provides the message values.
+        values[singular] = {'Source': sourceId, 'Singular': singular, 'plural1': plurals[0], 'plural2': plurals[1],
+                            'plural3': plurals[2], 'plural4': plurals[3], 'Context': context, 'LineNumber': lineno,
+                            'Comments': '\n'.join(comments)}
+
+    for singular, value in values.items():
+        current = known.pop(singular, None)
+        if current is None: inserts.append(value)
+        elif any(current[key] != value[key] for key in MESSAGE_COMPARED):
+            value['_id'] = current['Id']
+            updates.append(value)
+    removes.extend(current['Id'] for current in known.values())
 
 def process(openFile, method):
     '''
@@ -0,0 +1,36 @@
+'''
+Created on Oct 18, 2026
+
+@package: security RBAC
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the asyncore server patch that disables the effective rights cache for multiple serving processes.
+'''
+
+from .service import rbac_effective_time_out
+from ally.container import ioc
+import logging
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+try:
+    from __setup__ import ally_http_asyncore_server  # @UnusedImport
+except ImportError: log.info('No asyncore server component available, thus no need to apply the multiple processes patch')
+else:
+    from __setup__.ally_http.server import server_type
+    from __setup__.ally_http_asyncore_server.server import server_processes, SERVER_ASYNCORE
+    
+    @ioc.replace(rbac_effective_time_out)
+    def rbac_effective_time_out_processes(timeOut):
+        '''
+        If the asyncore server has multiple serving processes the effective rights are not cached since the rights
+        changed in one process are not reflected in the other processes.
+        '''
+        if server_type() == SERVER_ASYNCORE and server_processes() > 1: return 0
+        return timeOut
@@ -0,0 +1,31 @@
+'''
+Created on Oct 18, 2026
+
+@package: security RBAC
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Contains the services setup for security RBAC.
+'''
+
+from ally.container import ioc
+from security.rbac.core.impl.effective import EffectiveCache
+
+# --------------------------------------------------------------------
+
+@ioc.config
+def rbac_effective_time_out() -> int:
+    '''
+    The number of seconds the effective rights of the RBAC objects are cached for, the rights changed by other processes
+    are reflected only after this time, if 0 then the effective rights are not cached.
+    '''
+    return 30
+
+# --------------------------------------------------------------------
+
+@ioc.entity
+def rbacEffectiveCache() -> EffectiveCache:
+    b = EffectiveCache()
+    b.timeOut = rbac_effective_time_out()
+    return b
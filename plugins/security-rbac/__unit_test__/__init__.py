@@ -0,0 +1,10 @@
+'''
+Created on Oct 18, 2026
+
+@package: security - role based access control
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Contains the unit tests.
+'''
@@ -0,0 +1,207 @@
+'''
+Created on Oct 18, 2026
+
+@package: security - role based access control
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides unit testing for the roles hierarchy and the effective rights cache.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container.ioc import initialize
+from security.meta.metadata_security import meta
+from security.meta.right import RightMapped
+from security.meta.right_type import RightTypeMapped
+from security.rbac.api.role import Role
+from security.rbac.core.impl.effective import EffectiveCache
+from security.rbac.meta.rbac_intern import RoleNode, RbacRight, RbacRole, Rbac
+from security.rbac.meta.role import RoleMapped
+from security.rbac.impl.role_rbac import RoleServiceAlchemy
+from sql_alchemy.support.mapper import tableFor
+from sql_alchemy.support.session import beginWith, openSession, endSessions
+from sqlalchemy.engine import create_engine
+from sqlalchemy.orm.session import sessionmaker
+import logging
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+def createService(rights):
+    engine = create_engine('sqlite:///:memory:')
+    meta.create_all(engine, tables=[tableFor(mapped) for mapped in (Rbac, RoleMapped, RoleNode, RbacRole, RbacRight,
+                                                                        RightTypeMapped, RightMapped)])
+    engine.execute(tableFor(RightTypeMapped).insert(), [{'id': 1, 'name': 'first'}, {'id': 2, 'name': 'second'}])
+    engine.execute(tableFor(RightMapped).insert(), [{'id': k, 'fk_right_type_id': k % 2 + 1, 'name': 'right%s' % k}
+                                                    for k in range(1, rights + 1)])
+    beginWith(sessionmaker(bind=engine))
+    service = RoleServiceAlchemy()
+    service.effective = initialize(EffectiveCache())
+    return service
+
+def insertRoles(service, names):
+    for name in names:
+        role = Role()
+        role.Name = name
+        service.insert(role)
+    openSession().commit()
+
+def rolesOf(service, name):
+    '''
+    Provides the roles names from the nested set that are inherited by the role.
+    '''
+    session = service.session()
+    nodes = session.query(RoleNode.left, RoleNode.right).join(RoleMapped, RoleMapped.id == RoleNode.roleId)
+    names = set()
+    for left, right in nodes.filter(RoleMapped.Name == name).all():
+        sql = session.query(RoleMapped.Name).join(RoleNode, RoleNode.roleId == RoleMapped.id)
+        names.update(name for name, in sql.filter(RoleNode.left >= left).filter(RoleNode.right <= right).all())
+    return names
+
+def checkNestedSet(test, service):
+    '''
+    Checks that the nested set intervals are contiguous and properly nested.
+    '''
+    intervals = sorted(service.session().query(RoleNode.left, RoleNode.right).all())
+    values = sorted(value for interval in intervals for value in interval)
+    test.assertEqual(list(range(1, 2 * len(intervals) + 1)), values)
+    stack = []
+    for left, right in intervals:
+        test.assertTrue(left < right)
+        while stack and stack[-1] < left: stack.pop()
+        if stack: test.assertTrue(right < stack[-1])
+        stack.append(right)
+
+def expectedRoles(children, name):
+    names = {name}
+    for child in children.get(name, ()): names.update(expectedRoles(children, child))
+    return names
+
+def rightsReference(service, name, typeName=None):
+    return [rightId for rightId, in service.sqlRights(service.findRbacId(name), typeName).all()]
+
+# --------------------------------------------------------------------
+
+class TestRoleRbac(unittest.TestCase):
+
+    def setUp(self):
+        self.service = createService(20)
+        insertRoles(self.service, ('admin', 'editor', 'writer', 'reader', 'guest'))
+        self.children = {}
+        for parent, child in (('editor', 'writer'), ('writer', 'reader'), ('admin', 'editor'), ('admin', 'guest'),
+                              ('guest', 'reader')):
+            self.service.addRole(parent, child)
+            self.children.setdefault(parent, []).append(child)
+            openSession().commit()
+            checkNestedSet(self, self.service)
+
+    def tearDown(self):
+        endSessions(lambda session: session.close())
+
+    def testHierarchy(self):
+        for name in ('admin', 'editor', 'writer', 'reader', 'guest'):
+            self.assertEqual(expectedRoles(self.children, name), rolesOf(self.service, name))
+
+        # Cycles are not allowed.
+        self.service.addRole('reader', 'admin')
+        openSession().commit()
+        self.assertEqual({'reader'}, rolesOf(self.service, 'reader'))
+
+    def testEffectiveRights(self):
+        service = self.service
+        for rightId, name in ((1, 'admin'), (2, 'editor'), (3, 'writer'), (4, 'reader'), (5, 'guest'), (6, 'reader')):
+            service.addRight(name, rightId)
+        openSession().commit()
+
+        for name in ('admin', 'editor', 'writer', 'reader', 'guest'):
+            self.assertEqual(rightsReference(service, name), list(service.getRights(name)))
+            self.assertEqual(rightsReference(service, name, 'first'), list(service.getRights(name, 'first')))
+        self.assertEqual([1, 2, 3, 4, 5, 6], list(service.getRights('admin')))
+        self.assertEqual([4, 6], list(service.getRights('reader', 'first')))
+        collection = service.getRights('admin', offset=1, limit=2, withTotal=True)
+        self.assertEqual((6, [2, 3]), (collection.total, list(collection)))
+
+        # The right changes are applied to the cached effective rights only after commit.
+        rbacId = service.findRbacId('admin')
+        cached = service.effectiveFor(rbacId)
+        service.addRight('writer', 7)
+        self.assertEqual([1, 2, 3, 4, 5, 6, 7], list(service.getRights('admin')))
+        openSession().rollback()
+        self.assertIs(cached, service.effectiveFor(rbacId))
+        self.assertEqual([1, 2, 3, 4, 5, 6], list(service.getRights('admin')))
+
+        service.addRight('writer', 7)
+        self.assertTrue(service.remRight('reader', 4))
+        openSession().commit()
+        self.assertEqual([1, 2, 3, 5, 6, 7], list(service.effectiveFor(rbacId).rightsFor()))
+        self.assertEqual(rightsReference(service, 'admin'), list(service.getRights('admin')))
+
+        # The reader right 6 is still provided through guest after removing reader from writer.
+        self.assertTrue(service.remRole('writer', 'reader'))
+        openSession().commit()
+        for name in ('admin', 'editor', 'writer', 'reader', 'guest'):
+            self.assertEqual(rightsReference(service, name), list(service.getRights(name)))
+        self.assertEqual([1, 2, 3, 5, 6, 7], list(service.getRights('admin')))
+        self.assertEqual([2, 3, 7], list(service.getRights('editor')))
+
+# --------------------------------------------------------------------
+
+class BenchmarkRoleRbac(unittest.TestCase):
+
+    depth = 10
+    # The depth of the roles hierarchy, a binary tree with 2 ** depth - 1 roles.
+
+    def tearDown(self):
+        endSessions(lambda session: session.close())
+
+    def testBenchmark(self):
+        count = 2 ** self.depth - 1
+        service = createService(count)
+        names = ['role%s' % k for k in range(count)]
+        insertRoles(service, names)
+
+        started = time.time()
+        for k in range(1, count):
+            service.addRole(names[(k - 1) // 2], names[k])
+            openSession().commit()
+        # A role inherited by two branches, which duplicates its subtree.
+        service.addRole(names[2], names[3])
+        openSession().commit()
+        elapsed = time.time() - started
+        checkNestedSet(self, service)
+        log.info('Added %s roles in a hierarchy of depth %s in %.4fs', count, self.depth, elapsed)
+
+        for k, name in enumerate(names): service.addRight(name, k + 1)
+        openSession().commit()
+
+        samples = names[:63]
+        started = time.time()
+        expected = [rightsReference(service, name) for name in samples]
+        reference = time.time() - started
+
+        self.assertEqual(expected, [list(service.getRights(name)) for name in samples])
+        started = time.time()
+        for _k in range(10): self.assertEqual(expected, [list(service.getRights(name)) for name in samples])
+        cached = (time.time() - started) / 10
+        self.assertEqual(count, len(expected[0]))
+
+        log.info('Rights for %s roles, nested set joins %.4fs, effective rights cache %.4fs (%.2fx)', len(samples),
+                 reference, cached, reference / cached)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,246 @@
+'''
+Created on Oct 18, 2026
+
+@package: security - role based access control
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the in process cache for the effective rights of the Rbac objects.
+'''
+
+from ally.container.ioc import injected
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm.session import Session
+from threading import RLock
+from weakref import WeakKeyDictionary, WeakSet
+import time
+
+# --------------------------------------------------------------------
+
+class Effective:
+    '''
+    The effective rights of a Rbac object, made of the rights assigned directly and the rights inherited from the roles.
+    '''
+    __slots__ = ('roles', 'direct', 'inherited', 'types', 'expires')
+
+    def __init__(self, roles, direct, inherited, types):
+        '''
+        Construct the effective rights.
+
+        @param roles: set(integer)
+            The ids of the roles (including the inherited roles) of the Rbac.
+        @param direct: set(integer)
+            The ids of the rights directly assigned to the Rbac.
+        @param inherited: dictionary{integer: integer}
+            The ids of the inherited rights and the number of roles that provide them.
+        @param types: dictionary{integer: string}
+            The right type name indexed by right id.
+        '''
+        assert isinstance(roles, set), 'Invalid roles %s' % roles
+        assert isinstance(direct, set), 'Invalid direct rights %s' % direct
+        assert isinstance(inherited, dict), 'Invalid inherited rights %s' % inherited
+        assert isinstance(types, dict), 'Invalid types %s' % types
+
+        self.roles = roles
+        self.direct = direct
+        self.inherited = inherited
+        self.types = types
+        self.expires = None
+
+    def rightsFor(self, typeName=None):
+        '''
+        Provides the effective rights ids.
+
+        @param typeName: string|None
+            The right type name to provide the rights for, if None all rights are provided.
+        @return: list[integer]
+            The sorted rights ids.
+        '''
+        rights = self.direct.union(self.inherited)
+        if typeName is not None: rights = (rightId for rightId in rights if self.types.get(rightId) == typeName)
+        return sorted(rights)
+
+    def addRight(self, rightId, typeName, isDirect, isInherited):
+        '''
+        Provides the effective rights with the right added, the effective rights are not changed in place since they
+        can be used concurrently.
+
+        @param rightId: integer
+            The right id to add.
+        @param typeName: string
+            The right type name.
+        @param isDirect: boolean
+            Flag indicating that the right has been assigned directly to the Rbac.
+        @param isInherited: boolean
+            Flag indicating that the right has been assigned to one of the Rbac roles.
+        @return: Effective
+            The changed effective rights.
+        '''
+        if not isDirect and not isInherited: return self
+        effective = self.copy()
+        if isDirect: effective.direct.add(rightId)
+        if isInherited: effective.inherited[rightId] = effective.inherited.get(rightId, 0) + 1
+        effective.types[rightId] = typeName
+        return effective
+
+    def remRight(self, rightId, isDirect, isInherited):
+        '''
+        Provides the effective rights with the right removed.
+
+        @param rightId: integer
+            The right id to remove.
+        @param isDirect: boolean
+            Flag indicating that the right has been unassigned directly from the Rbac.
+        @param isInherited: boolean
+            Flag indicating that the right has been unassigned from one of the Rbac roles.
+        @return: Effective
+            The changed effective rights.
+        '''
+        if not isDirect and not isInherited: return self
+        effective = self.copy()
+        if isDirect: effective.direct.discard(rightId)
+        if isInherited:
+            count = effective.inherited.get(rightId, 0) - 1
+            if count > 0: effective.inherited[rightId] = count
+            else: effective.inherited.pop(rightId, None)
+        return effective
+
+    def copy(self):
+        '''
+        Provides a copy of the effective rights.
+        '''
+        effective = Effective(self.roles, set(self.direct), dict(self.inherited), dict(self.types))
+        effective.expires = self.expires
+        return effective
+
+@injected
+class EffectiveCache:
+    '''
+    Cache for the effective rights indexed by Rbac id. The cache is maintained incrementally for the rights changes and
+    by invalidating the dependent effective rights for the roles changes. The changes are applied only after the session
+    that made them is committed, and while a session has changes that are not committed the effective rights for it are
+    not cached.
+    '''
+
+    timeOut = 30
+    # The number of seconds the effective rights are cached for, this limits the time changes that are not made through
+    # this cache (like other processes) are not reflected, if 0 then the effective rights are not cached.
+    maximum = 10000
+    # The maximum number of cached effective rights.
+
+    def __init__(self):
+        assert isinstance(self.timeOut, (int, float)), 'Invalid time out %s' % self.timeOut
+        assert isinstance(self.maximum, int), 'Invalid maximum %s' % self.maximum
+
+        self._entries = OrderedDict()
+        self._pending = WeakKeyDictionary()
+        self._listened = WeakSet()
+        self._generation = 0
+        self._lock = RLock()
+
+    def get(self, session, rbacId, compute):
+        '''
+        Provides the effective rights for the Rbac id.
+
+        @param session: Session
+            The session used for the request.
+        @param rbacId: integer
+            The Rbac id to provide the effective rights for.
+        @param compute: callable() -> Effective
+            The call used for computing the effective rights when they are not cached.
+        @return: Effective
+            The effective rights.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        assert callable(compute), 'Invalid compute %s' % compute
+
+        if self.timeOut <= 0 or session in self._pending: return compute()
+        # The session has changes not committed so we cannot rely on the cache.
+
+        with self._lock:
+            effective = self._entries.get(rbacId)
+            if effective is not None and effective.expires > time.time(): return effective
+            generation = self._generation
+
+        effective = compute()
+        assert isinstance(effective, Effective), 'Invalid effective rights %s' % effective
+        effective.expires = time.time() + self.timeOut
+        with self._lock:
+            # If changes have been committed in the meantime the computed rights might be already obsolete.
+            if generation == self._generation:
+                self._entries.pop(rbacId, None)
+                self._entries[rbacId] = effective
+                while len(self._entries) > self.maximum: self._entries.popitem(last=False)
+        return effective
+
+    def addRight(self, session, rbacId, rightId, typeName):
+        '''
+        Registers the right assigned to the Rbac id, the change is applied when the session is committed.
+        '''
+        def apply(entries):
+            for key, effective in list(entries.items()):
+                entries[key] = effective.addRight(rightId, typeName, key == rbacId, rbacId in effective.roles)
+        self.register(session, apply)
+
+    def remRight(self, session, rbacId, rightId):
+        '''
+        Registers the right unassigned from the Rbac id, the change is applied when the session is committed.
+        '''
+        def apply(entries):
+            for key, effective in list(entries.items()):
+                entries[key] = effective.remRight(rightId, key == rbacId, rbacId in effective.roles)
+        self.register(session, apply)
+
+    def invalidate(self, session, rbacId):
+        '''
+        Registers the invalidation of the effective rights for the Rbac id and all the effective rights that have it as a
+        role, the invalidation is applied when the session is committed.
+        '''
+        def apply(entries):
+            for key in [key for key, effective in entries.items() if key == rbacId or rbacId in effective.roles]:
+                del entries[key]
+        self.register(session, apply)
+
+    def clear(self):
+        '''
+        Clears all the cached effective rights.
+        '''
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    # ----------------------------------------------------------------
+
+    def register(self, session, apply):
+        '''
+        Registers the change to be applied when the session is committed.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        with self._lock:
+            changes = self._pending.get(session)
+            if changes is None: changes = self._pending[session] = []
+            if session not in self._listened:
+                # The session classes created by session makers do not receive the class level listeners registered
+                # before they are created, so the listeners are registered on the session itself.
+                event.listen(session, 'after_commit', self.onCommit)
+                event.listen(session, 'after_rollback', self.onRollback)
+                self._listened.add(session)
+            changes.append(apply)
+
+    def onCommit(self, session):
+        '''
+        Applies the changes registered for the committed session.
+        '''
+        with self._lock:
+            changes = self._pending.pop(session, None)
+            if not changes: return
+            for apply in changes: apply(self._entries)
+            self._generation += 1
+
+    def onRollback(self, session):
+        '''
+        Discards the changes registered for the rolled back session.
+        '''
+        with self._lock: self._pending.pop(session, None)
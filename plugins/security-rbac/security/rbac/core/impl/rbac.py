@@ -9,8 +9,11 @@ Created on Aug 28, 2013
 Implementation for handling ACL service.
 '''
 
+from .effective import EffectiveCache, Effective
 from ally.api.error import IdError
-from ally.support.api.util_service import emptyCollection, modelId
+from ally.container import wire
+from ally.support.api.util_service import emptyCollection, modelId, \
+    processCollection
 from security.api.right import QRight
 from security.meta.right import RightMapped
 from security.meta.right_type import RightTypeMapped
@@ -23,7 +26,7 @@ from sql_alchemy.support.util_service import SessionSupport, buildQuery, \
     iterateCollection
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.orm.util import aliased
-from sqlalchemy.sql.expression import and_
+from sqlalchemy.sql.expression import and_, or_
 
 # --------------------------------------------------------------------
 
@@ -37,6 +40,9 @@ class RbacServiceAlchemy(SessionSupport):
     RBAC structure on it.
     '''
     
+    effective = EffectiveCache; wire.entity('effective')
+    # The effective rights cache, shared by all the RBAC services since roles changes affect all Rbac objects.
+    
     def __init__(self, Rbac):
         '''
         Construct the RBAC service alchemy.
@@ -74,11 +80,12 @@ class RbacServiceAlchemy(SessionSupport):
         rbacId = self.findRbacId(identifier)
         if rbacId is None: return emptyCollection(**options)
         
-        sql = self.sqlRights(rbacId, typeName)
         if q:
             assert isinstance(q, QRight), 'Invalid query %s' % q
-            sql = buildQuery(sql, q, RightMapped)
-        return iterateCollection(sql, **options)
+            sql = buildQuery(self.sqlRights(rbacId, typeName), q, RightMapped)
+            return iterateCollection(sql, **options)
+        
+        return processCollection(self.effectiveFor(rbacId).rightsFor(typeName), **options)
 
     def addRole(self, identifier, roleName):
         '''
@@ -93,6 +100,7 @@ class RbacServiceAlchemy(SessionSupport):
         sql = self.session().query(RbacRole).filter(RbacRole.rbacId == rbacId).filter(RbacRole.roleId == roleId)
         if sql.count() > 0: return  # The role is already mapped to Rbac
         self.session().add(RbacRole(rbacId=rbacId, roleId=roleId))
+        self.effective.invalidate(self.session(), rbacId)
         
     def remRole(self, identifier, roleName):
         '''
@@ -109,6 +117,7 @@ class RbacServiceAlchemy(SessionSupport):
         except NoResultFound: return False
         
         self.session().delete(rbacRole)
+        self.effective.invalidate(self.session(), rbacId)
         return True
     
     def addRight(self, identifier, rightId):
@@ -123,6 +132,11 @@ class RbacServiceAlchemy(SessionSupport):
         if sql.count() > 0: return  # The right is already mapped to Rbac
         self.session().add(RbacRight(rbacId=rbacId, rightId=rightId))
         
+        sql = self.session().query(RightTypeMapped.Name).join(RightMapped).filter(RightMapped.Id == rightId)
+        try: typeName, = sql.one()
+        except NoResultFound: self.effective.invalidate(self.session(), rbacId)
+        else: self.effective.addRight(self.session(), rbacId, rightId, typeName)
+        
     def remRight(self, identifier, rightId):
         '''
         @see: IRbacPrototype.remRight
@@ -138,6 +152,7 @@ class RbacServiceAlchemy(SessionSupport):
         except NoResultFound: return False
         
         self.session().delete(rbacRight)
+        self.effective.remRight(self.session(), rbacId, rightId)
         return True
 
     # ----------------------------------------------------------------
@@ -181,6 +196,37 @@ class RbacServiceAlchemy(SessionSupport):
     
     # ----------------------------------------------------------------
     
+    def effectiveFor(self, rbacId):
+        '''
+        Provides the effective rights for the provided rbac id, from the cache if available.
+        
+        @param rbacId: integer
+            The rbac id to provide the effective rights for.
+        @return: Effective
+            The effective rights.
+        '''
+        assert isinstance(rbacId, int), 'Invalid rbac id %s' % rbacId
+        
+        def compute():
+            sqlRoles = self.session().query(Child.roleId)
+            sqlRoles = sqlRoles.join(Parent, and_(Child.left >= Parent.left, Child.right <= Parent.right))
+            sqlRoles = sqlRoles.join(RbacRole, and_(RbacRole.roleId == Parent.roleId, RbacRole.rbacId == rbacId))
+            sqlRoles = sqlRoles.distinct()
+            
+            sql = self.session().query(RbacRight.rbacId, RbacRight.rightId, RightTypeMapped.Name)
+            sql = sql.join(RightMapped, RightMapped.Id == RbacRight.rightId).join(RightTypeMapped)
+            sql = sql.filter(or_(RbacRight.rbacId == rbacId, RbacRight.rbacId.in_(sqlRoles.subquery())))
+            
+            roles = set(roleId for roleId, in sqlRoles.all())
+            direct, inherited, types = set(), {}, {}
+            for rightRbacId, rightId, typeName in sql.all():
+                if rightRbacId == rbacId: direct.add(rightId)
+                if rightRbacId in roles: inherited[rightId] = inherited.get(rightId, 0) + 1
+                types[rightId] = typeName
+            return Effective(roles, direct, inherited, types)
+        
+        return self.effective.get(self.session(), rbacId, compute)
+    
     def sqlRights(self, rbacId, typeName=None):
         '''
         Generates the sql that can be used for fetching all rights for the provided rbac id.
@@ -20,7 +20,7 @@ from sql_alchemy.impl.entity import EntityServiceAlchemy
 from sql_alchemy.support.mapper import InsertFromSelect, tableFor
 from sql_alchemy.support.util_service import insertModel
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy.sql.expression import and_, select
+from sqlalchemy.sql.expression import and_, select, case, union_all
 from ally.api.validate import validate
 
 # --------------------------------------------------------------------
@@ -95,88 +95,43 @@ class RoleServiceAlchemy(EntityServiceAlchemy, RbacServiceAlchemy, IRoleRbacServ
         treeWidth = childNode.right - childNode.left + 1
         id = childNode.id
 
-        # get the number of duplicates for parent
-        sql = self.session().query(RoleNode).filter(RoleNode.roleId == toRoleId)
-        treeCnt = sql.count()
-
-        right, count = 0, 0
-        sql = self.session().query(RoleNode.right).filter(RoleNode.roleId == toRoleId).order_by(RoleNode.right.desc())
-
-        for left, in sql.all():
-            if count == 0:
-                # last interval
-                gap = treeWidth * treeCnt
-
-                sql = self.session().query(RoleNode).filter(RoleNode.left >= left)
-                sql.update({RoleNode.left: RoleNode.left + gap}, False)
-
-                sql = self.session().query(RoleNode).filter(RoleNode.right >= left)
-                sql.update({RoleNode.right: RoleNode.right + gap}, False)
-
-                self.session().flush()
-                self.session().commit()
-
-                # get child roleNode
-                childNode = self.session().query(RoleNode).get(id)
-
-                gap = left - childNode.left
-
-                # insert
-                insert = InsertFromSelect(tableFor(RoleNode), 'fk_role_id, lft, rgt',
-                                          select([RoleNode.roleId, RoleNode.left + gap, RoleNode.right + gap]
-                                                ).where(and_(RoleNode.left >= childNode.left, RoleNode.right <= childNode.right)))
-                self.session().execute(insert)
-
-                right = left
-                count = count + 1
-                continue
-
-            gap = (treeCnt - count) * treeWidth
-
-            sql = self.session().query(RoleNode).filter(and_(RoleNode.left >= left, RoleNode.left < right))
-            sql.update({RoleNode.left: RoleNode.left + gap}, False)
-
-            sql = self.session().query(RoleNode).filter(and_(RoleNode.right >= left, RoleNode.right < right))
-            sql.update({RoleNode.right: RoleNode.right + gap}, False)
-
-            self.session().flush()
-            self.session().commit()
-
-            # get child roleNode
-            sql = self.session().query(RoleNode).get(id)
-
-            gap = gap + left - childNode.left
-
-            # insert
-            # for sqlite is nedeed: INSERT INTO t1 (columns) SELECT * FROM t1
-            # change how is specified the list of columns
-            insert = InsertFromSelect(tableFor(RoleNode), 'fk_role_id, lft, rgt',
-                                      select([RoleNode.roleId, RoleNode.left + gap, RoleNode.right + gap]
-                                             ).where(and_(RoleNode.left >= childNode.left, RoleNode.right <= childNode.right)))
-            self.session().execute(insert)
-
-            right = left
-            count = count + 1
+        # the child subtree is copied as the last child of every parent duplicate
+        sql = self.session().query(RoleNode.right).filter(RoleNode.roleId == toRoleId).order_by(RoleNode.right)
+        positions = [right for right, in sql.all()]
+        if not positions: return
+        
+        # shift all the intervals in a single statement, each value is shifted with the tree width for every copy
+        # position that is before it
+        self.session().flush()
+        sql = self.session().query(RoleNode).filter(RoleNode.right >= positions[0])
+        sql.update({RoleNode.left: RoleNode.left + self.shiftFor(RoleNode.left, positions, treeWidth),
+                    RoleNode.right: RoleNode.right + self.shiftFor(RoleNode.right, positions, treeWidth)}, False)
+        
+        # insert all the copies in a single statement, the child subtree might have been also shifted
+        left, right = self.session().query(RoleNode.left, RoleNode.right).filter(RoleNode.id == id).one()
+        copies = [select([RoleNode.roleId, RoleNode.left + position + k * treeWidth - left,
+                          RoleNode.right + position + k * treeWidth - left]
+                         ).where(and_(RoleNode.left >= left, RoleNode.right <= right))
+                  for k, position in enumerate(positions)]
+        # for sqlite is nedeed: INSERT INTO t1 (columns) SELECT * FROM t1
+        # change how is specified the list of columns
+        insert = InsertFromSelect(tableFor(RoleNode), 'fk_role_id, lft, rgt',
+                                  copies[0] if len(copies) == 1 else union_all(*copies))
+        self.session().execute(insert)
 
         # if has root parent, delete from it
         if parentCnt == 1:
-            # get child roleNode
-            sql = self.session().query(RoleNode).get(id)
-
-            left = childNode.left
-            right = childNode.right
-
             # delete child subtree from root
             sql = self.session().query(RoleNode).filter(and_(RoleNode.left >= left, RoleNode.right <= right))
-            sql.delete()
+            sql.delete(False)
 
-            # update lft
-            sql = self.session().query(RoleNode).filter(RoleNode.left > left)
-            sql.update({RoleNode.left: RoleNode.left - treeWidth}, False)
-
-            # update rgt
+            # update lft and rgt
             sql = self.session().query(RoleNode).filter(RoleNode.right > right)
-            sql.update({RoleNode.right: RoleNode.right - treeWidth}, False)
+            sql.update({RoleNode.left: case([(RoleNode.left > right, RoleNode.left - treeWidth)], else_=RoleNode.left),
+                        RoleNode.right: RoleNode.right - treeWidth}, False)
+        
+        self.session().expire_all()
+        self.effective.invalidate(self.session(), toRoleId)
     
     def remRole(self, identifier, roleName):
         '''
@@ -254,10 +209,29 @@ class RoleServiceAlchemy(EntityServiceAlchemy, RbacServiceAlchemy, IRoleRbacServ
             sql = self.session().query(RoleNode).filter(RoleNode.right >= childRight)
             sql.update({RoleNode.right: RoleNode.right - gap}, False)
 
+        self.effective.invalidate(self.session(), toRoleId)
         return True
     
     # ----------------------------------------------------------------
 
+    def shiftFor(self, column, positions, width):
+        '''
+        Provides the expression for the shifting of the column, the column value is shifted with the width for every
+        position that is lower or equal.
+        
+        @param column: Column
+            The column to provide the shift for.
+        @param positions: list[integer]
+            The sorted positions.
+        @param width: integer
+            The width to shift for every position.
+        @return: expression
+            The shift expression.
+        '''
+        assert isinstance(positions, list) and positions, 'Invalid positions %s' % positions
+        return case([(column >= position, (k + 1) * width) for k, position in reversed(list(enumerate(positions)))],
+                    else_=0)
+
     def rootId(self):
         '''
         Return the root node id, that has the lower left value
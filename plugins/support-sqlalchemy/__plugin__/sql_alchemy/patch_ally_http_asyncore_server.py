@@ -0,0 +1,34 @@
+'''
+Created on Oct 18, 2026
+
+@package: support sqlalchemy
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the asyncore server patch that makes the database connection pools aware of the serving processes.
+'''
+
+import logging
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+try:
+    from __setup__ import ally_http_asyncore_server  # @UnusedImport
+except ImportError: log.info('No asyncore server component available, thus no need to apply the multiple processes patch')
+else:
+    from __setup__.ally_http.server import server_type
+    from __setup__.ally_http_asyncore_server.server import server_processes, SERVER_ASYNCORE
+    from sql_alchemy.multiprocess_config import enableMultiProcessPool
+    
+    def isMultiProcess():
+        '''
+        Checks if the asyncore server is going to fork serving processes.
+        '''
+        return server_type() == SERVER_ASYNCORE and server_processes() > 1
+    
+    enableMultiProcessPool(isMultiProcess)
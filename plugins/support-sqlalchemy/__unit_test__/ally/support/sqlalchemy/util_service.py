@@ -0,0 +1,209 @@
+'''
+Created on Oct 18, 2026
+
+@package: support sqlalchemy
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides unit testing for the sql alchemy keyset (cursor) slicing and total strategies.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.api.config import model, query
+from ally.api.criteria import AsLikeOrdered, AsRangeOrdered
+from ally.api.error import InputError
+from ally.api.extension import IterCursor, IterSlice
+from sql_alchemy.support.mapper import mapperModel
+from sql_alchemy.support.util_service import buildQuery, iterateCollection, \
+    iterateObjectCollection, TotalWindow, TotalCached, TotalEstimated, \
+    encodeCursor, decodeCursor
+from sqlalchemy.engine import create_engine
+from sqlalchemy.orm.session import sessionmaker
+from sqlalchemy.schema import Table, Column, MetaData
+from sqlalchemy.types import String, Integer
+from datetime import datetime, date
+from decimal import Decimal
+import logging
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+meta = MetaData()
+
+@model(id='Id')
+class Item:
+    '''
+    Provides the item model.
+    '''
+    Id = int
+    Name = str
+    Rank = int
+
+@query(Item)
+class QItem:
+    '''
+    Provides the item query.
+    '''
+    name = AsLikeOrdered
+    rank = AsRangeOrdered
+
+table = Table('item', meta,
+              Column('id', Integer, primary_key=True, key='Id'),
+              Column('name', String(255), nullable=False, key='Name'),
+              Column('rank', Integer, nullable=False, index=True, key='Rank'))
+
+ItemMapped = mapperModel(Item, table)
+
+def createSession(count):
+    engine = create_engine('sqlite:///:memory:')
+    meta.create_all(engine)
+    engine.execute(table.insert(), [{'Id': k + 1, 'Name': 'item%06d' % k, 'Rank': (k * 7) % 13} for k in range(count)])
+    return sessionmaker(bind=engine)()
+
+# --------------------------------------------------------------------
+
+class TestCursor(unittest.TestCase):
+
+    def setUp(self):
+        self.session = createSession(500)
+
+    def tearDown(self):
+        self.session.close()
+
+    def queryIds(self):
+        q = QItem()
+        q.rank.ascending = False
+        return buildQuery(self.session.query(ItemMapped.Id), q, ItemMapped).order_by(ItemMapped.Id)
+
+    def testCursorSlices(self):
+        expected = list(iterateCollection(self.queryIds()))
+        self.assertEqual(500, len(expected))
+
+        ids, cursor, slices = [], '', 0
+        while cursor is not None:
+            collection = iterateCollection(self.queryIds(), limit=30, withTotal=slices == 0, cursor=cursor)
+            self.assertIsInstance(collection, IterCursor)
+            if slices == 0: self.assertEqual(500, collection.total)
+            else: self.assertIsNone(collection.total)
+            ids.extend(collection)
+            cursor, slices = collection.cursor, slices + 1
+        self.assertEqual(expected, ids)
+        self.assertEqual(17, slices)
+
+        collection = iterateCollection(self.queryIds(), limit=None, cursor='')
+        self.assertEqual(expected, list(collection))
+        self.assertIsNone(collection.cursor)
+
+    def testCursorObjects(self):
+        q = QItem()
+        q.name.ascending = False
+        q.name.like = 'item0001%'
+        sql = buildQuery(self.session.query(ItemMapped), q, ItemMapped)
+
+        names, cursor = [], ''
+        while cursor is not None:
+            collection = iterateObjectCollection(sql, limit=3, cursor=cursor)
+            names.extend(item.Name for item in collection)
+            cursor = collection.cursor
+        self.assertEqual(['item%06d' % k for k in range(199, 99, -1)], names)
+
+    def testCursorEncoding(self):
+        values = [1, 'name', None, 1.5, datetime(2026, 10, 18, 10, 11, 12, 13), date(2026, 10, 18), Decimal('1.25')]
+        cursor = encodeCursor(values)
+        self.assertNotIn('=', cursor)
+        self.assertEqual(values, decodeCursor(cursor))
+
+        self.assertRaises(InputError, decodeCursor, 'invalid')
+        self.assertRaises(InputError, iterateCollection, self.queryIds(), limit=10, cursor=encodeCursor([1]))
+
+    def testTotalStrategies(self):
+        expected = list(iterateCollection(self.queryIds(), offset=490, limit=30))[490:]
+        for totalBy in (None, TotalWindow(), TotalCached(), TotalEstimated(), TotalCached(wrapped=TotalWindow())):
+            collection = iterateCollection(self.queryIds(), offset=490, limit=30, withTotal=True, totalBy=totalBy)
+            self.assertIsInstance(collection, IterSlice)
+            self.assertEqual((500, 490, 10), (collection.total, collection.offset, collection.limit))
+            self.assertEqual(expected, list(collection))
+
+            collection = iterateCollection(self.queryIds(), offset=600, limit=30, withTotal=True, totalBy=totalBy)
+            self.assertEqual(500, collection.total)
+            self.assertEqual([], list(collection))
+
+            collection = iterateObjectCollection(self.session.query(ItemMapped).order_by(ItemMapped.Id), offset=10,
+                                                 limit=2, withTotal=True, totalBy=totalBy)
+            self.assertEqual((500, ['item000010', 'item000011']), (collection.total, [item.Name for item in collection]))
+
+    def testTotalCached(self):
+        totalBy = TotalCached(timeOut=0.2)
+        self.assertEqual(500, iterateCollection(self.queryIds(), limit=1, withTotal=True, totalBy=totalBy).total)
+        self.session.execute(table.delete().where(table.c.Id > 400))
+
+        self.assertEqual(500, iterateCollection(self.queryIds(), limit=1, withTotal=True, totalBy=totalBy).total)
+        sql = self.queryIds().filter(ItemMapped.Rank == 1)
+        self.assertEqual(31, iterateCollection(sql, limit=1, withTotal=True, totalBy=totalBy).total)
+        time.sleep(0.25)
+        self.assertEqual(400, iterateCollection(self.queryIds(), limit=1, withTotal=True, totalBy=totalBy).total)
+
+# --------------------------------------------------------------------
+
+class BenchmarkSlicing(unittest.TestCase):
+
+    count = 200000
+    # The number of rows in the benchmark table.
+    limit = 50
+    # The slice size.
+    slices = 20
+    # The number of deep slices to fetch.
+
+    def testBenchmark(self):
+        session = createSession(self.count)
+        try:
+            def queryIds():
+                q = QItem()
+                q.rank.ascending = True
+                return buildQuery(session.query(ItemMapped.Id), q, ItemMapped)
+
+            offset = self.count - self.limit * self.slices
+            cursor = iterateCollection(queryIds(), limit=offset, cursor='').cursor
+
+            timings = {}
+            for name, totalBy in (('count', None), ('window', TotalWindow()), ('cached', TotalCached())):
+                started, ids = time.time(), []
+                for k in range(self.slices):
+                    collection = iterateCollection(queryIds().order_by(ItemMapped.Id), offset=offset + k * self.limit,
+                                                   limit=self.limit, withTotal=True, totalBy=totalBy)
+                    self.assertEqual(self.count, collection.total)
+                    ids.extend(collection)
+                timings[name] = time.time() - started
+
+            for name, withTotal, totalBy in (('cursor', False, None), ('cursor and cached', True, TotalCached())):
+                started, cursorIds, current = time.time(), [], cursor
+                for k in range(self.slices):
+                    collection = iterateCollection(queryIds(), limit=self.limit, withTotal=withTotal, cursor=current,
+                                                   totalBy=totalBy)
+                    cursorIds.extend(collection)
+                    current = collection.cursor
+                timings[name] = time.time() - started
+                self.assertEqual(ids, cursorIds)
+
+            for name, elapsed in sorted(timings.items(), key=lambda item: item[1]):
+                log.info('Slicing %s rows, %s deep slices of %s with %s: %.4fs (%.2fx offset and count)', self.count,
+                         self.slices, self.limit, name, elapsed, timings['count'] / elapsed)
+        finally: session.close()
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
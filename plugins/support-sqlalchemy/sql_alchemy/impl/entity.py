@@ -28,6 +28,9 @@ class EntitySupportAlchemy(SessionSupport):
     '''
     Provides support generic entity handling.
     '''
+    
+    totalBy = None
+    # The strategy used for providing the collections total count, @see: sql_alchemy.support.util_service.TotalCount
 
     def __init__(self, Mapped, QEntity=None, **mapping):
         '''
@@ -83,7 +86,8 @@ class EntityFindServiceAlchemy(EntitySupportAlchemy):
         '''
         @see: IEntityFindPrototype.getAll
         '''
-        return iterateCollection(self.session().query(self.MappedId).order_by(self.MappedId), **options)
+        return iterateCollection(self.session().query(self.MappedId).order_by(self.MappedId), totalBy=self.totalBy,
+                                 **options)
 
 class EntityQueryServiceAlchemy(EntitySupportAlchemy):
     '''
@@ -99,7 +103,7 @@ class EntityQueryServiceAlchemy(EntitySupportAlchemy):
         if q is not None:
             assert isinstance(q, self.QEntity), 'Invalid query %s' % q
             sql = buildQuery(sql, q, self.Mapped, orderBy=self.MappedId, autoJoin=True, **self._mapping)
-        return iterateCollection(sql, **options)
+        return iterateCollection(sql, totalBy=self.totalBy, **options)
 
 class EntityCRUDServiceAlchemy(EntitySupportAlchemy):
     '''
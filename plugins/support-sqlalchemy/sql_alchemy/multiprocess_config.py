@@ -10,21 +10,27 @@ Provides the configuration used for wraping the connection pool to properly supp
 '''
 
 from ally.container import support
-from ally.support.sqlalchemy.pool import SingletonProcessWrapper
-from sqlalchemy.engine.base import Engine
 from ally.support.util_sys import callerLocals
+from sql_alchemy.support.pool import SingletonProcessWrapper
+from sqlalchemy.engine.base import Engine
     
 # --------------------------------------------------------------------
 
-def enableMultiProcessPool():
+def enableMultiProcessPool(condition=None):
     '''
     Wraps all the engines in the current assembly with a pool that allows for working on multiple processes.
+    
+    @param condition: callable()|None
+        The condition called at engine creation in order to check if the multiple processes pool is required, if None
+        then the engines are always wrapped.
     '''
+    assert condition is None or callable(condition), 'Invalid condition %s' % condition
     def present(engine):
         '''
         Used for listening to all sql alchemy engines that are created in order to wrap the engine pool with a pool that can
         handle multiple processors.
         '''
+        if condition is not None and not condition(): return
         if not isinstance(engine.pool, SingletonProcessWrapper):
             engine.pool = SingletonProcessWrapper(engine.pool)
     
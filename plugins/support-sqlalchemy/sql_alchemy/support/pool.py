@@ -9,8 +9,8 @@ Created on Oct 18, 2012
 Contains pool implementations for sql alchemy database setup.
 '''
 
-from multiprocessing.process import current_process
 from sqlalchemy.pool import Pool
+import os
 
 # --------------------------------------------------------------------
 
@@ -21,14 +21,15 @@ class SingletonProcessWrapper(Pool):
     A Pool that wraps another pool that will be recreated for each process.
 
     Maintains one pool per each process, never moving a connection pool to a process other than the one which it
-    was created in.
+    was created in, the processes are identified by their id so also the processes obtained by forking will have their
+    own pool.
     '''
 
     def __init__(self, wrapped):
         assert isinstance(wrapped, Pool), 'Invalid wrapped pool %s' % wrapped
         
         self._wrapped = wrapped
-        self._pools = set()
+        self._pools = {}
 
     def unique_connection(self):
         '''
@@ -52,7 +53,10 @@ class SingletonProcessWrapper(Pool):
         '''
         @see: Pool.dispose
         '''
-        for pool in self._pools: pool.dispose()
+        # Only the pool of the current process is disposed since the connections of the other processes pools are
+        # not owned by this process.
+        pool = self._pools.get(os.getpid())
+        if pool is not None: pool.dispose()
         self._pools.clear()
 
     def status(self):
@@ -65,9 +69,7 @@ class SingletonProcessWrapper(Pool):
         '''
         Provides the pool for the current process.
         '''
-        process = current_process()
-        try: return process._ally_db_pool
-        except AttributeError: pass
-        pool = process._ally_db_pool = self._wrapped.recreate()
-        self._pools.add(pool)
+        pid = os.getpid()
+        pool = self._pools.get(pid)
+        if pool is None: pool = self._pools[pid] = self._wrapped.recreate()
         return pool
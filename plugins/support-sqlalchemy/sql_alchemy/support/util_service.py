@@ -9,17 +9,30 @@ Created on Jan 5, 2012
 Provides utility methods for SQL alchemy service implementations.
 '''
 
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from collections import OrderedDict
+from datetime import datetime, date, time as time_
+from decimal import Decimal
 from inspect import isclass
 from itertools import chain
+from sqlalchemy.orm import class_mapper
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.orm.interfaces import PropComparator
 from sqlalchemy.orm.mapper import Mapper
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import _UnaryExpression, func, and_, or_
+from threading import RLock
+import binascii
+import json
+import re
+import time
 
 from ally.api.criteria import AsLike, AsOrdered, AsBoolean, AsEqual, AsDate, \
     AsTime, AsDateTime, AsRange
-from ally.api.error import IdError
-from ally.api.extension import IterSlice
+from ally.api.error import IdError, InputError
+from ally.api.extension import IterSlice, IterCursor
+from ally.api.option import SliceAndCursor
 from ally.api.operator.type import TypeProperty, TypeCriteria, TypeModel
 from ally.api.type import typeFor
 from ally.support.api.util_service import namesFor
@@ -168,16 +181,17 @@ def buildQuery(sql, query, Mapped, only=None, exclude=None, orderBy=None, autoJo
                 else:
                     unordered.append((column, crt.ascending, None))
 
-        if ordered or unordered:
-            if ordered: ordered.sort(key=lambda pack: pack[2])
-            for column, asc, _priority in chain(ordered, unordered):
-                if asc: sql = sql.order_by(column)
-                else: sql = sql.order_by(column.desc())
-        elif orderBy is not None: sql.order_by(orderBy)
+    if ordered or unordered:
+        if ordered: ordered.sort(key=lambda pack: pack[2])
+        for column, asc, _priority in chain(ordered, unordered):
+            if asc: sql = sql.order_by(column)
+            else: sql = sql.order_by(column.desc())
+    elif orderBy is not None: sql = sql.order_by(orderBy)
 
     return sql
 
-def iterateObjectCollection(sql, offset=None, limit=None, withTotal=False, factorySlice=IterSlice):
+def iterateObjectCollection(sql, offset=None, limit=None, withTotal=False, cursor=None, totalBy=None,
+                            factorySlice=IterSlice):
     '''
     Iterates the collection of objects from the sql query based on the provided parameters.
     
@@ -186,16 +200,24 @@ def iterateObjectCollection(sql, offset=None, limit=None, withTotal=False, facto
         
     ... the options
     
+    @param totalBy: TotalCount|None
+        The strategy used for providing the total count, if None the default exact count is used.
     @return: Iterable(object)
         The obtained collection of objects.
     '''
+    if totalBy is None: totalBy = TOTAL_COUNT
+    assert isinstance(totalBy, TotalCount), 'Invalid total strategy %s' % totalBy
+    if cursor is not None:
+        rows, cursor, total = fetchCursor(sql, cursor, limit, withTotal, totalBy)
+        return IterCursor([row[0] for row in rows], cursor, total, limit)
+    
     if withTotal:
-        sqlLimit = buildLimits(sql, offset, limit)
-        if limit <= 0: return factorySlice((), sql.count())
-        return factorySlice(sqlLimit.yield_per(10), sql.count(), offset, limit)
+        if limit is not None and limit <= 0: return factorySlice((), totalBy.count(sql))
+        rows, total = totalBy.fetch(sql.yield_per(10), offset, limit)
+        return factorySlice(rows, total, offset, limit)
     return sql.yield_per(10)
 
-def iterateCollection(sql, offset=None, limit=None, withTotal=False, _factorySlice=IterSlice):
+def iterateCollection(sql, offset=None, limit=None, withTotal=False, cursor=None, totalBy=None, _factorySlice=IterSlice):
     '''
     Iterates the collection of value from the sql query based on the provided parameters.
     
@@ -204,17 +226,391 @@ def iterateCollection(sql, offset=None, limit=None, withTotal=False, _factorySli
         
     ... the options
     
+    @param totalBy: TotalCount|None
+        The strategy used for providing the total count, if None the default exact count is used.
     @return: Iterable(object)
         The obtained collection of values.
     '''
+    if totalBy is None: totalBy = TOTAL_COUNT
+    assert isinstance(totalBy, TotalCount), 'Invalid total strategy %s' % totalBy
+    if cursor is not None:
+        rows, cursor, total = fetchCursor(sql, cursor, limit, withTotal, totalBy)
+        return IterCursor([row[0] for row in rows], cursor, total, limit)
+    
     if withTotal:
-        sqlLimit = buildLimits(sql, offset, limit)
-        if limit == 0: return _factorySlice((), sql.count())
-        return _factorySlice((value for value, in sqlLimit.all()), sql.count(), offset, limit)
+        if limit == 0: return _factorySlice((), totalBy.count(sql))
+        rows, total = totalBy.fetch(sql, offset, limit)
+        return _factorySlice((value for value, in rows), total, offset, limit)
     return (value for value, in sql.all())
 
 # --------------------------------------------------------------------
 
+class TotalCount:
+    '''
+    The total strategy that provides the exact total count using a separated count query, this is the default strategy.
+    '''
+    
+    def count(self, sql):
+        '''
+        Provides the total count for the sql query.
+        
+        @param sql: SQL alchemy
+            The sql alchemy query to count.
+        @return: integer
+            The total count.
+        '''
+        return sql.count()
+    
+    def fetch(self, sql, offset=None, limit=None):
+        '''
+        Provides the rows for the sql query slice and the total count.
+        
+        @param sql: SQL alchemy
+            The sql alchemy query to fetch the rows from.
+        @param offset: integer|None
+            The offset to fetch rows from.
+        @param limit: integer|None
+            The limit of rows to fetch.
+        @return: tuple(Iterable(object), integer)
+            The rows as provided by the query and the total count.
+        '''
+        return buildLimits(sql, offset, limit), self.count(sql)
+
+class TotalWindow(TotalCount):
+    '''
+    The total strategy that provides the exact total count in the same round-trip as the rows, by using the
+    COUNT(*) OVER () window function, the database needs to support window functions. Databases that materialize the
+    whole window before limiting (ex: SQLite) can be slower with this strategy then with the separated count.
+    '''
+    
+    def fetch(self, sql, offset=None, limit=None):
+        '''
+        @see: TotalCount.fetch
+        '''
+        rows = buildLimits(sql.add_columns(func.count().over()), offset, limit).all()
+        if not rows:
+            # If there are no rows for the slice we can only know the total by counting.
+            if offset: return rows, self.count(sql)
+            return rows, 0
+        
+        total = rows[0][-1]
+        if isEntityQuery(sql): return [row[0] for row in rows], total
+        return [tuple(row[:-1]) for row in rows], total
+
+class TotalCached(TotalCount):
+    '''
+    The total strategy that caches for a period of time the total counts provided by a wrapped strategy, the totals are
+    cached based on the query fingerprint (the compiled SQL and parameters).
+    '''
+    
+    def __init__(self, timeOut=60, maximum=1000, wrapped=None):
+        '''
+        Construct the cached total.
+        
+        @param timeOut: integer|float
+            The number of seconds a total is cached for.
+        @param maximum: integer
+            The maximum number of cached totals.
+        @param wrapped: TotalCount|None
+            The strategy that provides the totals to be cached, if None the default exact count is used.
+        '''
+        assert isinstance(timeOut, (int, float)), 'Invalid time out %s' % timeOut
+        assert isinstance(maximum, int), 'Invalid maximum %s' % maximum
+        if wrapped is None: wrapped = TOTAL_COUNT
+        assert isinstance(wrapped, TotalCount), 'Invalid wrapped strategy %s' % wrapped
+        
+        self.timeOut = timeOut
+        self.maximum = maximum
+        self.wrapped = wrapped
+        
+        self._totals = OrderedDict()
+        self._lock = RLock()
+        
+    def count(self, sql):
+        '''
+        @see: TotalCount.count
+        '''
+        fingerprint = fingerprintFor(sql)
+        total = self.cached(fingerprint)
+        if total is None:
+            total = self.wrapped.count(sql)
+            self.cache(fingerprint, total)
+        return total
+    
+    def fetch(self, sql, offset=None, limit=None):
+        '''
+        @see: TotalCount.fetch
+        '''
+        fingerprint = fingerprintFor(sql)
+        total = self.cached(fingerprint)
+        if total is None:
+            rows, total = self.wrapped.fetch(sql, offset, limit)
+            self.cache(fingerprint, total)
+            return rows, total
+        return buildLimits(sql, offset, limit), total
+    
+    # ----------------------------------------------------------------
+    
+    def cached(self, fingerprint):
+        '''
+        Provides the cached total for the fingerprint.
+        
+        @param fingerprint: tuple
+            The query fingerprint.
+        @return: integer|None
+            The cached total or None if there is no valid total cached.
+        '''
+        with self._lock:
+            cached = self._totals.get(fingerprint)
+            if cached is None: return
+            expires, total = cached
+            if expires > time.time(): return total
+            del self._totals[fingerprint]
+    
+    def cache(self, fingerprint, total):
+        '''
+        Caches the total for the fingerprint.
+        
+        @param fingerprint: tuple
+            The query fingerprint.
+        @param total: integer
+            The total to cache.
+        '''
+        with self._lock:
+            self._totals.pop(fingerprint, None)
+            self._totals[fingerprint] = (time.time() + self.timeOut, total)
+            while len(self._totals) > self.maximum: self._totals.popitem(last=False)
+            
+class TotalEstimated(TotalCount):
+    '''
+    The total strategy that provides the total count as estimated by the database query planner, only if the estimation
+    is larger then a threshold, smaller totals are provided by the wrapped strategy. The estimation is available for
+    PostgreSQL and MySQL, for other databases the wrapped strategy is used.
+    '''
+    
+    def __init__(self, threshold=100000, wrapped=None):
+        '''
+        Construct the estimated total.
+        
+        @param threshold: integer
+            The estimated total from which the estimation is provided instead of the wrapped strategy total.
+        @param wrapped: TotalCount|None
+            The strategy that provides the totals bellow the threshold, if None the default exact count is used.
+        '''
+        assert isinstance(threshold, int), 'Invalid threshold %s' % threshold
+        if wrapped is None: wrapped = TOTAL_COUNT
+        assert isinstance(wrapped, TotalCount), 'Invalid wrapped strategy %s' % wrapped
+        
+        self.threshold = threshold
+        self.wrapped = wrapped
+        
+    def count(self, sql):
+        '''
+        @see: TotalCount.count
+        '''
+        estimate = self.estimate(sql)
+        if estimate is None or estimate < self.threshold: return self.wrapped.count(sql)
+        return estimate
+    
+    def fetch(self, sql, offset=None, limit=None):
+        '''
+        @see: TotalCount.fetch
+        '''
+        estimate = self.estimate(sql)
+        if estimate is None or estimate < self.threshold: return self.wrapped.fetch(sql, offset, limit)
+        return buildLimits(sql, offset, limit), estimate
+    
+    # ----------------------------------------------------------------
+    
+    def estimate(self, sql):
+        '''
+        Provides the query planner estimation of the rows count for the sql query.
+        
+        @param sql: SQL alchemy
+            The sql alchemy query to estimate.
+        @return: integer|None
+            The estimated count or None if no estimation is available.
+        '''
+        connection = sql.session.connection()
+        name = connection.dialect.name
+        if name not in ('postgresql', 'mysql'): return
+        
+        compiled = sql.statement.compile(dialect=connection.dialect)
+        if compiled.positional: params = tuple(compiled.params[name] for name in compiled.positiontup)
+        else: params = compiled.params
+        result = connection.execute('EXPLAIN %s' % compiled, params)
+        try:
+            if name == 'postgresql':
+                # The first line of the plan contains the top node estimation, ex: 'Seq Scan on t (cost=... rows=10 ...)'
+                match = ESTIMATE_POSTGRESQL.search(result.scalar() or '')
+                if match: return int(match.group(1))
+            else:
+                estimates = [row['rows'] for row in result if row['rows'] is not None]
+                if estimates: return int(max(estimates))
+        finally: result.close()
+
+TOTAL_COUNT = TotalCount()
+# The default total strategy.
+ESTIMATE_POSTGRESQL = re.compile('rows=(\\d+)')
+# The regex used for extracting the PostgreSQL plan rows estimation.
+
+# --------------------------------------------------------------------
+
+def fetchCursor(sql, cursor, limit=None, withTotal=False, totalBy=TOTAL_COUNT):
+    '''
+    Fetches the keyset (cursor) slice of rows for the sql query. The keyset is made of the query order by columns and
+    the query identifiers (the first queried column or the entity primary key) which are added to the order by if not
+    already present. The ordered columns should not contain NULL values since they cannot be compared in the keyset.
+    
+    @param sql: SQL alchemy
+        The sql alchemy query to fetch the rows from.
+    @param cursor: string
+        The continuation token to fetch the rows after, an empty string for the first slice.
+    @param limit: integer|None
+        The limit of rows to fetch.
+    @param withTotal: boolean
+        Flag indicating that the total count should be provided.
+    @param totalBy: TotalCount
+        The strategy used for providing the total count.
+    @return: tuple(list[tuple], string|None, integer|None)
+        The rows as tuples of the queried columns, the continuation token for the next slice (None if there are no more
+        rows) and the total count (None if not requested).
+    '''
+    assert isinstance(cursor, str), 'Invalid cursor %s' % cursor
+    assert isinstance(totalBy, TotalCount), 'Invalid total strategy %s' % totalBy
+    
+    keyset = orderingFor(sql)
+    for column in identifiersFor(sql):
+        if any(column.compare(ordered) for ordered, _asc in keyset): continue
+        keyset.append((column, True))
+        sql = sql.order_by(column)
+    
+    total = totalBy.count(sql) if withTotal else None
+    
+    sqlCursor = sql.add_columns(*(column for column, _asc in keyset))
+    if cursor:
+        values = decodeCursor(cursor)
+        if len(values) != len(keyset): raise InputError('Invalid cursor', SliceAndCursor.cursor)
+        clauses = []
+        for k, (column, asc) in enumerate(keyset):
+            clause = column > values[k] if asc else column < values[k]
+            clauses.append(and_(*[equal == value for (equal, _asc), value in zip(keyset, values[:k])] + [clause]))
+        # The redundant bound on the first column allows the database to seek in the index instead of scanning.
+        column, asc = keyset[0]
+        sqlCursor = sqlCursor.filter(column >= values[0] if asc else column <= values[0]).filter(or_(*clauses))
+    # We fetch an extra row in order to know if there is a next slice.
+    if limit is not None: sqlCursor = sqlCursor.limit(limit + 1)
+    
+    rows, cursor = sqlCursor.all(), None
+    if limit is not None and len(rows) > limit:
+        del rows[limit:]
+        cursor = encodeCursor(rows[-1][-len(keyset):])
+    return [tuple(row[:-len(keyset)]) for row in rows], cursor, total
+
+def orderingFor(sql):
+    '''
+    Provides the order by columns of the sql query.
+    
+    @param sql: SQL alchemy
+        The sql alchemy query to provide the ordering for.
+    @return: list[tuple(Column, boolean)]
+        The ordering columns and the ascending flag.
+    '''
+    ordering = []
+    for clause in sql._order_by or ():
+        if isinstance(clause, _UnaryExpression) and clause.modifier in (operators.desc_op, operators.asc_op):
+            ordering.append((clause.element, clause.modifier is operators.asc_op))
+        else: ordering.append((clause, True))
+    return ordering
+
+def identifiersFor(sql):
+    '''
+    Provides the identifier columns of the sql query, this are the primary key columns if the query is for an entity or
+    the first queried column otherwise.
+    
+    @param sql: SQL alchemy
+        The sql alchemy query to provide the identifiers for.
+    @return: list[Column]
+        The identifier columns.
+    '''
+    if isEntityQuery(sql): return list(class_mapper(sql.column_descriptions[0]['expr']).primary_key)
+    column = sql.column_descriptions[0]['expr']
+    if hasattr(column, '__clause_element__'): column = column.__clause_element__()
+    return [column]
+
+def isEntityQuery(sql):
+    '''
+    Checks if the sql query provides entity objects rather then rows.
+    
+    @param sql: SQL alchemy
+        The sql alchemy query to check.
+    @return: boolean
+        True if the query provides entity objects.
+    '''
+    descriptions = sql.column_descriptions
+    return len(descriptions) == 1 and isclass(descriptions[0]['expr'])
+
+def fingerprintFor(sql):
+    '''
+    Provides the fingerprint of the sql query, made of the compiled SQL and the parameters.
+    
+    @param sql: SQL alchemy
+        The sql alchemy query to provide the fingerprint for.
+    @return: tuple(string, string)
+        The query fingerprint.
+    '''
+    compiled = sql.statement.compile()
+    return str(compiled), repr(sorted(compiled.params.items()))
+
+# --------------------------------------------------------------------
+
+def encodeCursor(values):
+    '''
+    Encodes the keyset values into an opaque continuation token.
+    
+    @param values: Iterable(object)
+        The keyset values to encode.
+    @return: string
+        The continuation token.
+    '''
+    encoded = []
+    for value in values:
+        if isinstance(value, datetime): value = ['dt', list(value.timetuple()[:6]) + [value.microsecond]]
+        elif isinstance(value, date): value = ['d', list(value.timetuple()[:3])]
+        elif isinstance(value, time_): value = ['t', [value.hour, value.minute, value.second, value.microsecond]]
+        elif isinstance(value, Decimal): value = ['n', str(value)]
+        else: assert value is None or isinstance(value, (int, float, str)), 'Invalid keyset value %s' % value
+        encoded.append(value)
+    return urlsafe_b64encode(json.dumps(encoded, separators=(',', ':')).encode('utf8')).decode('ascii').rstrip('=')
+
+def decodeCursor(cursor):
+    '''
+    Decodes the keyset values from the continuation token.
+    
+    @param cursor: string
+        The continuation token to decode.
+    @return: list[object]
+        The keyset values.
+    @raise InputError: If the continuation token is invalid.
+    '''
+    assert isinstance(cursor, str), 'Invalid cursor %s' % cursor
+    try:
+        values = json.loads(urlsafe_b64decode((cursor + '=' * (-len(cursor) % 4)).encode('ascii')).decode('utf8'))
+        if not isinstance(values, list): raise ValueError()
+        for k, value in enumerate(values):
+            if not isinstance(value, list): continue
+            kind, value = value
+            if kind == 'dt': values[k] = datetime(*value)
+            elif kind == 'd': values[k] = date(*value)
+            elif kind == 't': values[k] = time_(*value)
+            elif kind == 'n': values[k] = Decimal(value)
+            else: raise ValueError()
+    except (ValueError, TypeError, UnicodeError, binascii.Error):
+        raise InputError('Invalid cursor', SliceAndCursor.cursor)
+    return values
+
+# --------------------------------------------------------------------
+
 def insertModel(Mapped, model, **data):
     '''
     Inserts the provided model entity using the current session.